@@ -10,7 +10,19 @@ datamodel-codegen \
     --output posthog/schema.py --output-model-type pydantic_v2.BaseModel \
     --custom-file-header "# mypy: disable-error-code=\"assignment\"" \
     --set-default-enum-member --capitalise-enum-members \
-    --wrap-string-literal
+    --wrap-string-literal --base-class posthog.schema_base.BaseModel
+
+# Models are built lazily (see `posthog.schema_base`), so root models use the lazy base class too, and rebuilding
+# models here would build them all on import
+if [[ "$OSTYPE" == "darwin"* ]]; then
+    sed -i '' -e 's/^from pydantic import \(.*\), RootModel$/from pydantic import \1/' posthog/schema.py
+    sed -i '' -e 's/^from posthog.schema_base import BaseModel$/from posthog.schema_base import BaseModel, RootModel/' posthog/schema.py
+    sed -i '' -e '/^[A-Za-z]*\.model_rebuild()$/d' posthog/schema.py
+else
+    sed -i -e 's/^from pydantic import \(.*\), RootModel$/from pydantic import \1/' posthog/schema.py
+    sed -i -e 's/^from posthog.schema_base import BaseModel$/from posthog.schema_base import BaseModel, RootModel/' posthog/schema.py
+    sed -i -e '/^[A-Za-z]*\.model_rebuild()$/d' posthog/schema.py
+fi
 
 # Format schema.py
 ruff format posthog/schema.py
@@ -0,0 +1,63 @@
+# isort: skip_file
+# Needs to be first to set up django environment
+from . import helpers  # noqa: F401
+from posthog.api.element import ElementSerializer
+from posthog.models.element.element import (
+    _parse_elements_chain,
+    chain_to_element_dicts,
+    chain_to_elements,
+    elements_to_string,
+    parse_elements_chain,
+)
+
+LONG_TEXT = 'Some longer navigation text; with \\"quotes\\" ' * 3
+
+# Chains as captured by autocapture, from a short click on a button to a deeply nested element with long texts
+ELEMENTS_CHAINS = [
+    'button.btn.btn-primary:nth-child="1"nth-of-type="1"text="Sign up"',
+    ";".join(
+        [
+            'span:nth-child="2"nth-of-type="1"text="Sign up"',
+            'button.LemonButton.LemonButton--primary:attr__class="LemonButton LemonButton--primary"'
+            'attr__data-attr="signup"nth-child="1"nth-of-type="1"',
+            'form.signup-form:attr__class="signup-form"attr__method="post"nth-child="1"nth-of-type="1"',
+            'div.container:attr__class="container"nth-child="3"nth-of-type="2"',
+            'body:nth-child="2"nth-of-type="1"',
+        ]
+    ),
+    ";".join(
+        [
+            f'a.nav-link.item-{i}:attr__href="/page/{i}"attr_id="link-{i}"href="/page/{i}"nth-child="{i}"'
+            f'nth-of-type="{i}"text="{LONG_TEXT}"'
+            for i in range(1, 30)
+        ]
+    ),
+]
+
+
+class ElementsChainSuite:
+    version = "v001"
+
+    def time_parse_elements_chain_uncached(self):
+        for chain in ELEMENTS_CHAINS:
+            _parse_elements_chain(chain)
+
+    def time_parse_elements_chain_cached(self):
+        for chain in ELEMENTS_CHAINS:
+            parse_elements_chain(chain)
+
+    def time_chain_to_elements(self):
+        for chain in ELEMENTS_CHAINS:
+            chain_to_elements(chain)
+
+    def time_chain_to_element_dicts(self):
+        for chain in ELEMENTS_CHAINS:
+            chain_to_element_dicts(chain)
+
+    def time_serialize_chain_to_elements(self):
+        for chain in ELEMENTS_CHAINS:
+            ElementSerializer(chain_to_elements(chain), many=True).data  # noqa: B018
+
+    def time_elements_to_string(self):
+        for chain in ELEMENTS_CHAINS:
+            elements_to_string(parse_elements_chain(chain))
@@ -1,25 +1,30 @@
-from collections import defaultdict
+from collections import Counter, defaultdict
+import math
 import re
 from datetime import timedelta
-from typing import Optional
+from typing import NamedTuple, Optional, cast
 from collections.abc import Generator
 
 import structlog
 
+from ee.clickhouse.materialized_columns.backfill import backfill_materialized_columns_by_partition
 from ee.clickhouse.materialized_columns.columns import (
     DEFAULT_TABLE_COLUMN,
-    backfill_materialized_columns,
+    SHORT_TABLE_COLUMN_NAME,
     get_materialized_columns,
     materialize,
+    tables,
 )
 from ee.settings import (
     MATERIALIZE_COLUMNS_ANALYSIS_PERIOD_HOURS,
+    MATERIALIZE_COLUMNS_BACKFILL_MAX_CONCURRENCY,
     MATERIALIZE_COLUMNS_BACKFILL_PERIOD_DAYS,
     MATERIALIZE_COLUMNS_MAX_AT_ONCE,
     MATERIALIZE_COLUMNS_MINIMUM_QUERY_TIME,
 )
 from posthog.cache_utils import instance_memoize
 from posthog.client import sync_execute
+from posthog.hogql.property_usage import PropertyAccess, get_property_usage
 from posthog.models.filters.mixins.utils import cached_property
 from posthog.models.person.sql import (
     GET_EVENT_PROPERTIES_COUNT,
@@ -33,6 +38,24 @@ Suggestion = tuple[TableWithProperties, TableColumn, PropertyName]
 
 logger = structlog.get_logger(__name__)
 
+# Minimum number of queries extracting a property from JSON before it is recommended for materialization
+MIN_PROPERTY_USAGE_QUERIES = 100
+
+
+class PropertyUsageSuggestion(NamedTuple):
+    table: TableWithProperties
+    table_column: TableColumn
+    property_name: PropertyName
+    # Number of queries which extracted the property from JSON, and how many teams they came from
+    json_extract_queries: int
+    teams: int
+    # Number of queries which read the property from a property group instead
+    property_group_queries: int
+
+    @property
+    def suggestion(self) -> Suggestion:
+        return self.table, self.table_column, self.property_name
+
 
 class TeamManager:
     @instance_memoize
@@ -163,12 +186,61 @@ LIMIT 100 -- Make sure we don't add 100s of columns in one run
     return [("events", table_column, property_name) for (table_column, property_name) in raw_queries]
 
 
+def analyze_property_usage(
+    since_hours_ago: int,
+    min_queries: int = MIN_PROPERTY_USAGE_QUERIES,
+    team_id: Optional[int] = None,
+) -> list[PropertyUsageSuggestion]:
+    """
+    Ranks the properties which HogQL queries most often had to extract from JSON, based off of the property usage
+    recorded when printing queries. Properties which are already materialized are skipped.
+    """
+    usage = get_property_usage(math.ceil(since_hours_ago / 24), team_id=team_id)
+
+    json_extract_queries: Counter[Suggestion] = Counter()
+    property_group_queries: Counter[Suggestion] = Counter()
+    teams: Counter[Suggestion] = Counter()
+    for team_usage in usage.values():
+        for access, count in team_usage.items():
+            if access.table not in tables or access.table_column not in SHORT_TABLE_COLUMN_NAME:
+                continue
+            suggestion = _property_access_suggestion(access)
+            if access.source == "json_extract":
+                json_extract_queries[suggestion] += count
+                teams[suggestion] += 1
+            elif access.source == "property_group":
+                property_group_queries[suggestion] += count
+
+    materialized_columns: dict[TableWithProperties, set[tuple[PropertyName, TableColumn]]] = {}
+    suggestions = []
+    for (table, table_column, property_name), queries in json_extract_queries.items():
+        if queries < min_queries:
+            continue
+        if table not in materialized_columns:
+            materialized_columns[table] = set(get_materialized_columns(table))
+        if (property_name, table_column) in materialized_columns[table]:
+            continue
+        suggestion = (table, table_column, property_name)
+        suggestions.append(
+            PropertyUsageSuggestion(
+                table, table_column, property_name, queries, teams[suggestion], property_group_queries[suggestion]
+            )
+        )
+
+    return sorted(suggestions, key=lambda s: (s.json_extract_queries, s.teams), reverse=True)
+
+
+def _property_access_suggestion(access: PropertyAccess) -> Suggestion:
+    return cast(TableWithProperties, access.table), cast(TableColumn, access.table_column), access.property_name
+
+
 def materialize_properties_task(
     columns_to_materialize: Optional[list[Suggestion]] = None,
     time_to_analyze_hours: int = MATERIALIZE_COLUMNS_ANALYSIS_PERIOD_HOURS,
     maximum: int = MATERIALIZE_COLUMNS_MAX_AT_ONCE,
     min_query_time: int = MATERIALIZE_COLUMNS_MINIMUM_QUERY_TIME,
     backfill_period_days: int = MATERIALIZE_COLUMNS_BACKFILL_PERIOD_DAYS,
+    backfill_max_concurrency: int = MATERIALIZE_COLUMNS_BACKFILL_MAX_CONCURRENCY,
     dry_run: bool = False,
     team_id_to_analyze: Optional[int] = None,
 ) -> None:
@@ -177,7 +249,18 @@ def materialize_properties_task(
     """
 
     if columns_to_materialize is None:
-        columns_to_materialize = _analyze(time_to_analyze_hours, min_query_time, team_id_to_analyze)
+        # Properties HogQL queries most often extract from JSON come first, then those from slow queries in the query log
+        columns_to_materialize = list(
+            dict.fromkeys(
+                [
+                    *(
+                        usage.suggestion
+                        for usage in analyze_property_usage(time_to_analyze_hours, team_id=team_id_to_analyze)
+                    ),
+                    *_analyze(time_to_analyze_hours, min_query_time, team_id_to_analyze),
+                ]
+            )
+        )
 
     columns_by_table: dict[TableWithProperties, list[tuple[TableColumn, PropertyName]]] = defaultdict(list)
     for table, table_column, property_name in columns_to_materialize:
@@ -203,10 +286,19 @@ def materialize_properties_task(
         logger.info(f"Materializing column. table={table}, property_name={property_name}")
 
         if not dry_run:
-            materialize(table, property_name, table_column=table_column)
+            if backfill_period_days > 0:
+                # Only enabled for HogQL queries once the backfill has finished
+                materialize(table, property_name, table_column=table_column, is_disabled=True)
+            else:
+                materialize(table, property_name, table_column=table_column)
         properties[table].append((property_name, table_column))
 
     if backfill_period_days > 0 and not dry_run:
         logger.info(f"Starting backfill for new materialized columns. period_days={backfill_period_days}")
-        backfill_materialized_columns("events", properties["events"], timedelta(days=backfill_period_days))
-        backfill_materialized_columns("person", properties["person"], timedelta(days=backfill_period_days))
+        for table in ("events", "person"):
+            backfill_materialized_columns_by_partition(
+                table,
+                properties[table],
+                timedelta(days=backfill_period_days),
+                max_concurrency=backfill_max_concurrency,
+            )
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+import structlog
+from clickhouse_driver import Client
+from django.utils.timezone import now
+
+from ee.clickhouse.materialized_columns.columns import (
+    MaterializedColumn,
+    ModifyColumnDefaultTask,
+    ShardedTableInfo,
+    get_cluster,
+    tables,
+    update_column_is_disabled,
+)
+from ee.settings import MATERIALIZE_COLUMNS_BACKFILL_MAX_CONCURRENCY
+from posthog.clickhouse.cluster import HostInfo
+from posthog.models.property import PropertyName, TableColumn, TableWithProperties
+from posthog.redis import get_client
+from posthog.settings import CLICKHOUSE_DATABASE
+
+logger = structlog.get_logger(__name__)
+
+BACKFILL_PROGRESS_KEY = "materialized_columns_backfill:{table}:{columns}"
+# Long enough to resume a backfill which was interrupted over a weekend
+BACKFILL_PROGRESS_TTL = timedelta(days=14)
+
+
+@dataclass(frozen=True)
+class BackfillPartition:
+    host: HostInfo
+    partition_id: str
+    rows: int
+    bytes: int
+
+    @property
+    def progress_key(self) -> str:
+        # Hosts of sharded tables can be replaced, but the shard they hold stays the same
+        location = self.host.shard_num if self.host.shard_num is not None else self.host.connection_info.address
+        return f"{location}:{self.partition_id}"
+
+
+@dataclass
+class BackfillStats:
+    partitions: int = 0
+    rows: int = 0
+    bytes: int = 0
+    duration: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.duration if self.duration > 0 else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.duration if self.duration > 0 else 0.0
+
+
+class BackfillProgress:
+    """
+    Keeps track of the partitions which have been backfilled in redis, so an interrupted backfill can be resumed.
+    """
+
+    def __init__(self, table: TableWithProperties, columns: list[MaterializedColumn]) -> None:
+        self.key = BACKFILL_PROGRESS_KEY.format(
+            table=table, columns=",".join(sorted(column.name for column in columns))
+        )
+
+    def get_completed(self, cutoff: datetime | None) -> set[str]:
+        """
+        Returns the progress keys of the partitions which have been backfilled at least back to `cutoff`.
+        """
+        completed = set()
+        for progress_key, value in get_client().hgetall(self.key).items():
+            completed_cutoff = json.loads(value)["cutoff"]
+            # A partition backfilled from an earlier cutoff (or without a cutoff) also covers later cutoffs
+            if completed_cutoff is None or (cutoff is not None and completed_cutoff <= cutoff.isoformat()):
+                completed.add(progress_key.decode())
+        return completed
+
+    def mark_completed(self, partition: BackfillPartition, cutoff: datetime | None, duration: float) -> None:
+        value = json.dumps(
+            {
+                "cutoff": cutoff.isoformat() if cutoff is not None else None,
+                "rows": partition.rows,
+                "bytes": partition.bytes,
+                "duration": duration,
+            }
+        )
+        pipeline = get_client().pipeline()
+        pipeline.hset(self.key, partition.progress_key, value)
+        pipeline.expire(self.key, BACKFILL_PROGRESS_TTL)
+        pipeline.execute()
+
+
+@dataclass
+class GetPartitionsTask:
+    table: str
+    min_partition_id: str | None
+
+    def execute(self, client: Client) -> list[tuple[str, int, int]]:
+        return client.execute(
+            f"""
+            SELECT partition_id, sum(rows), sum(bytes_on_disk)
+            FROM system.parts
+            WHERE database = %(database)s AND table = %(table)s AND active
+            {"AND partition_id >= %(min_partition_id)s" if self.min_partition_id is not None else ""}
+            GROUP BY partition_id
+            ORDER BY partition_id
+            """,
+            {"database": CLICKHOUSE_DATABASE, "table": self.table, "min_partition_id": self.min_partition_id},
+        )
+
+
+@dataclass
+class BackfillPartitionTask:
+    table: str
+    columns: list[MaterializedColumn]
+    partition: BackfillPartition
+    cutoff: datetime | None
+    progress: BackfillProgress
+    test_settings: dict[str, Any] | None
+
+    def execute(self, client: Client) -> BackfillStats:
+        assignments = ", ".join(f"{column.name} = {column.name}" for column in self.columns)
+        where_clause = "timestamp > %(cutoff)s" if self.cutoff is not None else "1 = 1"
+
+        start = time.monotonic()
+        # Waits for the mutation to finish on all replicas, so that a completed partition is fully backfilled
+        client.execute(
+            f"ALTER TABLE {self.table} UPDATE {assignments} IN PARTITION ID %(partition_id)s WHERE {where_clause}",
+            {"partition_id": self.partition.partition_id, "cutoff": self.cutoff},
+            settings={"mutations_sync": 2, **(self.test_settings or {})},
+        )
+        duration = time.monotonic() - start
+
+        self.progress.mark_completed(self.partition, self.cutoff, duration)
+
+        stats = BackfillStats(partitions=1, rows=self.partition.rows, bytes=self.partition.bytes, duration=duration)
+        logger.info(
+            "Backfilled materialized columns partition",
+            table=self.table,
+            partition_id=self.partition.partition_id,
+            shard_num=self.partition.host.shard_num,
+            rows=stats.rows,
+            bytes=stats.bytes,
+            rows_per_second=round(stats.rows_per_second),
+            bytes_per_second=round(stats.bytes_per_second),
+        )
+        return stats
+
+
+def backfill_materialized_columns_by_partition(
+    table: TableWithProperties,
+    properties: list[tuple[PropertyName, TableColumn]],
+    backfill_period: timedelta,
+    max_concurrency: int = MATERIALIZE_COLUMNS_BACKFILL_MAX_CONCURRENCY,
+    test_settings: dict[str, Any] | None = None,
+) -> BackfillStats:
+    """
+    Backfills materialized columns one partition at a time, running up to `max_concurrency` partitions in parallel
+    across the shards of the table, largest partitions first.
+
+    Backfilled partitions are recorded, so running this again after a failure resumes where the backfill stopped.
+    Columns which are disabled are enabled for HogQL queries once all partitions within the backfill period are done.
+    """
+
+    if len(properties) == 0:
+        return BackfillStats()
+
+    cluster = get_cluster()
+    table_info = tables[table]
+
+    materialized_columns = {
+        (column.details.property_name, column.details.table_column): column
+        for column in MaterializedColumn.get_all(table)
+    }
+    columns = [materialized_columns[property] for property in properties]
+
+    table_info.map_data_nodes(
+        cluster,
+        ModifyColumnDefaultTask(table_info.data_table, columns, test_settings).execute,
+    ).result()
+
+    cutoff: datetime | None = None
+    min_partition_id: str | None = None
+    if table == "events":  # XXX: the events table is partitioned by toYYYYMM(timestamp)
+        cutoff = (now() - backfill_period).replace(hour=0, minute=0, second=0, microsecond=0)
+        min_partition_id = cutoff.strftime("%Y%m")
+
+    partitions_by_host = table_info.map_data_nodes(
+        cluster,
+        GetPartitionsTask(table_info.data_table, min_partition_id).execute,
+    ).result()
+
+    progress = BackfillProgress(table, columns)
+    completed = progress.get_completed(cutoff)
+    partitions = [
+        BackfillPartition(host, partition_id, rows, bytes_on_disk)
+        for host, host_partitions in partitions_by_host.items()
+        for partition_id, rows, bytes_on_disk in host_partitions
+    ]
+    pending_partitions = sorted(
+        (partition for partition in partitions if partition.progress_key not in completed),
+        key=lambda partition: partition.bytes,
+        reverse=True,
+    )
+
+    logger.info(
+        "Starting materialized columns backfill",
+        table=table,
+        columns=[column.name for column in columns],
+        sharded=isinstance(table_info, ShardedTableInfo),
+        partitions=len(partitions),
+        pending_partitions=len(pending_partitions),
+        max_concurrency=max_concurrency,
+    )
+
+    start = time.monotonic()
+    # Raises once all partitions have been attempted if any of them failed, leaving the columns disabled
+    results = cluster.map_hosts(
+        {
+            partition: (
+                partition.host,
+                BackfillPartitionTask(
+                    table_info.data_table, columns, partition, cutoff, progress, test_settings
+                ).execute,
+            )
+            for partition in pending_partitions
+        },
+        max_workers=max_concurrency,
+    ).result()
+
+    stats = BackfillStats(
+        partitions=len(results),
+        rows=sum(result.rows for result in results.values()),
+        bytes=sum(result.bytes for result in results.values()),
+        duration=time.monotonic() - start,
+    )
+    logger.info(
+        "Finished materialized columns backfill",
+        table=table,
+        columns=[column.name for column in columns],
+        partitions=stats.partitions,
+        rows=stats.rows,
+        bytes=stats.bytes,
+        rows_per_second=round(stats.rows_per_second),
+        bytes_per_second=round(stats.bytes_per_second),
+    )
+
+    for column in columns:
+        if column.details.is_disabled:
+            update_column_is_disabled(table, column.name, is_disabled=False)
+
+    return stats
@@ -215,6 +215,7 @@ def materialize(
     column_name: ColumnName | None = None,
     table_column: TableColumn = DEFAULT_TABLE_COLUMN,
     create_minmax_index=not TEST,
+    is_disabled: bool = False,
 ) -> ColumnName | None:
     if (property, table_column) in get_materialized_columns(table):
         if TEST:
@@ -233,7 +234,7 @@ def materialize(
         details=MaterializedColumnDetails(
             table_column=table_column,
             property_name=property,
-            is_disabled=False,
+            is_disabled=is_disabled,
         ),
     )
 
@@ -334,10 +335,9 @@ def drop_column(table: TablesWithMaterializedColumns, column_name: str) -> None:
 
 
 @dataclass
-class BackfillColumnTask:
+class ModifyColumnDefaultTask:
     table: str
     columns: list[MaterializedColumn]
-    backfill_period: timedelta | None
     test_settings: dict[str, Any] | None
 
     def execute(self, client: Client) -> None:
@@ -354,6 +354,17 @@ class BackfillColumnTask:
                 settings=self.test_settings,
             )
 
+
+@dataclass
+class BackfillColumnTask:
+    table: str
+    columns: list[MaterializedColumn]
+    backfill_period: timedelta | None
+    test_settings: dict[str, Any] | None
+
+    def execute(self, client: Client) -> None:
+        ModifyColumnDefaultTask(self.table, self.columns, self.test_settings).execute(client)
+
         # Kick off mutations which will update clickhouse partitions in the background. This will return immediately
         assignments = ", ".join(f"{column.name} = {column.name}" for column in self.columns)
 
@@ -1,13 +1,18 @@
 from posthog.test.base import BaseTest, ClickhouseTestMixin
 from posthog.client import sync_execute
-from ee.clickhouse.materialized_columns.analyze import materialize_properties_task
+from ee.clickhouse.materialized_columns.analyze import (
+    PropertyUsageSuggestion,
+    analyze_property_usage,
+    materialize_properties_task,
+)
+from posthog.hogql.property_usage import PropertyAccess, flush_property_usage, record_property_usage
 
 from unittest.mock import patch, call
 
 
 class TestMaterializedColumnsAnalyze(ClickhouseTestMixin, BaseTest):
     @patch("ee.clickhouse.materialized_columns.analyze.materialize")
-    @patch("ee.clickhouse.materialized_columns.analyze.backfill_materialized_columns")
+    @patch("ee.clickhouse.materialized_columns.analyze.backfill_materialized_columns_by_partition")
     def test_mat_columns(self, patch_backfill, patch_materialize):
         sync_execute("SYSTEM FLUSH LOGS")
         sync_execute("TRUNCATE TABLE system.query_log")
@@ -55,3 +60,40 @@ class TestMaterializedColumnsAnalyze(ClickhouseTestMixin, BaseTest):
                 call("events", "materialize_me3", table_column="properties"),
             ]
         )
+
+    @patch("ee.clickhouse.materialized_columns.analyze.get_materialized_columns")
+    def test_analyze_property_usage(self, patch_get_materialized_columns):
+        patch_get_materialized_columns.return_value = {
+            ("already_materialized", "properties"): "mat_already_materialized"
+        }
+
+        for team_id, accesses, queries in [
+            (1, {PropertyAccess("json_extract", "events", "properties", "popular")}, 3),
+            (2, {PropertyAccess("json_extract", "events", "properties", "popular")}, 2),
+            (
+                1,
+                {
+                    PropertyAccess("json_extract", "events", "person_properties", "email"),
+                    PropertyAccess("json_extract", "events", "properties", "already_materialized"),
+                    PropertyAccess("json_extract", "sessions", "properties", "not_materializable"),
+                    PropertyAccess("property_group", "events", "properties", "popular"),
+                },
+                4,
+            ),
+            (1, {PropertyAccess("json_extract", "person", "properties", "rare")}, 1),
+        ]:
+            for _ in range(queries):
+                record_property_usage(team_id, accesses)
+        flush_property_usage()
+
+        self.assertEqual(
+            analyze_property_usage(24, min_queries=2),
+            [
+                PropertyUsageSuggestion("events", "properties", "popular", 5, 2, 4),
+                PropertyUsageSuggestion("events", "person_properties", "email", 4, 1, 0),
+            ],
+        )
+        self.assertEqual(
+            analyze_property_usage(24, min_queries=1, team_id=2),
+            [PropertyUsageSuggestion("events", "properties", "popular", 2, 1, 0)],
+        )
@@ -5,6 +5,10 @@ from unittest.mock import patch
 
 from freezegun import freeze_time
 
+from ee.clickhouse.materialized_columns.backfill import (
+    BackfillPartitionTask,
+    backfill_materialized_columns_by_partition,
+)
 from ee.clickhouse.materialized_columns.columns import (
     MaterializedColumn,
     MaterializedColumnDetails,
@@ -239,6 +243,82 @@ class TestMaterializedColumns(ClickhouseTestMixin, BaseTest):
             ],
         )
 
+    def test_backfilling_data_by_partition(self):
+        for timestamp, properties in [
+            ("2021-01-01 00:00:00", {"prop": 1}),
+            ("2021-04-02 00:00:00", {"prop": 2}),
+            ("2021-05-03 00:00:00", {"prop": 3}),
+            ("2021-05-04 00:00:00", {}),
+        ]:
+            _create_event(
+                event="some_event", distinct_id="1", team=self.team, timestamp=timestamp, properties=properties
+            )
+
+        column = materialize("events", "prop", create_minmax_index=True, is_disabled=True)
+        assert column is not None
+        assert ("prop", "properties") not in get_materialized_columns("events", exclude_disabled_columns=True)
+
+        with freeze_time("2021-05-10T14:00:01Z"):
+            stats = backfill_materialized_columns_by_partition(
+                "events", [("prop", "properties")], timedelta(days=50), max_concurrency=2
+            )
+
+        # Only the April and May partitions are within the backfill period, and only events after the cutoff are written
+        self.assertEqual(stats.partitions, 2)
+        self.assertEqual(stats.rows, 3)
+        self.assertEqual(self._count_materialized_rows(column), 3)
+        self.assertEqual(
+            sync_execute(f"SELECT {column} FROM events ORDER BY timestamp"), [("1",), ("2",), ("3",), ("",)]
+        )
+        self.assertEqual(
+            get_materialized_columns("events", exclude_disabled_columns=True)[("prop", "properties")], column
+        )
+
+        # Backfilled partitions are skipped when the backfill runs again
+        with freeze_time("2021-05-10T14:00:01Z"):
+            stats = backfill_materialized_columns_by_partition("events", [("prop", "properties")], timedelta(days=50))
+        self.assertEqual(stats.partitions, 0)
+
+        # ... unless they need to be backfilled further back
+        with freeze_time("2021-05-10T14:00:01Z"):
+            stats = backfill_materialized_columns_by_partition("events", [("prop", "properties")], timedelta(days=365))
+        self.assertEqual(stats.partitions, 3)
+
+    def test_backfilling_data_by_partition_resumes_after_failure(self):
+        _create_event(
+            event="some_event", distinct_id="1", team=self.team, timestamp="2021-04-02 00:00:00", properties={"prop": 1}
+        )
+        _create_event(
+            event="some_event", distinct_id="1", team=self.team, timestamp="2021-05-03 00:00:00", properties={"prop": 2}
+        )
+
+        column = materialize("events", "prop", create_minmax_index=True, is_disabled=True)
+        assert column is not None
+
+        execute = BackfillPartitionTask.execute
+
+        def fail_for_april(task, client):
+            if task.partition.partition_id == "202104":
+                raise Exception("Mutation failed")
+            return execute(task, client)
+
+        with freeze_time("2021-05-10T14:00:01Z"), patch.object(BackfillPartitionTask, "execute", fail_for_april):
+            with self.assertRaises(ExceptionGroup):
+                backfill_materialized_columns_by_partition("events", [("prop", "properties")], timedelta(days=50))
+
+        # The column stays disabled until all partitions have been backfilled
+        assert ("prop", "properties") not in get_materialized_columns("events", exclude_disabled_columns=True)
+        self.assertEqual(self._count_materialized_rows(column), 1)
+
+        with freeze_time("2021-05-10T14:00:01Z"):
+            stats = backfill_materialized_columns_by_partition("events", [("prop", "properties")], timedelta(days=50))
+
+        self.assertEqual(stats.partitions, 1)
+        self.assertEqual(self._count_materialized_rows(column), 2)
+        self.assertEqual(
+            get_materialized_columns("events", exclude_disabled_columns=True)[("prop", "properties")], column
+        )
+
     def test_column_types(self):
         materialize("events", "myprop", create_minmax_index=True)
 
@@ -6,14 +6,16 @@ from freezegun import freeze_time
 from posthog.client import sync_execute
 from posthog.hogql.hogql import HogQLContext
 from posthog.models.action import Action
-from posthog.models.cohort import Cohort
+from posthog.models.cohort import Cohort, calculate_people_ch_for_cohorts
 from posthog.models.cohort.sql import GET_COHORTPEOPLE_BY_COHORT_ID
 from posthog.models.cohort.util import format_filter_query, get_person_ids_by_cohort_id
 from posthog.models.filters import Filter
 from posthog.models.organization import Organization
 from posthog.models.person import Person
+from posthog.models.person.util import create_person
 from posthog.models.property.util import parse_prop_grouped_clauses
 from posthog.models.team import Team
+from posthog.models.utils import UUIDT
 from posthog.queries.util import PersonPropertiesMode
 from posthog.schema import PersonsOnEventsMode
 from posthog.test.base import (
@@ -526,6 +528,31 @@ class TestCohort(ClickhouseTestMixin, BaseTest):
         results = self._get_cohortpeople(cohort1)
         self.assertEqual(len(results), 2)
 
+    def test_cohortpeople_for_cohorts_with_identical_filters(self):
+        p1 = Person.objects.create(
+            team_id=self.team.pk,
+            distinct_ids=["1"],
+            properties={"$some_prop": "something"},
+        )
+        Person.objects.create(
+            team_id=self.team.pk,
+            distinct_ids=["2"],
+            properties={"$some_prop": "other"},
+        )
+
+        groups = [{"properties": [{"key": "$some_prop", "value": "something", "type": "person"}]}]
+        cohort1 = Cohort.objects.create(team=self.team, groups=groups, name="cohort1")
+        cohort2 = Cohort.objects.create(team=self.team, groups=groups, name="cohort2")
+
+        calculate_people_ch_for_cohorts([cohort1, cohort2], {cohort1.pk: 0, cohort2.pk: 3})
+
+        cohort1.refresh_from_db()
+        cohort2.refresh_from_db()
+        self.assertEqual((cohort1.version, cohort1.count), (0, 1))
+        self.assertEqual((cohort2.version, cohort2.count), (3, 1))
+        self.assertEqual([r[0] for r in self._get_cohortpeople(cohort1)], [p1.uuid])
+        self.assertEqual([r[0] for r in self._get_cohortpeople(cohort2)], [p1.uuid])
+
     def test_cohortpeople_action_basic(self):
         action = _create_action(team=self.team, name="$pageview")
         Person.objects.create(
@@ -755,6 +782,124 @@ class TestCohort(ClickhouseTestMixin, BaseTest):
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0][0], p1.uuid)
 
+    def test_cohortpeople_incremental_person_properties(self):
+        # Persons are written with explicit `_timestamp`s, as ClickHouse doesn't see the frozen time
+        p1_uuid = str(UUIDT())
+        p2_uuid = str(UUIDT())
+
+        def write_persons(timestamp: str, version: int, p1_prop: str, p2_prop: str):
+            for uuid, prop in [(p1_uuid, p1_prop), (p2_uuid, p2_prop)]:
+                create_person(
+                    team_id=self.team.pk,
+                    uuid=uuid,
+                    version=version,
+                    properties={"$some_prop": prop},
+                    timestamp=timestamp,
+                    sync=True,
+                )
+
+        write_persons("2024-01-01T10:00:00Z", 0, "something", "other")
+        cohort1 = Cohort.objects.create(
+            team=self.team,
+            groups=[{"properties": [{"key": "$some_prop", "value": "something", "type": "person"}]}],
+            name="cohort1",
+        )
+        with freeze_time("2024-01-01T10:00:00Z"):
+            cohort1.calculate_people_ch(pending_version=0)
+        self.assertEqual([str(r[0]) for r in self._get_cohortpeople(cohort1)], [p1_uuid])
+
+        write_persons("2024-01-01T11:00:00Z", 1, "other", "something")
+        with freeze_time("2024-01-01T11:00:00Z"):
+            cohort1.calculate_people_ch(pending_version=None, incremental=True)
+
+        # p1 was removed, so the remaining members were copied to a new version
+        cohort1.refresh_from_db()
+        self.assertEqual(cohort1.version, 1)
+        self.assertEqual(cohort1.count, 1)
+        self.assertEqual([str(r[0]) for r in self._get_cohortpeople(cohort1)], [p2_uuid])
+
+        # A removed person can be added back
+        write_persons("2024-01-01T12:00:00Z", 2, "something", "something")
+        with freeze_time("2024-01-01T12:00:00Z"):
+            cohort1.calculate_people_ch(pending_version=None, incremental=True)
+
+        # Persons were only added, so the current version was updated in place
+        cohort1.refresh_from_db()
+        self.assertEqual(cohort1.version, 1)
+        self.assertEqual(cohort1.count, 2)
+        self.assertCountEqual([str(r[0]) for r in self._get_cohortpeople(cohort1)], [p1_uuid, p2_uuid])
+
+    def test_cohortpeople_incremental_performed_event(self):
+        # ClickHouse's now() isn't frozen, so timestamps are relative to the actual time
+        now = timezone.now()
+        p1 = _create_person(team_id=self.team.pk, distinct_ids=["1"])
+        p2 = _create_person(team_id=self.team.pk, distinct_ids=["2"])
+        p3 = _create_person(team_id=self.team.pk, distinct_ids=["3"])
+        _create_event(
+            team=self.team, event="$pageview", distinct_id="1", timestamp=now - timedelta(days=7, minutes=-30)
+        )
+        _create_event(team=self.team, event="$pageview", distinct_id="2", timestamp=now - timedelta(days=1))
+        flush_persons_and_events()
+
+        cohort1 = Cohort.objects.create(
+            team=self.team,
+            filters={
+                "properties": {
+                    "type": "OR",
+                    "values": [
+                        {
+                            "type": "AND",
+                            "values": [
+                                {
+                                    "key": "$pageview",
+                                    "event_type": "events",
+                                    "time_value": 7,
+                                    "time_interval": "day",
+                                    "value": "performed_event",
+                                    "type": "behavioral",
+                                }
+                            ],
+                        }
+                    ],
+                }
+            },
+            name="cohort1",
+        )
+        cohort1.calculate_people_ch(pending_version=0)
+        self.assertCountEqual([r[0] for r in self._get_cohortpeople(cohort1)], [p1.uuid, p2.uuid])
+
+        _create_event(team=self.team, event="$pageview", distinct_id="3", timestamp=now + timedelta(minutes=5))
+        flush_persons_and_events()
+
+        with freeze_time(now + timedelta(hours=1)):
+            cohort1.calculate_people_ch(pending_version=None, incremental=True)
+
+        # p1's event dropped out of the window and p3 performed the event since the last calculation
+        cohort1.refresh_from_db()
+        self.assertEqual(cohort1.version, 1)
+        self.assertEqual(cohort1.count, 2)
+        self.assertCountEqual([r[0] for r in self._get_cohortpeople(cohort1)], [p2.uuid, p3.uuid])
+
+    def test_cohortpeople_incremental_falls_back_to_full_recalculation(self):
+        Person.objects.create(team_id=self.team.pk, distinct_ids=["1"], properties={"$some_prop": "something"})
+        cohort1 = Cohort.objects.create(
+            team=self.team,
+            groups=[{"properties": [{"key": "$some_prop", "value": "something", "type": "person"}]}],
+            name="cohort1",
+        )
+
+        # No previous calculation to apply changes to
+        cohort1.calculate_people_ch(pending_version=0, incremental=True)
+        self.assertEqual(cohort1.version, 0)
+
+        # Filters changed since the current version was calculated
+        cohort1.groups = [{"properties": [{"key": "$some_prop", "value": "other", "type": "person"}]}]
+        cohort1.save()
+        cohort1.calculate_people_ch(pending_version=1, incremental=True)
+
+        self.assertEqual(cohort1.version, 1)
+        self.assertEqual(self._get_cohortpeople(cohort1), [])
+
     def test_cohort_change(self):
         p1 = Person.objects.create(
             team_id=self.team.pk,
@@ -19,8 +19,7 @@ from posthog.constants import (
     TREND_FILTER_TYPE_ACTIONS,
     FunnelCorrelationType,
 )
-from posthog.models.element.element import chain_to_elements
-from posthog.models.event.util import ElementSerializer
+from posthog.models.event.util import serialize_elements_chain
 from posthog.models.filters import Filter
 from posthog.models.property.util import get_property_string_expr
 from posthog.models.team import Team
@@ -932,7 +931,7 @@ class FunnelCorrelation:
                 properties={self.AUTOCAPTURE_EVENT_TYPE: event_type},
                 elements=cast(
                     list,
-                    ElementSerializer(chain_to_elements(elements_chain), many=True).data,
+                    serialize_elements_chain(elements_chain),
                 ),
             )
 
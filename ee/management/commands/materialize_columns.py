@@ -9,6 +9,7 @@ from ee.clickhouse.materialized_columns.analyze import (
 from ee.clickhouse.materialized_columns.columns import DEFAULT_TABLE_COLUMN
 from posthog.settings import (
     MATERIALIZE_COLUMNS_ANALYSIS_PERIOD_HOURS,
+    MATERIALIZE_COLUMNS_BACKFILL_MAX_CONCURRENCY,
     MATERIALIZE_COLUMNS_BACKFILL_PERIOD_DAYS,
     MATERIALIZE_COLUMNS_MAX_AT_ONCE,
     MATERIALIZE_COLUMNS_MINIMUM_QUERY_TIME,
@@ -44,6 +45,12 @@ class Command(BaseCommand):
             default=MATERIALIZE_COLUMNS_BACKFILL_PERIOD_DAYS,
             help="How many days worth of data to backfill. 0 to disable. Same as MATERIALIZE_COLUMNS_BACKFILL_PERIOD_DAYS env variable.",
         )
+        parser.add_argument(
+            "--backfill-max-concurrency",
+            type=int,
+            default=MATERIALIZE_COLUMNS_BACKFILL_MAX_CONCURRENCY,
+            help="How many partitions to backfill at once. Same as MATERIALIZE_COLUMNS_BACKFILL_MAX_CONCURRENCY env variable.",
+        )
 
         parser.add_argument(
             "--min-query-time",
@@ -89,6 +96,7 @@ class Command(BaseCommand):
                     for prop in options.get("property")
                 ],
                 backfill_period_days=options["backfill_period"],
+                backfill_max_concurrency=options["backfill_max_concurrency"],
                 dry_run=options["dry_run"],
             )
         else:
@@ -97,6 +105,7 @@ class Command(BaseCommand):
                 maximum=options["max_columns"],
                 min_query_time=options["min_query_time"],
                 backfill_period_days=options["backfill_period"],
+                backfill_max_concurrency=options["backfill_max_concurrency"],
                 dry_run=options["dry_run"],
                 team_id_to_analyze=options["analyze_team_id"],
             )
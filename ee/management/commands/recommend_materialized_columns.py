@@ -0,0 +1,82 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from ee.clickhouse.materialized_columns.analyze import (
+    MIN_PROPERTY_USAGE_QUERIES,
+    analyze_property_usage,
+    logger,
+    materialize_properties_task,
+)
+from posthog.settings import (
+    MATERIALIZE_COLUMNS_ANALYSIS_PERIOD_HOURS,
+    MATERIALIZE_COLUMNS_BACKFILL_PERIOD_DAYS,
+    MATERIALIZE_COLUMNS_MAX_AT_ONCE,
+)
+
+
+class Command(BaseCommand):
+    help = "Recommend properties to materialize based off of how often HogQL queries extract them from JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--analyze-period",
+            type=int,
+            default=MATERIALIZE_COLUMNS_ANALYSIS_PERIOD_HOURS,
+            help="How long of a time period to analyze. Same as MATERIALIZE_COLUMNS_ANALYSIS_PERIOD_HOURS env variable.",
+        )
+        parser.add_argument(
+            "--analyze-team-id",
+            type=int,
+            default=None,
+            help="Analyze property usage only for a specific team_id",
+        )
+        parser.add_argument(
+            "--min-queries",
+            type=int,
+            default=MIN_PROPERTY_USAGE_QUERIES,
+            help="Minimum number of queries extracting a property from JSON before it is recommended",
+        )
+        parser.add_argument(
+            "--max-columns",
+            type=int,
+            default=MATERIALIZE_COLUMNS_MAX_AT_ONCE,
+            help="Max number of columns to recommend. Same as MATERIALIZE_COLUMNS_MAX_AT_ONCE env variable.",
+        )
+        parser.add_argument(
+            "--materialize",
+            action="store_true",
+            help="Materialize the recommended columns instead of only listing them",
+        )
+        parser.add_argument(
+            "--backfill-period",
+            type=int,
+            default=MATERIALIZE_COLUMNS_BACKFILL_PERIOD_DAYS,
+            help="How many days worth of data to backfill when materializing. 0 to disable. Same as MATERIALIZE_COLUMNS_BACKFILL_PERIOD_DAYS env variable.",
+        )
+
+    def handle(self, *args, **options):
+        logger.setLevel(logging.INFO)
+
+        suggestions = analyze_property_usage(
+            options["analyze_period"],
+            min_queries=options["min_queries"],
+            team_id=options["analyze_team_id"],
+        )[: options["max_columns"]]
+
+        if not suggestions:
+            self.stdout.write("No properties to recommend for materialization.")
+            return
+
+        for rank, suggestion in enumerate(suggestions, start=1):
+            self.stdout.write(
+                f"{rank}. table={suggestion.table} table_column={suggestion.table_column} "
+                f"property={suggestion.property_name!r} json_extract_queries={suggestion.json_extract_queries} "
+                f"teams={suggestion.teams} property_group_queries={suggestion.property_group_queries}"
+            )
+
+        if options["materialize"]:
+            materialize_properties_task(
+                columns_to_materialize=[suggestion.suggestion for suggestion in suggestions],
+                backfill_period_days=options["backfill_period"],
+            )
@@ -1,7 +1,10 @@
 from django.contrib.postgres.fields import ArrayField
 from django.db import models
+from django.db.models.signals import post_delete, post_save
 
 from posthog.models.property_definition import PropertyDefinition
+from posthog.models.property_type_catalog import invalidate_property_type_catalog
+from posthog.models.signals import mutable_receiver
 
 
 class EnterprisePropertyDefinition(PropertyDefinition):
@@ -29,3 +32,8 @@ class EnterprisePropertyDefinition(PropertyDefinition):
         default=None,
         db_column="tags",
     )
+
+
+@mutable_receiver([post_save, post_delete], sender=EnterprisePropertyDefinition)
+def enterprise_property_definition_changed(sender, instance: EnterprisePropertyDefinition, **kwargs):
+    invalidate_property_type_catalog(instance.team_id)
@@ -57,6 +57,10 @@ MATERIALIZE_COLUMNS_ANALYSIS_PERIOD_HOURS = get_from_env(
 MATERIALIZE_COLUMNS_BACKFILL_PERIOD_DAYS = get_from_env("MATERIALIZE_COLUMNS_BACKFILL_PERIOD_DAYS", 0, type_cast=int)
 # Maximum number of columns to materialize at once. Avoids running into resource bottlenecks (storage + ingest + backfilling).
 MATERIALIZE_COLUMNS_MAX_AT_ONCE = get_from_env("MATERIALIZE_COLUMNS_MAX_AT_ONCE", 100, type_cast=int)
+# Maximum number of partitions to backfill at once across all shards when materializing columns
+MATERIALIZE_COLUMNS_BACKFILL_MAX_CONCURRENCY = get_from_env(
+    "MATERIALIZE_COLUMNS_BACKFILL_MAX_CONCURRENCY", 4, type_cast=int
+)
 
 BILLING_SERVICE_URL = get_from_env("BILLING_SERVICE_URL", "https://billing.posthog.com")
 
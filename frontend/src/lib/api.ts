@@ -834,6 +834,14 @@ class ApiRequest {
         return apiRequest
     }
 
+    public queryStatusWait(queryId: string, showProgress: boolean, teamId?: TeamType['id']): ApiRequest {
+        const apiRequest = this.query(teamId).addPathComponent(queryId).addPathComponent('wait')
+        if (showProgress) {
+            return apiRequest.withQueryString('show_progress=true')
+        }
+        return apiRequest
+    }
+
     // Chat
     public chat(teamId?: TeamType['id']): ApiRequest {
         return this.environmentsDetail(teamId).addPathComponent('query').addPathComponent('chat')
@@ -2465,6 +2473,14 @@ const api = {
         async get(queryId: string, showProgress: boolean): Promise<QueryStatusResponse> {
             return await new ApiRequest().queryStatus(queryId, showProgress).get()
         },
+        /** Like `get`, but the request is held open until the query completes, for as long as the backend allows */
+        async wait(
+            queryId: string,
+            showProgress: boolean,
+            methodOptions?: ApiMethodOptions
+        ): Promise<QueryStatusResponse> {
+            return await new ApiRequest().queryStatusWait(queryId, showProgress).get(methodOptions)
+        },
     },
 
     personalApiKeys: {
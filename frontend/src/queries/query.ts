@@ -58,19 +58,26 @@ export async function pollForResults(
 ): Promise<QueryStatus> {
     const pollStart = performance.now()
     let currentDelay = 300 // start low, because all queries will take at minimum this
+    let nextDelay = currentDelay
 
     while (performance.now() - pollStart < QUERY_ASYNC_TOTAL_POLL_SECONDS * 1000) {
-        await delay(currentDelay, methodOptions?.signal)
+        await delay(nextDelay, methodOptions?.signal)
         currentDelay = Math.min(currentDelay * 1.25, QUERY_ASYNC_MAX_INTERVAL_SECONDS * 1000)
 
         try {
-            const statusResponse = (await api.queryStatus.get(queryId, true)).query_status
+            const requestStart = performance.now()
+            // The backend holds the request open until the query completes, for as long as it can afford to
+            const statusResponse = (
+                await api.queryStatus.wait(queryId, true, { signal: methodOptions?.signal })
+            ).query_status
             if (statusResponse.complete) {
                 return statusResponse
             }
             if (onPoll) {
                 onPoll(statusResponse)
             }
+            // Time spent waiting counts towards the delay, so requests which were held open are made back to back
+            nextDelay = Math.max(0, currentDelay - (performance.now() - requestStart))
         } catch (e: any) {
             e.detail = e.data?.query_status?.error_message
             throw e
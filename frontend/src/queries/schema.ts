@@ -310,6 +310,8 @@ export interface HogQuery extends DataNode<HogQueryResponse> {
 export interface RecordingsQueryResponse {
     results: SessionRecordingType[]
     has_next: boolean
+    /** Pass as `cursor` to get the next page. Only returned if the ordering of the query allows it */
+    next_cursor?: string
 }
 
 export type RecordingOrder =
@@ -349,6 +351,8 @@ export interface RecordingsQuery extends DataNode<RecordingsQueryResponse> {
     order?: RecordingOrder
     limit?: integer
     offset?: integer
+    /** Continue after the last row of the previous page, using the `nextCursor` it returned. Faster than `offset` for pages deep into the results */
+    cursor?: string
     user_modified_filters?: Record<string, any>
 }
 
@@ -544,6 +548,8 @@ export interface EventsQueryResponse extends AnalyticsQueryResponseBase<any[][]>
     hasMore?: boolean
     limit?: integer
     offset?: integer
+    /** Pass as `cursor` to get the next page. Only returned if the ordering of the query allows it */
+    nextCursor?: string
 }
 
 export type CachedEventsQueryResponse = CachedQueryResponse<EventsQueryResponse>
@@ -579,6 +585,8 @@ export interface EventsQuery extends DataNode<EventsQueryResponse> {
      * Number of rows to skip before returning rows
      */
     offset?: integer
+    /** Continue after the last row of the previous page, using the `nextCursor` it returned. Faster than `offset` for pages deep into the results */
+    cursor?: string
     /**
      * Show events matching a given action
      */
@@ -842,6 +850,15 @@ export interface InsightsQueryBase<R extends AnalyticsQueryResponseBase<any>> ex
     modifiers?: HogQLQueryModifiers
 }
 
+export interface AutoSamplingInfo {
+    /** Share of the events the results were calculated from, e.g. 0.1 for 10% */
+    samplingFactor: number
+    /** Estimated number of events the query would have read without sampling */
+    estimatedEventCount: integer
+    /** Expected relative standard error of the counts in the results, e.g. 0.01 for ±1% */
+    relativeStandardError: number
+}
+
 /** `TrendsFilterType` minus everything inherited from `FilterType` and `shown_as` */
 export type TrendsFilterLegacy = Omit<TrendsFilterType, keyof FilterType | 'shown_as'>
 
@@ -890,6 +907,8 @@ export const TRENDS_FILTER_PROPERTIES = new Set<keyof TrendsFilter>([
 export interface TrendsQueryResponse extends AnalyticsQueryResponseBase<Record<string, any>[]> {
     /** Wether more breakdown values are available. */
     hasMore?: boolean
+    /** Set when the results were calculated from automatically sampled events */
+    samplingInfo?: AutoSamplingInfo
 }
 
 export type CachedTrendsQueryResponse = CachedQueryResponse<TrendsQueryResponse>
@@ -910,6 +929,13 @@ export interface TrendsQuery extends InsightsQueryBase<TrendsQueryResponse> {
     breakdownFilter?: BreakdownFilter
     /** Compare to date range */
     compareFilter?: CompareFilter
+    /**
+     * Sample the events automatically if the query would otherwise read too many of them to be fast.
+     * Ignored if `samplingFactor` is set.
+     *
+     * @default false
+     */
+    autoSampling?: boolean
 }
 
 export type AssistantArrayPropertyFilterOperator = PropertyOperator.Exact | PropertyOperator.IsNot
@@ -1398,6 +1424,13 @@ export interface FunnelsQuery extends InsightsQueryBase<FunnelsQueryResponse> {
     funnelsFilter?: FunnelsFilter
     /** Breakdown of the events and actions */
     breakdownFilter?: BreakdownFilter
+    /**
+     * Sample the events automatically if the query would otherwise read too many of them to be fast.
+     * Ignored if `samplingFactor` is set.
+     *
+     * @default false
+     */
+    autoSampling?: boolean
 }
 
 /** @asType integer */
@@ -1414,6 +1447,8 @@ export interface FunnelsQueryResponse
         FunnelStepsResults | FunnelStepsBreakdownResults | FunnelTimeToConvertResults | FunnelTrendsResults
     > {
     isUdf?: boolean
+    /** Set when the results were calculated from automatically sampled events */
+    samplingInfo?: AutoSamplingInfo
 }
 
 export type CachedFunnelsQueryResponse = CachedQueryResponse<FunnelsQueryResponse>
@@ -1445,7 +1480,10 @@ export interface RetentionResult {
     date: string
 }
 
-export interface RetentionQueryResponse extends AnalyticsQueryResponseBase<RetentionResult[]> {}
+export interface RetentionQueryResponse extends AnalyticsQueryResponseBase<RetentionResult[]> {
+    /** Set when the results were calculated from automatically sampled events */
+    samplingInfo?: AutoSamplingInfo
+}
 
 export type CachedRetentionQueryResponse = CachedQueryResponse<RetentionQueryResponse>
 
@@ -1453,9 +1491,19 @@ export interface RetentionQuery extends InsightsQueryBase<RetentionQueryResponse
     kind: NodeKind.RetentionQuery
     /** Properties specific to the retention insight */
     retentionFilter: RetentionFilter
+    /**
+     * Sample the events automatically if the query would otherwise read too many of them to be fast.
+     * Ignored if `samplingFactor` is set.
+     *
+     * @default false
+     */
+    autoSampling?: boolean
 }
 
-export interface PathsQueryResponse extends AnalyticsQueryResponseBase<Record<string, any>[]> {}
+export interface PathsQueryResponse extends AnalyticsQueryResponseBase<Record<string, any>[]> {
+    /** Set when the results were calculated from automatically sampled events */
+    samplingInfo?: AutoSamplingInfo
+}
 
 export type CachedPathsQueryResponse = CachedQueryResponse<PathsQueryResponse>
 
@@ -1501,6 +1549,13 @@ export interface PathsQuery extends InsightsQueryBase<PathsQueryResponse> {
     pathsFilter: PathsFilter
     /** Used for displaying paths in relation to funnel steps. */
     funnelPathsFilter?: FunnelPathsFilter
+    /**
+     * Sample the events automatically if the query would otherwise read too many of them to be fast.
+     * Ignored if `samplingFactor` is set.
+     *
+     * @default false
+     */
+    autoSampling?: boolean
 }
 
 /** `StickinessFilterType` minus everything inherited from `FilterType` and persons modal related params  */
@@ -1732,6 +1787,8 @@ export interface ActorsQueryResponse extends AnalyticsQueryResponseBase<any[][]>
     hasMore?: boolean
     limit: integer
     offset: integer
+    /** Pass as `cursor` to get the next page. Only returned if the ordering of the query allows it */
+    nextCursor?: string
     missing_actors_count?: integer
 }
 
@@ -1749,6 +1806,8 @@ export interface ActorsQuery extends DataNode<ActorsQueryResponse> {
     orderBy?: string[]
     limit?: integer
     offset?: integer
+    /** Continue after the last row of the previous page, using the `nextCursor` it returned. Faster than `offset` for pages deep into the results */
+    cursor?: string
 }
 
 export interface TimelineEntry {
@@ -2154,6 +2213,9 @@ export interface FunnelCorrelationQuery extends Node<FunnelCorrelationResponse>
     /* Properties */
     funnelCorrelationNames?: string[]
     funnelCorrelationExcludeNames?: string[]
+
+    /** Compute the odds ratios, drop insignificant results and keep the top results in the query, instead of returning the counts of every event or property value */
+    funnelCorrelationRankInQuery?: boolean
 }
 
 /**  @format date-time */
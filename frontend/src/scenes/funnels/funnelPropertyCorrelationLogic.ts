@@ -77,6 +77,7 @@ export const funnelPropertyCorrelationLogic = kea<funnelPropertyCorrelationLogic
                             funnelCorrelationType: FunnelCorrelationResultsType.Properties,
                             funnelCorrelationNames: targetProperties,
                             funnelCorrelationExcludeNames: values.excludedPropertyNames,
+                            funnelCorrelationRankInQuery: true,
                         }
                         const response = await api.query(query)
                         return {
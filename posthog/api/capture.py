@@ -28,9 +28,12 @@ from ee.billing.quota_limiting import QuotaLimitingCaches
 from posthog.api.utils import get_data, get_token, safe_clickhouse_string
 from posthog.cache_utils import cache_for
 from posthog.exceptions import generate_exception_response
-from posthog.kafka_client.client import KafkaProducer, session_recording_kafka_producer
+from posthog.kafka_client.client import KafkaProducer, _KafkaProducer, session_recording_kafka_producer
+from posthog.kafka_client.spool import SpoolBatch, SpoolFullError, get_capture_spool
+from posthog.heavy_hitters import HeavyHitterDetector
 from posthog.kafka_client.topics import (
     KAFKA_EVENTS_PLUGIN_INGESTION_HISTORICAL,
+    KAFKA_EVENTS_PLUGIN_INGESTION_OVERFLOW,
     KAFKA_SESSION_RECORDING_EVENTS,
     KAFKA_SESSION_RECORDING_SNAPSHOT_ITEM_EVENTS,
     KAFKA_SESSION_RECORDING_SNAPSHOT_ITEM_OVERFLOW,
@@ -103,6 +106,18 @@ TOKEN_SHAPE_INVALID_COUNTER = Counter(
     labelnames=["reason"],
 )
 
+HEAVY_HITTER_DETECTED_COUNTER = Counter(
+    "capture_heavy_hitter_detected_total",
+    "Partition keys detected as heavy hitters by this process and rerouted, per token.",
+    labelnames=["token"],
+)
+
+HEAVY_HITTER_EVENTS_GAUGE = Gauge(
+    "capture_heavy_hitter_events",
+    "Events counted in the detection window when a partition key was detected as a heavy hitter, while it's rerouted.",
+    labelnames=["partition_key"],
+)
+
 OVERFLOWING_KEYS_LOADED_GAUGE = Gauge(
     "capture_overflowing_keys_loaded",
     "Number of keys loaded for the overflow redirection, per resource_type.",
@@ -202,6 +217,8 @@ def _kafka_topic(event_name: str, historical: bool = False, overflowing: bool =
             # historical data topic.
             if historical:
                 return KAFKA_EVENTS_PLUGIN_INGESTION_HISTORICAL
+            if overflowing:
+                return KAFKA_EVENTS_PLUGIN_INGESTION_OVERFLOW
             return settings.KAFKA_EVENTS_PLUGIN_INGESTION_TOPIC
 
 
@@ -212,15 +229,20 @@ def log_event(
     headers: Optional[list] = None,
     historical: bool = False,
     overflowing: bool = False,
-) -> FutureRecordMetadata:
+    spool_batch: Optional[SpoolBatch] = None,
+) -> Optional[FutureRecordMetadata]:
     kafka_topic = _kafka_topic(event_name, historical=historical, overflowing=overflowing)
 
     logger.debug("logging_event", event_name=event_name, kafka_topic=kafka_topic)
 
     # TODO: Handle Kafka being unavailable with exponential backoff retries
     try:
+        producer: _KafkaProducer | SpoolBatch
         if event_name in SESSION_RECORDING_DEDICATED_KAFKA_EVENTS:
             producer = session_recording_kafka_producer()
+        elif spool_batch is not None:
+            # Written to the spool by the caller, which returns no future
+            producer = spool_batch
         else:
             producer = KafkaProducer()
 
@@ -515,16 +537,32 @@ def get_event(request):
             )
 
     futures: list[FutureRecordMetadata] = []
+    spool_batch: Optional[SpoolBatch] = None
+    if settings.CAPTURE_SPOOL_ENABLED:
+        try:
+            spool_batch = get_capture_spool().batch()
+        except OSError as exc:
+            # Produce to Kafka directly if the spool directory can't be used
+            capture_exception(exc)
 
     with start_span(op="kafka.produce") as span:
         span.set_tag("event.count", len(processed_events))
         for event, event_uuid, distinct_id in processed_events:
             try:
-                futures.append(
-                    capture_internal(
-                        event, distinct_id, ip, site_url, now, sent_at, event_uuid, token, historical=historical
-                    )
+                future = capture_internal(
+                    event,
+                    distinct_id,
+                    ip,
+                    site_url,
+                    now,
+                    sent_at,
+                    event_uuid,
+                    token,
+                    historical=historical,
+                    spool_batch=spool_batch,
                 )
+                if future is not None:
+                    futures.append(future)
             except Exception as exc:
                 capture_exception(exc, {"data": data})
                 statsd.incr("posthog_cloud_raw_endpoint_failure", tags={"endpoint": "capture"})
@@ -540,6 +578,17 @@ def get_event(request):
                     ),
                 )
 
+    if spool_batch is not None:
+        with start_span(op="spool.append"):
+            try:
+                # The events are acknowledged once they're on disk, and produced to Kafka in the background
+                spool_batch.commit()
+            except (SpoolFullError, OSError) as exc:
+                if not isinstance(exc, SpoolFullError):
+                    capture_exception(exc)
+                logger.warning("capture_spool_append_failed", error=str(exc))
+                futures.extend(spool_batch.produce_to(KafkaProducer()))
+
     with start_span(op="kafka.wait"):
         span.set_tag("future.count", len(futures))
         start_time = time.monotonic()
@@ -597,7 +646,7 @@ def get_event(request):
                             event_uuid,
                             token,
                         )
-                        capture_kwargs = {
+                        capture_kwargs: dict[str, Any] = {
                             "extra_headers": [
                                 ("lib_version", lib_version),
                             ],
@@ -831,6 +880,7 @@ def capture_internal(
     token=None,
     historical=False,
     extra_headers: list[tuple[str, str]] | None = None,
+    spool_batch: Optional[SpoolBatch] = None,
 ):
     if event_uuid is None:
         event_uuid = UUIDT()
@@ -871,16 +921,23 @@ def capture_internal(
     # overriding this to deal with hot partitions in specific cases.
     # Setting the partition key to None means using random partitioning.
     candidate_partition_key = f"{token}:{distinct_id}"
-    if (
-        not historical
-        and settings.CAPTURE_ALLOW_RANDOM_PARTITIONING
-        and (distinct_id.lower() in LIKELY_ANONYMOUS_IDS or is_randomly_partitioned(candidate_partition_key))
-    ):
-        kafka_partition_key = None
-    else:
-        kafka_partition_key = candidate_partition_key
-
-    return log_event(parsed_event, event["event"], partition_key=kafka_partition_key, historical=historical)
+    kafka_partition_key: Optional[str] = candidate_partition_key
+    overflowing = False
+    if not historical and settings.CAPTURE_ALLOW_RANDOM_PARTITIONING:
+        if distinct_id.lower() in LIKELY_ANONYMOUS_IDS or is_randomly_partitioned(candidate_partition_key):
+            kafka_partition_key = None
+        elif settings.CAPTURE_HEAVY_HITTERS_ENABLED and is_heavy_hitter(candidate_partition_key):
+            kafka_partition_key = None
+            overflowing = settings.CAPTURE_HEAVY_HITTERS_ROUTING == "overflow"
+
+    return log_event(
+        parsed_event,
+        event["event"],
+        partition_key=kafka_partition_key,
+        historical=historical,
+        overflowing=overflowing,
+        spool_batch=spool_batch,
+    )
 
 
 def is_randomly_partitioned(candidate_partition_key: str) -> bool:
@@ -933,6 +990,56 @@ def is_randomly_partitioned(candidate_partition_key: str) -> bool:
     return candidate_partition_key in keys_to_override
 
 
+def _on_heavy_hitter_detected(partition_key: str, count: int) -> None:
+    HEAVY_HITTER_DETECTED_COUNTER.labels(token=partition_key.split(":")[0]).inc()
+    HEAVY_HITTER_EVENTS_GAUGE.labels(partition_key=partition_key).set(count)
+    logger.warning("capture_heavy_hitter_detected", partition_key=partition_key, count=count)
+
+    # Publish the detection for the other capture pods, which load it with _list_overflowing_keys
+    now = timezone.now().timestamp()
+    redis_key = f"{OVERFLOWING_REDIS_KEY}{InputType.EVENTS.value}"
+    try:
+        pipeline = get_client().pipeline(transaction=False)
+        pipeline.zadd(redis_key, {partition_key: now + settings.CAPTURE_HEAVY_HITTERS_TTL_SECONDS})
+        pipeline.zremrangebyscore(redis_key, "-inf", now)
+        pipeline.execute()
+    except Exception as e:
+        # The detection still applies to this process
+        capture_exception(e)
+
+
+def _on_heavy_hitter_expired(partition_key: str) -> None:
+    HEAVY_HITTER_EVENTS_GAUGE.remove(partition_key)
+
+
+HEAVY_HITTER_DETECTOR = HeavyHitterDetector(
+    threshold=settings.CAPTURE_HEAVY_HITTERS_THRESHOLD,
+    window_seconds=settings.CAPTURE_HEAVY_HITTERS_WINDOW_SECONDS,
+    ttl_seconds=settings.CAPTURE_HEAVY_HITTERS_TTL_SECONDS,
+    on_detect=_on_heavy_hitter_detected,
+    on_expire=_on_heavy_hitter_expired,
+)
+
+
+def is_heavy_hitter(candidate_partition_key: str) -> bool:
+    """Check whether events with the given partition key are to be rerouted as a heavy hitter.
+
+    Every call counts an event for the key in HEAVY_HITTER_DETECTOR, which detects keys with at least
+    CAPTURE_HEAVY_HITTERS_THRESHOLD events in the last CAPTURE_HEAVY_HITTERS_WINDOW_SECONDS in this process, and
+    publishes them to Redis. Keys published by other capture pods are heavy hitters as well.
+
+    Args:
+        candidate_partition_key: The partition key that would be used if the key isn't
+            a heavy hitter. This is in the format `token:distinct_id`.
+
+    Returns:
+        Whether the events with the given partition key are to be rerouted.
+    """
+    if HEAVY_HITTER_DETECTOR.record(candidate_partition_key):
+        return True
+    return candidate_partition_key in _list_overflowing_keys(InputType.EVENTS)
+
+
 @cache_for(timedelta(seconds=30), background_refresh=True)
 def _list_overflowing_keys(input_type: InputType) -> set[str]:
     """Retrieve the active overflows from Redis with caching and pre-fetching
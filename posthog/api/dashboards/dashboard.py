@@ -18,12 +18,13 @@ from posthog.api.dashboards.dashboard_template_json_schema_parser import (
 from posthog.rbac.access_control_api_mixin import AccessControlViewSetMixin
 from posthog.rbac.user_access_control import UserAccessControlSerializerMixin
 from posthog.api.forbid_destroy_model import ForbidDestroyModel
-from posthog.api.insight import InsightSerializer, InsightViewSet
+from posthog.api.insight import InsightSerializer, InsightViewSet, insight_calculation_kwargs
 from posthog.api.monitoring import Feature, monitor
 from posthog.api.routing import TeamAndOrgViewSetMixin
 from posthog.api.shared import UserBasicSerializer
 from posthog.api.tagged_item import TaggedItemSerializerMixin, TaggedItemViewSetMixin
 from posthog.api.utils import action
+from posthog.caching.dashboard_tiles import DashboardTileResultsLoader
 from posthog.event_usage import report_user_action
 from posthog.helpers import create_dashboard_from_template
 from posthog.helpers.dashboard_templates import create_from_template
@@ -408,6 +409,11 @@ class DashboardSerializer(DashboardBasicSerializer):
         )
         self.user_permissions.set_preloaded_dashboard_tiles(list(tiles))
 
+        # Reads the cached results of all tiles at once, and calculates those that need it in parallel
+        self.context["dashboard_tile_results"] = DashboardTileResultsLoader(
+            dashboard=dashboard, **insight_calculation_kwargs(self.context)
+        ).load(tiles)
+
         for tile in tiles:
             self.context.update({"dashboard_tile": tile})
 
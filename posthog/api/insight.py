@@ -252,6 +252,24 @@ class InsightBasicSerializer(TaggedItemSerializerMixin, serializers.ModelSeriali
         return [tile.dashboard_id for tile in instance.dashboard_tiles.all()]
 
 
+def insight_calculation_kwargs(context: dict[str, Any]) -> dict[str, Any]:
+    """
+    Team, execution mode, user and overrides which the request in the serializer context calculates insights with.
+    """
+    request = context["request"]
+    execution_mode = execution_mode_from_refresh(refresh_requested_by_client(request))
+    if context.get("is_shared", False):
+        execution_mode = shared_insights_execution_mode(execution_mode)
+
+    return {
+        "team": context["get_team"](),
+        "execution_mode": execution_mode,
+        "user": None if request.user.is_anonymous else request.user,
+        "filters_override": filters_override_requested_by_client(request),
+        "variables_override": variables_override_requested_by_client(request),
+    }
+
+
 class InsightSerializer(InsightBasicSerializer, UserPermissionsSerializerMixin, UserAccessControlSerializerMixin):
     result = serializers.SerializerMethodField()
     hasMore = serializers.SerializerMethodField()
@@ -652,25 +670,23 @@ class InsightSerializer(InsightBasicSerializer, UserPermissionsSerializerMixin,
         from posthog.caching.calculate_results import calculate_for_query_based_insight
 
         dashboard: Optional[Dashboard] = self.context.get("dashboard")
+        # Loaded for all tiles at once when serializing a dashboard, see `DashboardTileResultsLoader`
+        dashboard_tile_results: Optional[dict[int, InsightResult | Exception]] = self.context.get(
+            "dashboard_tile_results"
+        )
 
         with conversion_to_query_based(insight):
             try:
-                refresh_requested = refresh_requested_by_client(self.context["request"])
-                execution_mode = execution_mode_from_refresh(refresh_requested)
-                filters_override = filters_override_requested_by_client(self.context["request"])
-                variables_override = variables_override_requested_by_client(self.context["request"])
-
-                if self.context.get("is_shared", False):
-                    execution_mode = shared_insights_execution_mode(execution_mode)
+                if dashboard_tile_results is not None and insight.pk in dashboard_tile_results:
+                    result = dashboard_tile_results[insight.pk]
+                    if isinstance(result, Exception):
+                        raise result
+                    return result
 
                 return calculate_for_query_based_insight(
                     insight,
-                    team=self.context["get_team"](),
                     dashboard=dashboard,
-                    execution_mode=execution_mode,
-                    user=None if self.context["request"].user.is_anonymous else self.context["request"].user,
-                    filters_override=filters_override,
-                    variables_override=variables_override,
+                    **insight_calculation_kwargs(self.context),
                 )
             except ExposedHogQLError as e:
                 raise ValidationError(str(e))
@@ -1,8 +1,11 @@
+import json
 import re
 import uuid
 from typing import cast
 
-from django.http import JsonResponse, StreamingHttpResponse
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
 from drf_spectacular.utils import OpenApiResponse
 from pydantic import BaseModel
 from rest_framework import status, viewsets
@@ -12,8 +15,6 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from sentry_sdk import capture_exception, set_tag
 
-from ee.hogai.assistant import Assistant
-from ee.hogai.utils import Conversation
 from posthog.api.documentation import extend_schema
 from posthog.api.mixins import PydanticModelMixin
 from posthog.api.monitoring import Feature, monitor
@@ -21,6 +22,7 @@ from posthog.api.routing import TeamAndOrgViewSetMixin
 from posthog.api.services.query import process_query_model
 from posthog.api.utils import action
 from posthog.clickhouse.client.execute_async import (
+    QueryStatusManager,
     cancel_query,
     get_query_status,
 )
@@ -32,6 +34,7 @@ from posthog.hogql_queries.apply_dashboard_filters import (
     apply_dashboard_filters_to_dict,
     apply_dashboard_variables_to_dict,
 )
+from posthog.hogql_queries.query_cache import RawCachedResponse
 from posthog.hogql_queries.query_runner import ExecutionMode, execution_mode_from_refresh
 from posthog.models.user import User
 from posthog.rate_limit import (
@@ -79,7 +82,7 @@ class QueryViewSet(TeamAndOrgViewSetMixin, PydanticModelMixin, viewsets.ViewSet)
         },
     )
     @monitor(feature=Feature.QUERY, endpoint="query", method="POST")
-    def create(self, request, *args, **kwargs) -> Response:
+    def create(self, request, *args, **kwargs) -> HttpResponse:
         data = self.get_model(request.data, QueryRequest)
         if data.filters_override is not None:
             data.query = apply_dashboard_filters_to_dict(
@@ -115,7 +118,13 @@ class QueryViewSet(TeamAndOrgViewSetMixin, PydanticModelMixin, viewsets.ViewSet)
                 execution_mode=execution_mode,
                 query_id=client_query_id,
                 user=request.user,
+                allow_raw_cached_response=True,
             )
+            if isinstance(result, RawCachedResponse):
+                # Fresh cache hits are passed through as cached, without being decoded and re-encoded
+                if result.query_status and result.query_status.complete is False:
+                    response_status = status.HTTP_202_ACCEPTED
+                return HttpResponse(result.content, content_type="application/json", status=response_status)
             if isinstance(result, BaseModel):
                 result = result.model_dump(by_alias=True)
             if result.get("query_status") and result["query_status"].get("complete") is False:
@@ -182,6 +191,10 @@ class QueryViewSet(TeamAndOrgViewSetMixin, PydanticModelMixin, viewsets.ViewSet)
     @action(detail=False, methods=["POST"], renderer_classes=[ServerSentEventRenderer])
     def chat(self, request: Request, *args, **kwargs):
         assert request.user is not None
+        # The assistant imports LangChain and the LLM clients, which only this endpoint needs
+        from ee.hogai.assistant import Assistant
+        from ee.hogai.utils import Conversation
+
         validated_body = Conversation.model_validate(request.data)
         assistant = Assistant(self.team, validated_body, cast(User, request.user))
         return StreamingHttpResponse(assistant.stream(), content_type=ServerSentEventRenderer.media_type)
@@ -202,3 +215,28 @@ class QueryViewSet(TeamAndOrgViewSetMixin, PydanticModelMixin, viewsets.ViewSet)
 
         tag_queries(client_query_id=query_id)
         set_tag("client_query_id", query_id)
+
+
+_retrieve_query_status = QueryViewSet.as_view({"get": "retrieve"})
+
+
+async def wait_for_query(request: HttpRequest, parent_lookup_team_id: str, pk: str) -> HttpResponse:
+    """
+    Responds like retrieving the query's status, but holds the request open until the query completes, so that the
+    frontend doesn't have to poll. Waiting happens in the event loop, so when served under ASGI a waiting request doesn't
+    take up a worker thread and is held for up to QUERY_STATUS_LONG_POLL_SECONDS. Under WSGI it's only held briefly.
+    """
+    retrieve = sync_to_async(_retrieve_query_status)
+    # Authentication, access checks and errors are all handled by the regular status endpoint
+    response = await retrieve(request, parent_lookup_team_id=parent_lookup_team_id, pk=pk)
+    if response.status_code != status.HTTP_202_ACCEPTED:
+        return response
+
+    timeout = (
+        settings.QUERY_STATUS_LONG_POLL_SECONDS
+        if settings.SERVER_GATEWAY_INTERFACE == "ASGI"
+        else settings.QUERY_STATUS_MAX_WAIT_SECONDS
+    )
+    team_id = json.loads(response.content)["query_status"]["team_id"]
+    await QueryStatusManager(pk, team_id).wait_for_completion(timeout)
+    return await retrieve(request, parent_lookup_team_id=parent_lookup_team_id, pk=pk)
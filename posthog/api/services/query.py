@@ -1,5 +1,5 @@
 import structlog
-from typing import Optional
+from typing import Optional, cast
 
 from pydantic import BaseModel
 from rest_framework.exceptions import ValidationError
@@ -14,7 +14,8 @@ from posthog.hogql.database.database import create_hogql_database, serialize_dat
 from posthog.hogql.autocomplete import get_hogql_autocomplete
 from posthog.hogql.metadata import get_hogql_metadata
 from posthog.hogql.modifiers import create_default_modifiers_for_team
-from posthog.hogql_queries.query_runner import CacheMissResponse, ExecutionMode, get_query_runner
+from posthog.hogql_queries.query_cache import RawCachedResponse
+from posthog.hogql_queries.query_runner import CacheMissResponse, ExecutionMode, QueryRunner, get_query_runner
 from posthog.models import Team, User
 from posthog.schema import (
     DatabaseSchemaQueryResponse,
@@ -52,20 +53,54 @@ def process_query_dict(
         [HogQLVariable.model_validate(n) for n in variables_override_json.values()] if variables_override_json else None
     )
 
-    return process_query_model(
-        team,
-        model.root,
-        dashboard_filters=dashboard_filters,
-        variables_override=variables_override,
-        limit_context=limit_context,
-        execution_mode=execution_mode,
-        user=user,
-        query_id=query_id,
-        insight_id=insight_id,
-        dashboard_id=dashboard_id,
+    # Raw cached responses aren't allowed here, so the result is always a dict or a model
+    return cast(
+        dict | BaseModel,
+        process_query_model(
+            team,
+            model.root,
+            dashboard_filters=dashboard_filters,
+            variables_override=variables_override,
+            limit_context=limit_context,
+            execution_mode=execution_mode,
+            user=user,
+            query_id=query_id,
+            insight_id=insight_id,
+            dashboard_id=dashboard_id,
+        ),
     )
 
 
+def get_query_runner_for_dict(
+    team: Team,
+    query_json: dict,
+    *,
+    dashboard_filters_json: Optional[dict] = None,
+    variables_override_json: Optional[dict] = None,
+    limit_context: Optional[LimitContext] = None,
+) -> Optional[QueryRunner]:
+    """
+    Returns the query runner `process_query_dict` would run the query with, or None if it doesn't run via one.
+    """
+    query: BaseModel = QuerySchemaRoot.model_validate(query_json).root
+    while True:
+        try:
+            query_runner = get_query_runner(query, team, limit_context=limit_context)
+            break
+        except ValueError:
+            if not (hasattr(query, "source") and isinstance(query.source, BaseModel)):
+                return None
+            query = query.source
+
+    if dashboard_filters_json:
+        query_runner.apply_dashboard_filters(DashboardFilter.model_validate(dashboard_filters_json))
+    if variables_override_json:
+        query_runner.apply_variable_overrides(
+            [HogQLVariable.model_validate(n) for n in variables_override_json.values()]
+        )
+    return query_runner
+
+
 def process_query_model(
     team: Team,
     query: BaseModel,  # mypy has problems with unions and isinstance
@@ -78,8 +113,9 @@ def process_query_model(
     query_id: Optional[str] = None,
     insight_id: Optional[int] = None,
     dashboard_id: Optional[int] = None,
-) -> dict | BaseModel:
-    result: dict | BaseModel
+    allow_raw_cached_response: bool = False,
+) -> dict | BaseModel | RawCachedResponse:
+    result: dict | BaseModel | RawCachedResponse
 
     try:
         query_runner = get_query_runner(query, team, limit_context=limit_context)
@@ -96,6 +132,7 @@ def process_query_model(
                 query_id=query_id,
                 insight_id=insight_id,
                 dashboard_id=dashboard_id,
+                allow_raw_cached_response=allow_raw_cached_response,
             )
         elif execution_mode == ExecutionMode.CACHE_ONLY_NEVER_CALCULATE:
             # Caching is handled by query runners, so in this case we can only return a cache miss
@@ -138,6 +175,7 @@ def process_query_model(
             query_id=query_id,
             insight_id=insight_id,
             dashboard_id=dashboard_id,
+            allow_raw_cached_response=allow_raw_cached_response,
         )
 
     return result
@@ -3,7 +3,9 @@ import gzip
 import json
 import pathlib
 import random
+import shutil
 import string
+import tempfile
 from collections import Counter
 from datetime import UTC
 from datetime import datetime, timedelta
@@ -43,9 +45,12 @@ from posthog.api.capture import (
 )
 from posthog.api.test.mock_sentry import mock_sentry_context_for_tagging
 from posthog.api.test.openapi_validation import validate_response
+from posthog.heavy_hitters import HeavyHitterDetector
 from posthog.kafka_client.client import KafkaProducer, session_recording_kafka_producer
+from posthog.kafka_client.spool import CaptureSpool
 from posthog.kafka_client.topics import (
     KAFKA_EVENTS_PLUGIN_INGESTION_HISTORICAL,
+    KAFKA_EVENTS_PLUGIN_INGESTION_OVERFLOW,
     KAFKA_SESSION_RECORDING_SNAPSHOT_ITEM_EVENTS,
     KAFKA_SESSION_RECORDING_SNAPSHOT_ITEM_OVERFLOW,
 )
@@ -427,6 +432,111 @@ class TestCapture(BaseTest):
                 ):
                     assert capture.is_randomly_partitioned(partition_key) is False
 
+    def _capture_autocapture_event(self, distinct_id: str) -> None:
+        data = {"event": "$autocapture", "properties": {"distinct_id": distinct_id, "token": self.team.api_token}}
+        self.client.get("/e/?data={}".format(quote(self._to_json(data))), HTTP_ORIGIN="https://localhost")
+
+    @patch("posthog.kafka_client.client._KafkaProducer.produce")
+    def test_capture_reroutes_heavy_hitters(self, kafka_produce):
+        detector = HeavyHitterDetector(
+            threshold=3,
+            on_detect=capture._on_heavy_hitter_detected,
+            on_expire=capture._on_heavy_hitter_expired,
+        )
+        partition_key = f"{self.team.api_token}:bot"
+
+        with patch("posthog.api.capture.HEAVY_HITTER_DETECTOR", new=detector):
+            with self.settings(CAPTURE_HEAVY_HITTERS_ENABLED=True, CAPTURE_HEAVY_HITTERS_ROUTING="random"):
+                for _ in range(4):
+                    self._capture_autocapture_event("bot")
+                self._capture_autocapture_event("person")
+
+        keys = [produce_call.kwargs["key"] for produce_call in kafka_produce.call_args_list]
+        assert keys == [partition_key, partition_key, None, None, f"{self.team.api_token}:person"]
+        assert all(
+            produce_call.kwargs["topic"] == KAFKA_EVENTS_PLUGIN_INGESTION_TOPIC
+            for produce_call in kafka_produce.call_args_list
+        )
+
+        # The detection is published for the other capture pods
+        expires_at = get_client().zscore("@posthog/capture-overflow/events", partition_key)
+        assert expires_at is not None
+        assert expires_at > timezone.now().timestamp()
+
+    @patch("posthog.kafka_client.client._KafkaProducer.produce")
+    def test_capture_sends_heavy_hitters_to_overflow(self, kafka_produce):
+        detector = HeavyHitterDetector(threshold=1)
+
+        with patch("posthog.api.capture.HEAVY_HITTER_DETECTOR", new=detector):
+            with self.settings(CAPTURE_HEAVY_HITTERS_ENABLED=True, CAPTURE_HEAVY_HITTERS_ROUTING="overflow"):
+                self._capture_autocapture_event("bot")
+
+            with self.settings(CAPTURE_HEAVY_HITTERS_ENABLED=False):
+                self._capture_autocapture_event("bot")
+
+        assert [
+            (produce_call.kwargs["topic"], produce_call.kwargs["key"]) for produce_call in kafka_produce.call_args_list
+        ] == [
+            (KAFKA_EVENTS_PLUGIN_INGESTION_OVERFLOW, None),
+            (KAFKA_EVENTS_PLUGIN_INGESTION_TOPIC, f"{self.team.api_token}:bot"),
+        ]
+
+    @patch("posthog.kafka_client.client._KafkaProducer.produce")
+    def test_capture_reroutes_heavy_hitters_detected_by_other_pods(self, kafka_produce):
+        get_client().zadd(
+            "@posthog/capture-overflow/events",
+            {f"{self.team.api_token}:bot": timezone.now().timestamp() + 1000},
+        )
+
+        with self.settings(CAPTURE_HEAVY_HITTERS_ENABLED=True, CAPTURE_HEAVY_HITTERS_ROUTING="random"):
+            self._capture_autocapture_event("bot")
+            self._capture_autocapture_event("person")
+
+        keys = [produce_call.kwargs["key"] for produce_call in kafka_produce.call_args_list]
+        assert keys == [None, f"{self.team.api_token}:person"]
+
+    @patch("posthog.kafka_client.client._KafkaProducer.produce")
+    def test_capture_event_through_spool(self, kafka_produce):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        spool = CaptureSpool(directory, max_bytes=1024 * 1024, segment_bytes=1024)
+        self.addCleanup(spool.stop, 5)
+
+        with patch("posthog.api.capture.get_capture_spool", return_value=spool):
+            with self.settings(CAPTURE_SPOOL_ENABLED=True):
+                response = self.client.post(
+                    "/e/",
+                    data={"event": "$pageview", "distinct_id": "user", "api_key": self.team.api_token},
+                    content_type="application/json",
+                )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert spool.wait_until_flushed(timeout=10)
+        kafka_produce.assert_called_once()
+        produce_kwargs = kafka_produce.call_args.kwargs
+        assert produce_kwargs["topic"] == KAFKA_EVENTS_PLUGIN_INGESTION_TOPIC
+        assert produce_kwargs["key"] == f"{self.team.api_token}:user"
+        assert json.loads(produce_kwargs["data"])["distinct_id"] == "user"
+
+    @patch("posthog.kafka_client.client._KafkaProducer.produce")
+    def test_capture_event_falls_back_to_kafka_when_spool_is_full(self, kafka_produce):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        spool = CaptureSpool(directory, max_bytes=10, segment_bytes=1024)
+
+        with patch("posthog.api.capture.get_capture_spool", return_value=spool):
+            with self.settings(CAPTURE_SPOOL_ENABLED=True):
+                response = self.client.post(
+                    "/e/",
+                    data={"event": "$pageview", "distinct_id": "user", "api_key": self.team.api_token},
+                    content_type="application/json",
+                )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert spool.message_count == 0
+        kafka_produce.assert_called_once()
+        assert kafka_produce.call_args.kwargs["key"] == f"{self.team.api_token}:user"
+
     @patch("posthog.kafka_client.client._KafkaProducer.produce")
     def test_capture_event(self, kafka_produce):
         data = {
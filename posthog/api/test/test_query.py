@@ -2,6 +2,7 @@ import json
 from unittest import mock
 from unittest.mock import patch
 
+from django.test import override_settings
 from freezegun import freeze_time
 from rest_framework import status
 
@@ -1066,6 +1067,55 @@ class TestQueryRetrieve(APIBaseTest):
         self.assertEqual(response.status_code, 202)
         self.assertFalse(response.json()["query_status"]["complete"])
 
+    @patch("posthog.api.query.QueryStatusManager.wait_for_completion")
+    def test_waiting_for_running_query(self, mock_wait_for_completion):
+        self.redis_client_mock.get.return_value = json.dumps(
+            {
+                "id": self.valid_query_id,
+                "team_id": self.team_id,
+                "complete": False,
+            }
+        ).encode()
+        response = self.client.get(f"/api/environments/{self.team.id}/query/{self.valid_query_id}/wait/")
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(response.json()["query_status"]["complete"])
+        # Under WSGI, a waiting request takes up a worker thread, so it's only held briefly
+        mock_wait_for_completion.assert_called_once_with(0.5)
+
+    @override_settings(SERVER_GATEWAY_INTERFACE="ASGI", QUERY_STATUS_LONG_POLL_SECONDS=30)
+    @patch("posthog.api.query.QueryStatusManager.wait_for_completion")
+    def test_waiting_for_running_query_under_asgi(self, mock_wait_for_completion):
+        self.redis_client_mock.get.side_effect = [
+            json.dumps({"id": self.valid_query_id, "team_id": self.team_id, "complete": False}).encode(),
+            json.dumps({"id": self.valid_query_id, "team_id": self.team_id, "complete": True}).encode(),
+        ]
+        response = self.client.get(f"/api/environments/{self.team.id}/query/{self.valid_query_id}/wait/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["query_status"]["complete"])
+        mock_wait_for_completion.assert_called_once_with(30)
+
+    @patch("posthog.api.query.QueryStatusManager.wait_for_completion")
+    def test_waiting_for_completed_query(self, mock_wait_for_completion):
+        self.redis_client_mock.get.return_value = json.dumps(
+            {
+                "id": self.valid_query_id,
+                "team_id": self.team_id,
+                "complete": True,
+                "results": ["result1", "result2"],
+            }
+        ).encode()
+        response = self.client.get(f"/api/environments/{self.team.id}/query/{self.valid_query_id}/wait/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["query_status"]["results"], ["result1", "result2"])
+        mock_wait_for_completion.assert_not_called()
+
+    @patch("posthog.api.query.QueryStatusManager.wait_for_completion")
+    def test_waiting_requires_authentication(self, mock_wait_for_completion):
+        self.client.logout()
+        response = self.client.get(f"/api/environments/{self.team.id}/query/{self.valid_query_id}/wait/")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        mock_wait_for_completion.assert_not_called()
+
     def test_failed_query_with_internal_error(self):
         self.redis_client_mock.get.return_value = json.dumps(
             {
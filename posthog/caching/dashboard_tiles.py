@@ -0,0 +1,193 @@
+import threading
+import time
+import weakref
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from typing import Any, Optional
+
+from django.conf import settings
+from django.db import connections
+
+from posthog.api.services.query import get_query_runner_for_dict
+from posthog.caching.calculate_results import calculate_for_query_based_insight
+from posthog.caching.fetch_from_cache import InsightResult
+from posthog.clickhouse.query_tagging import get_query_tags, reset_query_tags, tag_queries
+from posthog.hogql_queries.legacy_compatibility.flagged_conversion_manager import conversion_to_query_based
+from posthog.hogql_queries.query_cache import QueryCacheManager, prefetched_cache_data
+from posthog.hogql_queries.query_runner import ExecutionMode, QueryRunner
+from posthog.models import Dashboard, DashboardTile, Insight, Team, User
+
+# Tiles which can't start calculating within the budget are calculated asynchronously in these modes instead
+_ASYNC_EXECUTION_MODES = {
+    ExecutionMode.CALCULATE_BLOCKING_ALWAYS: ExecutionMode.CALCULATE_ASYNC_ALWAYS,
+    ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE: ExecutionMode.RECENT_CACHE_CALCULATE_ASYNC_IF_STALE,
+    ExecutionMode.RECENT_CACHE_CALCULATE_ASYNC_IF_STALE_AND_BLOCKING_ON_MISS: ExecutionMode.RECENT_CACHE_CALCULATE_ASYNC_IF_STALE,
+}
+
+# Limits how many tiles of a team this process calculates at once, across all dashboard loads
+_team_semaphores: weakref.WeakValueDictionary[int, threading.BoundedSemaphore] = weakref.WeakValueDictionary()
+_team_semaphores_lock = threading.Lock()
+
+
+def _get_team_semaphore(team_id: int) -> threading.BoundedSemaphore:
+    with _team_semaphores_lock:
+        semaphore = _team_semaphores.get(team_id)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(settings.DASHBOARD_TILE_MAX_CONCURRENCY_PER_TEAM)
+            _team_semaphores[team_id] = semaphore
+        return semaphore
+
+
+class DashboardTileResultsLoader:
+    """
+    Loads the results of all insight tiles of a dashboard at once. Cached results of all tiles are read in one
+    round-trip, and the tiles which need calculating are calculated on a thread pool. Tiles which can't start
+    calculating within DASHBOARD_TILE_CALCULATION_BUDGET_SECONDS are calculated asynchronously instead, so they're
+    returned with a query status to poll.
+    """
+
+    def __init__(
+        self,
+        *,
+        team: Team,
+        dashboard: Dashboard,
+        execution_mode: ExecutionMode,
+        user: Optional[User],
+        filters_override: Optional[dict] = None,
+        variables_override: Optional[dict] = None,
+    ):
+        self.team = team
+        self.dashboard = dashboard
+        self.execution_mode = execution_mode
+        self.user = user
+        self.filters_override = filters_override
+        self.variables_override = variables_override
+
+    def load(self, tiles: Iterable[DashboardTile]) -> dict[int, InsightResult | Exception]:
+        """
+        Returns the result of each tile's insight by insight ID, or the exception calculating it raised.
+        """
+        insights = [tile.insight for tile in tiles if tile.insight is not None and not tile.insight.deleted]
+        query_runners = {insight.pk: self._get_query_runner(insight) for insight in insights}
+        cache_keys = {
+            insight_id: query_runner.get_cache_key()
+            for insight_id, query_runner in query_runners.items()
+            if query_runner is not None
+        }
+        cached_data = QueryCacheManager.get_many_raw_cache_data(list(set(cache_keys.values())))
+
+        to_calculate: list[Insight] = []
+        from_cache: list[Insight] = []
+        for insight in insights:
+            query_runner = query_runners[insight.pk]
+            if query_runner is not None and query_runner.needs_blocking_calculation(
+                self.execution_mode, cached_data.get(cache_keys[insight.pk])
+            ):
+                to_calculate.append(insight)
+            else:
+                from_cache.append(insight)
+
+        deadline = time.monotonic() + settings.DASHBOARD_TILE_CALCULATION_BUDGET_SECONDS
+        results: dict[int, InsightResult | Exception] = {}
+        with prefetched_cache_data(cached_data):
+            if settings.DASHBOARD_TILE_MAX_WORKERS <= 1 or len(to_calculate) <= 1:
+                for insight in to_calculate:
+                    results[insight.pk] = self._calculate_within_budget(insight, deadline) or self._calculate_async(
+                        insight
+                    )
+                for insight in from_cache:
+                    results[insight.pk] = self._calculate(insight, execution_mode=self.execution_mode)
+                return results
+
+            executor = ThreadPoolExecutor(
+                max_workers=min(settings.DASHBOARD_TILE_MAX_WORKERS, len(to_calculate)),
+                thread_name_prefix="dashboard-tiles",
+            )
+            try:
+                query_tags = get_query_tags().copy()
+                futures: dict[Future, Insight] = {
+                    # Copying the context passes the prefetched cache data on to the worker
+                    executor.submit(
+                        copy_context().run, self._calculate_in_worker, insight, deadline, query_tags
+                    ): insight
+                    for insight in to_calculate
+                }
+
+                # Cached results are served while the other tiles are being calculated
+                for insight in from_cache:
+                    results[insight.pk] = self._calculate(insight, execution_mode=self.execution_mode)
+
+                wait(futures, timeout=max(deadline - time.monotonic(), 0))
+                for future, insight in futures.items():
+                    # Tiles that are already being calculated are waited for, the rest are calculated asynchronously
+                    result = None if future.cancel() else future.result()
+                    results[insight.pk] = result or self._calculate_async(insight)
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        return results
+
+    def _get_query_runner(self, insight: Insight) -> Optional[QueryRunner]:
+        with conversion_to_query_based(insight):
+            if not insight.query:
+                return None
+            try:
+                return get_query_runner_for_dict(
+                    self.team,
+                    insight.query,
+                    dashboard_filters_json=(
+                        self.filters_override if self.filters_override is not None else self.dashboard.filters
+                    ),
+                    variables_override_json=(
+                        self.variables_override if self.variables_override is not None else self.dashboard.variables
+                    ),
+                )
+            except Exception:
+                # The error is raised again when the tile is calculated
+                return None
+
+    def _calculate(self, insight: Insight, *, execution_mode: ExecutionMode) -> InsightResult | Exception:
+        try:
+            with conversion_to_query_based(insight):
+                return calculate_for_query_based_insight(
+                    insight,
+                    team=self.team,
+                    dashboard=self.dashboard,
+                    execution_mode=execution_mode,
+                    user=self.user,
+                    filters_override=self.filters_override,
+                    variables_override=self.variables_override,
+                )
+        except Exception as e:
+            return e
+
+    def _calculate_async(self, insight: Insight) -> InsightResult | Exception:
+        return self._calculate(
+            insight, execution_mode=_ASYNC_EXECUTION_MODES.get(self.execution_mode, self.execution_mode)
+        )
+
+    def _calculate_within_budget(self, insight: Insight, deadline: float) -> Optional[InsightResult | Exception]:
+        """
+        Calculates the tile once the team's concurrency limit allows it, or returns None if that's past the deadline.
+        """
+        semaphore = _get_team_semaphore(self.team.pk)
+        timeout = deadline - time.monotonic()
+        if timeout <= 0 or not semaphore.acquire(timeout=timeout):
+            return None
+        try:
+            return self._calculate(insight, execution_mode=self.execution_mode)
+        finally:
+            semaphore.release()
+
+    def _calculate_in_worker(
+        self, insight: Insight, deadline: float, query_tags: dict[str, Any]
+    ) -> Optional[InsightResult | Exception]:
+        # Query tags are thread-local, so the request's tags are copied over
+        reset_query_tags()
+        tag_queries(**query_tags)
+        try:
+            return self._calculate_within_budget(insight, deadline)
+        finally:
+            # Each worker thread has its own database connections, which would otherwise be left open
+            connections.close_all()
@@ -0,0 +1,198 @@
+"""
+A compact encoding of cached query responses.
+
+Query responses are mostly the same few arrays over and over: every series of a trends result repeats the `days` and
+`labels` of the date range, and its `data` is a list of numbers, which JSON spells out digit by digit. This codec
+stores the response as JSON with
+
+- lists of numbers packed into a binary section, as the narrowest integer type that fits them or as doubles. Their
+  bytes are shuffled (all first bytes, then all second bytes, ...) so that zstd compresses them well.
+- lists of strings and datetimes stored once per response and referenced from everywhere else they occur.
+
+Encoded payloads start with `CODEC_MAGIC` and a version byte. Anything else is read as plain JSON, which is how query
+responses were cached before, so both formats can be read at any time.
+"""
+
+import math
+import struct
+from array import array
+from datetime import datetime
+from typing import Any
+
+from posthog.cache_utils import OrjsonJsonSerializer
+
+CODEC_MAGIC = b"\x00PHQC"
+CODEC_VERSION = 1
+_HEADER = struct.Struct("<BI")  # version, length of the JSON section
+
+# Keys of the objects that stand in for packed and shared lists. JSON payloads from anywhere else can't be told
+# apart from these, so responses which contain such keys are cached as plain JSON.
+_PACKED_KEY = "\x00p"
+_SHARED_KEY = "\x00s"
+_RESERVED_KEY_PREFIX = "\x00"
+
+# Shorter lists aren't worth the indirection
+MIN_PACKED_LENGTH = 8
+MIN_SHARED_LENGTH = 4
+
+_INT_TYPECODES = (("b", 2**7), ("h", 2**15), ("i", 2**31), ("q", 2**63))
+
+
+class QueryCacheCodecError(ValueError):
+    pass
+
+
+class _NotEncodable(Exception):
+    pass
+
+
+def _shuffle(data: bytes, itemsize: int) -> bytes:
+    if itemsize == 1:
+        return data
+    return b"".join(data[offset::itemsize] for offset in range(itemsize))
+
+
+def _unshuffle(data: bytes, itemsize: int) -> bytes:
+    if itemsize == 1:
+        return data
+    length = len(data) // itemsize
+    unshuffled = bytearray(len(data))
+    for offset in range(itemsize):
+        unshuffled[offset::itemsize] = data[offset * length : (offset + 1) * length]
+    return bytes(unshuffled)
+
+
+def _pack_numbers(values: list) -> array | None:
+    """
+    Returns the values as an array if they're all ints or all finite floats. Mixed lists are left alone, so that ints
+    don't come back as floats.
+    """
+    first = type(values[0])
+    if first is int:
+        if not all(type(value) is int for value in values):
+            return None
+        low, high = min(values), max(values)
+        for typecode, bound in _INT_TYPECODES:
+            if -bound <= low and high < bound:
+                return array(typecode, values)
+        return None
+    if first is float:
+        # NaN and infinity are cached as null in JSON, so they're kept that way
+        if not all(type(value) is float and math.isfinite(value) for value in values):
+            return None
+        return array("d", values)
+    return None
+
+
+class _Encoder:
+    def __init__(self) -> None:
+        self.binary = bytearray()
+        self.shared: dict[tuple[str | datetime, ...], int] = {}
+        self.shared_references = 0
+
+    def encode(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            encoded = {}
+            for key, item in value.items():
+                if isinstance(key, str) and key.startswith(_RESERVED_KEY_PREFIX):
+                    raise _NotEncodable()
+                encoded[key] = self.encode(item) if isinstance(item, dict | list) else item
+            return encoded
+        if isinstance(value, list):
+            if len(value) >= MIN_PACKED_LENGTH:
+                packed = _pack_numbers(value)
+                if packed is not None:
+                    offset = len(self.binary)
+                    self.binary += _shuffle(packed.tobytes(), packed.itemsize)
+                    return {_PACKED_KEY: [packed.typecode, offset, len(packed)]}
+            if len(value) >= MIN_SHARED_LENGTH and all(type(item) is str or type(item) is datetime for item in value):
+                index = self.shared.setdefault(tuple(value), len(self.shared))
+                self.shared_references += 1
+                return {_SHARED_KEY: index}
+            return [self.encode(item) if isinstance(item, dict | list) else item for item in value]
+        return value
+
+
+class _Decoder:
+    def __init__(self, binary: bytes, shared: list[list[str]]) -> None:
+        self.binary = binary
+        self.shared = shared
+
+    def decode(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            if len(value) == 1:
+                if _PACKED_KEY in value:
+                    typecode, offset, length = value[_PACKED_KEY]
+                    packed = array(typecode)
+                    end = offset + length * packed.itemsize
+                    packed.frombytes(_unshuffle(self.binary[offset:end], packed.itemsize))
+                    return packed.tolist()
+                if _SHARED_KEY in value:
+                    # Each occurrence gets its own list, and datetimes come back as strings, as with plain JSON
+                    return list(self.shared[value[_SHARED_KEY]])
+            return {key: self.decode(item) if isinstance(item, dict | list) else item for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.decode(item) if isinstance(item, dict | list) else item for item in value]
+        return value
+
+
+def is_encoded(data: bytes) -> bool:
+    return data.startswith(CODEC_MAGIC)
+
+
+def is_supported(data: bytes) -> bool:
+    """
+    Whether an encoded payload was written by a codec version this one can decode, without decoding it.
+    """
+    try:
+        version, _ = _HEADER.unpack(data[len(CODEC_MAGIC) : len(CODEC_MAGIC) + _HEADER.size])
+    except struct.error:
+        return False
+    return version == CODEC_VERSION
+
+
+def encode(value: Any) -> bytes:
+    """
+    Encodes a query response. Falls back to plain JSON for responses the codec can't represent or make smaller.
+    """
+    serializer = OrjsonJsonSerializer({})
+    encoder = _Encoder()
+    try:
+        encoded = encoder.encode(value)
+    except _NotEncodable:
+        return serializer.dumps(value)
+    if not encoder.binary and encoder.shared_references == len(encoder.shared):
+        # Nothing to gain, so it's kept as JSON, which is quicker to decode
+        return serializer.dumps(value)
+    shared = [list(values) for values in encoder.shared]
+    json_section = serializer.dumps([encoded, shared])
+    return CODEC_MAGIC + _HEADER.pack(CODEC_VERSION, len(json_section)) + json_section + bytes(encoder.binary)
+
+
+def decode(data: bytes) -> Any:
+    """
+    Decodes a payload written by `encode`, or plain JSON.
+    """
+    serializer = OrjsonJsonSerializer({})
+    if not is_encoded(data):
+        return serializer.loads(data)
+
+    header_end = len(CODEC_MAGIC) + _HEADER.size
+    try:
+        version, json_length = _HEADER.unpack(data[len(CODEC_MAGIC) : header_end])
+    except struct.error as e:
+        raise QueryCacheCodecError("Truncated query cache payload") from e
+    if version != CODEC_VERSION:
+        raise QueryCacheCodecError(f"Unsupported query cache codec version {version}")
+
+    encoded, shared = serializer.loads(data[header_end : header_end + json_length])
+    return _Decoder(data[header_end + json_length :], shared).decode(encoded)
+
+
+def to_json(data: bytes) -> bytes:
+    """
+    Returns the payload as JSON, whichever format it was written in.
+    """
+    if not is_encoded(data):
+        return data
+    return OrjsonJsonSerializer({}).dumps(decode(data))
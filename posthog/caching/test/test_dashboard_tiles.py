@@ -0,0 +1,96 @@
+import threading
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import override_settings
+
+from posthog.caching.dashboard_tiles import DashboardTileResultsLoader
+from posthog.caching.fetch_from_cache import InsightResult
+from posthog.hogql_queries.query_runner import ExecutionMode
+from posthog.models import Dashboard, DashboardTile, Insight
+from posthog.test.base import APIBaseTest, ClickhouseTestMixin, _create_event, flush_persons_and_events
+
+
+class TestDashboardTileResultsLoader(ClickhouseTestMixin, APIBaseTest):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.dashboard = Dashboard.objects.create(team=self.team, name="dashboard")
+        self.insights = [
+            Insight.objects.create(
+                team=self.team,
+                query={
+                    "kind": "InsightVizNode",
+                    "source": {"kind": "TrendsQuery", "series": [{"kind": "EventsNode", "event": event}]},
+                },
+            )
+            for event in ["$pageview", "$pageleave", "signed up"]
+        ]
+        for insight in self.insights:
+            DashboardTile.objects.create(dashboard=self.dashboard, insight=insight)
+        _create_event(team=self.team, event="$pageview", distinct_id="d1")
+        flush_persons_and_events()
+
+    def _load(self, execution_mode: ExecutionMode) -> dict:
+        tiles = list(DashboardTile.dashboard_queryset(self.dashboard.tiles.all()))
+        return DashboardTileResultsLoader(
+            team=self.team, dashboard=self.dashboard, execution_mode=execution_mode, user=self.user
+        ).load(tiles)
+
+    def test_calculates_missing_results_and_serves_cached_ones(self):
+        results = self._load(ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+
+        assert set(results.keys()) == {insight.pk for insight in self.insights}
+        assert all(isinstance(result, InsightResult) and not result.is_cached for result in results.values())
+
+        with (
+            patch("posthog.hogql_queries.query_cache.get_safe_cache") as get_safe_cache,
+            patch.object(cache, "get_many", wraps=cache.get_many) as get_many,
+        ):
+            cached_results = self._load(ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE)
+
+        # all tiles are read in one go
+        get_many.assert_called_once()
+        get_safe_cache.assert_not_called()
+        assert all(isinstance(result, InsightResult) and result.is_cached for result in cached_results.values())
+        assert [cached_results[insight.pk].result for insight in self.insights] == [
+            results[insight.pk].result for insight in self.insights
+        ]
+
+    def test_cache_only_never_calculates(self):
+        with patch("posthog.caching.dashboard_tiles.DashboardTileResultsLoader._calculate_within_budget") as calculate:
+            results = self._load(ExecutionMode.CACHE_ONLY_NEVER_CALCULATE)
+
+        calculate.assert_not_called()
+        assert all(result.result is None for result in results.values())
+
+    @override_settings(DASHBOARD_TILE_CALCULATION_BUDGET_SECONDS=0)
+    def test_calculates_asynchronously_past_the_budget(self):
+        with patch("posthog.caching.dashboard_tiles.calculate_for_query_based_insight") as calculate:
+            self._load(ExecutionMode.CALCULATE_BLOCKING_ALWAYS)
+
+        assert [call.kwargs["execution_mode"] for call in calculate.call_args_list] == [
+            ExecutionMode.CALCULATE_ASYNC_ALWAYS
+        ] * len(self.insights)
+
+    @override_settings(DASHBOARD_TILE_MAX_WORKERS=4)
+    def test_calculates_tiles_in_parallel(self):
+        calculated_in: set[str] = set()
+
+        def calculate(insight, **kwargs):
+            calculated_in.add(threading.current_thread().name)
+            return InsightResult(result=[insight.pk], last_refresh=None, cache_key=None, is_cached=False, timezone=None)
+
+        with patch("posthog.caching.dashboard_tiles.calculate_for_query_based_insight", side_effect=calculate):
+            results = self._load(ExecutionMode.CALCULATE_BLOCKING_ALWAYS)
+
+        assert {insight_id: result.result for insight_id, result in results.items()} == {
+            insight.pk: [insight.pk] for insight in self.insights
+        }
+        assert all(name.startswith("dashboard-tiles") for name in calculated_in)
+
+    def test_returns_errors_per_tile(self):
+        with patch("posthog.caching.dashboard_tiles.calculate_for_query_based_insight", side_effect=ValueError("boom")):
+            results = self._load(ExecutionMode.CALCULATE_BLOCKING_ALWAYS)
+
+        assert all(isinstance(result, ValueError) for result in results.values())
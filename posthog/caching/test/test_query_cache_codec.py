@@ -0,0 +1,83 @@
+from datetime import UTC, datetime
+
+import orjson
+from django.test import SimpleTestCase
+from parameterized import parameterized
+
+from posthog.cache_utils import OrjsonJsonSerializer
+from posthog.caching import query_cache_codec
+
+serializer = OrjsonJsonSerializer({})
+
+
+class TestQueryCacheCodec(SimpleTestCase):
+    def _roundtrip(self, value):
+        encoded = query_cache_codec.encode(value)
+        # Decoding must give exactly what caching the value as JSON would have
+        self.assertEqual(query_cache_codec.decode(encoded), serializer.loads(serializer.dumps(value)))
+        self.assertEqual(orjson.loads(query_cache_codec.to_json(encoded)), serializer.loads(serializer.dumps(value)))
+        return encoded
+
+    @parameterized.expand(
+        [
+            ("small ints", list(range(-5, 20))),
+            ("medium ints", [1000 * i for i in range(20)]),
+            ("large ints", [2**40 * i for i in range(20)]),
+            ("floats", [i / 3 for i in range(20)]),
+        ]
+    )
+    def test_packs_numbers(self, _, data):
+        encoded = self._roundtrip({"results": [{"data": data}, {"data": data}]})
+
+        self.assertTrue(query_cache_codec.is_encoded(encoded))
+        self.assertNotIn(orjson.dumps(data), encoded)
+
+    @parameterized.expand(
+        [
+            ("mixed ints and floats", [1, 2.5] * 10),
+            ("ints and bools", [1, True] * 10),
+            ("non-finite floats", [1.5, float("nan"), float("inf")] * 10),
+            ("ints out of range", [2**63] * 10),
+            ("short lists", [1, 2, 3]),
+        ]
+    )
+    def test_leaves_other_lists_alone(self, _, data):
+        self._roundtrip({"results": [{"data": data}]})
+
+    def test_shares_repeated_lists(self):
+        dates = [datetime(2024, 1, day, tzinfo=UTC) for day in range(1, 31)]
+        labels = [date.strftime("%-d-%b-%Y") for date in dates]
+        response = {"results": [{"labels": labels, "action": {"days": dates}} for _ in range(10)]}
+
+        encoded = self._roundtrip(response)
+
+        self.assertEqual(encoded.count(orjson.dumps(labels)), 1)
+
+    def test_falls_back_to_json(self):
+        # Nothing to pack or share
+        response = {"results": [["a", 1, 2.5], ["b", 2, 3.5]], "columns": ["name", "count", "value", "other"]}
+        self.assertEqual(self._roundtrip(response), serializer.dumps(response))
+
+        # Keys which the codec uses itself
+        response = {"results": [{"\x00p": list(range(10))}]}
+        self.assertEqual(self._roundtrip(response), serializer.dumps(response))
+
+    def test_decodes_json(self):
+        self.assertEqual(query_cache_codec.decode(b'{"results":[1,2]}'), {"results": [1, 2]})
+        self.assertEqual(query_cache_codec.to_json(b'{"results":[1,2]}'), b'{"results":[1,2]}')
+
+    def test_keeps_key_order(self):
+        response = {"is_cached": False, "query_status": None, "results": [list(range(10))], "hogql": "SELECT 1"}
+
+        encoded = self._roundtrip(response)
+
+        self.assertEqual(list(query_cache_codec.decode(encoded).keys()), list(response.keys()))
+
+    def test_rejects_unknown_versions(self):
+        encoded = bytearray(query_cache_codec.encode({"results": [list(range(10))]}))
+        self.assertTrue(query_cache_codec.is_supported(bytes(encoded)))
+        encoded[len(query_cache_codec.CODEC_MAGIC)] = query_cache_codec.CODEC_VERSION + 1
+
+        self.assertFalse(query_cache_codec.is_supported(bytes(encoded)))
+        with self.assertRaises(query_cache_codec.QueryCacheCodecError):
+            query_cache_codec.decode(bytes(encoded))
@@ -1,8 +1,21 @@
-from posthog.caching.warming import priority_insights, schedule_warming_for_teams_task
+from typing import Optional
+
+from django.test import override_settings
+
+from posthog.caching.warming import (
+    plan_warming,
+    priority_insights,
+    schedule_warming_for_teams_task,
+    warm_insight_cache_task,
+)
+from posthog.clickhouse.client.limit import CeleryConcurrencyLimitExceeded
+from posthog.hogql_queries.query_cache import QueryCacheManager
+from posthog.hogql_queries.query_runner import ExecutionMode
 from posthog.models import Insight, DashboardTile, InsightViewed, Dashboard
+from posthog.redis import get_client
 
 from datetime import datetime, timedelta, UTC
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 from posthog.test.base import APIBaseTest
 
@@ -116,6 +129,120 @@ class TestWarming(APIBaseTest):
         self.assertEqual(insights, expected_results)
 
 
+class TestPlanWarming(APIBaseTest):
+    def setUp(self) -> None:
+        super().setUp()
+        get_client().flushall()
+
+    def _create_insight(self, event: str) -> Insight:
+        return Insight.objects.create(
+            team=self.team,
+            query={
+                "kind": "InsightVizNode",
+                "source": {"kind": "TrendsQuery", "series": [{"kind": "EventsNode", "event": event}]},
+            },
+        )
+
+    def _set_stale_at(self, insight: Insight, dashboard: Optional[Dashboard], stale_at: datetime) -> None:
+        QueryCacheManager(
+            team_id=self.team.pk,
+            cache_key="unused",
+            insight_id=insight.pk,
+            dashboard_id=dashboard.pk if dashboard else None,
+        ).update_target_age(stale_at)
+
+    def test_deduplicates_by_cache_key(self):
+        insight = self._create_insight("$pageview")
+        same_query_insight = self._create_insight("$pageview")
+        dashboard = Dashboard.objects.create(team=self.team)
+        now = datetime.now(UTC)
+        self._set_stale_at(insight, None, now - timedelta(minutes=10))
+        self._set_stale_at(same_query_insight, dashboard, now - timedelta(minutes=20))
+
+        items = plan_warming(self.team, [(insight.pk, None), (same_query_insight.pk, dashboard.pk)])
+
+        self.assertEqual(len(items), 1)
+        self.assertEqual((items[0].insight_id, items[0].dashboard_id), (same_query_insight.pk, dashboard.pk))
+        self.assertEqual(items[0].duplicates, ((insight.pk, None),))
+
+    def test_orders_by_staleness_then_views_then_duration(self):
+        soon = self._create_insight("soon")
+        viewed = self._create_insight("viewed")
+        cheap = self._create_insight("cheap")
+        expensive = self._create_insight("expensive")
+        now = datetime.now(UTC)
+        self._set_stale_at(soon, None, now - timedelta(hours=1))
+        for insight in [viewed, cheap, expensive]:
+            self._set_stale_at(insight, None, now)
+        InsightViewed.objects.create(team=self.team, user=self.user, insight=viewed, last_viewed_at=now)
+        insight_tuples = [(insight.pk, None) for insight in [expensive, cheap, viewed, soon]]
+        for item in plan_warming(self.team, insight_tuples):
+            assert item.cache_key is not None
+            get_client().set(
+                f"cache_calculation_duration:{item.cache_key}", 30 if item.insight_id == expensive.pk else 1
+            )
+
+        items = plan_warming(self.team, insight_tuples)
+
+        self.assertEqual([item.insight_id for item in items], [soon.pk, viewed.pk, cheap.pk, expensive.pk])
+
+    @override_settings(CACHE_WARMING_TEAM_BUDGET_SECONDS=12)
+    def test_stops_at_team_budget(self):
+        insights = [self._create_insight(f"event {i}") for i in range(4)]
+
+        # Without known durations, each insight is assumed to take 5 seconds
+        items = plan_warming(self.team, [(insight.pk, None) for insight in insights])
+
+        self.assertEqual([item.insight_id for item in items], [insights[0].pk, insights[1].pk])
+
+
+class TestWarmInsightCacheTask(APIBaseTest):
+    def setUp(self) -> None:
+        super().setUp()
+        self.insight = Insight.objects.create(
+            team=self.team,
+            query={
+                "kind": "InsightVizNode",
+                "source": {"kind": "TrendsQuery", "series": [{"kind": "EventsNode", "event": "$pageview"}]},
+            },
+        )
+
+    @patch("posthog.caching.warming.process_query_dict")
+    def test_recalculates_results_which_are_not_stale_yet(self, mock_process_query_dict):
+        mock_process_query_dict.return_value = MagicMock(is_cached=False)
+        stale_at = datetime.now(UTC) + timedelta(minutes=30)
+
+        warm_insight_cache_task(self.insight.pk, None, team_id=self.team.pk, stale_at=stale_at.timestamp())
+
+        self.assertEqual(
+            mock_process_query_dict.call_args.kwargs["execution_mode"], ExecutionMode.CALCULATE_BLOCKING_ALWAYS
+        )
+
+    @patch("posthog.caching.warming.process_query_dict")
+    def test_uses_recent_cache_for_stale_results(self, mock_process_query_dict):
+        mock_process_query_dict.return_value = MagicMock(is_cached=False)
+        stale_at = datetime.now(UTC) - timedelta(minutes=30)
+
+        warm_insight_cache_task(self.insight.pk, None, team_id=self.team.pk, stale_at=stale_at.timestamp())
+
+        self.assertEqual(
+            mock_process_query_dict.call_args.kwargs["execution_mode"],
+            ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE,
+        )
+
+    @patch("posthog.caching.warming._warm_insight_cache")
+    def test_continues_chain_once_out_of_retries(self, mock_warm_insight_cache):
+        mock_warm_insight_cache.side_effect = CeleryConcurrencyLimitExceeded("limit")
+
+        # The last retry succeeds without warming, so that the rest of the chain still runs
+        result = warm_insight_cache_task.apply(
+            args=[self.insight.pk, None], kwargs={"team_id": self.team.pk}, retries=warm_insight_cache_task.max_retries
+        )
+
+        self.assertTrue(result.successful())
+        mock_warm_insight_cache.assert_called_once()
+
+
 class TestScheduleWarmingForTeamsTask(APIBaseTest):
     def setUp(self) -> None:
         super().setUp()
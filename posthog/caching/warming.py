@@ -1,24 +1,27 @@
 import itertools
+from dataclasses import dataclass
 from datetime import timedelta, UTC, datetime
-from collections.abc import Generator
+from collections.abc import Generator, Iterable
 from typing import Optional
 
 import structlog
 from celery import shared_task
 from celery.canvas import chain
-from django.db.models import Q
+from django.conf import settings
+from django.db.models import Count, Q
 from prometheus_client import Counter, Gauge
 from sentry_sdk import capture_exception
 
-from posthog.api.services.query import process_query_dict
+from posthog.api.services.query import get_query_runner_for_dict, process_query_dict
 from posthog.caching.utils import largest_teams
+from posthog.clickhouse.client.limit import CeleryConcurrencyLimitExceeded, limit_concurrency
 from posthog.clickhouse.query_tagging import tag_queries
 from posthog.errors import CHQueryErrorTooManySimultaneousQueries
 from posthog.hogql.constants import LimitContext
 from posthog.hogql_queries.query_cache import QueryCacheManager
 from posthog.hogql_queries.legacy_compatibility.flagged_conversion_manager import conversion_to_query_based
 from posthog.hogql_queries.query_runner import ExecutionMode
-from posthog.models import Team, Insight, DashboardTile
+from posthog.models import Team, Insight, DashboardTile, Dashboard, InsightViewed
 from posthog.tasks.utils import CeleryQueue
 
 logger = structlog.get_logger(__name__)
@@ -33,21 +36,40 @@ PRIORITY_INSIGHTS_COUNTER = Counter(
     "Number of priority insights warmed",
     ["team_id", "dashboard", "is_cached"],
 )
+WARMING_SCHEDULED_COUNTER = Counter(
+    "posthog_cache_warming_scheduled",
+    "Insights scheduled for warming, and those left out as they share a cache key or exceed the team's budget",
+    ["team_id", "outcome"],
+)
+WARMING_RESULT_COUNTER = Counter(
+    "posthog_cache_warming_result",
+    "Whether warming refreshed a result before it went stale (ahead), after (late), found it fresh already (fresh), "
+    "or ran out of retries (skipped). The warm-hit ratio is ahead / (ahead + late).",
+    ["team_id", "result"],
+)
 
 LAST_VIEWED_THRESHOLD = timedelta(days=7)
+# Warming is scheduled hourly, so results which go stale before the next run are warmed as well
+WARMING_HORIZON = timedelta(hours=1)
+# Used for results whose last calculation took an unknown amount of time
+DEFAULT_WARMING_DURATION = 5.0
 
 
-def priority_insights(team: Team, shared_only: bool = False) -> Generator[tuple[int, Optional[int]], None, None]:
+def priority_insights(
+    team: Team, shared_only: bool = False, until: Optional[datetime] = None
+) -> Generator[tuple[int, Optional[int]], None, None]:
     """
     This is the place to decide which insights should be kept warm.
     The reasoning is that this will be a yes or no decision. If we need to keep it warm, we try our best
     to not let the cache go stale. There isn't any middle ground, like trying to refresh it once a day, since
     that would be like clock that's only right twice a day.
+
+    Pass `until` to also include insights which will only go stale by then.
     """
 
     threshold = datetime.now(UTC) - LAST_VIEWED_THRESHOLD
     QueryCacheManager.clean_up_stale_insights(team_id=team.pk, threshold=threshold)
-    combos = QueryCacheManager.get_stale_insights(team_id=team.pk, limit=500)
+    combos = QueryCacheManager.get_stale_insights(team_id=team.pk, limit=500, until=until)
 
     STALE_INSIGHTS_GAUGE.labels(team_id=team.pk).set(len(combos))
 
@@ -86,6 +108,131 @@ def priority_insights(team: Team, shared_only: bool = False) -> Generator[tuple[
     yield from dashboard_tiles
 
 
+@dataclass(frozen=True)
+class WarmingItem:
+    insight_id: int
+    dashboard_id: Optional[int]
+    cache_key: Optional[str] = None
+    stale_at: Optional[datetime] = None
+    views: int = 0
+    duration: Optional[float] = None
+    # Other insight + dashboard combinations with the same cache key, which are kept warm by warming this one
+    duplicates: tuple[tuple[int, Optional[int]], ...] = ()
+
+    @property
+    def estimated_duration(self) -> float:
+        return self.duration if self.duration is not None else DEFAULT_WARMING_DURATION
+
+    @property
+    def priority(self) -> tuple[datetime, int, float]:
+        # Earliest to go stale first, then the most viewed, then the cheapest
+        return (self.stale_at or datetime.max.replace(tzinfo=UTC), -self.views, self.estimated_duration)
+
+
+def _get_cache_key(insight: Insight, dashboard: Optional[Dashboard]) -> Optional[str]:
+    with conversion_to_query_based(insight):
+        if not insight.query:
+            return None
+        try:
+            query_runner = get_query_runner_for_dict(
+                insight.team,
+                insight.query,
+                dashboard_filters_json=dashboard.filters if dashboard is not None else None,
+            )
+        except Exception:
+            return None
+    return query_runner.get_cache_key() if query_runner is not None else None
+
+
+def plan_warming(team: Team, insight_tuples: Iterable[tuple[int, Optional[int]]]) -> list[WarmingItem]:
+    """
+    Orders the insights to warm by when they go stale, how often they're viewed and how long they took to calculate
+    last time. Combinations sharing a cache key are warmed once, and the team's insights are cut off once their
+    estimated duration exceeds CACHE_WARMING_TEAM_BUDGET_SECONDS. The rest are left for the next run.
+    """
+    insight_tuples = list(insight_tuples)
+    if not insight_tuples:
+        return []
+
+    insights = {
+        insight.pk: insight
+        for insight in Insight.objects.filter(team=team, pk__in={int(insight_id) for insight_id, _ in insight_tuples})
+    }
+    dashboards = {
+        dashboard.pk: dashboard
+        for dashboard in Dashboard.objects.filter(
+            team=team, pk__in={int(dashboard_id) for _, dashboard_id in insight_tuples if dashboard_id}
+        )
+    }
+    views = dict(
+        InsightViewed.objects.filter(
+            team=team,
+            insight_id__in=insights.keys(),
+            last_viewed_at__gte=datetime.now(UTC) - LAST_VIEWED_THRESHOLD,
+        )
+        .values("insight_id")
+        .annotate(views=Count("id"))
+        .values_list("insight_id", "views")
+    )
+    stale_at = QueryCacheManager.get_target_ages(
+        team_id=team.pk,
+        identifiers=[f"{insight_id}:{dashboard_id or ''}" for insight_id, dashboard_id in insight_tuples],
+    )
+
+    items: list[WarmingItem] = []
+    for insight_id, dashboard_id in insight_tuples:
+        insight = insights.get(int(insight_id))
+        dashboard = dashboards.get(int(dashboard_id)) if dashboard_id else None
+        items.append(
+            WarmingItem(
+                insight_id=insight_id,
+                dashboard_id=dashboard_id,
+                cache_key=_get_cache_key(insight, dashboard) if insight is not None else None,
+                stale_at=stale_at.get(f"{insight_id}:{dashboard_id or ''}"),
+                views=views.get(int(insight_id), 0),
+            )
+        )
+
+    durations = QueryCacheManager.get_calculation_durations(
+        list({item.cache_key for item in items if item.cache_key is not None})
+    )
+
+    # Combinations sharing a cache key are warmed as the one going stale first, and count as viewed as all of them
+    by_cache_key: dict[str, list[WarmingItem]] = {}
+    deduplicated: list[WarmingItem] = []
+    for item in items:
+        if item.cache_key is None:
+            deduplicated.append(item)
+        else:
+            by_cache_key.setdefault(item.cache_key, []).append(item)
+    for cache_key, same_key_items in by_cache_key.items():
+        first, *duplicates = sorted(same_key_items, key=lambda item: item.priority)
+        deduplicated.append(
+            WarmingItem(
+                insight_id=first.insight_id,
+                dashboard_id=first.dashboard_id,
+                cache_key=cache_key,
+                stale_at=first.stale_at,
+                views=sum(item.views for item in same_key_items),
+                duration=durations.get(cache_key),
+                duplicates=tuple((item.insight_id, item.dashboard_id) for item in duplicates),
+            )
+        )
+    WARMING_SCHEDULED_COUNTER.labels(team_id=team.pk, outcome="deduplicated").inc(len(items) - len(deduplicated))
+
+    planned: list[WarmingItem] = []
+    budget = float(settings.CACHE_WARMING_TEAM_BUDGET_SECONDS)
+    for item in sorted(deduplicated, key=lambda item: item.priority):
+        if planned and item.estimated_duration > budget:
+            break
+        planned.append(item)
+        budget -= item.estimated_duration
+    WARMING_SCHEDULED_COUNTER.labels(team_id=team.pk, outcome="over_budget").inc(len(deduplicated) - len(planned))
+    WARMING_SCHEDULED_COUNTER.labels(team_id=team.pk, outcome="scheduled").inc(len(planned))
+
+    return planned
+
+
 @shared_task(ignore_result=True, expires=60 * 15)
 def schedule_warming_for_teams_task():
     team_ids = largest_teams(limit=10)
@@ -107,26 +254,66 @@ def schedule_warming_for_teams_task():
 
     # Use a fixed expiration time since tasks in the chain are executed sequentially
     expire_after = datetime.now(UTC) + timedelta(minutes=50)
+    until = datetime.now(UTC) + WARMING_HORIZON
 
     for team, shared_only in all_teams:
-        insight_tuples = priority_insights(team, shared_only=shared_only)
+        items = plan_warming(team, priority_insights(team, shared_only=shared_only, until=until))
 
-        # We chain the task execution to prevent queries *for a single team* running at the same time
-        chain(
-            *(warm_insight_cache_task.si(*insight_tuple).set(expires=expire_after) for insight_tuple in insight_tuples)
-        )()
+        # Each chain runs its queries one after the other, so this limits how many of the team's queries run at once
+        for chain_items in (
+            items[i :: settings.CACHE_WARMING_TEAM_CONCURRENCY] for i in range(settings.CACHE_WARMING_TEAM_CONCURRENCY)
+        ):
+            if not chain_items:
+                continue
+            chain(
+                *(
+                    warm_insight_cache_task.si(
+                        item.insight_id,
+                        item.dashboard_id,
+                        team_id=team.pk,
+                        stale_at=item.stale_at.timestamp() if item.stale_at is not None else None,
+                        duplicates=list(item.duplicates),
+                    ).set(expires=expire_after)
+                    for item in chain_items
+                )
+            )()
 
 
 @shared_task(
     queue=CeleryQueue.ANALYTICS_LIMITED.value,  # Important! Prevents Clickhouse from being overwhelmed
     ignore_result=True,
     expires=60 * 60,
-    autoretry_for=(CHQueryErrorTooManySimultaneousQueries,),
+    autoretry_for=(CHQueryErrorTooManySimultaneousQueries, CeleryConcurrencyLimitExceeded),
     retry_backoff=1,
     retry_backoff_max=3,
     max_retries=3,
 )
-def warm_insight_cache_task(insight_id: int, dashboard_id: Optional[int]):
+def warm_insight_cache_task(
+    insight_id: int,
+    dashboard_id: Optional[int],
+    team_id: Optional[int] = None,
+    stale_at: Optional[float] = None,
+    duplicates: Optional[list[tuple[int, Optional[int]]]] = None,
+):
+    try:
+        _warm_insight_cache(insight_id, dashboard_id, team_id=team_id, stale_at=stale_at, duplicates=duplicates)
+    except (CHQueryErrorTooManySimultaneousQueries, CeleryConcurrencyLimitExceeded):
+        if warm_insight_cache_task.request.retries < warm_insight_cache_task.max_retries:
+            raise
+        # A task which fails ends its chain, which would leave the team's remaining insights unwarmed
+        logger.warning(f"Warming insight cache skipped after running out of retries: {insight_id}")
+        WARMING_RESULT_COUNTER.labels(team_id=team_id, result="skipped").inc()
+
+
+@limit_concurrency(settings.CACHE_WARMING_MAX_CONCURRENCY)
+@limit_concurrency(settings.CACHE_WARMING_TEAM_CONCURRENCY, key=lambda *args, **kwargs: kwargs.get("team_id"))
+def _warm_insight_cache(
+    insight_id: int,
+    dashboard_id: Optional[int],
+    team_id: Optional[int] = None,
+    stale_at: Optional[float] = None,
+    duplicates: Optional[list[tuple[int, Optional[int]]]] = None,
+):
     try:
         insight = Insight.objects.get(pk=insight_id)
     except Insight.DoesNotExist:
@@ -140,6 +327,9 @@ def warm_insight_cache_task(insight_id: int, dashboard_id: Optional[int]):
         tag_queries(dashboard_id=dashboard_id)
         dashboard = insight.dashboards.filter(pk=dashboard_id).first()
 
+    # Results which aren't stale yet are recalculated ahead of time, as the recent cache would just return them
+    ahead = stale_at is not None and datetime.now(UTC).timestamp() < stale_at
+
     with conversion_to_query_based(insight):
         logger.info(f"Warming insight cache: {insight.pk} for team {insight.team_id} and dashboard {dashboard_id}")
 
@@ -148,20 +338,43 @@ def warm_insight_cache_task(insight_id: int, dashboard_id: Optional[int]):
                 insight.team,
                 insight.query,
                 dashboard_filters_json=dashboard.filters if dashboard is not None else None,
-                # We need an execution mode with recent cache:
+                # Stale results need an execution mode with recent cache:
                 # - in case someone refreshed after this task was triggered
                 # - if insight + dashboard combinations have the same cache key, we prevent needless recalculations
                 limit_context=LimitContext.QUERY_ASYNC,
-                execution_mode=ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE,
+                execution_mode=ExecutionMode.CALCULATE_BLOCKING_ALWAYS
+                if ahead
+                else ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE,
                 insight_id=insight_id,
                 dashboard_id=dashboard_id,
             )
 
+            is_cached = getattr(results, "is_cached", False)
             PRIORITY_INSIGHTS_COUNTER.labels(
                 team_id=insight.team_id,
                 dashboard=dashboard_id is not None,
-                is_cached=getattr(results, "is_cached", False),
+                is_cached=is_cached,
             ).inc()
+
+            if is_cached:
+                warming_result = "fresh"
+            elif ahead:
+                warming_result = "ahead"
+            else:
+                warming_result = "late"
+            WARMING_RESULT_COUNTER.labels(team_id=insight.team_id, result=warming_result).inc()
+
+            # Combinations sharing the cache key now have a fresh result too
+            cache_key = getattr(results, "cache_key", None)
+            cache_target_age = getattr(results, "cache_target_age", None)
+            if cache_key and cache_target_age:
+                for duplicate_insight_id, duplicate_dashboard_id in duplicates or []:
+                    QueryCacheManager(
+                        team_id=insight.team_id,
+                        cache_key=cache_key,
+                        insight_id=duplicate_insight_id,
+                        dashboard_id=duplicate_dashboard_id,
+                    ).update_target_age(cache_target_age)
         except CHQueryErrorTooManySimultaneousQueries:
             raise
         except Exception as e:
@@ -98,6 +98,7 @@ def sync_execute(
     workload: Workload = Workload.DEFAULT,
     team_id: Optional[int] = None,
     readonly=False,
+    columnar=False,
 ):
     if TEST and flush:
         try:
@@ -144,6 +145,7 @@ def sync_execute(
                 params=prepared_args,
                 settings=settings,
                 with_column_types=with_column_types,
+                columnar=columnar,
                 query_id=query_id,
             )
         except Exception as e:
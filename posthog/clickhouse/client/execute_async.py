@@ -1,10 +1,12 @@
 import datetime
+import time
 import uuid
 from typing import TYPE_CHECKING, Optional
 
 import orjson as json
 import sentry_sdk
 import structlog
+from asgiref.sync import sync_to_async
 from prometheus_client import Histogram
 from pydantic import BaseModel
 from rest_framework.exceptions import APIException, NotFound
@@ -55,12 +57,27 @@ class QueryStatusManager:
     def clickhouse_query_status_key(self) -> str:
         return f"{self.KEY_PREFIX_ASYNC_RESULTS}:{self.team_id}:{self.query_id}:status"
 
-    def store_query_status(self, query_status: QueryStatus):
-        value = SafeJSONRenderer().render(query_status.model_dump(exclude={"clickhouse_query_progress"}))
+    @property
+    def completion_channel(self) -> str:
+        return f"{self.KEY_PREFIX_ASYNC_RESULTS}:{self.team_id}:{self.query_id}:complete"
+
+    def store_query_status(self, query_status: QueryStatus, results_cache_key: Optional[str] = None):
+        """
+        Stores the status. If the results are in the query cache under `results_cache_key`, only that key is stored
+        and the results are read from the cache when the status is retrieved, instead of keeping a second copy.
+        """
+        status_dict = query_status.model_dump(exclude={"clickhouse_query_progress"})
+        if results_cache_key is not None:
+            status_dict["results"] = None
+            status_dict["results_cache_key"] = results_cache_key
+        value = SafeJSONRenderer().render(status_dict)
         query_status.expiration_time = datetime.datetime.now(datetime.UTC) + datetime.timedelta(
             seconds=self.STATUS_TTL_SECONDS
         )
         self.redis_client.set(self.results_key, value, exat=int(query_status.expiration_time.timestamp()))
+        if query_status.complete:
+            # Wakes up anyone waiting for the query in `wait_for_completion`
+            self.redis_client.publish(self.completion_channel, b"1")
 
     def _store_clickhouse_query_progress_dict(self, query_progress_dict):
         value = json.dumps(query_progress_dict)
@@ -113,19 +130,58 @@ class QueryStatusManager:
             logger.exception("Clickhouse Status Check Failed", error=e)
             return None
 
-    def get_query_status(self, show_progress: bool = False) -> QueryStatus:
+    def _get_cached_results(self, results_cache_key: str) -> dict:
+        from posthog.hogql_queries.query_cache import QueryCacheManager
+
+        results = QueryCacheManager(team_id=self.team_id, cache_key=results_cache_key).get_cache_data()
+        if results is None:
+            # The results were evicted from the cache, the query has to be run again
+            raise QueryNotFoundError(f"Results of query {self.query_id} not found for team {self.team_id}")
+        return results
+
+    def get_query_status(self, show_progress: bool = False, with_results: bool = True) -> QueryStatus:
         byte_results = self._get_results()
 
         if not byte_results:
             raise QueryNotFoundError(f"Query {self.query_id} not found for team {self.team_id}")
 
-        query_status = QueryStatus(**json.loads(byte_results))
+        status_dict = json.loads(byte_results)
+        results_cache_key = status_dict.pop("results_cache_key", None)
+        query_status = QueryStatus(**status_dict)
+
+        if with_results and results_cache_key is not None:
+            query_status.results = self._get_cached_results(results_cache_key)
 
         if show_progress and not query_status.complete:
             query_status.query_progress = self.get_clickhouse_progresses()
 
         return query_status
 
+    async def wait_for_completion(self, timeout: float) -> None:
+        """
+        Waits until the query completes, or until the timeout has passed. This waits in the event loop on the
+        completion channel, so a request served under ASGI doesn't take up a thread while it waits.
+        """
+        client = redis.get_async_client()
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(self.completion_channel)
+            # Checked after subscribing, so that completing in between isn't missed
+            try:
+                query_status = await sync_to_async(self.get_query_status)(with_results=False)
+            except QueryNotFoundError:
+                return
+            if query_status.complete:
+                return
+
+            deadline = time.monotonic() + timeout
+            while (remaining := deadline - time.monotonic()) > 0:
+                if await pubsub.get_message(timeout=remaining) is not None:
+                    return
+        finally:
+            await pubsub.reset()
+            await client.close()
+
     def delete_query_status(self) -> None:
         logger.info("Deleting redis query key %s", self.results_key)
         self.redis_client.delete(self.results_key)
@@ -156,7 +212,7 @@ def execute_process_query(
         is_staff_user = user.is_staff
         sentry_sdk.set_user({"email": user.email, "id": user_id, "username": user.email})
 
-    query_status = manager.get_query_status()
+    query_status = manager.get_query_status(with_results=False)
 
     if query_status.complete:
         return
@@ -171,6 +227,8 @@ def execute_process_query(
     if trigger == "chained":
         tag_queries(trigger="chaining")
 
+    results_cache_key: Optional[str] = None
+
     if query_status.start_time:
         wait_duration = (query_status.pickup_time - query_status.start_time) / datetime.timedelta(seconds=1)
         QUERY_WAIT_TIME.labels(team=team_id, mode=trigger).observe(wait_duration)
@@ -190,7 +248,16 @@ def execute_process_query(
             results = results.model_dump(by_alias=True)
         logger.info("Got results for team %s query %s", team_id, query_id)
         query_status.error = False
-        query_status.results = results
+        if (
+            isinstance(results, dict)
+            and results.get("cache_key")
+            and not results.get("error")
+            and limit_context != LimitContext.EXPORT
+        ):
+            # Query runners have cached these results (see `QueryRunner.run`), so the status only references them
+            results_cache_key = results["cache_key"]
+        else:
+            query_status.results = results
         process_duration = (datetime.datetime.now(datetime.UTC) - query_status.pickup_time) / datetime.timedelta(
             seconds=1
         )
@@ -199,6 +266,7 @@ def execute_process_query(
         raise
     except Exception as err:
         query_status.results = None  # Clear results in case they are faulty
+        results_cache_key = None
         if isinstance(err, APIException | ExposedHogQLError | ExposedCHQueryError) or is_staff_user:
             # We can only expose the error message if it's a known safe error OR if the user is PostHog staff
             query_status.error_message = str(err)
@@ -207,7 +275,7 @@ def execute_process_query(
         # Do not raise here, the task itself did its job and we cannot recover
     finally:
         query_status.end_time = datetime.datetime.now(datetime.UTC)
-        manager.store_query_status(query_status)
+        manager.store_query_status(query_status, results_cache_key=results_cache_key)
 
 
 def enqueue_process_query_task(
@@ -233,7 +301,11 @@ def enqueue_process_query_task(
 
     if manager.has_results() and not refresh_requested:
         # If we've seen this query before return and don't resubmit it.
-        return manager.get_query_status()
+        try:
+            return manager.get_query_status()
+        except QueryNotFoundError:
+            # The results it referenced have been evicted from the cache since, so it's submitted again
+            pass
 
     # Immediately set status, so we don't have race with celery
     query_status = QueryStatus(
@@ -255,19 +327,25 @@ def enqueue_process_query_task(
     return query_status
 
 
-def get_query_status(team_id: int, query_id: str, show_progress: bool = False) -> QueryStatus:
+def get_query_status(
+    team_id: int,
+    query_id: str,
+    show_progress: bool = False,
+    *,
+    with_results: bool = True,
+) -> QueryStatus:
     """
     Abstracts away the manager for any caller and returns a QueryStatus object
     """
     manager = QueryStatusManager(query_id, team_id)
-    return manager.get_query_status(show_progress=show_progress)
+    return manager.get_query_status(show_progress=show_progress, with_results=with_results)
 
 
 def cancel_query(team_id: int, query_id: str) -> bool:
     manager = QueryStatusManager(query_id, team_id)
 
     try:
-        query_status = manager.get_query_status()
+        query_status = manager.get_query_status(with_results=False)
 
         if query_status.task_id:
             logger.info("Got task id %s, attempting to revoke", query_status.task_id)
@@ -1,16 +1,21 @@
 import json
+import threading
+import time
 from typing import Any
 
 from posthog.clickhouse.client.async_task_chain import task_chain_context
 from posthog.clickhouse.client.connection import Workload
 import uuid
 
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
 from django.test import TestCase, SimpleTestCase
 from django.db import transaction
 
 from posthog.clickhouse.client import execute_async as client
 from posthog.client import sync_execute
 from posthog.errors import CHQueryErrorTooManySimultaneousQueries
+from posthog.hogql_queries.query_cache import QueryCacheManager
 from posthog.models import Organization, Team
 from posthog.models.user import User
 from posthog.redis import get_client
@@ -99,6 +104,46 @@ class TestQueryStatusManager(SimpleTestCase):
         self.query_status.expiration_time = None  # We don't care about expiration time in this test
         self.assertEqual(self.manager.get_query_status(show_progress=True), self.query_status)
 
+    def test_results_are_referenced_from_the_cache(self):
+        QueryCacheManager(team_id=self.team_id, cache_key="cache_key").set_cache_data(
+            response={"results": [1, 2]}, target_age=None
+        )
+        self.query_status.complete = True
+        self.manager.store_query_status(self.query_status, results_cache_key="cache_key")
+
+        self.assertNotIn(b"[1,2]", get_client().get(self.manager.results_key) or b"")
+        self.assertEqual(self.manager.get_query_status().results, {"results": [1, 2]})
+        self.assertIsNone(self.manager.get_query_status(with_results=False).results)
+
+        cache.delete("cache_key")
+        self.assertRaises(QueryNotFoundError, self.manager.get_query_status)
+
+    def test_wait_for_completion(self):
+        self.manager.store_query_status(self.query_status)
+
+        def complete():
+            time.sleep(0.2)
+            self.query_status.complete = True
+            QueryStatusManager(self.query_id, self.team_id).store_query_status(self.query_status)
+
+        thread = threading.Thread(target=complete)
+        thread.start()
+        start = time.monotonic()
+        async_to_sync(self.manager.wait_for_completion)(timeout=10)
+        thread.join()
+
+        self.assertLess(time.monotonic() - start, 10)
+        self.assertTrue(self.manager.get_query_status().complete)
+
+    def test_wait_for_completion_times_out(self):
+        self.manager.store_query_status(self.query_status)
+
+        start = time.monotonic()
+        async_to_sync(self.manager.wait_for_completion)(timeout=0.2)
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+        self.assertFalse(self.manager.get_query_status().complete)
+
 
 class TestExecuteProcessQuery(TestCase):
     def setUp(self):
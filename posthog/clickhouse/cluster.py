@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import logging
-from collections.abc import Callable, Iterator, Sequence
+from collections.abc import Callable, Iterator, Mapping, Sequence
 from concurrent.futures import ALL_COMPLETED, FIRST_EXCEPTION, Future, ThreadPoolExecutor, as_completed
 from typing import Literal, NamedTuple, TypeVar
 
@@ -125,3 +125,16 @@ class ClickhouseCluster:
             return FuturesMap(
                 {host: executor.submit(self.__get_task_function(host, fn)) for host in shard_hosts.values()}
             )
+
+    def map_hosts(
+        self,
+        tasks: Mapping[K, tuple[HostInfo, Callable[[Client], T]]],
+        max_workers: int | None = None,
+    ) -> FuturesMap[K, T]:
+        """
+        Execute each callable on the host it is paired with, running at most `max_workers` callables at once.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return FuturesMap(
+                {key: executor.submit(self.__get_task_function(host, fn)) for key, (host, fn) in tasks.items()}
+            )
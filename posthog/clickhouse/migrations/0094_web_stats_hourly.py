@@ -0,0 +1,12 @@
+from posthog.clickhouse.client.migration_tools import run_sql_with_exceptions
+from posthog.models.web_preaggregated.sql import (
+    DISTRIBUTED_WEB_STATS_HOURLY_TABLE_SQL,
+    WEB_STATS_HOURLY_TABLE_SQL,
+    WRITABLE_WEB_STATS_HOURLY_TABLE_SQL,
+)
+
+operations = [
+    run_sql_with_exceptions(WEB_STATS_HOURLY_TABLE_SQL()),
+    run_sql_with_exceptions(WRITABLE_WEB_STATS_HOURLY_TABLE_SQL()),
+    run_sql_with_exceptions(DISTRIBUTED_WEB_STATS_HOURLY_TABLE_SQL()),
+]
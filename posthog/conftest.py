@@ -73,6 +73,7 @@ def reset_clickhouse_tables():
         TRUNCATE_PERSON_TABLE_SQL,
     )
     from posthog.models.sessions.sql import TRUNCATE_SESSIONS_TABLE_SQL
+    from posthog.models.web_preaggregated.sql import TRUNCATE_WEB_STATS_HOURLY_TABLE_SQL
     from posthog.session_recordings.sql.session_recording_event_sql import (
         TRUNCATE_SESSION_RECORDING_EVENTS_TABLE_SQL,
     )
@@ -98,6 +99,7 @@ def reset_clickhouse_tables():
         TRUNCATE_SESSIONS_TABLE_SQL(),
         TRUNCATE_RAW_SESSIONS_TABLE_SQL(),
         TRUNCATE_HEATMAPS_TABLE_SQL(),
+        TRUNCATE_WEB_STATS_HOURLY_TABLE_SQL(),
     ]
 
     run_clickhouse_statement_in_parallel(TABLES_TO_CREATE_DROP)
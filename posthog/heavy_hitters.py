@@ -0,0 +1,153 @@
+"""In-process detection of keys which make up a disproportionate share of a stream, e.g. hot partition keys"""
+
+import hashlib
+import threading
+import time
+from collections.abc import Callable
+from typing import Optional
+
+import numpy as np
+
+
+class HeavyHitterDetector:
+    """
+    Counts keys over a sliding window in fixed memory, and detects the keys seen at least `threshold` times in it.
+
+    Counts are kept in a count-min sketch: `depth` rows of `width` counters, where each key increments one counter per
+    row and its count is estimated as the smallest of them. Estimates can only be too high, and are usually off by at
+    most `e / width` times the number of keys counted in the window. The window is split into `bucket_count` buckets with a
+    sketch each, and the sum of all buckets is kept in a separate sketch, so that a bucket is subtracted from it
+    once it falls out of the window.
+
+    A detected key stays detected for `ttl_seconds`, and is detected again if it's still heavy after that. The
+    `top_k` keys with the highest counts are tracked for reporting.
+
+    `on_detect` is called with a key and its count when it's detected, and `on_expire` with a key when its detection
+    expires. Both are called on the thread which recorded the key, outside of the detector's lock.
+    """
+
+    def __init__(
+        self,
+        threshold: int,
+        window_seconds: float = 60,
+        ttl_seconds: float = 600,
+        bucket_count: int = 6,
+        width: int = 4096,
+        depth: int = 4,
+        top_k: int = 20,
+        on_detect: Optional[Callable[[str, int], None]] = None,
+        on_expire: Optional[Callable[[str], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.bucket_seconds = window_seconds / bucket_count
+        self.width = width
+        self.depth = depth
+        self.top_k = top_k
+        self.on_detect = on_detect
+        self.on_expire = on_expire
+        self.clock = clock
+
+        self._buckets = np.zeros((bucket_count, depth, width), dtype=np.int64)
+        self._window = np.zeros((depth, width), dtype=np.int64)
+        self._rows = np.arange(depth)
+        self._bucket_number = int(clock() // self.bucket_seconds)
+        self._top: dict[str, int] = {}
+        self._detected: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _indices(self, key: str) -> np.ndarray:
+        # Derives all rows' counters from one hash, as the sum of two halves of it multiplied by the row
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return np.array([(first + row * second) % self.width for row in range(self.depth)])
+
+    def _estimate(self, indices: np.ndarray) -> int:
+        return int(self._window[self._rows, indices].min())
+
+    def _advance(self, now: float) -> None:
+        """Moves the window up to `now`"""
+        bucket_number = int(now // self.bucket_seconds)
+        if bucket_number > self._bucket_number:
+            bucket_count = len(self._buckets)
+            if bucket_number - self._bucket_number >= bucket_count:
+                self._buckets.fill(0)
+                self._window.fill(0)
+            else:
+                for number in range(self._bucket_number + 1, bucket_number + 1):
+                    bucket = self._buckets[number % bucket_count]
+                    self._window -= bucket
+                    bucket.fill(0)
+            self._bucket_number = bucket_number
+
+            # Counts of the top keys only go down as buckets leave the window
+            for key in list(self._top):
+                count = self._estimate(self._indices(key))
+                if count > 0:
+                    self._top[key] = count
+                else:
+                    del self._top[key]
+
+    def _expire(self, now: float) -> list[str]:
+        expired = [key for key, expires_at in self._detected.items() if expires_at <= now]
+        for key in expired:
+            del self._detected[key]
+        return expired
+
+    def _update_top(self, key: str, count: int) -> None:
+        if key in self._top or len(self._top) < self.top_k:
+            self._top[key] = count
+            return
+        smallest_key = min(self._top, key=self._top.__getitem__)
+        if count > self._top[smallest_key]:
+            del self._top[smallest_key]
+            self._top[key] = count
+
+    def record(self, key: str, count: int = 1) -> bool:
+        """Counts `count` occurrences of `key`, and returns whether it's detected as a heavy hitter"""
+        indices = self._indices(key)
+        detected_count: Optional[int] = None
+        with self._lock:
+            now = self.clock()
+            self._advance(now)
+            expired = self._expire(now)
+            self._buckets[self._bucket_number % len(self._buckets), self._rows, indices] += count
+            self._window[self._rows, indices] += count
+            estimate = self._estimate(indices)
+            self._update_top(key, estimate)
+
+            is_detected = key in self._detected
+            if not is_detected and estimate >= self.threshold:
+                self._detected[key] = now + self.ttl_seconds
+                is_detected = True
+                detected_count = estimate
+
+        if self.on_expire is not None:
+            for expired_key in expired:
+                self.on_expire(expired_key)
+        if detected_count is not None and self.on_detect is not None:
+            self.on_detect(key, detected_count)
+        return is_detected
+
+    def estimate(self, key: str) -> int:
+        """How often `key` was counted in the window, or more if other keys share its counters"""
+        with self._lock:
+            self._advance(self.clock())
+            return self._estimate(self._indices(key))
+
+    def is_detected(self, key: str) -> bool:
+        with self._lock:
+            return self._detected.get(key, 0) > self.clock()
+
+    def detected_keys(self) -> list[str]:
+        with self._lock:
+            now = self.clock()
+            return [key for key, expires_at in self._detected.items() if expires_at > now]
+
+    def top(self) -> list[tuple[str, int]]:
+        """The keys with the highest counts in the window, highest first"""
+        with self._lock:
+            self._advance(self.clock())
+            return sorted(self._top.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,173 @@
+from collections.abc import Iterator, Sequence
+from typing import Any, Optional, Union, overload
+
+import numpy as np
+from pydantic import GetCoreSchemaHandler
+from pydantic_core import core_schema
+
+from posthog.schema import HogQLQueryResponse
+
+# NumPy types for ClickHouse types whose values always fit them, other columns are kept as arrays of Python objects
+_NUMPY_DTYPES: dict[str, str] = {
+    "Bool": "bool",
+    "Int8": "int64",
+    "Int16": "int64",
+    "Int32": "int64",
+    "Int64": "int64",
+    "UInt8": "int64",
+    "UInt16": "int64",
+    "UInt32": "int64",
+    "UInt64": "uint64",
+    "Float32": "float64",
+    "Float64": "float64",
+}
+
+
+def _numpy_dtype(clickhouse_type: str) -> Optional[str]:
+    if clickhouse_type.startswith("LowCardinality(") and clickhouse_type.endswith(")"):
+        clickhouse_type = clickhouse_type[len("LowCardinality(") : -1]
+    return _NUMPY_DTYPES.get(clickhouse_type)
+
+
+def _to_array(values: Sequence[Any], dtype: Optional[str] = None) -> np.ndarray:
+    if dtype is not None:
+        try:
+            return np.asarray(values, dtype=dtype)
+        except (OverflowError, TypeError, ValueError):
+            pass
+    # Filled one by one, as NumPy would turn a column of tuples or lists into a two dimensional array
+    return np.fromiter(values, dtype=object, count=len(values))
+
+
+def _to_python(value: Any) -> Any:
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class ColumnarResults(Sequence[list[Any]]):
+    """
+    Query results stored as one NumPy array per column, as returned by `execute_hogql_query(columnar=True)`.
+
+    Code which post-processes large results can work on whole columns with `column`, `with_column`, `filter` and
+    `take`, instead of looping over rows in Python. The results are still a sequence of rows, so code which expects
+    rows keeps working, and rows are only materialized, as lists of Python values, when they are read or dumped.
+    Response models which expect a list of rows materialize them when they're created, so do that last.
+    """
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        # Kept as is by models, and serialized as rows, so that responses holding the results can be dumped and cached
+        return core_schema.is_instance_schema(
+            cls, serialization=core_schema.plain_serializer_function_ser_schema(lambda results: results.to_rows())
+        )
+
+    def __init__(self, columns: list[str], data: list[np.ndarray], types: Optional[list[str]] = None):
+        if len(columns) != len(data):
+            raise ValueError(f"Got {len(data)} columns of data for {len(columns)} column names")
+        lengths = {len(values) for values in data}
+        if len(lengths) > 1:
+            raise ValueError("All columns must have the same length")
+        self.columns = columns
+        self.data = data
+        self.types = types
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_clickhouse(
+        cls, columns: list[str], types: list[tuple[str, str]], data: Sequence[Sequence[Any]]
+    ) -> "ColumnarResults":
+        """Builds the results from the columnar output of the ClickHouse driver, which is empty if no rows matched"""
+        clickhouse_types = [clickhouse_type for _, clickhouse_type in types]
+        if len(data) == 0:
+            data = [[] for _ in clickhouse_types]
+        return cls(
+            columns,
+            [
+                _to_array(values, _numpy_dtype(clickhouse_type))
+                for values, clickhouse_type in zip(data, clickhouse_types)
+            ],
+            clickhouse_types,
+        )
+
+    @classmethod
+    def from_rows(
+        cls, columns: list[str], rows: Sequence[Sequence[Any]], types: Optional[list[str]] = None
+    ) -> "ColumnarResults":
+        data = [_to_array([row[index] for row in rows]) for index in range(len(columns))]
+        return cls(columns, data, types)
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, index: int) -> list[Any]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "ColumnarResults": ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[list[Any], "ColumnarResults"]:
+        if isinstance(index, slice):
+            return self._with_data([values[index] for values in self.data])
+        return [_to_python(values[index]) for values in self.data]
+
+    def __iter__(self) -> Iterator[list[Any]]:
+        # `tolist` converts NumPy scalars back to the Python values the rows would have held
+        for row in zip(*(values.tolist() for values in self.data)):
+            yield list(row)
+
+    def __repr__(self) -> str:
+        return f"ColumnarResults(columns={self.columns!r}, rows={self._length})"
+
+    def _with_data(self, data: list[np.ndarray]) -> "ColumnarResults":
+        return ColumnarResults(self.columns, data, self.types)
+
+    def column_index(self, column: Union[str, int]) -> int:
+        if isinstance(column, int):
+            return column
+        try:
+            return self.columns.index(column)
+        except ValueError:
+            raise KeyError(f"Column {column!r} not found in results") from None
+
+    def column(self, column: Union[str, int]) -> np.ndarray:
+        """The values of a column, by name or index"""
+        return self.data[self.column_index(column)]
+
+    def with_column(self, column: Union[str, int], values: Union[np.ndarray, Sequence[Any]]) -> "ColumnarResults":
+        """Returns the results with a column replaced, or added at the end if there's no column by that name"""
+        array = values if isinstance(values, np.ndarray) else _to_array(values)
+        if len(array) != self._length:
+            raise ValueError(f"Got {len(array)} values for {self._length} rows")
+        data = list(self.data)
+        columns = list(self.columns)
+        if isinstance(column, str) and column not in columns:
+            columns.append(column)
+            data.append(array)
+            types = [*self.types, ""] if self.types is not None else None
+            return ColumnarResults(columns, data, types)
+        data[self.column_index(column)] = array
+        return self._with_data(data)
+
+    def select(self, columns: Sequence[Union[str, int]]) -> "ColumnarResults":
+        """Returns the results with only the given columns, in that order"""
+        indices = [self.column_index(column) for column in columns]
+        types = [self.types[index] for index in indices] if self.types is not None else None
+        return ColumnarResults(
+            [self.columns[index] for index in indices], [self.data[index] for index in indices], types
+        )
+
+    def filter(self, mask: np.ndarray) -> "ColumnarResults":
+        """Returns the rows for which `mask`, an array of booleans with one value per row, is true"""
+        return self._with_data([values[mask] for values in self.data])
+
+    def take(self, indices: Union[np.ndarray, Sequence[int]]) -> "ColumnarResults":
+        """Returns the rows at `indices`, in that order, e.g. to sort by the result of `np.argsort`"""
+        return self._with_data([values[indices] for values in self.data])
+
+    def to_rows(self) -> list[list[Any]]:
+        return list(self)
+
+
+class ColumnarHogQLQueryResponse(HogQLQueryResponse):
+    """The response of `execute_hogql_query(columnar=True)`, whose results are only turned into rows when dumped"""
+
+    results: ColumnarResults  # type: ignore[assignment]
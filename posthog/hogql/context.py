@@ -6,6 +6,7 @@ from posthog.schema import HogQLNotice, HogQLQueryModifiers
 
 if TYPE_CHECKING:
     from posthog.hogql.database.database import Database
+    from posthog.hogql.property_usage import PropertyAccess
     from posthog.hogql.transforms.property_types import PropertySwapper
     from posthog.models import Team
 
@@ -54,6 +55,8 @@ class HogQLContext:
     debug: bool = False
 
     property_swapper: Optional["PropertySwapper"] = None
+    # Properties read by the printed ClickHouse query, and whether materialized columns or property groups were used
+    property_accesses: set["PropertyAccess"] = field(default_factory=set)
 
     def add_value(self, value: Any) -> str:
         key = f"hogql_val_{len(self.values)}"
@@ -0,0 +1,38 @@
+from posthog.hogql.database.models import (
+    DatabaseField,
+    DateTimeDatabaseField,
+    FieldOrTable,
+    FloatDatabaseField,
+    IntegerDatabaseField,
+    StringDatabaseField,
+    Table,
+)
+
+
+class WebStatsHourlyTable(Table):
+    fields: dict[str, FieldOrTable] = {
+        "team_id": IntegerDatabaseField(name="team_id"),
+        "hour": DateTimeDatabaseField(name="hour"),
+        "pageview_hour": DateTimeDatabaseField(name="pageview_hour"),
+        "entry_pathname": StringDatabaseField(name="entry_pathname"),
+        "referring_domain": StringDatabaseField(name="referring_domain"),
+        "utm_source": StringDatabaseField(name="utm_source"),
+        "utm_medium": StringDatabaseField(name="utm_medium"),
+        "utm_campaign": StringDatabaseField(name="utm_campaign"),
+        "browser": StringDatabaseField(name="browser"),
+        "os": StringDatabaseField(name="os"),
+        "device_type": StringDatabaseField(name="device_type"),
+        "country_code": StringDatabaseField(name="country_code"),
+        # uniq state, read it with uniqMerge
+        "persons_uniq_state": DatabaseField(name="persons_uniq_state"),
+        "pageviews_count": IntegerDatabaseField(name="pageviews_count"),
+        "sessions_count": IntegerDatabaseField(name="sessions_count"),
+        "bounces_count": IntegerDatabaseField(name="bounces_count"),
+        "total_session_duration": FloatDatabaseField(name="total_session_duration"),
+    }
+
+    def to_printed_clickhouse(self, context):
+        return "web_stats_hourly"
+
+    def to_printed_hogql(self):
+        return "web_stats_hourly"
@@ -1,9 +1,11 @@
-from typing import Literal, Optional, cast
+import threading
+from collections import OrderedDict
+from typing import Any, Literal, Optional, cast
 from collections.abc import Callable
 
 from antlr4 import CommonTokenStream, InputStream, ParseTreeVisitor, ParserRuleContext
 from antlr4.error.ErrorListener import ErrorListener
-from prometheus_client import Histogram
+from prometheus_client import Counter, Histogram
 
 from posthog.hogql import ast
 from posthog.hogql.ast import SelectSetNode
@@ -15,6 +17,7 @@ from posthog.hogql.grammar.HogQLParser import HogQLParser
 from posthog.hogql.parse_string import parse_string_literal_text, parse_string_literal_ctx, parse_string_text_ctx
 from posthog.hogql.placeholders import replace_placeholders
 from posthog.hogql.timings import HogQLTimings
+from posthog.hogql.visitor import clone_expr
 from hogql_parser import (
     parse_expr as _parse_expr_cpp,
     parse_order_expr as _parse_order_expr_cpp,
@@ -69,6 +72,84 @@ RULE_TO_HISTOGRAM: dict[Literal["expr", "order_expr", "select", "full_template_s
 }
 
 
+PARSE_CACHE_COUNTER = Counter(
+    "hogql_parse_cache_total",
+    "Parses of HogQL templates, by whether the parsed AST was found in the parse cache",
+    labelnames=["rule", "result"],
+)
+
+# Longer strings are most likely user written queries rather than templates, which aren't worth keeping around
+PARSE_CACHE_MAX_STRING_LENGTH = 10_000
+PARSE_CACHE_MAX_SIZE = 2048
+
+
+class ParseCache:
+    """
+    Thread safe LRU cache of parsed ASTs. The cached ASTs must never be handed out or modified, only clones of them.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[tuple, ast.Expr] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[ast.Expr]:
+        with self._lock:
+            node = self._entries.get(key)
+            if node is not None:
+                self._entries.move_to_end(key)
+            return node
+
+    def set(self, key: tuple, node: ast.Expr) -> None:
+        with self._lock:
+            self._entries[key] = node
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+parse_cache = ParseCache(PARSE_CACHE_MAX_SIZE)
+
+
+def _parse_template(
+    rule: Literal["expr", "order_expr", "select", "full_template_string"],
+    string: str,
+    placeholders: Optional[dict[str, ast.Expr]],
+    timings: HogQLTimings,
+    backend: Literal["python", "cpp"],
+    *args: Any,
+) -> Any:
+    """
+    Parses `string` with the rule, reusing the AST of an earlier parse of the same string if there was one.
+    The AST returned is always a fresh copy, with placeholders replaced. Hits and misses of the cache are counted on
+    `timings`.
+    """
+    is_cacheable = len(string) <= PARSE_CACHE_MAX_STRING_LENGTH
+    cache_key = (rule, string, backend, *args)
+    node = parse_cache.get(cache_key) if is_cacheable else None
+    if node is not None:
+        timings.increment("parse_cache_hit")
+        PARSE_CACHE_COUNTER.labels(rule=rule, result="hit").inc()
+    else:
+        with RULE_TO_HISTOGRAM[rule].labels(backend=backend).time():
+            node = RULE_TO_PARSE_FUNCTION[backend][rule](string, *args)
+        if is_cacheable:
+            parse_cache.set(cache_key, node)
+            timings.increment("parse_cache_miss")
+            PARSE_CACHE_COUNTER.labels(rule=rule, result="miss").inc()
+
+    if placeholders:
+        # Replacing placeholders clones the AST as well
+        with timings.measure("replace_placeholders"):
+            return replace_placeholders(node, placeholders)
+    # Cached ASTs are shared between all parses of the same string, so each parse gets its own copy
+    return clone_expr(node) if is_cacheable else node
+
+
 def parse_string_template(
     string: str,
     placeholders: Optional[dict[str, ast.Expr]] = None,
@@ -80,12 +161,7 @@ def parse_string_template(
     if timings is None:
         timings = HogQLTimings()
     with timings.measure(f"parse_full_template_string_{backend}"):
-        with RULE_TO_HISTOGRAM["full_template_string"].labels(backend=backend).time():
-            node = RULE_TO_PARSE_FUNCTION[backend]["full_template_string"]("F'" + string)
-        if placeholders:
-            with timings.measure("replace_placeholders"):
-                node = replace_placeholders(node, placeholders)
-    return node
+        return _parse_template("full_template_string", "F'" + string, placeholders, timings, backend)
 
 
 def parse_expr(
@@ -101,12 +177,7 @@ def parse_expr(
     if timings is None:
         timings = HogQLTimings()
     with timings.measure(f"parse_expr_{backend}"):
-        with RULE_TO_HISTOGRAM["expr"].labels(backend=backend).time():
-            node = RULE_TO_PARSE_FUNCTION[backend]["expr"](expr, start)
-        if placeholders:
-            with timings.measure("replace_placeholders"):
-                node = replace_placeholders(node, placeholders)
-    return node
+        return _parse_template("expr", expr, placeholders, timings, backend, start)
 
 
 def parse_order_expr(
@@ -119,12 +190,7 @@ def parse_order_expr(
     if timings is None:
         timings = HogQLTimings()
     with timings.measure(f"parse_order_expr_{backend}"):
-        with RULE_TO_HISTOGRAM["order_expr"].labels(backend=backend).time():
-            node = RULE_TO_PARSE_FUNCTION[backend]["order_expr"](order_expr)
-        if placeholders:
-            with timings.measure("replace_placeholders"):
-                node = replace_placeholders(node, placeholders)
-    return node
+        return _parse_template("order_expr", order_expr, placeholders, timings, backend)
 
 
 def parse_select(
@@ -137,12 +203,7 @@ def parse_select(
     if timings is None:
         timings = HogQLTimings()
     with timings.measure(f"parse_select_{backend}"):
-        with RULE_TO_HISTOGRAM["select"].labels(backend=backend).time():
-            node = RULE_TO_PARSE_FUNCTION[backend]["select"](statement)
-        if placeholders:
-            with timings.measure("replace_placeholders"):
-                node = replace_placeholders(node, placeholders)
-    return node
+        return _parse_template("select", statement, placeholders, timings, backend)
 
 
 def parse_program(
@@ -22,7 +22,7 @@ from posthog.hogql.functions import (
     find_hogql_function,
 )
 from posthog.hogql.context import HogQLContext
-from posthog.hogql.database.models import Table, FunctionCallTable, SavedQuery
+from posthog.hogql.database.models import DatabaseField, Table, FunctionCallTable, SavedQuery
 from posthog.hogql.database.database import create_hogql_database
 from posthog.hogql.database.s3_table import S3Table
 from posthog.hogql.errors import ImpossibleASTError, InternalHogQLError, QueryError, ResolutionError
@@ -34,6 +34,7 @@ from posthog.hogql.escape_sql import (
 )
 from posthog.hogql.functions.mapping import ALL_EXPOSED_FUNCTION_NAMES, validate_function_args, HOGQL_COMPARISON_MAPPING
 from posthog.hogql.modifiers import create_default_modifiers_for_team, set_default_in_cohort_via
+from posthog.hogql.property_usage import PropertyAccess, PropertyAccessSource
 from posthog.hogql.resolver import resolve_types
 from posthog.hogql.resolver_utils import lookup_field_by_name
 from posthog.hogql.transforms.in_cohort import resolve_in_cohorts, resolve_in_cohorts_conjoined
@@ -1290,9 +1291,46 @@ class _Printer(Visitor):
         Find the most efficient materialized property source for the provided property type.
         """
         for source in self.__get_all_materialized_property_sources(type.field_type, str(type.chain[0])):
+            self.__record_property_access(type, source)
             return source
+        self.__record_property_access(type, None)
         return None
 
+    def __record_property_access(
+        self,
+        type: ast.PropertyType,
+        source: PrintableMaterializedColumn | PrintableMaterializedPropertyGroupItem | None,
+    ) -> None:
+        if self.dialect != "clickhouse":
+            return
+
+        table = type.field_type.table_type
+        while isinstance(table, ast.TableAliasType):
+            table = table.table_type
+        if not isinstance(table, ast.TableType):
+            return
+
+        field = type.field_type.resolve_database_field(self.context)
+        if not isinstance(field, DatabaseField):
+            return
+
+        source_kind: PropertyAccessSource
+        if isinstance(source, PrintableMaterializedColumn):
+            source_kind = "materialized_column"
+        elif isinstance(source, PrintableMaterializedPropertyGroupItem):
+            source_kind = "property_group"
+        else:
+            source_kind = "json_extract"
+
+        self.context.property_accesses.add(
+            PropertyAccess(
+                source=source_kind,
+                table=table.table.to_printed_clickhouse(self.context),
+                table_column=field.name,
+                property_name=str(type.chain[0]),
+            )
+        )
+
     def __get_all_materialized_property_sources(
         self, field_type: ast.FieldType, property_name: str
     ) -> Iterable[PrintableMaterializedColumn | PrintableMaterializedPropertyGroupItem]:
@@ -1440,8 +1478,10 @@ class _Printer(Visitor):
             if len(node.order_by) == 0:
                 raise ImpossibleASTError("ORDER BY must have at least one argument")
             strings.append("ORDER BY")
+            columns = []
             for expr in node.order_by:
-                strings.append(self.visit(expr))
+                columns.append(self.visit(expr))
+            strings.append(", ".join(columns))
 
         if node.frame_method is not None:
             if node.frame_method == "ROWS":
@@ -17,7 +17,6 @@ from posthog.models import (
     Action,
     Cohort,
     Property,
-    PropertyDefinition,
     Team,
 )
 from posthog.models.event import Selector
@@ -25,6 +24,7 @@ from posthog.models.element import Element
 from posthog.models.property import PropertyGroup, ValueT
 from posthog.models.property.util import build_selector_regex
 from posthog.models.property_definition import PropertyType
+from posthog.models.property_type_catalog import get_property_type_catalog
 from posthog.schema import (
     FilterLogicalOperator,
     PropertyGroupFilter,
@@ -85,17 +85,14 @@ def _handle_bool_values(value: ValueT, expr: ast.Expr, property: Property, team:
     if value != "true" and value != "false":
         return value
     if property.type == "person":
-        property_types = PropertyDefinition.objects.filter(
-            team=team,
-            name=property.key,
-            type=PropertyDefinition.Type.PERSON,
-        )
+        property_type = get_property_type_catalog(team.pk).get_person_property_types([property.key]).get(property.key)
     elif property.type == "group":
-        property_types = PropertyDefinition.objects.filter(
-            team=team,
-            name=property.key,
-            type=PropertyDefinition.Type.GROUP,
-            group_type_index=property.group_type_index,
+        property_type = (
+            get_property_type_catalog(team.pk)
+            .get_group_property_types(property.group_type_index, [property.key])
+            .get(property.key)
+            if property.group_type_index is not None
+            else None
         )
     elif property.type == "data_warehouse_person_property":
         if not isinstance(expr, ast.Field):
@@ -132,12 +129,7 @@ def _handle_bool_values(value: ValueT, expr: ast.Expr, property: Property, team:
         return value
 
     else:
-        property_types = PropertyDefinition.objects.filter(
-            team=team,
-            name=property.key,
-            type=PropertyDefinition.Type.EVENT,
-        )
-    property_type = property_types[0].property_type if len(property_types) > 0 else None
+        property_type = get_property_type_catalog(team.pk).get_event_property_types([property.key]).get(property.key)
 
     if property_type == PropertyType.Boolean:
         if value == "true":
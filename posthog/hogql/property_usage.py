@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, UTC
+from typing import Literal, NamedTuple, Optional
+
+from sentry_sdk import capture_exception
+
+from posthog.redis import get_client
+
+PropertyAccessSource = Literal["materialized_column", "property_group", "json_extract"]
+
+PROPERTY_USAGE_KEY_PREFIX = "posthog:hogql_property_usage"
+PROPERTY_USAGE_TTL = timedelta(days=31)
+PROPERTY_USAGE_SEPARATOR = "::"
+# Counts are buffered in the process and written to redis at most this often, rather than on every query
+PROPERTY_USAGE_FLUSH_INTERVAL_SECONDS = 60
+
+_buffer: dict[str, Counter[str]] = {}
+_buffer_lock = threading.Lock()
+_last_flushed_at = time.monotonic()
+
+
+class PropertyAccess(NamedTuple):
+    """A property read by a printed ClickHouse query, and how it was read."""
+
+    source: PropertyAccessSource
+    table: str
+    table_column: str
+    property_name: str
+
+    def to_field(self) -> str:
+        # Property names can contain anything, so they go last
+        return PROPERTY_USAGE_SEPARATOR.join(self)
+
+    @classmethod
+    def from_field(cls, field: str) -> "PropertyAccess":
+        source, table, table_column, property_name = field.split(PROPERTY_USAGE_SEPARATOR, 3)
+        return cls(source, table, table_column, property_name)  # type: ignore[arg-type]
+
+
+def _get_property_usage_key(team_id: int, day: datetime) -> str:
+    return f"{PROPERTY_USAGE_KEY_PREFIX}:{team_id}:{day.strftime('%Y-%m-%d')}"
+
+
+def record_property_usage(team_id: int, accesses: set[PropertyAccess]) -> None:
+    """
+    Counts the query for each property it accessed, per team and day. Counts are flushed to redis by the first query
+    after `PROPERTY_USAGE_FLUSH_INTERVAL_SECONDS`, so the most recent ones of a process can be lost when it exits.
+    """
+    global _last_flushed_at
+
+    if not accesses:
+        return
+
+    key = _get_property_usage_key(team_id, datetime.now(UTC))
+    with _buffer_lock:
+        _buffer.setdefault(key, Counter()).update(access.to_field() for access in accesses)
+        if time.monotonic() - _last_flushed_at < PROPERTY_USAGE_FLUSH_INTERVAL_SECONDS:
+            return
+        _last_flushed_at = time.monotonic()
+
+    flush_property_usage()
+
+
+def flush_property_usage() -> None:
+    """
+    Writes the counts buffered by `record_property_usage` to redis.
+    """
+    with _buffer_lock:
+        counts = dict(_buffer)
+        _buffer.clear()
+    if not counts:
+        return
+
+    try:
+        pipeline = get_client().pipeline(transaction=False)
+        for key, fields in counts.items():
+            for field, count in fields.items():
+                pipeline.hincrby(key, field, count)
+            pipeline.expire(key, PROPERTY_USAGE_TTL)
+        pipeline.execute()
+    except Exception as error:
+        capture_exception(error)
+
+
+def get_property_usage(days: int, team_id: Optional[int] = None) -> dict[int, Counter[PropertyAccess]]:
+    """
+    Returns the number of queries which accessed each property over the last `days` days (including today), per team.
+    """
+    client = get_client()
+    today = datetime.now(UTC)
+    recent_days = {(today - timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(days)}
+
+    usage: dict[int, Counter[PropertyAccess]] = {}
+    match = f"{PROPERTY_USAGE_KEY_PREFIX}:{team_id if team_id is not None else '*'}:*"
+    for key in client.scan_iter(match=match, count=1000):
+        key_team_id, day = key.decode().removeprefix(f"{PROPERTY_USAGE_KEY_PREFIX}:").split(":")
+        if day not in recent_days:
+            continue
+        team_usage = usage.setdefault(int(key_team_id), Counter())
+        for field, count in client.hgetall(key).items():
+            team_usage[PropertyAccess.from_field(field.decode())] += int(count)
+    return usage
@@ -4,12 +4,14 @@ from typing import Optional, Union, cast
 from posthog.clickhouse.client.connection import Workload
 from posthog.errors import ExposedCHQueryError
 from posthog.hogql import ast
+from posthog.hogql.columnar import ColumnarHogQLQueryResponse, ColumnarResults
 from posthog.hogql.constants import HogQLGlobalSettings, LimitContext, get_default_limit_for_context
 from posthog.hogql.errors import ExposedHogQLError
 from posthog.hogql.hogql import HogQLContext
 from posthog.hogql.modifiers import create_default_modifiers_for_team
 from posthog.hogql.parser import parse_select
 from posthog.hogql.placeholders import replace_placeholders, find_placeholders
+from posthog.hogql.property_usage import record_property_usage
 from posthog.hogql.printer import (
     prepare_ast_for_printing,
     print_ast,
@@ -35,22 +37,43 @@ from posthog.schema import (
 from posthog.settings import HOGQL_INCREASED_MAX_EXECUTION_TIME
 
 
-def execute_hogql_query(
+@dataclasses.dataclass
+class CompiledHogQLQuery:
+    """
+    A query resolved and printed by `compile_hogql_query`, once as HogQL and once as ClickHouse SQL. Runners which
+    need the printed HogQL before running the query pass this to `execute_hogql_query`, which runs it as is.
+    """
+
+    # The resolved query, as printed to `hogql`
+    select_query: ast.SelectQuery | ast.SelectSetQuery
+    hogql: str
+    # None if printing failed in debug mode, in which case `error` says why
+    clickhouse: Optional[str]
+    columns: list[str]
+    # The context `clickhouse` was printed with, holding the values of its parameters
+    context: HogQLContext
+    # The modifiers as requested, and as applied to the team's defaults
+    modifiers: Optional[HogQLQueryModifiers]
+    query_modifiers: HogQLQueryModifiers
+    # The query string, if the query was given as one
+    query: Optional[str] = None
+    error: Optional[str] = None
+
+
+def compile_hogql_query(
     query: Union[str, ast.SelectQuery, ast.SelectSetQuery],
     team: Team,
     *,
-    query_type: str = "hogql_query",
     filters: Optional[HogQLFilters] = None,
     placeholders: Optional[dict[str, ast.Expr]] = None,
     variables: Optional[dict[str, HogQLVariable]] = None,
-    workload: Workload = Workload.DEFAULT,
     settings: Optional[HogQLGlobalSettings] = None,
     modifiers: Optional[HogQLQueryModifiers] = None,
     limit_context: Optional[LimitContext] = LimitContext.QUERY,
     timings: Optional[HogQLTimings] = None,
     pretty: Optional[bool] = True,
     context: Optional[HogQLContext] = None,
-) -> HogQLQueryResponse:
+) -> CompiledHogQLQuery:
     if timings is None:
         timings = HogQLTimings()
 
@@ -60,10 +83,6 @@ def execute_hogql_query(
     query_modifiers = create_default_modifiers_for_team(team, modifiers)
     debug = modifiers is not None and modifiers.debug
     error: Optional[str] = None
-    explain: Optional[list[str]] = None
-    results = None
-    types = None
-    metadata: Optional[HogQLMetadataResponse] = None
 
     with timings.measure("query"):
         if isinstance(query, ast.SelectQuery) or isinstance(query, ast.SelectSetQuery):
@@ -121,6 +140,7 @@ def execute_hogql_query(
                 enable_select_queries=True,
                 timings=timings,
                 modifiers=query_modifiers,
+                property_accesses=set(),
             )
 
             with timings.measure("clone"):
@@ -186,6 +206,74 @@ def execute_hogql_query(
             else:
                 raise
 
+    return CompiledHogQLQuery(
+        select_query=select_query_hogql,
+        hogql=hogql,
+        clickhouse=clickhouse_sql,
+        columns=print_columns,
+        context=clickhouse_context,
+        modifiers=modifiers,
+        query_modifiers=query_modifiers,
+        query=query if isinstance(query, str) else None,
+        error=error,
+    )
+
+
+def execute_hogql_query(
+    query: Union[str, ast.SelectQuery, ast.SelectSetQuery, CompiledHogQLQuery],
+    team: Team,
+    *,
+    query_type: str = "hogql_query",
+    filters: Optional[HogQLFilters] = None,
+    placeholders: Optional[dict[str, ast.Expr]] = None,
+    variables: Optional[dict[str, HogQLVariable]] = None,
+    workload: Workload = Workload.DEFAULT,
+    settings: Optional[HogQLGlobalSettings] = None,
+    modifiers: Optional[HogQLQueryModifiers] = None,
+    limit_context: Optional[LimitContext] = LimitContext.QUERY,
+    timings: Optional[HogQLTimings] = None,
+    pretty: Optional[bool] = True,
+    context: Optional[HogQLContext] = None,
+    columnar: bool = False,
+) -> HogQLQueryResponse:
+    """
+    Runs a query, compiling it first unless it's a `CompiledHogQLQuery`. The arguments which only affect compiling,
+    from `filters` to `context` except for `workload`, are ignored for compiled queries.
+
+    With `columnar`, the results are read from ClickHouse column by column into `ColumnarResults`, for callers which
+    post-process many rows with NumPy, and the response is a `ColumnarHogQLQueryResponse`, which only builds rows
+    from them when it's dumped.
+    """
+    if timings is None:
+        timings = HogQLTimings()
+
+    if isinstance(query, CompiledHogQLQuery):
+        compiled_query = query
+    else:
+        compiled_query = compile_hogql_query(
+            query,
+            team,
+            filters=filters,
+            placeholders=placeholders,
+            variables=variables,
+            settings=settings,
+            modifiers=modifiers,
+            limit_context=limit_context,
+            timings=timings,
+            pretty=pretty,
+            context=context,
+        )
+
+    modifiers = compiled_query.modifiers
+    debug = modifiers is not None and modifiers.debug
+    clickhouse_sql = compiled_query.clickhouse
+    clickhouse_context = compiled_query.context
+    error = compiled_query.error
+    explain: Optional[list[str]] = None
+    results = None
+    types = None
+    metadata: Optional[HogQLMetadataResponse] = None
+
     if clickhouse_sql is not None:
         timings_dict = timings.to_dict()
         with timings.measure("clickhouse_execute"):
@@ -206,7 +294,10 @@ def execute_hogql_query(
                     workload=workload,
                     team_id=team.pk,
                     readonly=True,
+                    columnar=columnar,
                 )
+                if columnar:
+                    results = ColumnarResults.from_clickhouse(compiled_query.columns, types, results)
             except Exception as e:
                 if debug:
                     results = []
@@ -217,6 +308,8 @@ def execute_hogql_query(
                 else:
                     raise
 
+        record_property_usage(team.pk, clickhouse_context.property_accesses)
+
         if debug and error is None:  # If the query errored, explain will fail as well.
             with timings.measure("explain"):
                 explain_results = sync_execute(
@@ -231,18 +324,22 @@ def execute_hogql_query(
             with timings.measure("metadata"):
                 from posthog.hogql.metadata import get_hogql_metadata
 
-                metadata = get_hogql_metadata(HogQLMetadata(language=HogLanguage.HOG_QL, query=hogql, debug=True), team)
+                metadata = get_hogql_metadata(
+                    HogQLMetadata(language=HogLanguage.HOG_QL, query=compiled_query.hogql, debug=True), team
+                )
 
-    return HogQLQueryResponse(
-        query=query,
-        hogql=hogql,
+    # Columnar results are kept as they are, instead of being validated as a list of rows
+    response_class = ColumnarHogQLQueryResponse if isinstance(results, ColumnarResults) else HogQLQueryResponse
+    return response_class(
+        query=compiled_query.query,
+        hogql=compiled_query.hogql,
         clickhouse=clickhouse_sql,
         error=error,
         timings=timings.to_list(),
         results=results,
-        columns=print_columns,
+        columns=compiled_query.columns,
         types=types,
-        modifiers=query_modifiers,
+        modifiers=compiled_query.query_modifiers,
         explain=explain,
         metadata=metadata,
     )
@@ -28,7 +28,8 @@ from posthog.hogql.ast import (
 from posthog.hogql.parser import parse_program
 from posthog.hogql import ast
 from posthog.hogql.errors import ExposedHogQLError, SyntaxError
-from posthog.hogql.parser import parse_expr, parse_order_expr, parse_select, parse_string_template
+from posthog.hogql.parser import parse_cache, parse_expr, parse_order_expr, parse_select, parse_string_template
+from posthog.hogql.timings import HogQLTimings
 from posthog.hogql.visitor import clear_locations
 from posthog.test.base import BaseTest, MemoryLeakTestMixin
 
@@ -760,6 +761,42 @@ def parser_test_factory(backend: Literal["python", "cpp"]):
                 ),
             )
 
+        def test_parse_cache(self):
+            parse_cache.clear()
+            timings = HogQLTimings()
+            template = "select event from events where timestamp < {timestamp}"
+
+            first = parse_select(template, {"timestamp": ast.Constant(value=1)}, timings=timings, backend=backend)
+            second = parse_select(template, {"timestamp": ast.Constant(value=2)}, timings=timings, backend=backend)
+            unreplaced = parse_select(template, timings=timings, backend=backend)
+            self.assertEqual(timings.counters, {"parse_cache_miss": 1, "parse_cache_hit": 2})
+            self.assertAlmostEqual(cast(float, timings.hit_rate("parse_cache")), 2 / 3)
+
+            assert isinstance(first, ast.SelectQuery) and isinstance(first.where, ast.CompareOperation)
+            assert isinstance(second, ast.SelectQuery) and isinstance(second.where, ast.CompareOperation)
+            self.assertEqual(clear_locations(first.where.right), ast.Constant(value=1))
+            self.assertEqual(clear_locations(second.where.right), ast.Constant(value=2))
+            self.assertEqual(
+                clear_locations(unreplaced),
+                self._select("select event from events where timestamp < {timestamp}"),
+            )
+
+            # Each parse gets its own copy of the cached AST
+            assert isinstance(unreplaced, ast.SelectQuery)
+            unreplaced.select.append(ast.Constant(value=1))
+            again = parse_select(template, timings=timings, backend=backend)
+            assert isinstance(again, ast.SelectQuery)
+            self.assertEqual(len(again.select), 1)
+            self.assertIsNot(again.select[0], first.select[0])
+
+        def test_parse_cache_counts_only_on_timings_passed(self):
+            parse_cache.clear()
+            timings = HogQLTimings()
+            parse_expr("1 + {one}", {"one": ast.Constant(value=1)}, timings=timings, backend=backend)
+            parse_expr("1 + {one}", {"one": ast.Constant(value=1)}, backend=backend)
+
+            self.assertEqual(timings.counters, {"parse_cache_miss": 1})
+
         def test_intervals(self):
             self.assertEqual(
                 self._expr("interval 1 month"),
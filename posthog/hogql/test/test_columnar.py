@@ -0,0 +1,121 @@
+from datetime import UTC, datetime
+
+import numpy as np
+import orjson
+from django.test import SimpleTestCase
+
+from posthog.cache_utils import OrjsonJsonSerializer
+from posthog.hogql.columnar import ColumnarHogQLQueryResponse, ColumnarResults
+from posthog.schema import CachedHogQLQueryResponse
+
+
+class TestColumnarResults(SimpleTestCase):
+    def _results(self) -> ColumnarResults:
+        return ColumnarResults.from_clickhouse(
+            ["event", "count()", "timestamps"],
+            [("event", "LowCardinality(String)"), ("count()", "UInt64"), ("timestamps", "Array(DateTime64(6, 'UTC'))")],
+            [
+                ("$pageview", "$pageleave", "$autocapture"),
+                (3, 1, 2),
+                ((datetime(2024, 1, 1),), (), (datetime(2024, 1, 2), datetime(2024, 1, 3))),
+            ],
+        )
+
+    def test_reads_as_rows(self):
+        results = self._results()
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[1], ["$pageleave", 1, ()])
+        self.assertEqual(results[-1][2], (datetime(2024, 1, 2), datetime(2024, 1, 3)))
+        self.assertEqual(
+            results.to_rows(),
+            [
+                ["$pageview", 3, (datetime(2024, 1, 1),)],
+                ["$pageleave", 1, ()],
+                ["$autocapture", 2, (datetime(2024, 1, 2), datetime(2024, 1, 3))],
+            ],
+        )
+        # Rows hold Python values rather than NumPy scalars, so they serialize as before
+        self.assertIs(type(results[0][1]), int)
+        self.assertIs(type(results.to_rows()[0][1]), int)
+
+    def test_columns_are_numpy_arrays(self):
+        results = self._results()
+
+        self.assertEqual(results.column("count()").dtype, np.uint64)
+        self.assertEqual(results.column("event").dtype, object)
+        # A column of tuples stays one dimensional
+        self.assertEqual(results.column(2).shape, (3,))
+        with self.assertRaises(KeyError):
+            results.column("missing")
+
+    def test_vectorized_post_processing(self):
+        results = self._results()
+
+        counts = results.column("count()")
+        processed = (
+            results.with_column("count()", counts * 10)
+            .with_column("share", counts / counts.sum())
+            .filter(counts > 1)
+            .take(np.argsort(-counts[counts > 1]))
+            .select(["event", "count()", "share"])
+        )
+
+        self.assertEqual(processed.columns, ["event", "count()", "share"])
+        self.assertEqual(processed.to_rows(), [["$pageview", 30, 0.5], ["$autocapture", 20, 2 / 6]])
+        # The original results are unchanged
+        self.assertEqual(results.columns, ["event", "count()", "timestamps"])
+        self.assertEqual(results[0][1], 3)
+
+    def test_empty_results(self):
+        results = ColumnarResults.from_clickhouse(
+            ["event", "count()"], [("event", "String"), ("count()", "UInt64")], []
+        )
+
+        self.assertEqual(len(results), 0)
+        self.assertEqual(results.to_rows(), [])
+        self.assertEqual(len(results.column("count()")), 0)
+
+    def test_from_rows(self):
+        rows = [["a", 1, None], ["b", 2, [1, 2]]]
+        results = ColumnarResults.from_rows(["name", "value", "list"], rows)
+
+        self.assertEqual(results.to_rows(), rows)
+        self.assertEqual(results[1:].to_rows(), rows[1:])
+
+    def test_response_serializes_as_rows(self):
+        results = self._results()
+        response = ColumnarHogQLQueryResponse(columns=results.columns, results=results)
+
+        # Validating the response doesn't build the rows
+        self.assertIs(response.results, results)
+        self.assertEqual(response.model_dump()["results"], results.to_rows())
+        json_results = [
+            ["$pageview", 3, ["2024-01-01T00:00:00"]],
+            ["$pageleave", 1, []],
+            ["$autocapture", 2, ["2024-01-02T00:00:00", "2024-01-03T00:00:00"]],
+        ]
+        self.assertEqual(response.model_dump(mode="json")["results"], json_results)
+        self.assertEqual(orjson.loads(response.model_dump_json())["results"], json_results)
+
+    def test_response_can_be_cached(self):
+        results = self._results()
+        response = ColumnarHogQLQueryResponse(columns=results.columns, results=results[1:])
+
+        # As `QueryRunner.run` caches a calculated response
+        last_refresh = datetime(2024, 1, 4, tzinfo=UTC)
+        cached_response = CachedHogQLQueryResponse(
+            **response.model_dump(),
+            is_cached=False,
+            last_refresh=last_refresh,
+            next_allowed_client_refresh=last_refresh,
+            cache_key="cache_key",
+            timezone="UTC",
+        )
+        serializer = OrjsonJsonSerializer({})
+        cached_data = serializer.loads(serializer.dumps(cached_response.model_dump()))
+
+        self.assertEqual(
+            CachedHogQLQueryResponse(**cached_data).results,
+            [["$pageleave", 1, []], ["$autocapture", 2, ["2024-01-02T00:00:00", "2024-01-03T00:00:00"]]],
+        )
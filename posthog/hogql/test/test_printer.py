@@ -15,6 +15,7 @@ from posthog.hogql.database.models import DateDatabaseField, StringDatabaseField
 from posthog.hogql.errors import ExposedHogQLError, QueryError
 from posthog.hogql.parser import parse_select, parse_expr
 from posthog.hogql.printer import print_ast, to_printed_hogql, prepare_ast_for_printing, print_prepared_ast
+from posthog.hogql.property_usage import PropertyAccess
 from posthog.models import PropertyDefinition
 from posthog.models.team.team import WeekStartDay
 from posthog.schema import (
@@ -522,6 +523,35 @@ class TestPrinter(BaseTest):
                 "nullIf(nullIf(events.mat_foo, ''), 'null')",
             )
 
+    def test_property_accesses(self):
+        context = HogQLContext(
+            team_id=self.team.pk,
+            enable_select_queries=True,
+            modifiers=HogQLQueryModifiers(
+                materializationMode=MaterializationMode.AUTO,
+                propertyGroupsMode=PropertyGroupsMode.ENABLED,
+            ),
+        )
+
+        with materialized("events", "mat"):
+            self._select(
+                "SELECT properties.mat, properties.foo, properties.foo, properties.$browser FROM events", context
+            )
+
+        self.assertEqual(
+            context.property_accesses,
+            {
+                PropertyAccess("materialized_column", "events", "properties", "mat"),
+                PropertyAccess("property_group", "events", "properties", "foo"),
+                PropertyAccess("json_extract", "events", "properties", "$browser"),
+            },
+        )
+
+        # Only ClickHouse queries are recorded
+        hogql_context = HogQLContext(team_id=self.team.pk, enable_select_queries=True)
+        print_ast(parse_select("SELECT properties.foo FROM events"), hogql_context, "hogql")
+        self.assertEqual(hogql_context.property_accesses, set())
+
     def _test_property_group_comparison(
         self,
         input_expression: str,
@@ -1436,6 +1466,14 @@ class TestPrinter(BaseTest):
             f"SELECT events.distinct_id AS distinct_id, min(toTimeZone(events.timestamp, %(hogql_val_0)s)) OVER win1 AS timestamp FROM events WHERE equals(events.team_id, {self.team.pk}) WINDOW win1 AS (PARTITION BY events.distinct_id ORDER BY timestamp DESC ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING) LIMIT {MAX_SELECT_RETURNED_ROWS}",
         )
 
+    def test_window_functions_with_multiple_order_by(self):
+        self.assertEqual(
+            self._select(
+                "SELECT row_number() OVER (PARTITION BY event ORDER BY timestamp DESC, distinct_id) AS rank FROM events"
+            ),
+            f"SELECT row_number() OVER (PARTITION BY events.event ORDER BY toTimeZone(events.timestamp, %(hogql_val_0)s) DESC, events.distinct_id ASC) AS rank FROM events WHERE equals(events.team_id, {self.team.pk}) LIMIT {MAX_SELECT_RETURNED_ROWS}",
+        )
+
     def test_window_functions_with_arg(self):
         self.assertEqual(
             self._select(
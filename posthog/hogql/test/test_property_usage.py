@@ -0,0 +1,59 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+from freezegun import freeze_time
+
+from posthog.hogql import property_usage
+from posthog.hogql.property_usage import (
+    PROPERTY_USAGE_FLUSH_INTERVAL_SECONDS,
+    PropertyAccess,
+    flush_property_usage,
+    get_property_usage,
+    record_property_usage,
+)
+from posthog.redis import get_client
+
+
+class TestPropertyUsage(SimpleTestCase):
+    def tearDown(self):
+        flush_property_usage()
+        get_client().flushdb()
+        super().tearDown()
+
+    def test_record_and_get_property_usage(self):
+        json_extract = PropertyAccess("json_extract", "events", "properties", "some::prop")
+        property_group = PropertyAccess("property_group", "events", "properties", "foo")
+
+        with freeze_time(timezone.now() - timedelta(days=10)):
+            record_property_usage(1, {json_extract})
+        with freeze_time(timezone.now() - timedelta(days=1)):
+            record_property_usage(1, {json_extract, property_group})
+        record_property_usage(1, {json_extract})
+        record_property_usage(2, {property_group})
+        record_property_usage(3, set())
+        flush_property_usage()
+
+        self.assertEqual(
+            get_property_usage(days=7),
+            {1: {json_extract: 2, property_group: 1}, 2: {property_group: 1}},
+        )
+        self.assertEqual(get_property_usage(days=30, team_id=1), {1: {json_extract: 3, property_group: 1}})
+        self.assertEqual(get_property_usage(days=1, team_id=2), {2: {property_group: 1}})
+
+    def test_counts_are_buffered_until_flush_interval(self):
+        access = PropertyAccess("json_extract", "events", "properties", "foo")
+        flushed_at = property_usage._last_flushed_at
+
+        with patch("posthog.hogql.property_usage.time.monotonic", return_value=flushed_at + 1):
+            record_property_usage(1, {access})
+            record_property_usage(1, {access})
+        self.assertEqual(get_property_usage(days=1), {})
+
+        with patch(
+            "posthog.hogql.property_usage.time.monotonic",
+            return_value=flushed_at + PROPERTY_USAGE_FLUSH_INTERVAL_SECONDS,
+        ):
+            record_property_usage(1, {access})
+        self.assertEqual(get_property_usage(days=1), {1: {access: 3}})
@@ -1,6 +1,7 @@
 import datetime
 
 import pytest
+from unittest.mock import patch
 from uuid import UUID
 
 from zoneinfo import ZoneInfo
@@ -11,7 +12,8 @@ from freezegun import freeze_time
 from posthog.hogql import ast
 from posthog.hogql.errors import QueryError
 from posthog.hogql.property import property_to_expr
-from posthog.hogql.query import execute_hogql_query
+from posthog.hogql.columnar import ColumnarHogQLQueryResponse
+from posthog.hogql.query import compile_hogql_query, execute_hogql_query
 from posthog.hogql.test.utils import pretty_print_in_tests, pretty_print_response_in_tests
 from posthog.models import Cohort
 from posthog.models.cohort.util import recalculate_cohortpeople
@@ -73,6 +75,44 @@ class TestQuery(ClickhouseTestMixin, APIBaseTest):
             assert pretty_print_response_in_tests(response, self.team.pk) == self.snapshot
             self.assertEqual(response.results, [(2, "random event")])
 
+    def test_compiled_query(self):
+        with freeze_time("2020-01-10"):
+            random_uuid = self._create_random_events()
+
+            compiled_query = compile_hogql_query(
+                "select count(), event from events where properties.random_uuid = {random_uuid} group by event",
+                placeholders={"random_uuid": ast.Constant(value=random_uuid)},
+                team=self.team,
+            )
+            self.assertIn("properties.random_uuid", compiled_query.hogql)
+            self.assertEqual(compiled_query.columns, ["count()", "event"])
+
+            # Running a compiled query doesn't resolve or print it again
+            with patch("posthog.hogql.query.prepare_ast_for_printing") as prepare_ast_for_printing:
+                with patch("posthog.hogql.query.print_ast") as print_ast:
+                    response = execute_hogql_query(compiled_query, team=self.team)
+            prepare_ast_for_printing.assert_not_called()
+            print_ast.assert_not_called()
+
+            self.assertEqual(response.hogql, compiled_query.hogql)
+            self.assertEqual(response.clickhouse, compiled_query.clickhouse)
+            self.assertEqual(response.columns, ["count()", "event"])
+            self.assertEqual(response.results, [(2, "random event")])
+
+    def test_columnar_results(self):
+        with freeze_time("2020-01-10"):
+            random_uuid = self._create_random_events()
+            query = "select count(), event from events where properties.random_uuid = {random_uuid} group by event"
+            placeholders: dict[str, ast.Expr] = {"random_uuid": ast.Constant(value=random_uuid)}
+
+            response = execute_hogql_query(query, placeholders=placeholders, team=self.team, columnar=True)
+            assert isinstance(response, ColumnarHogQLQueryResponse)
+            self.assertEqual(response.results.column("count()").tolist(), [2])
+            self.assertEqual(response.results.column("event").tolist(), ["random event"])
+
+            row_response = execute_hogql_query(query, placeholders=placeholders, team=self.team)
+            self.assertEqual(response.results.to_rows(), [list(row) for row in row_response.results])
+
     @pytest.mark.usefixtures("unittest_snapshot")
     def test_subquery(self):
         with freeze_time("2020-01-10"):
@@ -87,3 +87,24 @@ class TestHogQLTimings(BaseTest):
             results = timings.to_dict()
             self.assertAlmostEqual(results["./a"], 0.1)
             self.assertAlmostEqual(results["."], 0.25)
+
+    def test_counters(self):
+        timings = HogQLTimings()
+        self.assertEqual(timings.hit_rate("cache"), None)
+
+        timings.increment("cache_hit")
+        timings.increment("cache_hit", 2)
+        timings.increment("cache_miss")
+
+        self.assertEqual(timings.counters, {"cache_hit": 3, "cache_miss": 1})
+        self.assertEqual(timings.hit_rate("cache"), 0.75)
+
+    def test_counters_are_not_timings(self):
+        with patch("posthog.hogql.timings.perf_counter", fake_perf_counter):
+            timings = HogQLTimings()
+            with timings.measure("test"):
+                timings.increment("cache_hit", 3)
+
+            # Counts would be read as seconds
+            self.assertEqual([timing.k for timing in timings.to_list()], ["./test", "."])
+            self.assertEqual(list(timings.to_dict().keys()), ["./test", "."])
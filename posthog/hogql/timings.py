@@ -1,5 +1,6 @@
 from time import perf_counter
 from contextlib import contextmanager
+from typing import Optional
 
 from sentry_sdk import start_span
 
@@ -10,12 +11,16 @@ from posthog.schema import QueryTiming
 # See trends_query_runner for an example of how to use for multithreaded queries
 class HogQLTimings:
     timings: dict[str, float]
+    counters: dict[str, int]
     _timing_starts: dict[str, float]
     _timing_pointer: str
 
     def __init__(self, _timing_pointer: str = "."):
         # Completed time in seconds for different parts of the HogQL query
         self.timings = {}
+        # Counts of events while building the query, such as parse cache hits and misses. These aren't durations, so
+        # they're kept out of `to_dict` and `to_list`
+        self.counters = {}
 
         # Used for housekeeping
         self._timing_pointer = _timing_pointer
@@ -26,6 +31,16 @@ class HogQLTimings:
 
     def clear_timings(self):
         self.timings = {}
+        self.counters = {}
+
+    def increment(self, key: str, count: int = 1):
+        self.counters[key] = self.counters.get(key, 0) + count
+
+    def hit_rate(self, key: str) -> Optional[float]:
+        """Share of `{key}_hit` out of `{key}_hit` and `{key}_miss` counts, None if neither was counted"""
+        hits = self.counters.get(f"{key}_hit", 0)
+        total = hits + self.counters.get(f"{key}_miss", 0)
+        return hits / total if total else None
 
     @contextmanager
     def measure(self, key: str):
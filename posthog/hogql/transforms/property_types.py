@@ -15,7 +15,7 @@ from posthog.hogql.database.s3_table import S3Table
 
 
 def build_property_swapper(node: ast.AST, context: HogQLContext) -> None:
-    from posthog.models import PropertyDefinition
+    from posthog.models.property_type_catalog import get_property_type_catalog
 
     if not context or not context.team_id:
         return
@@ -24,42 +24,21 @@ def build_property_swapper(node: ast.AST, context: HogQLContext) -> None:
     property_finder = PropertyFinder(context)
     property_finder.visit(node)
 
-    # fetch them
-    event_property_values = (
-        PropertyDefinition.objects.filter(
-            name__in=property_finder.event_properties,
-            team_id=context.team_id,
-            type__in=[None, PropertyDefinition.Type.EVENT],
-        ).values_list("name", "property_type")
-        if property_finder.event_properties
-        else []
-    )
-    event_properties = {name: property_type for name, property_type in event_property_values if property_type}
-
-    person_property_values = (
-        PropertyDefinition.objects.filter(
-            name__in=property_finder.person_properties,
-            team_id=context.team_id,
-            type=PropertyDefinition.Type.PERSON,
-        ).values_list("name", "property_type")
-        if property_finder.person_properties
-        else []
-    )
-    person_properties = {name: property_type for name, property_type in person_property_values if property_type}
-
-    group_properties = {}
-    for group_id, properties in property_finder.group_properties.items():
-        if not properties:
-            continue
-        group_property_values = PropertyDefinition.objects.filter(
-            name__in=properties,
-            team_id=context.team_id,
-            type=PropertyDefinition.Type.GROUP,
-            group_type_index=group_id,
-        ).values_list("name", "property_type")
-        group_properties.update(
-            {f"{group_id}_{name}": property_type for name, property_type in group_property_values if property_type}
-        )
+    # look up their types
+    event_properties: dict[str, str] = {}
+    person_properties: dict[str, str] = {}
+    group_properties: dict[str, str] = {}
+    if property_finder.event_properties or property_finder.person_properties or property_finder.group_properties:
+        catalog = get_property_type_catalog(context.team_id)
+        event_properties = catalog.get_event_property_types(property_finder.event_properties)
+        person_properties = catalog.get_person_property_types(property_finder.person_properties)
+        for group_id, properties in property_finder.group_properties.items():
+            group_properties.update(
+                {
+                    f"{group_id}_{name}": property_type
+                    for name, property_type in catalog.get_group_property_types(group_id, properties).items()
+                }
+            )
 
     timezone = context.database.get_timezone() if context and context.database else "UTC"
     context.property_swapper = PropertySwapper(
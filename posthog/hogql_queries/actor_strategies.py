@@ -1,17 +1,14 @@
 from typing import cast, Literal, Optional
 
-from django.db import connection
-
 from posthog.hogql import ast
 from posthog.hogql.property import property_to_expr
 from posthog.hogql.parser import parse_expr
 from posthog.hogql_queries.insights.paginators import HogQLHasMorePaginator
+from posthog.hogql_queries.utils.actor_hydration import ActorHydrator
 from posthog.hogql_queries.utils.recordings_helper import RecordingsHelper
-from posthog.models import Team, Group
+from posthog.models import Team
 from posthog.schema import ActorsQuery
 
-import orjson as json
-
 
 class ActorStrategy:
     field: str
@@ -44,49 +41,8 @@ class PersonStrategy(ActorStrategy):
     origin = "persons"
     origin_id = "id"
 
-    # This is hand written instead of using the ORM because the ORM was blowing up the memory on exports and taking forever
-    def get_actors(self, actor_ids, order_by: str = "") -> dict[str, dict]:
-        # If actor queries start quietly dying again, this might need batching at some point
-        # but currently works with 800,000 persondistinctid entries (May 24, 2024)
-        persons_query = """SELECT posthog_person.id, posthog_person.uuid, posthog_person.properties, posthog_person.is_identified, posthog_person.created_at
-            FROM posthog_person
-            WHERE posthog_person.uuid = ANY(%(uuids)s)
-            AND posthog_person.team_id = %(team_id)s"""
-        if order_by:
-            persons_query += f" ORDER BY {order_by}"
-        with connection.cursor() as cursor:
-            cursor.execute(
-                persons_query,
-                {"uuids": list(actor_ids), "team_id": self.team.pk},
-            )
-            people = cursor.fetchall()
-            cursor.execute(
-                """SELECT posthog_persondistinctid.person_id, posthog_persondistinctid.distinct_id
-            FROM posthog_persondistinctid
-            WHERE posthog_persondistinctid.person_id = ANY(%(people_ids)s)
-            AND posthog_persondistinctid.team_id = %(team_id)s""",
-                {"people_ids": [x[0] for x in people], "team_id": self.team.pk},
-            )
-            distinct_ids = cursor.fetchall()
-
-        person_id_to_raw_person_and_set: dict[int, tuple] = {person[0]: (person, []) for person in people}
-
-        for pdid in distinct_ids:
-            person_id_to_raw_person_and_set[pdid[0]][1].append(pdid[1])
-        del distinct_ids
-
-        person_uuid_to_person = {
-            str(person[1]): {
-                "id": person[1],
-                "properties": json.loads(person[2]),
-                "is_identified": person[3],
-                "created_at": person[4],
-                "distinct_ids": distinct_ids,
-            }
-            for person, distinct_ids in person_id_to_raw_person_and_set.values()
-        }
-
-        return person_uuid_to_person
+    def get_actors(self, actor_ids) -> dict[str, dict]:
+        return ActorHydrator(self.team).persons_by_uuid(actor_ids)
 
     def input_columns(self) -> list[str]:
         return ["person", "id", "created_at", "person.$delete"]
@@ -156,19 +112,7 @@ class GroupStrategy(ActorStrategy):
         super().__init__(**kwargs)
 
     def get_actors(self, actor_ids) -> dict[str, dict]:
-        return {
-            str(p["group_key"]): {
-                "id": p["group_key"],
-                "type": "group",
-                "properties": p["group_properties"],  # TODO: Legacy for frontend
-                **p,
-            }
-            for p in Group.objects.filter(
-                team_id=self.team.pk, group_type_index=self.group_type_index, group_key__in=actor_ids
-            )
-            .values("group_key", "group_type_index", "created_at", "group_properties")
-            .iterator(chunk_size=self.paginator.limit)
-        }
+        return ActorHydrator(self.team).groups_by_key(self.group_type_index, actor_ids)
 
     def input_columns(self) -> list[str]:
         return ["group"]
@@ -10,7 +10,7 @@ from posthog.hogql.resolver_utils import extract_select_queries
 from posthog.hogql_queries.actor_strategies import ActorStrategy, PersonStrategy, GroupStrategy
 from posthog.hogql_queries.insights.funnels.funnels_query_runner import FunnelsQueryRunner
 from posthog.hogql_queries.insights.insight_actors_query_runner import InsightActorsQueryRunner
-from posthog.hogql_queries.insights.paginators import HogQLHasMorePaginator
+from posthog.hogql_queries.insights.paginators import HogQLCursorPaginator, HogQLHasMorePaginator
 from posthog.hogql_queries.query_runner import QueryRunner, get_query_runner
 from posthog.schema import (
     ActorsQuery,
@@ -25,6 +25,8 @@ class ActorsQueryRunner(QueryRunner):
     response: ActorsQueryResponse
     cached_response: CachedActorsQueryResponse
 
+    paginator: HogQLHasMorePaginator
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.paginator = HogQLHasMorePaginator.from_limit_context(
@@ -37,6 +39,48 @@ class ActorsQueryRunner(QueryRunner):
 
         self.strategy = self.determine_strategy()
 
+        cursor_order_by = self.cursor_order_by()
+        if cursor_order_by is not None:
+            self.paginator = HogQLCursorPaginator.from_limit_context(
+                limit_context=self.limit_context,
+                order_by=cursor_order_by,
+                cursor=self.query.cursor,
+                limit=self.query.limit,
+                offset=self.query.offset,
+            )
+            self.strategy.paginator = self.paginator
+
+    def cursor_order_by(self) -> Optional[list[ast.OrderExpr]]:
+        """
+        Lists of actors ordered by when they were created are paginated by (created_at, id), others by offset.
+        """
+        if self.query.source:
+            return None
+
+        input_columns = self.input_columns()
+        if any(has_aggregation(parse_expr(column)) for column in input_columns):
+            return None
+
+        if self.query.orderBy is not None:
+            if self.strategy.order_by() is not None:
+                return None
+            order_by = [parse_order_expr(column, timings=self.timings) for column in self.query.orderBy]
+        elif "created_at" in input_columns:
+            order_by = [ast.OrderExpr(expr=ast.Field(chain=["created_at"]), order="DESC")]
+        else:
+            return None
+
+        if (
+            len(order_by) != 1
+            or not isinstance(order_by[0].expr, ast.Field)
+            or order_by[0].expr.chain != ["created_at"]
+        ):
+            return None
+        return [
+            ast.OrderExpr(expr=ast.Field(chain=["created_at"]), order=order_by[0].order),
+            ast.OrderExpr(expr=ast.Field(chain=[self.strategy.origin_id]), order=order_by[0].order),
+        ]
+
     @property
     def group_type_index(self) -> int | None:
         if not self.source_query_runner or not isinstance(self.source_query_runner, InsightActorsQueryRunner):
@@ -1,7 +1,6 @@
 from typing import Optional
 
 from posthog.hogql import ast
-from posthog.hogql.printer import to_printed_hogql
 from posthog.hogql.query import execute_hogql_query
 from posthog.hogql_queries.ai.utils import TaxonomyCacheMixin
 from posthog.hogql_queries.query_runner import QueryRunner
@@ -19,8 +18,6 @@ class ActorsPropertyTaxonomyQueryRunner(TaxonomyCacheMixin, QueryRunner):
 
     def calculate(self):
         query = self.to_query()
-        hogql = to_printed_hogql(query, self.team)
-
         response = execute_hogql_query(
             query_type="ActorsPropertyTaxonomyQuery",
             query=query,
@@ -45,7 +42,7 @@ class ActorsPropertyTaxonomyQueryRunner(TaxonomyCacheMixin, QueryRunner):
         return ActorsPropertyTaxonomyQueryResponse(
             results=results,
             timings=response.timings,
-            hogql=hogql,
+            hogql=response.hogql,
             modifiers=self.modifiers,
         )
 
@@ -2,7 +2,6 @@ from typing import cast
 
 from posthog.hogql import ast
 from posthog.hogql.parser import parse_expr, parse_select
-from posthog.hogql.printer import to_printed_hogql
 from posthog.hogql.query import execute_hogql_query
 from posthog.hogql_queries.ai.utils import TaxonomyCacheMixin
 from posthog.hogql_queries.query_runner import QueryRunner
@@ -21,8 +20,6 @@ class EventTaxonomyQueryRunner(TaxonomyCacheMixin, QueryRunner):
 
     def calculate(self):
         query = self.to_query()
-        hogql = to_printed_hogql(query, self.team)
-
         response = execute_hogql_query(
             query_type="EventTaxonomyQuery",
             query=query,
@@ -45,7 +42,7 @@ class EventTaxonomyQueryRunner(TaxonomyCacheMixin, QueryRunner):
         return EventTaxonomyQueryResponse(
             results=results,
             timings=response.timings,
-            hogql=hogql,
+            hogql=response.hogql,
             modifiers=self.modifiers,
         )
 
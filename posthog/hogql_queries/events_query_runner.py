@@ -1,23 +1,24 @@
 from datetime import timedelta
 from typing import Optional
 
-from django.db.models import Prefetch
 from django.utils.timezone import now
 import orjson
 
-from posthog.api.element import ElementSerializer
+from posthog.api.person import PERSON_DEFAULT_DISPLAY_NAME_PROPERTIES
 from posthog.api.utils import get_pk_or_uuid
 from posthog.hogql import ast
 from posthog.hogql.ast import Alias
+from posthog.hogql.columnar import ColumnarResults
+from posthog.hogql.constants import LimitContext
 from posthog.hogql.parser import parse_expr, parse_order_expr
 from posthog.hogql.property import action_to_expr, has_aggregation, property_to_expr
 from posthog.hogql.timings import HogQLTimings
-from posthog.hogql_queries.insights.paginators import HogQLHasMorePaginator
+from posthog.hogql_queries.insights.paginators import HogQLCursorPaginator, HogQLHasMorePaginator
 from posthog.hogql_queries.query_runner import QueryRunner
+from posthog.hogql_queries.utils.actor_hydration import ActorHydrator
 from posthog.models import Action, Person
-from posthog.models.element import chain_to_elements
+from posthog.models.element import chain_to_element_dicts
 from posthog.models.person.person import get_distinct_ids_for_subquery
-from posthog.models.person.util import get_persons_by_distinct_ids
 from posthog.schema import DashboardFilter, EventsQuery, EventsQueryResponse, CachedEventsQueryResponse
 from posthog.utils import relative_date_parse
 
@@ -39,11 +40,45 @@ class EventsQueryRunner(QueryRunner):
     response: EventsQueryResponse
     cached_response: CachedEventsQueryResponse
 
+    paginator: HogQLHasMorePaginator
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.paginator = HogQLHasMorePaginator.from_limit_context(
-            limit_context=self.limit_context, limit=self.query.limit, offset=self.query.offset
-        )
+        cursor_order_by = self.cursor_order_by()
+        if cursor_order_by is not None:
+            self.paginator = HogQLCursorPaginator.from_limit_context(
+                limit_context=self.limit_context,
+                order_by=cursor_order_by,
+                cursor=self.query.cursor,
+                limit=self.query.limit,
+                offset=self.query.offset,
+            )
+        else:
+            self.paginator = HogQLHasMorePaginator.from_limit_context(
+                limit_context=self.limit_context, limit=self.query.limit, offset=self.query.offset
+            )
+
+    def cursor_order_by(self) -> Optional[list[ast.OrderExpr]]:
+        """
+        Events ordered by timestamp are paginated by (timestamp, uuid), other orderings by offset.
+        """
+        select_input, select = self.select_cols()
+        if any(has_aggregation(column) for column in select):
+            return None
+
+        if self.query.orderBy is not None:
+            order_by = [parse_order_expr(column, timings=self.timings) for column in self.query.orderBy]
+        elif "timestamp" in select_input:
+            order_by = [ast.OrderExpr(expr=ast.Field(chain=["timestamp"]), order="DESC")]
+        else:
+            return None
+
+        if len(order_by) != 1 or not isinstance(order_by[0].expr, ast.Field) or order_by[0].expr.chain != ["timestamp"]:
+            return None
+        return [
+            ast.OrderExpr(expr=ast.Field(chain=["timestamp"]), order=order_by[0].order),
+            ast.OrderExpr(expr=ast.Field(chain=["uuid"]), order=order_by[0].order),
+        ]
 
     def select_cols(self) -> tuple[list[str], list[ast.Expr]]:
         select_input: list[str] = []
@@ -194,61 +229,46 @@ class EventsQueryRunner(QueryRunner):
             timings=self.timings,
             modifiers=self.modifiers,
             limit_context=self.limit_context,
+            columnar=True,
         )
+        # Rows are only built once, by the response, after the columns below have been replaced
+        results = self.paginator.results
+        if not isinstance(results, ColumnarResults):
+            # The results of debug queries which failed
+            results = ColumnarResults.from_rows(query_result.columns or [], results)
 
         # Convert star field from tuple to dict in each result
-        if "*" in self.select_input_raw():
+        if "*" in self.select_input_raw() and len(results) > 0:
             with self.timings.measure("expand_asterisk"):
                 star_idx = self.select_input_raw().index("*")
-                for index, result in enumerate(self.paginator.results):
-                    self.paginator.results[index] = list(result)
-                    select = result[star_idx]
-                    new_result = dict(zip(SELECT_STAR_FROM_EVENTS_FIELDS, select))
-                    new_result["properties"] = orjson.loads(new_result["properties"])
-                    if new_result["elements_chain"]:
-                        new_result["elements"] = ElementSerializer(
-                            chain_to_elements(new_result["elements_chain"]), many=True
-                        ).data
-                    self.paginator.results[index][star_idx] = new_result
+                results = results.with_column(
+                    star_idx, [self._expand_asterisk(select) for select in results.column(star_idx)]
+                )
 
         person_indices: list[int] = []
         for index, col in enumerate(self.select_input_raw()):
             if col.split("--")[0].strip() == "person":
                 person_indices.append(index)
 
-        if len(person_indices) > 0 and len(self.paginator.results) > 0:
+        if len(person_indices) > 0 and len(results) > 0:
             with self.timings.measure("person_column_extra_query"):
                 # Make a query into postgres to fetch person
-                person_idx = person_indices[0]
-                distinct_ids = list({event[person_idx] for event in self.paginator.results})
-                persons = get_persons_by_distinct_ids(self.team.pk, distinct_ids)
-                persons = persons.prefetch_related(Prefetch("persondistinctid_set", to_attr="distinct_ids_cache"))
-                distinct_to_person: dict[str, Person] = {}
-                for person in persons:
-                    if person:
-                        for person_distinct_id in person.distinct_ids:
-                            distinct_to_person[person_distinct_id] = person
+                distinct_to_person = ActorHydrator(
+                    self.team, property_keys=self._person_column_property_keys()
+                ).persons_by_distinct_id(results.column(person_indices[0]).tolist())
 
                 # Loop over all columns in case there is more than one "person" column
                 for column_index in person_indices:
-                    for index, result in enumerate(self.paginator.results):
-                        distinct_id: str = result[column_index]
-                        self.paginator.results[index] = list(result)
-                        if distinct_to_person.get(distinct_id):
-                            person = distinct_to_person[distinct_id]
-                            self.paginator.results[index][column_index] = {
-                                "uuid": person.uuid,
-                                "created_at": person.created_at,
-                                "properties": person.properties or {},
-                                "distinct_id": distinct_id,
-                            }
-                        else:
-                            self.paginator.results[index][column_index] = {
-                                "distinct_id": distinct_id,
-                            }
+                    results = results.with_column(
+                        column_index,
+                        [
+                            self._person_column(distinct_id, distinct_to_person.get(distinct_id))
+                            for distinct_id in results.column(column_index).tolist()
+                        ],
+                    )
 
         return EventsQueryResponse(
-            results=self.paginator.results,
+            results=results,
             columns=self.columns(query_result.columns),
             types=[t for _, t in query_result.types] if query_result.types else None,
             timings=self.timings.to_list(),
@@ -257,6 +277,32 @@ class EventsQueryRunner(QueryRunner):
             **self.paginator.response_params(),
         )
 
+    def _expand_asterisk(self, select: tuple) -> dict:
+        new_result = dict(zip(SELECT_STAR_FROM_EVENTS_FIELDS, select))
+        new_result["properties"] = orjson.loads(new_result["properties"])
+        if new_result["elements_chain"]:
+            new_result["elements"] = chain_to_element_dicts(new_result["elements_chain"])
+        return new_result
+
+    def _person_column_property_keys(self) -> Optional[list[str]]:
+        """
+        The person column is shown as the person's display name and avatar, so only those properties are loaded.
+        Exports include all properties of the person.
+        """
+        if self.limit_context == LimitContext.EXPORT:
+            return None
+        return [*(self.team.person_display_name_properties or PERSON_DEFAULT_DISPLAY_NAME_PROPERTIES), "email"]
+
+    def _person_column(self, distinct_id: str, person: Optional[dict]) -> dict:
+        if not person:
+            return {"distinct_id": distinct_id}
+        return {
+            "uuid": person["id"],
+            "created_at": person["created_at"],
+            "properties": person["properties"] or {},
+            "distinct_id": distinct_id,
+        }
+
     def apply_dashboard_filters(self, dashboard_filter: DashboardFilter):
         if dashboard_filter.date_to or dashboard_filter.date_from:
             self.query.before = dashboard_filter.date_to
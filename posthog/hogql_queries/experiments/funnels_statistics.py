@@ -1,7 +1,6 @@
 from rest_framework.exceptions import ValidationError
 from numpy.random import default_rng
 from sentry_sdk import capture_exception
-import scipy.stats as stats
 from posthog.hogql_queries.experiments import (
     EXPECTED_LOSS_SIGNIFICANCE_LEVEL,
     FF_DISTRIBUTION_THRESHOLD,
@@ -184,6 +183,9 @@ def calculate_credible_intervals(variants, lower_bound=0.025, upper_bound=0.975)
     Calculate the Bayesian credible intervals for a list of variants.
     If no lower/upper bound provided, the function calculates the 95% credible interval.
     """
+    # SciPy takes long to import, so it's only imported by the processes that calculate experiment results
+    import scipy.stats as stats
+
     intervals = {}
 
     for variant in variants:
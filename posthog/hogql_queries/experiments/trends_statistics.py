@@ -3,7 +3,6 @@ from math import exp, lgamma, log, ceil
 
 from numpy.random import default_rng
 from rest_framework.exceptions import ValidationError
-import scipy.stats as stats
 from sentry_sdk import capture_exception
 
 from ee.clickhouse.queries.experiments import (
@@ -170,6 +169,9 @@ def calculate_credible_intervals(variants, lower_bound=0.025, upper_bound=0.975)
     for a list of variants in a Trend experiment.
     If no lower/upper bound is provided, the function calculates the 95% credible interval.
     """
+    # SciPy takes long to import, so it's only imported by the processes that calculate experiment results
+    import scipy.stats as stats
+
     intervals = {}
 
     for variant in variants:
@@ -0,0 +1,176 @@
+from collections.abc import Sequence
+from math import sqrt
+from typing import Optional, Union
+
+from django.conf import settings
+from django.core.cache import cache
+
+from posthog.hogql import ast
+from posthog.hogql.constants import LimitContext
+from posthog.hogql.parser import parse_select
+from posthog.hogql.query import execute_hogql_query
+from posthog.hogql.timings import HogQLTimings
+from posthog.hogql_queries.utils.query_date_range import QueryDateRange
+from posthog.models.action.action import Action
+from posthog.models.team.team import Team
+from posthog.schema import (
+    ActionsNode,
+    AutoSamplingInfo,
+    DataWarehouseNode,
+    EventsNode,
+    FunnelsQuery,
+    PathsQuery,
+    RetentionQuery,
+    TrendsQuery,
+)
+from posthog.utils import generate_cache_key, get_safe_cache
+
+# How many events an insight query can read and still return within a few seconds on our clusters. Queries which
+# would read more than this are sampled down to about this many events.
+AUTO_SAMPLING_EVENT_BUDGET = 50_000_000
+
+# Sampling factors to pick from, so that similar insights use the same factor and share cached event counts
+AUTO_SAMPLING_FACTORS = [0.1, 0.01, 0.001]
+
+# The event count is estimated from a sample as well, which is plenty precise for choosing a sampling factor
+ESTIMATE_SAMPLE_DENOMINATOR = 1000
+
+
+def sampling_factor_for_event_count(event_count: int) -> Optional[float]:
+    """
+    Returns the largest sampling factor which keeps the query within the event budget, or `None` if the query doesn't
+    need sampling.
+    """
+    if event_count <= AUTO_SAMPLING_EVENT_BUDGET:
+        return None
+    for factor in AUTO_SAMPLING_FACTORS:
+        if event_count * factor <= AUTO_SAMPLING_EVENT_BUDGET:
+            return factor
+    return AUTO_SAMPLING_FACTORS[-1]
+
+
+def relative_standard_error(event_count: int, sampling_factor: float) -> float:
+    """
+    Expected relative error of a count of `event_count` events when only `sampling_factor` of them are read.
+
+    This assumes that events are sampled independently. They are actually sampled by distinct ID, so when a few users
+    make most of the events, the error is larger.
+    """
+    sampled_count = event_count * sampling_factor
+    if sampled_count <= 0:
+        return 0.0
+    return sqrt((1 - sampling_factor) / sampled_count)
+
+
+def get_series_events(
+    series: Sequence[Union[EventsNode, ActionsNode, DataWarehouseNode]], team: Team
+) -> list[Optional[str]]:
+    events: list[Optional[str]] = []
+    for node in series:
+        if isinstance(node, EventsNode):
+            events.append(node.event)
+        elif isinstance(node, ActionsNode):
+            try:
+                action = Action.objects.get(pk=int(node.id), team__project_id=team.project_id)
+                events.extend(action.get_step_events())
+            except Action.DoesNotExist:
+                continue
+    return events
+
+
+class AutoSamplingMixin:
+    """
+    Picks a sampling factor for insights which set `autoSampling`, based on how many events the query would read.
+
+    The factor is set as the query's `samplingFactor`, so it's applied and corrected for exactly like a sampling
+    factor set by the user.
+    """
+
+    query: Union[TrendsQuery, FunnelsQuery, RetentionQuery, PathsQuery]
+    team: Team
+    timings: HogQLTimings
+    limit_context: LimitContext
+    query_date_range: QueryDateRange
+
+    _auto_sampling_info: Optional[AutoSamplingInfo] = None
+
+    def auto_sampling_events(self) -> list[Optional[str]]:
+        """
+        The events the query reads, where `None` stands for any event.
+        """
+        return [None]
+
+    def can_auto_sample(self) -> bool:
+        return True
+
+    def apply_auto_sampling(self) -> Optional[AutoSamplingInfo]:
+        if self._auto_sampling_info is not None:
+            return self._auto_sampling_info
+        if not self.query.autoSampling or self.query.samplingFactor is not None or not self.can_auto_sample():
+            return None
+
+        event_count = self._get_or_estimate_event_count()
+        sampling_factor = sampling_factor_for_event_count(event_count)
+        if sampling_factor is None:
+            return None
+
+        self.query.samplingFactor = sampling_factor
+        self._auto_sampling_info = AutoSamplingInfo(
+            samplingFactor=sampling_factor,
+            estimatedEventCount=event_count,
+            relativeStandardError=relative_standard_error(event_count, sampling_factor),
+        )
+        return self._auto_sampling_info
+
+    def _auto_sampling_cache_key(self, events: list[str]) -> str:
+        date_range = self.query.dateRange.model_dump_json() if self.query.dateRange else None
+        return generate_cache_key(f"insight_event_count_{date_range}_{events}_{self.team.pk}_{self.team.timezone}")
+
+    def _get_or_estimate_event_count(self) -> int:
+        # No event filter if the query reads any event
+        auto_sampling_events = self.auto_sampling_events()
+        events = [] if None in auto_sampling_events else sorted({event for event in auto_sampling_events if event})
+
+        cache_key = self._auto_sampling_cache_key(events)
+        cached_count = get_safe_cache(cache_key)
+        if cached_count is not None:
+            return cached_count
+
+        where_exprs: list[ast.Expr] = [
+            ast.CompareOperation(
+                op=ast.CompareOperationOp.GtEq,
+                left=ast.Field(chain=["timestamp"]),
+                right=ast.Constant(value=self.query_date_range.date_from()),
+            ),
+            ast.CompareOperation(
+                op=ast.CompareOperationOp.LtEq,
+                left=ast.Field(chain=["timestamp"]),
+                right=ast.Constant(value=self.query_date_range.date_to()),
+            ),
+        ]
+        if events:
+            where_exprs.append(
+                ast.CompareOperation(
+                    op=ast.CompareOperationOp.In,
+                    left=ast.Field(chain=["event"]),
+                    right=ast.Tuple(exprs=[ast.Constant(value=event) for event in events]),
+                )
+            )
+
+        with self.timings.measure("auto_sampling_event_count_query"):
+            event_count_query = parse_select(
+                f"SELECT count() FROM events SAMPLE 1/{ESTIMATE_SAMPLE_DENOMINATOR} WHERE {{where}}",
+                placeholders={"where": ast.And(exprs=where_exprs)},
+                timings=self.timings,
+            )
+            response = execute_hogql_query(
+                query_type="auto_sampling_event_count_query",
+                query=event_count_query,
+                team=self.team,
+                timings=self.timings,
+                limit_context=self.limit_context,
+            )
+
+        event_count = (response.results[0][0] if response.results else 0) * ESTIMATE_SAMPLE_DENOMINATOR
+        cache.set(cache_key, event_count, settings.CACHED_RESULTS_TTL)
+        return event_count
@@ -10,13 +10,11 @@ from posthog.hogql_queries.insights.funnels.funnel_persons import FunnelActors
 from posthog.hogql_queries.insights.funnels.funnel_strict_actors import FunnelStrictActors
 from posthog.hogql_queries.insights.funnels.funnel_unordered_actors import FunnelUnorderedActors
 from posthog.models.action.action import Action
-from posthog.models.element.element import chain_to_elements
-from posthog.models.event.util import ElementSerializer
+from posthog.models.event.util import serialize_elements_chain
 from rest_framework.exceptions import ValidationError
 
 from posthog.hogql import ast
 from posthog.hogql.constants import LimitContext
-from posthog.hogql.printer import to_printed_hogql
 from posthog.hogql.query import execute_hogql_query
 from posthog.hogql.timings import HogQLTimings
 from posthog.hogql_queries.insights.funnels.funnel_query_context import FunnelQueryContext
@@ -89,6 +87,8 @@ class FunnelCorrelationQueryRunner(QueryRunner):
     AUTOCAPTURE_EVENT_TYPE = "$event_type"
     MIN_PERSON_COUNT = 25
     MIN_PERSON_PERCENTAGE = 0.02
+    # Number of results returned for each correlation type
+    TOP_RESULTS_COUNT = 10
 
     query: FunnelCorrelationQuery
     response: FunnelCorrelationResponse
@@ -231,10 +231,10 @@ class FunnelCorrelationQueryRunner(QueryRunner):
             modifiers=self.modifiers,
         )
 
-    def _calculate(self) -> tuple[list[EventOddsRatio], bool, str, HogQLQueryResponse]:
+    def _calculate(self) -> tuple[list[EventOddsRatio], bool, Optional[str], HogQLQueryResponse]:
         query = self.to_query()
-
-        hogql = to_printed_hogql(query, self.team)
+        if self.query.funnelCorrelationRankInQuery:
+            query = self.rank_in_query(query)
 
         response = execute_hogql_query(
             query_type="FunnelsQuery",
@@ -244,25 +244,43 @@ class FunnelCorrelationQueryRunner(QueryRunner):
             modifiers=self.modifiers,
             limit_context=self.limit_context,
         )
+        hogql = response.hogql
         assert response.results
 
         # Get the total success/failure counts from the results
         results = [result for result in response.results if result[0] != self.TOTAL_IDENTIFIER]
-        _, success_total, failure_total = next(
-            result for result in response.results if result[0] == self.TOTAL_IDENTIFIER
-        )
-
-        # Add a little structure, and keep it close to the query definition so it's
-        # obvious what's going on with result indices.
-        event_contingency_tables = [
-            EventContingencyTable(
-                event=result[0],
-                visited=EventStats(success_count=result[1], failure_count=result[2]),
-                success_total=success_total,
-                failure_total=failure_total,
-            )
-            for result in results
-        ]
+        totals = next(result for result in response.results if result[0] == self.TOTAL_IDENTIFIER)
+        success_total, failure_total = totals[1], totals[2]
+
+        if self.query.funnelCorrelationRankInQuery:
+            # The query already computed the odds ratios and dropped insignificant and lower ranked results
+            odds_ratios = [
+                EventOddsRatio(
+                    event=result[0],
+                    success_count=result[1],
+                    failure_count=result[2],
+                    odds_ratio=result[3],
+                    correlation_type=result[4],
+                )
+                for result in results
+            ]
+        else:
+            # Add a little structure, and keep it close to the query definition so it's
+            # obvious what's going on with result indices.
+            event_contingency_tables = [
+                EventContingencyTable(
+                    event=result[0],
+                    visited=EventStats(success_count=result[1], failure_count=result[2]),
+                    success_total=success_total,
+                    failure_total=failure_total,
+                )
+                for result in results
+            ]
+            odds_ratios = [
+                get_entity_odds_ratio(event_stats, PRIOR_COUNT)
+                for event_stats in event_contingency_tables
+                if not self.are_results_insignificant(event_stats)
+            ]
 
         success_total = int(correct_result_for_sampling(success_total, self.funnels_query.samplingFactor))
         failure_total = int(correct_result_for_sampling(failure_total, self.funnels_query.samplingFactor))
@@ -277,12 +295,6 @@ class FunnelCorrelationQueryRunner(QueryRunner):
         if success_total / failure_total > 10 or failure_total / success_total > 10:
             skewed_totals = True
 
-        odds_ratios = [
-            get_entity_odds_ratio(event_stats, PRIOR_COUNT)
-            for event_stats in event_contingency_tables
-            if not self.are_results_insignificant(event_stats)
-        ]
-
         positively_correlated_events = sorted(
             [odds_ratio for odds_ratio in odds_ratios if odds_ratio["correlation_type"] == "success"],
             key=lambda x: x["odds_ratio"],
@@ -296,7 +308,10 @@ class FunnelCorrelationQueryRunner(QueryRunner):
         )
 
         # Return the top ten positively correlated events, and top then negatively correlated events
-        events = positively_correlated_events[:10] + negatively_correlated_events[:10]
+        events = (
+            positively_correlated_events[: self.TOP_RESULTS_COUNT]
+            + negatively_correlated_events[: self.TOP_RESULTS_COUNT]
+        )
         return events, skewed_totals, hogql, response
 
     def serialize_event_odds_ratio(self, odds_ratio: EventOddsRatio) -> EventOddsRatioSerialized:
@@ -326,7 +341,7 @@ class FunnelCorrelationQueryRunner(QueryRunner):
                 properties={self.AUTOCAPTURE_EVENT_TYPE: event_type},
                 elements=cast(
                     list,
-                    ElementSerializer(chain_to_elements(elements_chain), many=True).data,
+                    serialize_elements_chain(elements_chain),
                 ),
             )
 
@@ -345,6 +360,65 @@ class FunnelCorrelationQueryRunner(QueryRunner):
 
         return self.get_event_query()
 
+    def rank_in_query(self, contingency_query: ast.SelectQuery | ast.SelectSetQuery) -> ast.SelectQuery:
+        """
+        Wraps the contingency table query, so that ClickHouse computes the odds ratio of each row the same way as
+        `get_entity_odds_ratio`, drops the rows `are_results_insignificant` would, and only returns the top results
+        of each correlation type along with the totals row. For high cardinality properties this returns a few rows
+        instead of one for every property value.
+        """
+        query = parse_select(
+            """
+            SELECT name, success_count, failure_count, odds_ratio, correlation_type
+            FROM (
+                SELECT
+                    name,
+                    success_count,
+                    failure_count,
+                    odds_ratio,
+                    correlation_type,
+                    row_number() OVER (
+                        PARTITION BY correlation_type
+                        ORDER BY if(correlation_type = 'success', -odds_ratio, odds_ratio), name
+                    ) AS correlation_rank
+                FROM (
+                    SELECT
+                        name,
+                        success_count,
+                        failure_count,
+                        ((success_count + {prior_count}) * (failure_total - failure_count + {prior_count}))
+                            / ((success_total - success_count + {prior_count}) * (failure_count + {prior_count}))
+                            AS odds_ratio,
+                        -- The totals row gets a type of its own, so that it doesn't take the place of a result
+                        if(name = {total_identifier}, '', if(odds_ratio > 1, 'success', 'failure')) AS correlation_type
+                    FROM (
+                        SELECT
+                            name,
+                            success_count,
+                            failure_count,
+                            sum(if(name = {total_identifier}, success_count, 0)) OVER () AS success_total,
+                            sum(if(name = {total_identifier}, failure_count, 0)) OVER () AS failure_total
+                        FROM {contingency_query}
+                    )
+                    WHERE name = {total_identifier}
+                        OR success_count + failure_count
+                            >= least({min_person_count}, {min_person_percentage} * (success_total + failure_total))
+                )
+            )
+            WHERE name = {total_identifier} OR correlation_rank <= {top_results_count}
+            """,
+            placeholders={
+                "contingency_query": contingency_query,
+                "prior_count": ast.Constant(value=PRIOR_COUNT),
+                "total_identifier": ast.Constant(value=self.TOTAL_IDENTIFIER),
+                "min_person_count": ast.Constant(value=self.MIN_PERSON_COUNT),
+                "min_person_percentage": ast.Constant(value=self.MIN_PERSON_PERCENTAGE),
+                "top_results_count": ast.Constant(value=self.TOP_RESULTS_COUNT),
+            },
+        )
+        assert isinstance(query, ast.SelectQuery)
+        return query
+
     def to_actors_query(self) -> ast.SelectQuery | ast.SelectSetQuery:
         assert self.correlation_actors_query is not None
 
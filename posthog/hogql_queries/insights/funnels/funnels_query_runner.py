@@ -12,9 +12,9 @@ from posthog.caching.insights_api import (
 
 from posthog.hogql import ast
 from posthog.hogql.constants import LimitContext
-from posthog.hogql.printer import to_printed_hogql
 from posthog.hogql.query import execute_hogql_query
 from posthog.hogql.timings import HogQLTimings
+from posthog.hogql_queries.insights.auto_sampling import AutoSamplingMixin, get_series_events
 from posthog.hogql_queries.insights.funnels.funnel_query_context import FunnelQueryContext
 from posthog.hogql_queries.insights.funnels.funnel_time_to_convert import FunnelTimeToConvert
 from posthog.hogql_queries.insights.funnels.funnel_trends import FunnelTrends
@@ -26,6 +26,7 @@ from posthog.models import Team
 from posthog.models.filters.mixins.utils import cached_property
 from posthog.schema import (
     CachedFunnelsQueryResponse,
+    DataWarehouseNode,
     FunnelVizType,
     FunnelsQuery,
     FunnelsQueryResponse,
@@ -34,7 +35,7 @@ from posthog.schema import (
 )
 
 
-class FunnelsQueryRunner(QueryRunner):
+class FunnelsQueryRunner(AutoSamplingMixin, QueryRunner):
     query: FunnelsQuery
     response: FunnelsQueryResponse
     cached_response: CachedFunnelsQueryResponse
@@ -73,6 +74,13 @@ class FunnelsQueryRunner(QueryRunner):
 
         return refresh_frequency
 
+    def can_auto_sample(self) -> bool:
+        # Data warehouse tables can't be sampled
+        return not any(isinstance(node, DataWarehouseNode) for node in self.query.series)
+
+    def auto_sampling_events(self) -> list[Optional[str]]:
+        return get_series_events(self.query.series, self.team)
+
     def to_query(self) -> ast.SelectQuery:
         return self.funnel_class.get_query()
 
@@ -80,12 +88,10 @@ class FunnelsQueryRunner(QueryRunner):
         return self.funnel_actor_class.actor_query()
 
     def calculate(self):
+        sampling_info = self.apply_auto_sampling()
         query = self.to_query()
         timings = []
 
-        # TODO: can we get this from execute_hogql_query as well?
-        hogql = to_printed_hogql(query, self.team)
-
         response = execute_hogql_query(
             query_type="FunnelsQuery",
             query=query,
@@ -106,7 +112,12 @@ class FunnelsQueryRunner(QueryRunner):
             timings.extend(response.timings)
 
         return FunnelsQueryResponse(
-            isUdf=self._use_udf, results=results, timings=timings, hogql=hogql, modifiers=self.modifiers
+            isUdf=self._use_udf,
+            results=results,
+            timings=timings,
+            hogql=response.hogql,
+            modifiers=self.modifiers,
+            samplingInfo=sampling_info,
         )
 
     @cached_property
@@ -63,6 +63,7 @@ class BaseTestClickhouseFunnelCorrelation(ClickhouseTestMixin, APIBaseTest):
         funnelCorrelationExcludeEventNames=None,
         funnelCorrelationEventNames=None,
         funnelCorrelationEventExcludePropertyNames=None,
+        funnelCorrelationRankInQuery=None,
     ):
         funnels_query = cast(FunnelsQuery, filter_to_query(filters))
         actors_query = FunnelsActorsQuery(source=funnels_query)
@@ -74,6 +75,7 @@ class BaseTestClickhouseFunnelCorrelation(ClickhouseTestMixin, APIBaseTest):
             funnelCorrelationExcludeEventNames=funnelCorrelationExcludeEventNames,
             funnelCorrelationEventNames=funnelCorrelationEventNames,
             funnelCorrelationEventExcludePropertyNames=funnelCorrelationEventExcludePropertyNames,
+            funnelCorrelationRankInQuery=funnelCorrelationRankInQuery,
         )
         result, skewed_totals, _, _ = FunnelCorrelationQueryRunner(query=correlation_query, team=self.team)._calculate()
         return result, skewed_totals
@@ -1518,6 +1520,77 @@ class BaseTestClickhouseFunnelCorrelation(ClickhouseTestMixin, APIBaseTest):
 
         self.assertEqual(len(result), 2)
 
+    def test_rank_in_query_matches_ranking_results_in_python(self):
+        filters = {
+            "events": [
+                {"id": "user signed up", "type": "events", "order": 0},
+                {"id": "paid", "type": "events", "order": 1},
+            ],
+            "insight": INSIGHT_FUNNELS,
+            "date_from": "2020-01-01",
+            "date_to": "2020-01-14",
+        }
+
+        # 15 successful and 15 failed users. The first `k` users of each group do `positive_{k}` or `negative_{k}`
+        # respectively, so each event has a different odds ratio, and only the top 10 of each type are returned.
+        # The successful ones also have the `positive_{k}` person property set in the same way.
+        for i in range(30):
+            successful = i < 15
+            correlated = [
+                f"{'positive' if successful else 'negative'}_{k}"
+                for k in range(1, 13)
+                if (i if successful else i - 15) < k
+            ]
+            _create_person(
+                distinct_ids=[f"user_{i}"],
+                team_id=self.team.pk,
+                properties={name: "yes" for name in correlated if successful},
+            )
+            _create_event(
+                team=self.team, event="user signed up", distinct_id=f"user_{i}", timestamp="2020-01-02T14:00:00Z"
+            )
+            for name in correlated:
+                _create_event(
+                    team=self.team,
+                    event=name,
+                    distinct_id=f"user_{i}",
+                    timestamp="2020-01-03T14:00:00Z",
+                )
+            if successful:
+                _create_event(team=self.team, event="paid", distinct_id=f"user_{i}", timestamp="2020-01-04T14:00:00Z")
+
+        result, skewed = self._get_events_for_filters(filters)
+        ranked_result, ranked_skewed = self._get_events_for_filters(filters, funnelCorrelationRankInQuery=True)
+
+        self.assertEqual(ranked_result, result)
+        self.assertEqual(ranked_skewed, skewed)
+        self.assertEqual(
+            [odds_ratio["event"] for odds_ratio in ranked_result],
+            [f"positive_{k}" for k in range(12, 2, -1)] + [f"negative_{k}" for k in range(12, 2, -1)],
+        )
+
+        # Properties are ranked the same way. Users without a property are counted under an empty value, which
+        # makes those values the negatively correlated ones.
+        property_names = [f"positive_{k}" for k in range(1, 13)]
+        result, skewed = self._get_events_for_filters(
+            filters,
+            funnelCorrelationType=FunnelCorrelationResultsType.PROPERTIES,
+            funnelCorrelationNames=property_names,
+        )
+        ranked_result, ranked_skewed = self._get_events_for_filters(
+            filters,
+            funnelCorrelationType=FunnelCorrelationResultsType.PROPERTIES,
+            funnelCorrelationNames=property_names,
+            funnelCorrelationRankInQuery=True,
+        )
+
+        self.assertEqual(ranked_result, result)
+        self.assertEqual(ranked_skewed, skewed)
+        self.assertEqual(
+            [odds_ratio["event"] for odds_ratio in ranked_result],
+            [f"positive_{k}::yes" for k in range(12, 2, -1)] + [f"positive_{k}::" for k in range(12, 2, -1)],
+        )
+
     def test_events_within_conversion_window_for_correlation(self):
         filters = {
             "events": [
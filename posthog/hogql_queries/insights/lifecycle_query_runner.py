@@ -10,7 +10,6 @@ from posthog.caching.insights_api import (
 
 from posthog.hogql import ast
 from posthog.hogql.parser import parse_expr, parse_select
-from posthog.hogql.printer import to_printed_hogql
 from posthog.hogql.property import property_to_expr, action_to_expr
 from posthog.hogql.query import execute_hogql_query
 from posthog.hogql_queries.query_runner import QueryRunner
@@ -150,8 +149,6 @@ class LifecycleQueryRunner(QueryRunner):
 
     def calculate(self) -> LifecycleQueryResponse:
         query = self.to_query()
-        hogql = to_printed_hogql(query, self.team)
-
         response = execute_hogql_query(
             query_type="LifecycleQuery",
             query=query,
@@ -213,7 +210,9 @@ class LifecycleQueryRunner(QueryRunner):
                 }
             )
 
-        return LifecycleQueryResponse(results=res, timings=response.timings, hogql=hogql, modifiers=self.modifiers)
+        return LifecycleQueryResponse(
+            results=res, timings=response.timings, hogql=response.hogql, modifiers=self.modifiers
+        )
 
     @cached_property
     def query_date_range(self):
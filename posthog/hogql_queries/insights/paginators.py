@@ -1,12 +1,20 @@
+import base64
+from datetime import datetime
+from collections.abc import Sequence
 from typing import Any, Optional, cast
+from uuid import UUID
+
+import orjson
 
 from posthog.hogql import ast
+from posthog.hogql.columnar import ColumnarResults
 from posthog.hogql.constants import (
     get_max_limit_for_context,
     get_default_limit_for_context,
     LimitContext,
     DEFAULT_RETURNED_ROWS,
 )
+from posthog.hogql.errors import QueryError
 from posthog.hogql.query import execute_hogql_query
 from posthog.schema import HogQLQueryResponse
 
@@ -21,7 +29,7 @@ class HogQLHasMorePaginator:
         self, *, limit: Optional[int] = None, offset: Optional[int] = None, limit_context: Optional[LimitContext] = None
     ):
         self.response: Optional[HogQLQueryResponse] = None
-        self.results: list[Any] = []
+        self.results: Sequence[Any] = []
         self.limit = limit if limit and limit > 0 else DEFAULT_RETURNED_ROWS
         self.offset = offset if offset and offset > 0 else 0
         self.limit_context = limit_context
@@ -46,7 +54,7 @@ class HogQLHasMorePaginator:
 
         return len(self.response.results) > self.limit
 
-    def trim_results(self) -> list[Any]:
+    def trim_results(self) -> Sequence[Any]:
         if not self.response or not self.response.results:
             return []
 
@@ -79,3 +87,133 @@ class HogQLHasMorePaginator:
             "limit": self.limit,
             "offset": self.offset,
         }
+
+
+def encode_cursor(values: list[Any]) -> str:
+    """
+    Encodes the sort key of a row as an opaque token, keeping the types of datetimes and UUIDs.
+    """
+    encoded = []
+    for value in values:
+        if isinstance(value, datetime):
+            encoded.append(["datetime", value.isoformat()])
+        elif isinstance(value, UUID):
+            encoded.append(["uuid", str(value)])
+        else:
+            encoded.append(["value", value])
+    return base64.urlsafe_b64encode(orjson.dumps(encoded)).decode()
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    try:
+        encoded = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+        values: list[Any] = []
+        for kind, value in encoded:
+            if kind == "datetime":
+                values.append(datetime.fromisoformat(value))
+            elif kind == "uuid":
+                values.append(UUID(value))
+            else:
+                values.append(value)
+        return values
+    except (ValueError, TypeError) as e:
+        raise QueryError("Invalid pagination cursor") from e
+
+
+class HogQLCursorPaginator(HogQLHasMorePaginator):
+    """
+    Paginator that continues after the sort key of the last row of the previous page, instead of skipping an offset
+    of rows, so ClickHouse doesn't have to read and discard all earlier rows.
+
+    The sort key must be unique for each row and sorted in one direction. Its values are selected as extra columns,
+    which are removed from the results. The first page can still be requested with an offset.
+    """
+
+    def __init__(
+        self,
+        *,
+        order_by: list[ast.OrderExpr],
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        limit_context: Optional[LimitContext] = None,
+    ):
+        super().__init__(limit=limit, offset=None if cursor else offset, limit_context=limit_context)
+        if len({order_expr.order for order_expr in order_by}) != 1:
+            raise ValueError("Cursor pagination needs a sort key sorted in one direction")
+        self.order_by = order_by
+        self.next_cursor: Optional[str] = None
+        self.cursor_values = decode_cursor(cursor) if cursor else None
+        if self.cursor_values is not None and len(self.cursor_values) != len(order_by):
+            raise QueryError("Invalid pagination cursor")
+
+    @classmethod
+    def from_limit_context(  # type: ignore[override]
+        cls,
+        *,
+        limit_context: LimitContext,
+        order_by: list[ast.OrderExpr],
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+    ) -> "HogQLCursorPaginator":
+        max_rows = get_max_limit_for_context(limit_context)
+        default_rows = get_default_limit_for_context(limit_context)
+        limit = min(max_rows, default_rows if (limit is None or limit <= 0) else limit)
+        return cls(order_by=order_by, cursor=cursor, limit=limit, offset=offset, limit_context=limit_context)
+
+    def paginate(self, query: ast.SelectQuery) -> ast.SelectQuery:
+        # Under aliases of their own, so that they never take over the alias of a selected column with the same name
+        query.select = [
+            *query.select,
+            *(
+                ast.Alias(alias=f"__cursor_{index}", expr=order_expr.expr)
+                for index, order_expr in enumerate(self.order_by)
+            ),
+        ]
+        query.order_by = self.order_by
+
+        if self.cursor_values is not None:
+            descending = self.order_by[0].order == "DESC"
+            key = [order_expr.expr for order_expr in self.order_by]
+            values: list[ast.Expr] = [ast.Constant(value=value) for value in self.cursor_values]
+            after_cursor: ast.Expr = ast.CompareOperation(
+                op=ast.CompareOperationOp.Lt if descending else ast.CompareOperationOp.Gt,
+                left=ast.Tuple(exprs=key),
+                right=ast.Tuple(exprs=values),
+            )
+            if query.group_by:
+                query.having = ast.And(exprs=[query.having, after_cursor]) if query.having else after_cursor
+            else:
+                # Comparing tuples can't use the primary key, so also compare the first column on its own
+                first_key_after_cursor = ast.CompareOperation(
+                    op=ast.CompareOperationOp.LtEq if descending else ast.CompareOperationOp.GtEq,
+                    left=key[0],
+                    right=values[0],
+                )
+                where_exprs = [query.where] if query.where else []
+                query.where = ast.And(exprs=[*where_exprs, first_key_after_cursor, after_cursor])
+
+        return super().paginate(query)
+
+    def trim_results(self) -> Sequence[Any]:
+        results = super().trim_results()
+        if self.response is not None:
+            # Remove the sort key columns
+            key_length = len(self.order_by)
+            if self.response.columns:
+                self.response.columns = self.response.columns[:-key_length]
+            if self.response.types:
+                self.response.types = self.response.types[:-key_length]
+            self.next_cursor = encode_cursor(list(results[-1][-key_length:])) if self.has_more() else None
+            if isinstance(results, ColumnarResults):
+                results = results.select(range(len(results.columns) - key_length))
+            else:
+                results = [row[:-key_length] for row in results]
+        return results
+
+    def response_params(self):
+        return {
+            **super().response_params(),
+            "nextCursor": self.next_cursor,
+        }
@@ -12,10 +12,10 @@ from posthog.constants import PAGEVIEW_EVENT, SCREEN_EVENT, HOGQL
 from posthog.hogql import ast
 from posthog.hogql.constants import LimitContext
 from posthog.hogql.parser import parse_select, parse_expr
-from posthog.hogql.printer import to_printed_hogql
 from posthog.hogql.property import property_to_expr
 from posthog.hogql.query import execute_hogql_query
 from posthog.hogql.timings import HogQLTimings
+from posthog.hogql_queries.insights.auto_sampling import AutoSamplingMixin
 from posthog.hogql_queries.insights.funnels.funnels_query_runner import FunnelsQueryRunner
 from posthog.hogql_queries.insights.funnels.utils import funnel_window_interval_unit_to_sql
 from posthog.hogql_queries.query_runner import QueryRunner
@@ -42,7 +42,7 @@ SESSION_TIME_THRESHOLD_DEFAULT_SECONDS = 30 * 60  # 30 minutes
 EDGE_LIMIT_DEFAULT = 50
 
 
-class PathsQueryRunner(QueryRunner):
+class PathsQueryRunner(AutoSamplingMixin, QueryRunner):
     query: PathsQuery
     response: PathsQueryResponse
     cached_response: CachedPathsQueryResponse
@@ -841,10 +841,20 @@ class PathsQueryRunner(QueryRunner):
 
         return validated_results
 
+    def auto_sampling_events(self) -> list[Optional[str]]:
+        include_event_types = self.query.pathsFilter.includeEventTypes or []
+        events: list[Optional[str]] = []
+        if PathType.FIELD_PAGEVIEW in include_event_types:
+            events.append(PAGEVIEW_EVENT)
+        if PathType.FIELD_SCREEN in include_event_types:
+            events.append(SCREEN_EVENT)
+        if not events or PathType.CUSTOM_EVENT in include_event_types:
+            return [None]
+        return events
+
     def calculate(self) -> PathsQueryResponse:
+        sampling_info = self.apply_auto_sampling()
         query = self.to_query()
-        hogql = to_printed_hogql(query, self.team)
-
         response = execute_hogql_query(
             query_type="PathsQuery",
             query=query,
@@ -870,7 +880,13 @@ class PathsQueryRunner(QueryRunner):
             for source, target, value, avg_conversion_time in response.results
         )
 
-        return PathsQueryResponse(results=results, timings=response.timings, hogql=hogql, modifiers=self.modifiers)
+        return PathsQueryResponse(
+            results=results,
+            timings=response.timings,
+            hogql=response.hogql,
+            modifiers=self.modifiers,
+            samplingInfo=sampling_info,
+        )
 
     @property
     def extra_event_fields_and_properties(self) -> list[str]:
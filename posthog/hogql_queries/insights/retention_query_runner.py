@@ -13,11 +13,11 @@ from posthog.constants import (
 )
 from posthog.hogql import ast
 from posthog.hogql.constants import LimitContext
-from posthog.hogql.printer import to_printed_hogql
 from posthog.hogql.property import entity_to_expr
 from posthog.hogql.query import execute_hogql_query
 from posthog.models.action.action import Action
 from posthog.hogql.timings import HogQLTimings
+from posthog.hogql_queries.insights.auto_sampling import AutoSamplingMixin
 from posthog.hogql_queries.query_runner import QueryRunner
 from posthog.hogql_queries.utils.query_date_range import QueryDateRangeWithIntervals
 from posthog.models import Team
@@ -44,7 +44,7 @@ DEFAULT_ENTITY = RetentionEntity(
 )
 
 
-class RetentionQueryRunner(QueryRunner):
+class RetentionQueryRunner(AutoSamplingMixin, QueryRunner):
     query: RetentionQuery
     response: RetentionQueryResponse
     cached_response: CachedRetentionQueryResponse
@@ -85,6 +85,9 @@ class RetentionQueryRunner(QueryRunner):
             ]
         )
 
+    def auto_sampling_events(self) -> list[Optional[str]]:
+        return self._get_events_for_entity(self.target_entity) + self._get_events_for_entity(self.returning_entity)
+
     def _get_events_for_entity(self, entity: RetentionEntity) -> list[str | None]:
         if entity.type == EntityType.ACTIONS and entity.id:
             action = Action.objects.get(pk=int(entity.id), team__project_id=self.team.project_id)
@@ -398,9 +401,8 @@ class RetentionQueryRunner(QueryRunner):
         return date
 
     def calculate(self) -> RetentionQueryResponse:
+        sampling_info = self.apply_auto_sampling()
         query = self.to_query()
-        hogql = to_printed_hogql(query, self.team)
-
         response = execute_hogql_query(
             query_type="RetentionQuery",
             query=query,
@@ -429,7 +431,13 @@ class RetentionQueryRunner(QueryRunner):
             for first_interval in range(self.query_date_range.total_intervals)
         ]
 
-        return RetentionQueryResponse(results=results, timings=response.timings, hogql=hogql, modifiers=self.modifiers)
+        return RetentionQueryResponse(
+            results=results,
+            timings=response.timings,
+            hogql=response.hogql,
+            modifiers=self.modifiers,
+            samplingInfo=sampling_info,
+        )
 
     def to_actors_query(self, interval: Optional[int] = None) -> ast.SelectQuery:
         with self.timings.measure("retention_query"):
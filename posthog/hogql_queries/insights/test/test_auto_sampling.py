@@ -0,0 +1,133 @@
+from typing import Optional
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from freezegun import freeze_time
+
+from posthog.hogql.printer import to_printed_hogql
+from posthog.hogql_queries.insights.auto_sampling import ESTIMATE_SAMPLE_DENOMINATOR
+from posthog.hogql_queries.insights.paths_query_runner import PathsQueryRunner
+from posthog.hogql_queries.insights.trends.trends_query_runner import TrendsQueryRunner
+from posthog.schema import EventsNode, HogQLQueryResponse, InsightDateRange, IntervalType, TrendsQuery
+from posthog.test.base import APIBaseTest, ClickhouseTestMixin, _create_event, _create_person, flush_persons_and_events
+
+
+class TestAutoSampling(ClickhouseTestMixin, APIBaseTest):
+    def setUp(self):
+        super().setUp()
+        # Estimated event counts are cached per team and date range
+        cache.clear()
+
+    def _create_pageviews(self):
+        for index in range(30):
+            _create_person(team_id=self.team.pk, distinct_ids=[f"person_{index}"])
+            _create_event(
+                team=self.team,
+                event="$pageview",
+                distinct_id=f"person_{index}",
+                timestamp="2020-01-11T12:00:00Z",
+                properties={"$current_url": "/"},
+            )
+            _create_event(
+                team=self.team,
+                event="$pageview",
+                distinct_id=f"person_{index}",
+                timestamp="2020-01-11T12:01:00Z",
+                properties={"$current_url": "/about"},
+            )
+        flush_persons_and_events()
+
+    def _estimate_event_count(self, event_count: int) -> MagicMock:
+        # The team's events are counted in a sample, so a large team is one whose sample holds many events
+        return MagicMock(return_value=HogQLQueryResponse(results=[(event_count // ESTIMATE_SAMPLE_DENOMINATOR,)]))
+
+    def _trends_runner(self, sampling_factor: Optional[float] = None) -> TrendsQueryRunner:
+        return TrendsQueryRunner(
+            query=TrendsQuery(
+                dateRange=InsightDateRange(date_from="2020-01-01", date_to="2020-01-31"),
+                interval=IntervalType.MONTH,
+                series=[EventsNode(event="$pageview")],
+                autoSampling=True,
+                samplingFactor=sampling_factor,
+            ),
+            team=self.team,
+        )
+
+    def test_trends_on_large_team_are_sampled(self):
+        self._create_pageviews()
+
+        with patch(
+            "posthog.hogql_queries.insights.auto_sampling.execute_hogql_query", self._estimate_event_count(500_000_000)
+        ) as estimate:
+            response = self._trends_runner().calculate()
+
+        assert response.samplingInfo is not None
+        assert response.samplingInfo.samplingFactor == 0.1
+        assert response.samplingInfo.estimatedEventCount == 500_000_000
+        assert "SAMPLE 0.1" in (response.hogql or "")
+        # Only the query's events are counted
+        assert "'$pageview'" in to_printed_hogql(estimate.call_args.kwargs["query"], self.team)
+        # 10% of 60 is 6, so check we're adjusting the results back up
+        assert 10 < response.results[0]["count"] < 60
+
+    def test_trends_sampling_factor_fits_event_budget(self):
+        self._create_pageviews()
+
+        with patch(
+            "posthog.hogql_queries.insights.auto_sampling.execute_hogql_query", self._estimate_event_count(4_000_000_000)
+        ):
+            response = self._trends_runner().calculate()
+
+        assert response.samplingInfo is not None
+        assert response.samplingInfo.samplingFactor == 0.01
+        assert "SAMPLE 0.01" in (response.hogql or "")
+
+    def test_trends_on_small_team_are_not_sampled(self):
+        self._create_pageviews()
+
+        with patch(
+            "posthog.hogql_queries.insights.auto_sampling.execute_hogql_query", self._estimate_event_count(60_000)
+        ):
+            response = self._trends_runner().calculate()
+
+        assert response.samplingInfo is None
+        assert "SAMPLE" not in (response.hogql or "")
+        assert response.results[0]["count"] == 60
+
+    def test_trends_sampling_factor_set_by_user_takes_precedence(self):
+        self._create_pageviews()
+
+        with patch(
+            "posthog.hogql_queries.insights.auto_sampling.execute_hogql_query", self._estimate_event_count(500_000_000)
+        ) as estimate:
+            response = self._trends_runner(sampling_factor=0.5).calculate()
+
+        estimate.assert_not_called()
+        assert response.samplingInfo is None
+        assert "SAMPLE 0.5" in (response.hogql or "")
+
+    def test_paths_on_large_team_are_sampled(self):
+        self._create_pageviews()
+
+        with (
+            freeze_time("2020-01-15T12:00:00Z"),
+            patch(
+                "posthog.hogql_queries.insights.auto_sampling.execute_hogql_query",
+                self._estimate_event_count(4_000_000_000),
+            ) as estimate,
+        ):
+            response = PathsQueryRunner(
+                query={
+                    "kind": "PathsQuery",
+                    "dateRange": {"date_from": "-7d"},
+                    "pathsFilter": {"includeEventTypes": ["$pageview"]},
+                    "autoSampling": True,
+                },
+                team=self.team,
+            ).calculate()
+
+        assert response.samplingInfo is not None
+        assert response.samplingInfo.samplingFactor == 0.01
+        assert response.samplingInfo.estimatedEventCount == 4_000_000_000
+        assert "SAMPLE 0.01" in (response.hogql or "")
+        assert "'$pageview'" in to_printed_hogql(estimate.call_args.kwargs["query"], self.team)
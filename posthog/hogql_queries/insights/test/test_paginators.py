@@ -1,6 +1,8 @@
+from datetime import datetime, UTC
 from typing import cast
 from unittest.mock import MagicMock, patch
 
+from posthog.hogql import ast
 from posthog.hogql.ast import SelectQuery
 from posthog.hogql.constants import (
     LimitContext,
@@ -8,12 +10,21 @@ from posthog.hogql.constants import (
     get_max_limit_for_context,
     MAX_SELECT_RETURNED_ROWS,
 )
+from posthog.hogql.errors import QueryError
 from posthog.hogql.parser import parse_select
-from posthog.hogql_queries.insights.paginators import HogQLHasMorePaginator
+from posthog.hogql.printer import to_printed_hogql
+from posthog.hogql_queries.events_query_runner import EventsQueryRunner
+from posthog.hogql_queries.insights.paginators import (
+    HogQLCursorPaginator,
+    HogQLHasMorePaginator,
+    decode_cursor,
+    encode_cursor,
+)
 from posthog.hogql_queries.actors_query_runner import ActorsQueryRunner
 from posthog.models.utils import UUIDT
 from posthog.schema import (
     ActorsQuery,
+    EventsQuery,
     PersonPropertyFilter,
     PropertyOperator,
 )
@@ -221,3 +232,74 @@ class TestHogQLHasMorePaginator(ClickhouseTestMixin, APIBaseTest):
         )
         mock_execute_hogql_query.assert_called_once()
         self.assertEqual(mock_execute_hogql_query.call_args.kwargs["limit_context"], limit_context)
+
+
+class TestHogQLCursorPaginator(ClickhouseTestMixin, APIBaseTest):
+    def setUp(self):
+        super().setUp()
+        for index in range(10):
+            _create_event(
+                distinct_id=f"id-{index}",
+                event=f"clicky-{index}",
+                team=self.team,
+                timestamp=datetime(2024, 1, 1, index, tzinfo=UTC),
+            )
+        flush_persons_and_events()
+
+    def _events_page(self, cursor: str | None = None, offset: int | None = None):
+        runner = EventsQueryRunner(
+            team=self.team,
+            query=EventsQuery(select=["event", "timestamp"], after="2023-12-31", limit=3, cursor=cursor, offset=offset),
+        )
+        return runner.calculate()
+
+    def test_events_query_pages_through_all_rows(self):
+        events: list[str] = []
+        cursor = None
+        for _ in range(4):
+            response = self._events_page(cursor=cursor)
+            assert response.columns == ["event", "timestamp"]
+            events.extend(row[0] for row in response.results)
+            cursor = response.nextCursor
+            assert (cursor is not None) == response.hasMore
+
+        assert events == [f"clicky-{index}" for index in reversed(range(10))]
+        assert cursor is None
+
+    def test_events_query_first_page_with_offset(self):
+        response = self._events_page(offset=3)
+        assert [row[0] for row in response.results] == ["clicky-6", "clicky-5", "clicky-4"]
+
+        # The cursor continues after the page it came from, and the offset is ignored
+        response = self._events_page(cursor=response.nextCursor, offset=3)
+        assert [row[0] for row in response.results] == ["clicky-3", "clicky-2", "clicky-1"]
+
+    def test_cursor_is_added_to_where(self):
+        paginator = HogQLCursorPaginator(
+            order_by=[
+                ast.OrderExpr(expr=ast.Field(chain=["timestamp"]), order="DESC"),
+                ast.OrderExpr(expr=ast.Field(chain=["uuid"]), order="DESC"),
+            ],
+            cursor=encode_cursor(["2024-01-01 00:00:00", "some-uuid"]),
+            limit=10,
+        )
+        query = paginator.paginate(cast(SelectQuery, parse_select("SELECT event FROM events WHERE event = 'a'")))
+
+        assert to_printed_hogql(query, self.team) == (
+            "SELECT\n    event,\n    timestamp AS __cursor_0,\n    uuid AS __cursor_1\nFROM\n    events\n"
+            "WHERE\n    and(equals(event, 'a'), lessOrEquals(timestamp, '2024-01-01 00:00:00'), "
+            "less(tuple(timestamp, uuid), tuple('2024-01-01 00:00:00', 'some-uuid')))\n"
+            "ORDER BY\n    timestamp DESC,\n    uuid DESC\nLIMIT 11\nOFFSET 0"
+        )
+
+    def test_encode_decode_cursor(self):
+        values = [datetime(2024, 1, 1, tzinfo=UTC), UUIDT(), "value", 1]
+        assert decode_cursor(encode_cursor(values)) == values
+
+        with self.assertRaises(QueryError):
+            decode_cursor("not a cursor")
+        with self.assertRaises(QueryError):
+            HogQLCursorPaginator(
+                order_by=[ast.OrderExpr(expr=ast.Field(chain=["timestamp"]), order="DESC")],
+                cursor=encode_cursor(["a", "b"]),
+            )
@@ -2754,6 +2754,38 @@ class TestTrendsQueryRunner(ClickhouseTestMixin, APIBaseTest):
         # 10% of 30 is 3, so check we're adjusting the results back up
         assert response.results[0]["aggregated_value"] > 5 and response.results[0]["aggregated_value"] < 30
 
+    @patch("posthog.hogql_queries.insights.auto_sampling.AutoSamplingMixin._get_or_estimate_event_count")
+    def test_auto_sampling(self, patch_estimate_event_count):
+        for value in list(range(30)):
+            _create_event(
+                team=self.team,
+                event="$pageview",
+                distinct_id=f"person_{value}",
+                timestamp="2020-01-11T12:00:00Z",
+            )
+
+        # Few enough events to not need sampling
+        patch_estimate_event_count.return_value = 30
+        runner = self._create_query_runner(
+            "2020-01-01", "2020-01-31", IntervalType.MONTH, [EventsNode(event="$pageview")]
+        )
+        runner.query.autoSampling = True
+        response = runner.calculate()
+        assert response.samplingInfo is None
+        assert response.results[0]["count"] == 30
+
+        patch_estimate_event_count.return_value = 100_000_000
+        runner = self._create_query_runner(
+            "2020-01-01", "2020-01-31", IntervalType.MONTH, [EventsNode(event="$pageview")]
+        )
+        runner.query.autoSampling = True
+        response = runner.calculate()
+        assert response.samplingInfo is not None
+        assert response.samplingInfo.samplingFactor == 0.1
+        assert response.samplingInfo.estimatedEventCount == 100_000_000
+        # 10% of 30 is 3, so check we're adjusting the results back up
+        assert response.results[0]["count"] > 5 and response.results[0]["count"] < 30
+
     def test_trends_multiple_event_breakdowns(self):
         self._create_test_events()
         flush_persons_and_events()
@@ -17,9 +17,9 @@ from posthog.caching.insights_api import (
 from posthog.clickhouse import query_tagging
 from posthog.hogql import ast
 from posthog.hogql.constants import MAX_SELECT_RETURNED_ROWS, LimitContext
-from posthog.hogql.printer import to_printed_hogql
-from posthog.hogql.query import execute_hogql_query
+from posthog.hogql.query import CompiledHogQLQuery, compile_hogql_query, execute_hogql_query
 from posthog.hogql.timings import HogQLTimings
+from posthog.hogql_queries.insights.auto_sampling import AutoSamplingMixin, get_series_events
 from posthog.hogql_queries.insights.trends.breakdown import (
     BREAKDOWN_NULL_DISPLAY,
     BREAKDOWN_NULL_STRING_LABEL,
@@ -46,6 +46,7 @@ from posthog.models.property_definition import PropertyDefinition
 from posthog.queries.util import correct_result_for_sampling
 from posthog.schema import (
     ActionsNode,
+    AutoSamplingInfo,
     BreakdownItem,
     BreakdownType,
     CachedTrendsQueryResponse,
@@ -73,7 +74,7 @@ from posthog.utils import format_label_date, multisort
 from posthog.warehouse.models.util import get_view_or_table_by_name
 
 
-class TrendsQueryRunner(QueryRunner):
+class TrendsQueryRunner(AutoSamplingMixin, QueryRunner):
     query: TrendsQuery
     response: TrendsQueryResponse
     cached_response: CachedTrendsQueryResponse
@@ -110,6 +111,22 @@ class TrendsQueryRunner(QueryRunner):
 
         return BASE_MINIMUM_INSIGHT_REFRESH_INTERVAL
 
+    def can_auto_sample(self) -> bool:
+        # Data warehouse tables can't be sampled
+        return not any(isinstance(series, DataWarehouseNode) for series in self.query.series)
+
+    def auto_sampling_events(self) -> list[Optional[str]]:
+        return get_series_events(self.query.series, self.team)
+
+    def apply_auto_sampling(self) -> Optional[AutoSamplingInfo]:
+        sampling_info = super().apply_auto_sampling()
+        if sampling_info is not None:
+            # Breaking down by multiple cohorts queries copies of the query
+            for series in self.series:
+                if series.overriden_query is not None:
+                    series.overriden_query.samplingFactor = sampling_info.samplingFactor
+        return sampling_info
+
     def to_query(self) -> ast.SelectSetQuery:
         return ast.SelectSetQuery.create_from_queries(self.to_queries(), "UNION ALL")
 
@@ -292,18 +309,22 @@ class TrendsQueryRunner(QueryRunner):
         )
 
     def calculate(self):
+        sampling_info = self.apply_auto_sampling()
         queries = self.to_queries()
 
-        if len(queries) == 0:
-            response_hogql = ""
-        else:
-            if len(queries) == 1:
-                response_hogql_query = queries[0]
-            else:
-                response_hogql_query = ast.SelectSetQuery.create_from_queries(queries, "UNION ALL")
-
-            with self.timings.measure("printing_hogql_for_response"):
-                response_hogql = to_printed_hogql(response_hogql_query, self.team, self.modifiers)
+        # Each series is resolved and printed once, for both the HogQL of the response and running it
+        series_timings = [self.timings.clone_for_subquery(index) for index in range(len(queries))]
+        compiled_queries = [
+            compile_hogql_query(
+                query,
+                team=self.team,
+                timings=series_timings[index],
+                modifiers=self.modifiers,
+                limit_context=self.limit_context,
+            )
+            for index, query in enumerate(queries)
+        ]
+        response_hogql = "\nUNION ALL\n".join(compiled_query.hogql.strip() for compiled_query in compiled_queries)
 
         res_matrix: list[list[Any] | Any | None] = [None] * len(queries)
         timings_matrix: list[list[QueryTiming] | None] = [None] * (2 + len(queries))
@@ -312,7 +333,7 @@ class TrendsQueryRunner(QueryRunner):
 
         def run(
             index: int,
-            query: ast.SelectQuery | ast.SelectSetQuery,
+            query: CompiledHogQLQuery,
             timings: HogQLTimings,
             is_parallel: bool,
             query_tags: Optional[dict] = None,
@@ -328,8 +349,6 @@ class TrendsQueryRunner(QueryRunner):
                     query=query,
                     team=self.team,
                     timings=timings,
-                    modifiers=self.modifiers,
-                    limit_context=self.limit_context,
                 )
 
                 timings_matrix[index + 1] = response.timings
@@ -352,21 +371,21 @@ class TrendsQueryRunner(QueryRunner):
             # This exists so that we're not spawning threads during unit tests. We can't do
             # this right now due to the lack of multithreaded support of Django
             if len(queries) == 1 or settings.IN_UNIT_TESTING:
-                for index, query in enumerate(queries):
-                    run(index, query, self.timings.clone_for_subquery(index), False)
+                for index, compiled_query in enumerate(compiled_queries):
+                    run(index, compiled_query, series_timings[index], False)
             else:
                 jobs = [
                     threading.Thread(
                         target=run,
                         args=(
                             index,
-                            query,
-                            self.timings.clone_for_subquery(index),
+                            compiled_query,
+                            series_timings[index],
                             True,
                             query_tagging.get_query_tags(),
                         ),
                     )
-                    for index, query in enumerate(queries)
+                    for index, compiled_query in enumerate(compiled_queries)
                 ]
                 [j.start() for j in jobs]  # type:ignore
                 [j.join() for j in jobs]  # type:ignore
@@ -427,6 +446,7 @@ class TrendsQueryRunner(QueryRunner):
             hogql=response_hogql,
             modifiers=self.modifiers,
             error=". ".join(debug_errors),
+            samplingInfo=sampling_info,
         )
 
     def build_series_response(self, response: HogQLQueryResponse, series: SeriesWithExtras, series_count: int):
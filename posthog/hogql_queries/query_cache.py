@@ -1,13 +1,112 @@
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
 from datetime import datetime, UTC
 from typing import Optional
 
+from dateutil.parser import isoparse
 from django.conf import settings
 from django.core.cache import cache
 
 from posthog import redis
 from posthog.cache_utils import OrjsonJsonSerializer
+from posthog.caching import query_cache_codec
+from posthog.schema import QueryStatus
 from posthog.utils import get_safe_cache
 
+# Cached responses start with these fields, so that cache hits can be served without decoding the whole payload
+CACHED_RESPONSE_HEADER_FIELDS = ("is_cached", "query_status", "last_refresh", "calculation_trigger")
+CACHED_RESPONSE_HEADER_PREFIX = b'{"is_cached":false,"query_status":null'
+CACHED_RESPONSE_HEADER_REGEX = re.compile(
+    re.escape(CACHED_RESPONSE_HEADER_PREFIX) + rb',"last_refresh":"([^"\\]+)","calculation_trigger":(null|"[^"\\]*"),'
+)
+
+# Cached responses read ahead of time by cache key, e.g. for all tiles of a dashboard in one round-trip
+_prefetched_cache_data: ContextVar[Optional[dict[str, Optional[bytes]]]] = ContextVar(
+    "prefetched_cache_data", default=None
+)
+
+
+@contextmanager
+def prefetched_cache_data(data: dict[str, Optional[bytes]]) -> Iterator[None]:
+    """
+    Makes `QueryCacheManager` read the given cache keys from `data` instead of the cache. Keys missing from `data` are
+    still read from the cache.
+    """
+    token = _prefetched_cache_data.set(data)
+    try:
+        yield
+    finally:
+        _prefetched_cache_data.reset(token)
+
+
+@dataclass
+class RawCachedResponse:
+    """
+    A cached query response which is kept as the bytes it was cached as. Only the envelope fields at the start of the
+    payload are read and patched, which makes serving it about as cheap as reading it from the cache.
+
+    With the query cache codec, the envelope is still written as plain JSON, followed by the encoded rest of the
+    response. Reading the envelope stays cheap, but serving the response converts the rest to JSON.
+    """
+
+    data: bytes
+    last_refresh: datetime
+    calculation_trigger: Optional[str]
+    header_length: int
+    query_status: Optional[QueryStatus] = None
+
+    @classmethod
+    def from_cache_data(cls, data: bytes) -> Optional["RawCachedResponse"]:
+        """
+        Returns None if the cached payload doesn't start with the expected header, e.g. if it was cached before
+        the header was introduced.
+        """
+        match = CACHED_RESPONSE_HEADER_REGEX.match(data)
+        if match is None:
+            return None
+        body = data[match.end() :]
+        if query_cache_codec.is_encoded(body) and not query_cache_codec.is_supported(body):
+            return None
+        last_refresh, calculation_trigger = match.groups()
+        return cls(
+            data=data,
+            last_refresh=isoparse(last_refresh.decode()),
+            calculation_trigger=OrjsonJsonSerializer({}).loads(calculation_trigger),
+            header_length=match.end(),
+        )
+
+    @property
+    def content(self) -> bytes:
+        query_status = (
+            OrjsonJsonSerializer({}).dumps(self.query_status.model_dump(by_alias=True))
+            if self.query_status is not None
+            else b"null"
+        )
+        header = self.data[len(CACHED_RESPONSE_HEADER_PREFIX) : self.header_length]
+        body = self.data[self.header_length :]
+        if query_cache_codec.is_encoded(body):
+            # The rest of the response is encoded as an object of its own, so its opening brace is dropped
+            body = query_cache_codec.to_json(body)[1:]
+        return b'{"is_cached":true,"query_status":' + query_status + header + body
+
+
+def _serialize_cache_data(response: dict) -> bytes:
+    serializer = OrjsonJsonSerializer({})
+    if not settings.USE_QUERY_CACHE_CODEC:
+        return serializer.dumps(response)
+    if "is_cached" not in response:
+        return query_cache_codec.encode(response)
+    # The envelope stays plain JSON ahead of the encoded rest, see `RawCachedResponse`
+    rest = {field: value for field, value in response.items() if field not in CACHED_RESPONSE_HEADER_FIELDS}
+    encoded_rest = query_cache_codec.encode(rest) if rest else b""
+    if not query_cache_codec.is_encoded(encoded_rest):
+        return serializer.dumps(response)
+    header = serializer.dumps({field: response[field] for field in CACHED_RESPONSE_HEADER_FIELDS})
+    return header[:-1] + b"," + encoded_rest
+
 
 class QueryCacheManager:
     def __init__(
@@ -29,7 +128,7 @@ class QueryCacheManager:
         return f"{self.insight_id}:{self.dashboard_id or ''}"
 
     @staticmethod
-    def get_stale_insights(*, team_id: int, limit: Optional[int] = None) -> list[str]:
+    def get_stale_insights(*, team_id: int, limit: Optional[int] = None, until: Optional[datetime] = None) -> list[str]:
         """
         Use redis sorted set to get stale insights. We sort by the timestamp and get the insights that are
         stale compared to the current time.
@@ -44,8 +143,10 @@ class QueryCacheManager:
         additional filters (which makes this dashboard insight the same as the single one). This is easily mitigated by
         the fact we should have the very same cache key for these and we calculate the insights in sequence. Thus, the
         first calculation to refresh it will refresh all of them.
+
+        Pass `until` to also get insights which will only go stale by then.
         """
-        current_time = datetime.now(UTC)
+        current_time = until or datetime.now(UTC)
         insights = redis.get_client().zrevrangebyscore(
             f"cache_timestamps:{team_id}",
             min="-inf",
@@ -55,6 +156,32 @@ class QueryCacheManager:
         )
         return [insight.decode("utf-8") for insight in insights]
 
+    @staticmethod
+    def get_target_ages(*, team_id: int, identifiers: list[str]) -> dict[str, datetime]:
+        """
+        Returns when each of the given insight + dashboard combinations goes stale, for those which have a target age.
+        """
+        pipeline = redis.get_client().pipeline(transaction=False)
+        for identifier in identifiers:
+            pipeline.zscore(f"cache_timestamps:{team_id}", identifier)
+        return {
+            identifier: datetime.fromtimestamp(score, UTC)
+            for identifier, score in zip(identifiers, pipeline.execute())
+            if score is not None
+        }
+
+    @staticmethod
+    def get_calculation_durations(cache_keys: list[str]) -> dict[str, float]:
+        """
+        Returns how many seconds the last calculation of each cache key took, for those calculated recently.
+        """
+        if not cache_keys:
+            return {}
+        durations = redis.get_client().mget([f"cache_calculation_duration:{cache_key}" for cache_key in cache_keys])
+        return {
+            cache_key: float(duration) for cache_key, duration in zip(cache_keys, durations) if duration is not None
+        }
+
     @staticmethod
     def clean_up_stale_insights(*, team_id: int, threshold: datetime) -> None:
         """
@@ -81,9 +208,25 @@ class QueryCacheManager:
 
         self.redis_client.zrem(f"cache_timestamps:{self.team_id}", self.identifier)
 
-    def set_cache_data(self, *, response: dict, target_age: Optional[datetime]) -> None:
-        fresh_response_serialized = OrjsonJsonSerializer({}).dumps(response)
+    def set_cache_data(
+        self, *, response: dict, target_age: Optional[datetime], calculation_duration: Optional[float] = None
+    ) -> None:
+        if "is_cached" in response:
+            # Moves the header fields to the start, see `RawCachedResponse`
+            response = {field: response.get(field) for field in CACHED_RESPONSE_HEADER_FIELDS} | response
+        fresh_response_serialized = _serialize_cache_data(response)
         cache.set(self.cache_key, fresh_response_serialized, settings.CACHED_RESULTS_TTL)
+        prefetched = _prefetched_cache_data.get()
+        if prefetched is not None:
+            # Later reads of the key have to see what was just cached
+            prefetched.pop(self.cache_key, None)
+        if calculation_duration is not None:
+            # Lets cache warming estimate how expensive keeping the result fresh is
+            self.redis_client.set(
+                f"cache_calculation_duration:{self.cache_key}",
+                round(calculation_duration, 3),
+                ex=settings.CACHED_RESULTS_TTL,
+            )
 
         if target_age:
             self.update_target_age(target_age)
@@ -91,8 +234,42 @@ class QueryCacheManager:
             self.remove_last_refresh()
 
     def get_cache_data(self) -> Optional[dict]:
+        return self.decode_cache_data(self.get_raw_cache_data())
+
+    def get_raw_cache_data(self) -> Optional[bytes]:
+        prefetched = _prefetched_cache_data.get()
+        if prefetched is not None and self.cache_key in prefetched:
+            return prefetched[self.cache_key] or None
+
         cached_response_bytes: Optional[bytes] = get_safe_cache(self.cache_key)
         if not cached_response_bytes:
             return None
 
-        return OrjsonJsonSerializer({}).loads(cached_response_bytes)
+        return cached_response_bytes
+
+    @staticmethod
+    def get_many_raw_cache_data(cache_keys: list[str]) -> dict[str, Optional[bytes]]:
+        """
+        Reads many cache keys in one round-trip, for use with `prefetched_cache_data`. Keys which aren't cached are
+        None, and if the read fails nothing is returned, so that each key is read on its own instead.
+        """
+        try:
+            cached = cache.get_many(cache_keys)
+        except Exception:
+            return {}
+        return {cache_key: cached.get(cache_key) for cache_key in cache_keys}
+
+    @staticmethod
+    def decode_cache_data(cached_response_bytes: Optional[bytes]) -> Optional[dict]:
+        if not cached_response_bytes:
+            return None
+
+        try:
+            match = CACHED_RESPONSE_HEADER_REGEX.match(cached_response_bytes)
+            if match is not None and query_cache_codec.is_encoded(cached_response_bytes[match.end() :]):
+                header = OrjsonJsonSerializer({}).loads(cached_response_bytes[: match.end() - 1] + b"}")
+                return header | query_cache_codec.decode(cached_response_bytes[match.end() :])
+            return query_cache_codec.decode(cached_response_bytes)
+        except query_cache_codec.QueryCacheCodecError:
+            # e.g. written by a newer codec version, so it's treated like a cache miss
+            return None
@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
 from datetime import UTC, datetime, timedelta
 from enum import StrEnum
-from typing import Any, Generic, Optional, TypeGuard, TypeVar, Union, cast
+from time import perf_counter
+from typing import Any, Generic, Literal, Optional, TypeGuard, TypeVar, Union, cast, overload
 
 import structlog
 from prometheus_client import Counter
@@ -18,7 +19,7 @@ from posthog.hogql.modifiers import create_default_modifiers_for_user
 from posthog.hogql.printer import print_ast
 from posthog.hogql.query import create_default_modifiers_for_team
 from posthog.hogql.timings import HogQLTimings
-from posthog.hogql_queries.query_cache import QueryCacheManager
+from posthog.hogql_queries.query_cache import QueryCacheManager, RawCachedResponse
 from posthog.metrics import LABEL_TEAM_ID
 from posthog.models import Team, User
 from posthog.schema import (
@@ -529,7 +530,9 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
 
     def get_async_query_status(self, *, cache_key: str) -> Optional[QueryStatus]:
         try:
-            query_status = get_query_status(team_id=self.team.pk, query_id=self.query_id or cache_key)
+            query_status = get_query_status(
+                team_id=self.team.pk, query_id=self.query_id or cache_key, with_results=False
+            )
             if query_status.complete:
                 return None
             return query_status
@@ -543,12 +546,43 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
             return
         QUERY_CACHE_HIT_COUNTER.labels(team_id=self.team.pk, cache_hit=hit, trigger=trigger).inc()
 
+    def needs_blocking_calculation(self, execution_mode: ExecutionMode, cached_response_bytes: Optional[bytes]) -> bool:
+        """
+        Whether `run` would calculate synchronously given what's cached, so that callers running many queries can
+        calculate those in parallel and serve the rest straight from the cache.
+        """
+        if execution_mode == ExecutionMode.CALCULATE_BLOCKING_ALWAYS:
+            return True
+        if execution_mode == ExecutionMode.RECENT_CACHE_CALCULATE_ASYNC_IF_STALE_AND_BLOCKING_ON_MISS:
+            return not cached_response_bytes
+        if execution_mode == ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE:
+            if not cached_response_bytes:
+                return True
+            raw_cached_response = RawCachedResponse.from_cache_data(cached_response_bytes)
+            # Payloads cached before the header was introduced are assumed to be stale
+            return raw_cached_response is None or self._is_stale(last_refresh=raw_cached_response.last_refresh)
+        return False
+
     def handle_cache_and_async_logic(
-        self, execution_mode: ExecutionMode, cache_manager: QueryCacheManager, user: Optional[User] = None
-    ) -> Optional[CR | CacheMissResponse]:
+        self,
+        execution_mode: ExecutionMode,
+        cache_manager: QueryCacheManager,
+        user: Optional[User] = None,
+        allow_raw_cached_response: bool = False,
+    ) -> Optional[CR | CacheMissResponse | RawCachedResponse]:
         CachedResponse: type[CR] = self.cached_response_type
         cached_response: CR | CacheMissResponse
-        cached_response_candidate = cache_manager.get_cache_data()
+        cached_response_bytes = cache_manager.get_raw_cache_data()
+
+        if allow_raw_cached_response and cached_response_bytes is not None:
+            # Fast path for fresh results: skip decoding and validating the payload, only patch its envelope
+            raw_cached_response = RawCachedResponse.from_cache_data(cached_response_bytes)
+            if raw_cached_response is not None and not self._is_stale(last_refresh=raw_cached_response.last_refresh):
+                self.count_query_cache_hit(hit="hit", trigger=raw_cached_response.calculation_trigger or "")
+                raw_cached_response.query_status = self.get_async_query_status(cache_key=cache_manager.cache_key)
+                return raw_cached_response
+
+        cached_response_candidate = cache_manager.decode_cache_data(cached_response_bytes)
 
         if self.is_cached_response(cached_response_candidate):
             cached_response_candidate["is_cached"] = True
@@ -615,6 +649,29 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
         # Nothing useful out of cache, nor async query status
         return None
 
+    @overload
+    def run(
+        self,
+        execution_mode: ExecutionMode = ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE,
+        user: Optional[User] = None,
+        query_id: Optional[str] = None,
+        insight_id: Optional[int] = None,
+        dashboard_id: Optional[int] = None,
+        allow_raw_cached_response: Literal[False] = False,
+    ) -> CR | CacheMissResponse | QueryStatusResponse: ...
+
+    @overload
+    def run(
+        self,
+        execution_mode: ExecutionMode = ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE,
+        user: Optional[User] = None,
+        query_id: Optional[str] = None,
+        insight_id: Optional[int] = None,
+        dashboard_id: Optional[int] = None,
+        *,
+        allow_raw_cached_response: bool,
+    ) -> CR | CacheMissResponse | QueryStatusResponse | RawCachedResponse: ...
+
     def run(
         self,
         execution_mode: ExecutionMode = ExecutionMode.RECENT_CACHE_CALCULATE_BLOCKING_IF_STALE,
@@ -622,7 +679,12 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
         query_id: Optional[str] = None,
         insight_id: Optional[int] = None,
         dashboard_id: Optional[int] = None,
-    ) -> CR | CacheMissResponse | QueryStatusResponse:
+        allow_raw_cached_response: bool = False,
+    ) -> CR | CacheMissResponse | QueryStatusResponse | RawCachedResponse:
+        """
+        With `allow_raw_cached_response`, fresh cache hits are returned as `RawCachedResponse` bytes instead of a
+        response model, for callers which send the response as JSON without looking into it.
+        """
         cache_key = self.get_cache_key()
 
         tag_queries(cache_key=cache_key)
@@ -655,7 +717,10 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
         elif execution_mode != ExecutionMode.CALCULATE_BLOCKING_ALWAYS:
             # Let's look in the cache first
             results = self.handle_cache_and_async_logic(
-                execution_mode=execution_mode, cache_manager=cache_manager, user=user
+                execution_mode=execution_mode,
+                cache_manager=cache_manager,
+                user=user,
+                allow_raw_cached_response=allow_raw_cached_response,
             )
             if results is not None:
                 return results
@@ -669,6 +734,7 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
             self.modifiers = create_default_modifiers_for_user(user, self.team, self.modifiers)
             self.modifiers.useMaterializedViews = True
 
+        calculation_start = perf_counter()
         fresh_response_dict = {
             **self.calculate().model_dump(),
             "is_cached": False,
@@ -691,6 +757,7 @@ class QueryRunner(ABC, Generic[Q, R, CR]):
                 # Example: Not for super quickly calculated insights
                 # Set target_age to None in that case
                 target_age=target_age,
+                calculation_duration=perf_counter() - calculation_start,
             )
             QUERY_CACHE_WRITE_COUNTER.labels(team_id=self.team.pk).inc()
 
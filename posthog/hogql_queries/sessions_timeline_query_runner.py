@@ -1,6 +1,5 @@
 import json
 from typing import cast
-from posthog.api.element import ElementSerializer
 
 
 from posthog.hogql import ast
@@ -8,7 +7,7 @@ from posthog.hogql.parser import parse_select
 from posthog.hogql.query import execute_hogql_query
 from posthog.hogql.timings import HogQLTimings
 from posthog.hogql_queries.query_runner import QueryRunner
-from posthog.models.element.element import chain_to_elements
+from posthog.models.element.element import chain_to_element_dicts
 from posthog.schema import (
     EventType,
     SessionsTimelineQuery,
@@ -167,7 +166,7 @@ class SessionsTimelineQueryRunner(QueryRunner):
                     timestamp=timestamp_parsed.isoformat(),
                     properties=json.loads(properties_raw),
                     elements_chain=elements_chain or None,
-                    elements=ElementSerializer(chain_to_elements(elements_chain), many=True).data,
+                    elements=chain_to_element_dicts(elements_chain),
                 )
             )
         timeline_entries = list(reversed(timeline_entries_map.values()))
@@ -4,6 +4,7 @@ from freezegun import freeze_time
 from datetime import datetime
 from posthog.hogql import ast
 from posthog.hogql.ast import CompareOperationOp
+from posthog.hogql.constants import LimitContext
 from posthog.hogql_queries.events_query_runner import EventsQueryRunner
 from posthog.models import Person, Team
 from posthog.models.organization import Organization
@@ -147,6 +148,27 @@ class TestEventsQueryRunner(ClickhouseTestMixin, APIBaseTest):
         right_expr = cast(ast.Tuple, where_expr.right)
         self.assertEqual(right_expr.exprs, [])
 
+    def test_person_column_loads_display_properties(self):
+        _create_person(
+            team_id=self.team.pk,
+            distinct_ids=["id1"],
+            properties={"email": "a@posthog.com", "name": "A", "plan": "free"},
+        )
+        _create_event(team=self.team, event="$pageview", distinct_id="id1", timestamp="2020-01-11T12:00:00Z")
+        flush_persons_and_events()
+
+        with freeze_time("2020-01-11T12:01:00"):
+            query = EventsQuery(kind="EventsQuery", after="-24h", select=["person", "event"])
+
+            response = EventsQueryRunner(query=query, team=self.team).run()
+            assert isinstance(response, CachedEventsQueryResponse)
+            assert response.results[0][0]["properties"] == {"email": "a@posthog.com", "name": "A"}
+
+            # Exports include all properties of the person
+            response = EventsQueryRunner(query=query, team=self.team, limit_context=LimitContext.EXPORT).run()
+            assert isinstance(response, CachedEventsQueryResponse)
+            assert response.results[0][0]["properties"] == {"email": "a@posthog.com", "name": "A", "plan": "free"}
+
     def test_test_account_filters(self):
         self.team.test_account_filters = [
             {
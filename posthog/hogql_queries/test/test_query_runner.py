@@ -3,10 +3,14 @@ from typing import Any, Literal, Optional
 from unittest import mock
 from zoneinfo import ZoneInfo
 
+import orjson
 from django.core.cache import cache
+from django.test import override_settings
 from freezegun import freeze_time
 from pydantic import BaseModel
 
+from posthog.caching import query_cache_codec
+from posthog.hogql_queries.query_cache import CACHED_RESPONSE_HEADER_REGEX, RawCachedResponse
 from posthog.hogql_queries.query_runner import ExecutionMode, QueryRunner
 from posthog.models.team.team import Team
 from posthog.schema import (
@@ -15,6 +19,7 @@ from posthog.schema import (
     HogQLQueryModifiers,
     MaterializationMode,
     PersonsOnEventsMode,
+    QueryStatus,
     TestBasicQueryResponse,
     TestCachedBasicQueryResponse,
 )
@@ -248,6 +253,85 @@ class TestQueryRunner(BaseTest):
             self.assertEqual(response.last_refresh.isoformat(), "2023-02-04T13:37:42+00:00")
             mock_on_commit.assert_called_once()
 
+    def test_raw_cached_response(self):
+        TestQueryRunner = self.setup_test_query_runner_class()
+
+        runner = TestQueryRunner(query={"some_attr": "bla"}, team=self.team)
+
+        with freeze_time(datetime(2023, 2, 4, 13, 37, 42)):
+            # returns fresh response if uncached
+            response = runner.run(allow_raw_cached_response=True)
+            self.assertIsInstance(response, TestCachedBasicQueryResponse)
+            self.assertEqual(response.is_cached, False)
+
+            # returns cached bytes afterwards, matching the cached response
+            raw_response = runner.run(allow_raw_cached_response=True)
+            self.assertIsInstance(raw_response, RawCachedResponse)
+            assert isinstance(raw_response, RawCachedResponse)
+            self.assertEqual(raw_response.last_refresh.isoformat(), "2023-02-04T13:37:42+00:00")
+            self.assertEqual(raw_response.calculation_trigger, None)
+
+            response = runner.run()
+            self.assertIsInstance(response, TestCachedBasicQueryResponse)
+            self.assertEqual(orjson.loads(raw_response.content), response.model_dump(mode="json", by_alias=True))
+            self.assertEqual(orjson.loads(raw_response.content)["is_cached"], True)
+
+        with freeze_time(datetime(2023, 2, 4, 13, 37 + 11, 42)):
+            # returns fresh response if stale
+            response = runner.run(allow_raw_cached_response=True)
+            self.assertIsInstance(response, TestCachedBasicQueryResponse)
+            self.assertEqual(response.is_cached, False)
+
+    @override_settings(USE_QUERY_CACHE_CODEC=True)
+    def test_cached_response_with_query_cache_codec(self):
+        TestQueryRunner = self.setup_test_query_runner_class()
+
+        runner = TestQueryRunner(query={"some_attr": "bla"}, team=self.team)
+
+        with (
+            freeze_time(datetime(2023, 2, 4, 13, 37, 42)),
+            mock.patch.object(
+                runner, "calculate", return_value=TestBasicQueryResponse(results=[list(range(10)), list(range(10))])
+            ),
+        ):
+            response = runner.run()
+            cached_bytes = cache.get(runner.get_cache_key())
+            # the envelope stays JSON ahead of the encoded rest
+            header = CACHED_RESPONSE_HEADER_REGEX.match(cached_bytes)
+            assert header is not None
+            self.assertTrue(query_cache_codec.is_encoded(cached_bytes[header.end() :]))
+
+            cached_response = runner.run()
+            self.assertIsInstance(cached_response, TestCachedBasicQueryResponse)
+            self.assertEqual(cached_response.is_cached, True)
+            self.assertEqual(cached_response.results, response.results)
+
+            # reading the envelope doesn't decode the rest
+            with mock.patch.object(query_cache_codec, "to_json", wraps=query_cache_codec.to_json) as mock_to_json:
+                raw_response = runner.run(allow_raw_cached_response=True)
+                assert isinstance(raw_response, RawCachedResponse)
+                self.assertEqual(raw_response.last_refresh.isoformat(), "2023-02-04T13:37:42+00:00")
+                mock_to_json.assert_not_called()
+
+            self.assertEqual(orjson.loads(raw_response.content), cached_response.model_dump(mode="json", by_alias=True))
+
+    def test_raw_cached_response_query_status(self):
+        raw_response = RawCachedResponse.from_cache_data(
+            b'{"is_cached":false,"query_status":null,"last_refresh":"2023-02-04T13:37:42Z",'
+            b'"calculation_trigger":"warming","results":[1,2]}'
+        )
+        assert raw_response is not None
+        self.assertEqual(raw_response.calculation_trigger, "warming")
+
+        raw_response.query_status = QueryStatus(id="abc", team_id=self.team.pk, complete=False)
+        content = orjson.loads(raw_response.content)
+        self.assertEqual(content["is_cached"], True)
+        self.assertEqual(content["query_status"]["id"], "abc")
+        self.assertEqual(content["results"], [1, 2])
+
+        # payloads cached without the header aren't passed through
+        self.assertIsNone(RawCachedResponse.from_cache_data(b'{"results":[1,2],"is_cached":false}'))
+
     def test_modifier_passthrough(self):
         try:
             from ee.clickhouse.materialized_columns.analyze import materialize
@@ -0,0 +1,244 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Sequence
+from itertools import islice
+from typing import Any, Optional
+from uuid import UUID
+
+import orjson
+from django.conf import settings
+from django.db import connection
+
+from posthog.models import Team
+
+# How many actors are looked up in Postgres with one query
+ACTOR_HYDRATION_BATCH_SIZE = 5000
+
+
+class ActorCache:
+    """
+    Thread safe LRU cache of hydrated actors, whose entries expire after `ttl_seconds`, so that paging through a list
+    of actors or reloading it doesn't look them up in Postgres again. Cached actors are shared and must not be modified.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Iterable[tuple]) -> dict[tuple, dict]:
+        if self.ttl_seconds <= 0:
+            return {}
+
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                expires_at, actor = entry
+                if expires_at <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = actor
+        return found
+
+    def set_many(self, actors: dict[tuple, dict]) -> None:
+        if self.ttl_seconds <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for key, actor in actors.items():
+                self._entries[key] = (expires_at, actor)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+actor_cache = ActorCache(
+    max_size=settings.ACTOR_HYDRATION_CACHE_MAX_SIZE, ttl_seconds=settings.ACTOR_HYDRATION_CACHE_TTL_SECONDS
+)
+
+
+def _batched(values: Iterable[str], size: int) -> Iterable[list[str]]:
+    iterator = iter(values)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        UUID(value)
+    except ValueError:
+        return False
+    return True
+
+
+class ActorHydrator:
+    """
+    Looks up the persons and groups which actor and event lists show, in batches and through the actor cache.
+
+    If `property_keys` is given, only those properties are loaded, which saves transferring and decoding the
+    properties a response doesn't show.
+    """
+
+    def __init__(self, team: Team, property_keys: Optional[Sequence[str]] = None):
+        self.team = team
+        self.property_keys = sorted(set(property_keys)) if property_keys is not None else None
+
+    def _properties_sql(self, column: str) -> str:
+        if self.property_keys is None:
+            return column
+        return f"""(
+            SELECT COALESCE(jsonb_object_agg(key, value), '{{}}'::jsonb)
+            FROM jsonb_each({column})
+            WHERE key = ANY(%(property_keys)s)
+        )"""
+
+    def _hydrate(
+        self, kind: tuple, ids: Iterable[Any], fetch: Callable[[list[str]], dict[str, dict]]
+    ) -> dict[str, dict]:
+        """
+        Returns actors by ID, in the order of the IDs. Actors which aren't cached are fetched in batches with `fetch`.
+        """
+        unique_ids = list(dict.fromkeys(str(actor_id) for actor_id in ids))
+        cache_prefix = (self.team.pk, *kind, tuple(self.property_keys) if self.property_keys is not None else None)
+
+        cached = actor_cache.get_many((*cache_prefix, actor_id) for actor_id in unique_ids)
+        actors = {key[-1]: actor for key, actor in cached.items()}
+
+        missing_ids = [actor_id for actor_id in unique_ids if actor_id not in actors]
+        for batch in _batched(missing_ids, ACTOR_HYDRATION_BATCH_SIZE):
+            fetched = fetch(batch)
+            actor_cache.set_many({(*cache_prefix, actor_id): actor for actor_id, actor in fetched.items()})
+            actors.update(fetched)
+
+        return {actor_id: actors[actor_id] for actor_id in unique_ids if actor_id in actors}
+
+    def persons_by_uuid(self, uuids: Iterable[Any]) -> dict[str, dict]:
+        """
+        Persons with all their distinct IDs, by UUID. IDs which aren't UUIDs can't match a person, and are skipped.
+        """
+        return self._hydrate(("person",), uuids, self._fetch_persons_by_uuid)
+
+    def persons_by_distinct_id(self, distinct_ids: Iterable[str]) -> dict[str, dict]:
+        """
+        Persons without their distinct IDs, by one of their distinct IDs.
+        """
+        return self._hydrate(("person_distinct_id",), distinct_ids, self._fetch_persons_by_distinct_id)
+
+    def groups_by_key(self, group_type_index: int, group_keys: Iterable[Any]) -> dict[str, dict]:
+        return self._hydrate(
+            ("group", group_type_index),
+            group_keys,
+            lambda batch: self._fetch_groups_by_key(group_type_index, batch),
+        )
+
+    # These are hand written instead of using the ORM because the ORM was blowing up the memory on exports and taking
+    # forever. Properties are decoded with orjson, which is a lot faster than the decoding the ORM does.
+    def _fetch_persons_by_uuid(self, uuids: list[str]) -> dict[str, dict]:
+        # Casting anything else to a UUID would fail the whole query
+        uuids = [uuid for uuid in uuids if _is_uuid(uuid)]
+        if not uuids:
+            return {}
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""SELECT posthog_person.id, posthog_person.uuid, {self._properties_sql("posthog_person.properties")},
+                    posthog_person.is_identified, posthog_person.created_at
+                FROM posthog_person
+                WHERE posthog_person.uuid = ANY(%(uuids)s::uuid[])
+                AND posthog_person.team_id = %(team_id)s""",
+                {"uuids": uuids, "team_id": self.team.pk, "property_keys": self.property_keys},
+            )
+            people = cursor.fetchall()
+            cursor.execute(
+                """SELECT posthog_persondistinctid.person_id, posthog_persondistinctid.distinct_id
+                FROM posthog_persondistinctid
+                WHERE posthog_persondistinctid.person_id = ANY(%(people_ids)s)
+                AND posthog_persondistinctid.team_id = %(team_id)s""",
+                {"people_ids": [person[0] for person in people], "team_id": self.team.pk},
+            )
+            distinct_ids = cursor.fetchall()
+
+        person_id_to_distinct_ids: dict[int, list[str]] = {person[0]: [] for person in people}
+        for person_id, distinct_id in distinct_ids:
+            person_id_to_distinct_ids[person_id].append(distinct_id)
+        del distinct_ids
+
+        return {
+            str(person[1]): {
+                "id": person[1],
+                "properties": orjson.loads(person[2]),
+                "is_identified": person[3],
+                "created_at": person[4],
+                "distinct_ids": person_id_to_distinct_ids[person[0]],
+            }
+            for person in people
+        }
+
+    def _fetch_persons_by_distinct_id(self, distinct_ids: list[str]) -> dict[str, dict]:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""SELECT posthog_persondistinctid.distinct_id, posthog_person.uuid,
+                    {self._properties_sql("posthog_person.properties")}, posthog_person.is_identified,
+                    posthog_person.created_at
+                FROM posthog_persondistinctid
+                INNER JOIN posthog_person ON posthog_person.id = posthog_persondistinctid.person_id
+                WHERE posthog_persondistinctid.distinct_id = ANY(%(distinct_ids)s)
+                AND posthog_persondistinctid.team_id = %(team_id)s
+                AND posthog_person.team_id = %(team_id)s""",
+                {"distinct_ids": distinct_ids, "team_id": self.team.pk, "property_keys": self.property_keys},
+            )
+            rows = cursor.fetchall()
+
+        return {
+            row[0]: {
+                "id": row[1],
+                "properties": orjson.loads(row[2]),
+                "is_identified": row[3],
+                "created_at": row[4],
+            }
+            for row in rows
+        }
+
+    def _fetch_groups_by_key(self, group_type_index: int, group_keys: list[str]) -> dict[str, dict]:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""SELECT posthog_group.group_key, posthog_group.group_type_index, posthog_group.created_at,
+                    {self._properties_sql("posthog_group.group_properties")}
+                FROM posthog_group
+                WHERE posthog_group.group_key = ANY(%(group_keys)s)
+                AND posthog_group.group_type_index = %(group_type_index)s
+                AND posthog_group.team_id = %(team_id)s""",
+                {
+                    "group_keys": group_keys,
+                    "group_type_index": group_type_index,
+                    "team_id": self.team.pk,
+                    "property_keys": self.property_keys,
+                },
+            )
+            rows = cursor.fetchall()
+
+        groups = {}
+        for group_key, group_type_index, created_at, raw_properties in rows:
+            properties = orjson.loads(raw_properties)
+            groups[group_key] = {
+                "id": group_key,
+                "type": "group",
+                "properties": properties,  # TODO: Legacy for frontend
+                "group_key": group_key,
+                "group_type_index": group_type_index,
+                "created_at": created_at,
+                "group_properties": properties,
+            }
+        return groups
@@ -0,0 +1,102 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from freezegun import freeze_time
+
+from posthog.hogql_queries.utils.actor_hydration import ActorCache, ActorHydrator
+from posthog.models import Group, Person
+from posthog.test.base import BaseTest
+
+
+class TestActorCache(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        cache = ActorCache(max_size=2, ttl_seconds=30)
+        cache.set_many({("a",): {"id": "a"}, ("b",): {"id": "b"}})
+        assert cache.get_many([("a",)]) == {("a",): {"id": "a"}}
+
+        cache.set_many({("c",): {"id": "c"}})
+        assert cache.get_many([("a",), ("b",), ("c",)]) == {("a",): {"id": "a"}, ("c",): {"id": "c"}}
+
+    def test_expires_entries(self):
+        cache = ActorCache(max_size=2, ttl_seconds=30)
+        with freeze_time("2024-01-01 00:00:00") as frozen_time:
+            cache.set_many({("a",): {"id": "a"}})
+            frozen_time.tick(timedelta(seconds=29))
+            assert cache.get_many([("a",)]) == {("a",): {"id": "a"}}
+            frozen_time.tick(timedelta(seconds=2))
+            assert cache.get_many([("a",)]) == {}
+
+    def test_disabled_without_ttl(self):
+        cache = ActorCache(max_size=2, ttl_seconds=0)
+        cache.set_many({("a",): {"id": "a"}})
+        assert cache.get_many([("a",)]) == {}
+
+
+class TestActorHydrator(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.person = Person.objects.create(
+            team=self.team, distinct_ids=["a", "b"], properties={"email": "a@posthog.com", "name": "A"}
+        )
+        self.other_person = Person.objects.create(team=self.team, distinct_ids=["c"], properties={"name": "C"})
+
+    def test_persons_by_uuid(self):
+        persons = ActorHydrator(self.team).persons_by_uuid([self.other_person.uuid, self.person.uuid, "missing"])
+
+        assert list(persons.keys()) == [str(self.other_person.uuid), str(self.person.uuid)]
+        assert persons[str(self.person.uuid)]["properties"] == {"email": "a@posthog.com", "name": "A"}
+        assert sorted(persons[str(self.person.uuid)]["distinct_ids"]) == ["a", "b"]
+        assert persons[str(self.other_person.uuid)]["distinct_ids"] == ["c"]
+
+    def test_persons_by_uuid_in_batches(self):
+        with patch("posthog.hogql_queries.utils.actor_hydration.ACTOR_HYDRATION_BATCH_SIZE", 1):
+            # A query for the persons and one for their distinct IDs, for each batch
+            with self.assertNumQueries(4):
+                persons = ActorHydrator(self.team).persons_by_uuid([self.person.uuid, self.other_person.uuid])
+
+        assert len(persons) == 2
+
+    def test_persons_by_uuid_without_uuids(self):
+        with self.assertNumQueries(0):
+            persons = ActorHydrator(self.team).persons_by_uuid(["missing", ""])
+
+        assert persons == {}
+
+    def test_persons_by_distinct_id(self):
+        persons = ActorHydrator(self.team).persons_by_distinct_id(["b", "c", "missing"])
+
+        assert persons.keys() == {"b", "c"}
+        assert str(persons["b"]["id"]) == str(self.person.uuid)
+        assert persons["b"]["properties"] == {"email": "a@posthog.com", "name": "A"}
+        assert persons["c"]["properties"] == {"name": "C"}
+
+    def test_persons_by_distinct_id_with_property_keys(self):
+        persons = ActorHydrator(self.team, property_keys=["email"]).persons_by_distinct_id(["b", "c", "missing"])
+
+        assert persons.keys() == {"b", "c"}
+        assert str(persons["b"]["id"]) == str(self.person.uuid)
+        assert persons["b"]["properties"] == {"email": "a@posthog.com"}
+        assert persons["c"]["properties"] == {}
+
+    def test_groups_by_key(self):
+        Group.objects.create(
+            team=self.team, group_type_index=0, group_key="org:1", group_properties={"name": "Org"}, version=0
+        )
+        Group.objects.create(
+            team=self.team, group_type_index=1, group_key="org:1", group_properties={"name": "Project"}, version=0
+        )
+
+        groups = ActorHydrator(self.team).groups_by_key(0, ["org:1", "org:2"])
+
+        assert groups.keys() == {"org:1"}
+        assert groups["org:1"]["properties"] == {"name": "Org"}
+        assert groups["org:1"]["group_type_index"] == 0
+
+    def test_uses_cache(self):
+        with patch("posthog.hogql_queries.utils.actor_hydration.actor_cache", ActorCache(max_size=10, ttl_seconds=30)):
+            ActorHydrator(self.team).persons_by_uuid([self.person.uuid])
+            with self.assertNumQueries(2):
+                persons = ActorHydrator(self.team).persons_by_uuid([self.person.uuid, self.other_person.uuid])
+
+        assert len(persons) == 2
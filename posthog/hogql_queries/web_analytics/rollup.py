@@ -0,0 +1,383 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Optional
+
+import orjson
+import structlog
+from django.conf import settings
+from sentry_sdk import capture_exception
+
+from posthog.client import sync_execute
+from posthog.clickhouse.client.connection import Workload
+from posthog.clickhouse.query_tagging import tag_queries
+from posthog.hogql import ast
+from posthog.hogql.context import HogQLContext
+from posthog.hogql.modifiers import create_default_modifiers_for_team
+from posthog.hogql.parser import parse_select
+from posthog.hogql.printer import print_ast
+from posthog.hogql.property import get_property_key, get_property_type
+from posthog.hogql.visitor import CloningVisitor
+from posthog.models.team import Team
+from posthog.models.web_preaggregated.sql import TABLE_BASE_NAME
+from posthog.redis import get_client
+from posthog.schema import EventPropertyFilter, PersonPropertyFilter, SessionPropertyFilter
+
+logger = structlog.get_logger(__name__)
+
+WEB_STATS_ROLLUP_COVERAGE_KEY = "posthog:web_stats_rollup_coverage:{team_id}"
+WEB_STATS_ROLLUP_COVERAGE_TTL = timedelta(days=31)
+# posthog-js starts a new session after 24 hours, so all pageviews of a session are within this long of its start
+WEB_STATS_ROLLUP_MAX_SESSION_LENGTH = timedelta(hours=24)
+# Hours are only rolled up once sessions which started in them are over and all their events ingested
+WEB_STATS_ROLLUP_LAG = WEB_STATS_ROLLUP_MAX_SESSION_LENGTH + timedelta(hours=2)
+# Rows are inserted a day at a time, so that backfills can be resumed
+WEB_STATS_ROLLUP_CHUNK = timedelta(days=1)
+
+# Session properties which web analytics queries can filter and break down by, and the rollup column storing them
+SESSION_PROPERTY_COLUMNS = {
+    "$entry_pathname": "entry_pathname",
+    "$entry_referring_domain": "referring_domain",
+    "$entry_utm_source": "utm_source",
+    "$entry_utm_medium": "utm_medium",
+    "$entry_utm_campaign": "utm_campaign",
+}
+# Event properties of each pageview which web analytics queries can break down by
+EVENT_PROPERTY_COLUMNS = {
+    "$browser": "browser",
+    "$os": "os",
+    "$device_type": "device_type",
+    "$geoip_country_code": "country_code",
+}
+DIMENSION_COLUMNS = [*SESSION_PROPERTY_COLUMNS.values(), *EVENT_PROPERTY_COLUMNS.values()]
+AGGREGATE_COLUMNS = [
+    "persons_uniq_state",
+    "pageviews_count",
+    "sessions_count",
+    "bounces_count",
+    "total_session_duration",
+]
+
+
+@dataclass(frozen=True)
+class WebStatsRollupCoverage:
+    """Range of hours which have been rolled up for a team"""
+
+    date_from: datetime
+    date_to: datetime
+
+    def to_json(self) -> bytes:
+        return orjson.dumps({"date_from": self.date_from.isoformat(), "date_to": self.date_to.isoformat()})
+
+    @classmethod
+    def from_json(cls, data: bytes) -> "WebStatsRollupCoverage":
+        parsed = orjson.loads(data)
+        return cls(
+            date_from=datetime.fromisoformat(parsed["date_from"]), date_to=datetime.fromisoformat(parsed["date_to"])
+        )
+
+
+@dataclass(frozen=True)
+class WebStatsRollupPlan:
+    """
+    Sessions starting in [date_from, rollup_to) are read from the rollup table, with their pageviews before
+    pageviews_to, and those starting in [rollup_to, date_to) from events.
+    """
+
+    date_from: datetime
+    rollup_to: datetime
+    date_to: datetime
+    pageviews_to: datetime
+
+
+def get_web_stats_rollup_coverage(team_id: int) -> Optional[WebStatsRollupCoverage]:
+    try:
+        data = get_client().get(WEB_STATS_ROLLUP_COVERAGE_KEY.format(team_id=team_id))
+    except Exception as e:
+        capture_exception(e)
+        return None
+    return WebStatsRollupCoverage.from_json(data) if data is not None else None
+
+
+def set_web_stats_rollup_coverage(team_id: int, coverage: WebStatsRollupCoverage) -> None:
+    get_client().set(
+        WEB_STATS_ROLLUP_COVERAGE_KEY.format(team_id=team_id), coverage.to_json(), ex=WEB_STATS_ROLLUP_COVERAGE_TTL
+    )
+
+
+def is_web_stats_rollup_team(team_id: int) -> bool:
+    return str(team_id) in settings.WEB_STATS_ROLLUP_TEAM_IDS
+
+
+def _start_of_hour(value: datetime) -> datetime:
+    return value.astimezone(UTC).replace(minute=0, second=0, microsecond=0)
+
+
+def to_start_of_hour(value: datetime) -> Optional[datetime]:
+    """
+    Returns the start of the hour closest to the date, or None if it isn't within a second of one. Date ranges often
+    end a microsecond before midnight, so previous periods start a microsecond after it.
+    """
+    closest = _start_of_hour(value + timedelta(minutes=30))
+    return closest if abs(value - closest) <= timedelta(seconds=1) else None
+
+
+def can_use_rollup_for_properties(
+    properties: Iterable[EventPropertyFilter | PersonPropertyFilter | SessionPropertyFilter],
+) -> bool:
+    return all(
+        get_property_type(p) == "session" and get_property_key(p) in SESSION_PROPERTY_COLUMNS for p in properties
+    )
+
+
+def get_web_stats_rollup_plan(team: Team, date_from: datetime, date_to: datetime) -> Optional[WebStatsRollupPlan]:
+    """
+    Returns how to split the query between the rollup and events, or None if the rollup can't be used for the dates.
+    Sessions are assigned to periods by the hour they started in, so date_from has to be at the start of an hour.
+    Their pageviews are counted by the hour they were viewed in, like events are counted up to date_to.
+    """
+    start_of_hour = to_start_of_hour(date_from)
+    if not is_web_stats_rollup_team(team.pk) or start_of_hour is None:
+        return None
+    date_from = start_of_hour
+
+    coverage = get_web_stats_rollup_coverage(team.pk)
+    if coverage is None or coverage.date_from > date_from:
+        return None
+
+    pageviews_to = to_start_of_hour(date_to)
+    if pageviews_to is not None:
+        rollup_to = min(coverage.date_to, pageviews_to)
+    else:
+        # Pageviews in the hour date_to is in can't be told apart, so only sessions which were over before it are
+        # read from the rollup
+        pageviews_to = _start_of_hour(date_to)
+        rollup_to = min(coverage.date_to, pageviews_to - WEB_STATS_ROLLUP_MAX_SESSION_LENGTH)
+    if rollup_to <= date_from:
+        return None
+
+    return WebStatsRollupPlan(date_from=date_from, rollup_to=rollup_to, date_to=date_to, pageviews_to=pageviews_to)
+
+
+class RollupFieldMapper(CloningVisitor):
+    """
+    Replaces session and event properties with the rollup columns storing them. The rollup stores empty strings
+    instead of NULLs, so they're turned back into NULLs.
+    """
+
+    def visit_field(self, node: ast.Field):
+        chain = node.chain
+        column: Optional[str] = None
+        if len(chain) == 2 and chain[0] == "session":
+            column = SESSION_PROPERTY_COLUMNS.get(str(chain[1]))
+        elif len(chain) == 2 and chain[0] == "properties":
+            column = EVENT_PROPERTY_COLUMNS.get(str(chain[1]))
+        elif len(chain) == 3 and chain[0] == "events" and chain[1] == "properties":
+            column = EVENT_PROPERTY_COLUMNS.get(str(chain[2]))
+
+        if column is None:
+            return super().visit_field(node)
+        return ast.Call(name="nullIf", args=[ast.Field(chain=[column]), ast.Constant(value="")])
+
+
+def map_to_rollup_columns(expr: ast.Expr) -> ast.Expr:
+    return RollupFieldMapper().visit(expr)
+
+
+def web_stats_hourly_rows_query(
+    date_from: ast.Expr, date_to: ast.Expr, events_date_to: Optional[ast.Expr] = None
+) -> ast.SelectQuery:
+    """
+    Aggregates the pageviews before events_date_to of sessions starting in [date_from, date_to) into rows of the
+    web_stats_hourly table.
+    """
+    query = parse_select(
+        """
+SELECT
+    -- hours are always UTC, as the start of an hour in a team's timezone isn't always the start of a UTC hour
+    toStartOfHour(toTimeZone(sessions.start_timestamp, 'UTC')) AS hour,
+    pageviews.pageview_hour AS pageview_hour,
+    sessions.entry_pathname AS entry_pathname,
+    sessions.referring_domain AS referring_domain,
+    sessions.utm_source AS utm_source,
+    sessions.utm_medium AS utm_medium,
+    sessions.utm_campaign AS utm_campaign,
+    pageviews.browser AS browser,
+    pageviews.os AS os,
+    pageviews.device_type AS device_type,
+    pageviews.country_code AS country_code,
+    uniqState(assumeNotNull(pageviews.person_id)) AS persons_uniq_state,
+    sum(pageviews.pageviews) AS pageviews_count,
+    -- each session is counted once, in the row of its first pageview
+    countIf(equals(sessions.first_pageview, {pageview_key})) AS sessions_count,
+    sumIf(sessions.is_bounce, equals(sessions.first_pageview, {pageview_key})) AS bounces_count,
+    sumIf(sessions.session_duration, equals(sessions.first_pageview, {pageview_key})) AS total_session_duration
+FROM (
+    SELECT
+        events.`$session_id` AS session_id,
+        toStartOfHour(toTimeZone(timestamp, 'UTC')) AS pageview_hour,
+        coalesce(properties.$browser, '') AS browser,
+        coalesce(properties.$os, '') AS os,
+        coalesce(properties.$device_type, '') AS device_type,
+        coalesce(properties.$geoip_country_code, '') AS country_code,
+        any(events.person_id) AS person_id,
+        count() AS pageviews
+    FROM events
+    WHERE and(
+        events.event == '$pageview',
+        events.`$session_id` IS NOT NULL,
+        timestamp >= {date_from},
+        timestamp < {events_date_to}
+    )
+    GROUP BY session_id, pageview_hour, browser, os, device_type, country_code
+) AS pageviews
+JOIN (
+    SELECT
+        events.`$session_id` AS session_id,
+        min(session.$start_timestamp) AS start_timestamp,
+        coalesce(any(session.$entry_pathname), '') AS entry_pathname,
+        coalesce(any(session.$entry_referring_domain), '') AS referring_domain,
+        coalesce(any(session.$entry_utm_source), '') AS utm_source,
+        coalesce(any(session.$entry_utm_medium), '') AS utm_medium,
+        coalesce(any(session.$entry_utm_campaign), '') AS utm_campaign,
+        argMin(
+            tuple(
+                toStartOfHour(toTimeZone(timestamp, 'UTC')),
+                coalesce(properties.$browser, ''),
+                coalesce(properties.$os, ''),
+                coalesce(properties.$device_type, ''),
+                coalesce(properties.$geoip_country_code, '')
+            ),
+            timestamp
+        ) AS first_pageview,
+        if(any(session.$is_bounce), 1, 0) AS is_bounce,
+        coalesce(toFloat(any(session.$session_duration)), 0) AS session_duration
+    FROM events
+    WHERE and(
+        events.event == '$pageview',
+        events.`$session_id` IS NOT NULL,
+        timestamp >= {date_from},
+        timestamp < {events_date_to}
+    )
+    GROUP BY session_id
+    HAVING and(
+        start_timestamp >= {date_from},
+        start_timestamp < {date_to}
+    )
+) AS sessions ON pageviews.session_id = sessions.session_id
+GROUP BY hour, pageview_hour, entry_pathname, referring_domain, utm_source, utm_medium, utm_campaign, browser, os, device_type, country_code
+        """,
+        placeholders={
+            "date_from": date_from,
+            "date_to": date_to,
+            "events_date_to": events_date_to or date_to,
+            "pageview_key": ast.Call(
+                name="tuple",
+                args=[
+                    ast.Field(chain=["pageviews", column])
+                    for column in ["pageview_hour", *EVENT_PROPERTY_COLUMNS.values()]
+                ],
+            ),
+        },
+    )
+    assert isinstance(query, ast.SelectQuery)
+    return query
+
+
+def web_stats_rollup_rows_query(plan: WebStatsRollupPlan) -> ast.SelectQuery | ast.SelectSetQuery:
+    """
+    Rows of the rollup table for the plan's rolled up hours, followed by the same rows aggregated from events for the
+    rest of the date range.
+    """
+    rollup_rows = parse_select(
+        f"""
+SELECT
+    toTimeZone(hour, 'UTC') AS hour,
+    toTimeZone(pageview_hour, 'UTC') AS pageview_hour,
+    {", ".join(DIMENSION_COLUMNS)},
+    {", ".join(AGGREGATE_COLUMNS)}
+FROM web_stats_hourly
+WHERE hour >= {{date_from}} AND hour < {{rollup_to}} AND pageview_hour < {{pageviews_to}}
+        """,
+        placeholders={
+            "date_from": ast.Constant(value=plan.date_from),
+            "rollup_to": ast.Constant(value=plan.rollup_to),
+            "pageviews_to": ast.Constant(value=plan.pageviews_to),
+        },
+    )
+    assert isinstance(rollup_rows, ast.SelectQuery)
+    if plan.rollup_to >= plan.date_to:
+        return rollup_rows
+    events_rows = web_stats_hourly_rows_query(ast.Constant(value=plan.rollup_to), ast.Constant(value=plan.date_to))
+    return ast.SelectSetQuery.create_from_queries([rollup_rows, events_rows], "UNION ALL")
+
+
+def _insert_web_stats_rollup(team: Team, date_from: datetime, date_to: datetime) -> None:
+    query = web_stats_hourly_rows_query(
+        ast.Constant(value=date_from),
+        ast.Constant(value=date_to),
+        ast.Constant(value=date_to + WEB_STATS_ROLLUP_MAX_SESSION_LENGTH),
+    )
+    query.select.insert(0, ast.Alias(alias="team_id", expr=ast.Constant(value=team.pk)))
+
+    context = HogQLContext(team_id=team.pk, team=team, enable_select_queries=True, limit_top_select=False)
+    create_default_modifiers_for_team(team, context.modifiers)
+    select_sql = print_ast(query, context=context, dialect="clickhouse")
+    columns = ", ".join(["team_id", "hour", "pageview_hour", *DIMENSION_COLUMNS, *AGGREGATE_COLUMNS])
+
+    tag_queries(team_id=team.pk, name="web_stats_rollup")
+    sync_execute(
+        f"INSERT INTO writable_{TABLE_BASE_NAME} ({columns}) {select_sql}",
+        context.values,
+        settings={
+            # Retrying the same hours after a failure doesn't count their sessions twice
+            "insert_deduplication_token": f"{TABLE_BASE_NAME}:{team.pk}:{date_from.isoformat()}:{date_to.isoformat()}",
+            "max_execution_time": 600,
+        },
+        workload=Workload.OFFLINE,
+    )
+
+
+def _get_web_stats_rollup_coverage_from_clickhouse(team_id: int) -> Optional[WebStatsRollupCoverage]:
+    # Hours without any sessions have no rows, so this can end before the last hour rolled up. Those hours are
+    # rolled up again, which is fine as they didn't have any sessions to count twice.
+    rows = sync_execute(
+        f"SELECT min(hour), max(hour), count() FROM {TABLE_BASE_NAME} WHERE team_id = %(team_id)s",
+        {"team_id": team_id},
+    )
+    if not rows or not rows[0][2]:
+        return None
+    min_hour, max_hour, _ = rows[0]
+    return WebStatsRollupCoverage(
+        date_from=min_hour.replace(tzinfo=UTC), date_to=max_hour.replace(tzinfo=UTC) + timedelta(hours=1)
+    )
+
+
+def update_web_stats_rollup(team: Team, now: Optional[datetime] = None) -> WebStatsRollupCoverage:
+    """
+    Rolls up all hours since the team's last rollup that are at least WEB_STATS_ROLLUP_LAG old, or the last
+    WEB_STATS_ROLLUP_BACKFILL_DAYS days for teams that haven't been rolled up yet.
+    """
+    rollup_to = _start_of_hour((now or datetime.now(UTC)) - WEB_STATS_ROLLUP_LAG)
+    coverage = get_web_stats_rollup_coverage(team.pk) or _get_web_stats_rollup_coverage_from_clickhouse(team.pk)
+    if coverage is None:
+        backfill_from = rollup_to - timedelta(days=settings.WEB_STATS_ROLLUP_BACKFILL_DAYS)
+        coverage = WebStatsRollupCoverage(date_from=backfill_from, date_to=backfill_from)
+
+    while coverage.date_to < rollup_to:
+        chunk_to = min(coverage.date_to + WEB_STATS_ROLLUP_CHUNK, rollup_to)
+        _insert_web_stats_rollup(team, coverage.date_to, chunk_to)
+        coverage = WebStatsRollupCoverage(date_from=coverage.date_from, date_to=chunk_to)
+        set_web_stats_rollup_coverage(team.pk, coverage)
+        logger.info("Rolled up web stats", team_id=team.pk, date_to=chunk_to.isoformat())
+
+    return coverage
+
+
+def update_web_stats_rollups(now: Optional[datetime] = None) -> None:
+    for team in Team.objects.filter(pk__in=[int(team_id) for team_id in settings.WEB_STATS_ROLLUP_TEAM_IDS]):
+        try:
+            update_web_stats_rollup(team, now=now)
+        except Exception as e:
+            logger.exception("Failed to roll up web stats", team_id=team.pk)
+            capture_exception(e)
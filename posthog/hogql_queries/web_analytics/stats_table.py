@@ -11,6 +11,7 @@ from posthog.hogql.property import (
     get_property_key,
 )
 from posthog.hogql_queries.insights.paginators import HogQLHasMorePaginator
+from posthog.hogql_queries.web_analytics.rollup import map_to_rollup_columns, web_stats_rollup_rows_query
 from posthog.hogql_queries.web_analytics.web_analytics_query_runner import (
     WebAnalyticsQueryRunner,
     map_columns,
@@ -26,6 +27,20 @@ from posthog.schema import (
 
 BREAKDOWN_NULL_DISPLAY = "(none)"
 
+# Breakdowns by properties that are stored in the hourly web stats rollup
+ROLLUP_BREAKDOWNS = {
+    WebStatsBreakdown.INITIAL_PAGE,
+    WebStatsBreakdown.INITIAL_REFERRING_DOMAIN,
+    WebStatsBreakdown.INITIAL_UTM_SOURCE,
+    WebStatsBreakdown.INITIAL_UTM_MEDIUM,
+    WebStatsBreakdown.INITIAL_UTM_CAMPAIGN,
+    WebStatsBreakdown.INITIAL_UTM_SOURCE_MEDIUM_CAMPAIGN,
+    WebStatsBreakdown.BROWSER,
+    WebStatsBreakdown.OS,
+    WebStatsBreakdown.DEVICE_TYPE,
+    WebStatsBreakdown.COUNTRY,
+}
+
 
 class WebStatsTableQueryRunner(WebAnalyticsQueryRunner):
     query: WebStatsTableQuery
@@ -40,20 +55,87 @@ class WebStatsTableQueryRunner(WebAnalyticsQueryRunner):
         )
 
     def to_query(self) -> ast.SelectQuery:
-        if self.query.breakdownBy == WebStatsBreakdown.PAGE:
-            if self.query.includeScrollDepth and self.query.includeBounceRate:
-                return self.to_path_scroll_bounce_query()
-            elif self.query.includeBounceRate:
-                return self.to_path_bounce_query()
+        with self._measure_query_path():
+            if self.rollup_plan:
+                return self.to_rollup_query()
+
+            if self.query.breakdownBy == WebStatsBreakdown.PAGE:
+                if self.query.includeScrollDepth and self.query.includeBounceRate:
+                    return self.to_path_scroll_bounce_query()
+                elif self.query.includeBounceRate:
+                    return self.to_path_bounce_query()
+
+            if self.query.breakdownBy == WebStatsBreakdown.INITIAL_PAGE:
+                if self.query.includeBounceRate:
+                    return self.to_entry_bounce_query()
+
+            if self._has_session_properties():
+                return self._to_main_query_with_session_properties()
+
+            return self.to_main_query()
 
-        if self.query.breakdownBy == WebStatsBreakdown.INITIAL_PAGE:
-            if self.query.includeBounceRate:
-                return self.to_entry_bounce_query()
+    def _can_use_rollup(self) -> bool:
+        return self.query.breakdownBy in ROLLUP_BREAKDOWNS
+
+    def to_rollup_query(self) -> ast.SelectQuery:
+        assert self.rollup_plan is not None
+        with self.timings.measure("stats_table_rollup_query"):
+            query = parse_select(
+                """
+WITH
+    hour >= {date_from} AS current_period_segment,
+    hour < {date_from} AS previous_period_segment
+SELECT
+    breakdown_value AS "context.columns.breakdown_value",
+    tuple(
+        uniqMergeIf(persons_uniq_state, current_period_segment),
+        uniqMergeIf(persons_uniq_state, previous_period_segment)
+    ) AS "context.columns.visitors",
+    tuple(
+        sumIf(pageviews_count, current_period_segment),
+        sumIf(pageviews_count, previous_period_segment)
+    ) AS "context.columns.views"
+FROM (
+    SELECT
+        {breakdown_value} AS breakdown_value,
+        hour,
+        persons_uniq_state,
+        pageviews_count,
+        sessions_count,
+        bounces_count
+    FROM {rollup_rows}
+    WHERE {session_properties}
+)
+WHERE {where_breakdown}
+GROUP BY "context.columns.breakdown_value"
+ORDER BY "context.columns.visitors" DESC,
+"context.columns.views" DESC,
+"context.columns.breakdown_value" ASC
+""",
+                timings=self.timings,
+                placeholders={
+                    "breakdown_value": map_to_rollup_columns(self._counts_breakdown_value()),
+                    "rollup_rows": web_stats_rollup_rows_query(self.rollup_plan),
+                    "session_properties": map_to_rollup_columns(self._session_properties()),
+                    "where_breakdown": self.where_breakdown(),
+                    "date_from": self._date_from(),
+                },
+            )
+        assert isinstance(query, ast.SelectQuery)
 
-        if self._has_session_properties():
-            return self._to_main_query_with_session_properties()
+        if self.query.breakdownBy == WebStatsBreakdown.INITIAL_PAGE and self.query.includeBounceRate:
+            query.select.append(
+                parse_expr(
+                    """
+tuple(
+    divide(sumIf(bounces_count, current_period_segment), sumIf(sessions_count, current_period_segment)),
+    divide(sumIf(bounces_count, previous_period_segment), sumIf(sessions_count, previous_period_segment))
+) AS "context.columns.bounce_rate"
+"""
+                )
+            )
 
-        return self.to_main_query()
+        return query
 
     def to_main_query(self) -> ast.SelectQuery:
         with self.timings.measure("stats_table_query"):
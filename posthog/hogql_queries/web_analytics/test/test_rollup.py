@@ -0,0 +1,253 @@
+from datetime import UTC, datetime
+from typing import Optional
+
+from django.test import override_settings
+from freezegun import freeze_time
+
+from posthog.hogql_queries.web_analytics.rollup import (
+    WebStatsRollupCoverage,
+    can_use_rollup_for_properties,
+    get_web_stats_rollup_coverage,
+    get_web_stats_rollup_plan,
+    set_web_stats_rollup_coverage,
+    to_start_of_hour,
+    update_web_stats_rollup,
+)
+from posthog.hogql_queries.web_analytics.stats_table import WebStatsTableQueryRunner
+from posthog.hogql_queries.web_analytics.web_overview import WebOverviewQueryRunner
+from posthog.models.utils import uuid7
+from posthog.redis import get_client
+from posthog.schema import (
+    DateRange,
+    EventPropertyFilter,
+    PropertyOperator,
+    SessionPropertyFilter,
+    WebOverviewQuery,
+    WebStatsBreakdown,
+    WebStatsTableQuery,
+)
+from posthog.test.base import APIBaseTest, ClickhouseTestMixin, _create_event, _create_person
+
+
+class TestWebStatsRollupPlan(APIBaseTest):
+    def setUp(self):
+        super().setUp()
+        get_client().flushall()
+
+    def test_to_start_of_hour(self):
+        assert to_start_of_hour(datetime(2024, 1, 1, 10, tzinfo=UTC)) == datetime(2024, 1, 1, 10, tzinfo=UTC)
+        assert to_start_of_hour(datetime(2024, 1, 1, 23, 59, 59, 999999, tzinfo=UTC)) == datetime(
+            2024, 1, 2, tzinfo=UTC
+        )
+        assert to_start_of_hour(datetime(2024, 1, 1, 10, 0, 0, 1, tzinfo=UTC)) == datetime(2024, 1, 1, 10, tzinfo=UTC)
+        assert to_start_of_hour(datetime(2024, 1, 1, 10, 15, tzinfo=UTC)) is None
+
+    def test_can_use_rollup_for_properties(self):
+        assert can_use_rollup_for_properties([])
+        assert can_use_rollup_for_properties(
+            [SessionPropertyFilter(key="$entry_pathname", value="/docs", operator=PropertyOperator.EXACT)]
+        )
+        assert not can_use_rollup_for_properties(
+            [SessionPropertyFilter(key="$session_duration", value=10, operator=PropertyOperator.GT)]
+        )
+        assert not can_use_rollup_for_properties(
+            [EventPropertyFilter(key="$browser", value="Chrome", operator=PropertyOperator.EXACT)]
+        )
+
+    def test_plan(self):
+        set_web_stats_rollup_coverage(
+            self.team.pk,
+            WebStatsRollupCoverage(
+                date_from=datetime(2024, 1, 1, tzinfo=UTC), date_to=datetime(2024, 1, 10, tzinfo=UTC)
+            ),
+        )
+
+        with override_settings(WEB_STATS_ROLLUP_TEAM_IDS={str(self.team.pk)}):
+            plan = get_web_stats_rollup_plan(
+                self.team, datetime(2024, 1, 2, tzinfo=UTC), datetime(2024, 1, 12, 23, 59, 59, 999999, tzinfo=UTC)
+            )
+            assert plan is not None
+            assert plan.date_from == datetime(2024, 1, 2, tzinfo=UTC)
+            assert plan.rollup_to == datetime(2024, 1, 10, tzinfo=UTC)
+            assert plan.pageviews_to == datetime(2024, 1, 13, tzinfo=UTC)
+
+            # sessions which may have pageviews in the hour the range ends in are read from events
+            plan = get_web_stats_rollup_plan(
+                self.team, datetime(2024, 1, 2, tzinfo=UTC), datetime(2024, 1, 10, 10, 30, tzinfo=UTC)
+            )
+            assert plan is not None
+            assert plan.rollup_to == datetime(2024, 1, 9, 10, tzinfo=UTC)
+            assert plan.pageviews_to == datetime(2024, 1, 10, 10, tzinfo=UTC)
+
+            # starts before the rolled up hours
+            assert (
+                get_web_stats_rollup_plan(
+                    self.team, datetime(2023, 12, 31, tzinfo=UTC), datetime(2024, 1, 5, tzinfo=UTC)
+                )
+                is None
+            )
+            # doesn't start at the start of an hour
+            assert (
+                get_web_stats_rollup_plan(
+                    self.team, datetime(2024, 1, 2, 10, 30, tzinfo=UTC), datetime(2024, 1, 5, tzinfo=UTC)
+                )
+                is None
+            )
+            # starts after the rolled up hours
+            assert (
+                get_web_stats_rollup_plan(
+                    self.team, datetime(2024, 1, 11, tzinfo=UTC), datetime(2024, 1, 12, tzinfo=UTC)
+                )
+                is None
+            )
+
+        # team isn't rolled up
+        assert (
+            get_web_stats_rollup_plan(self.team, datetime(2024, 1, 2, tzinfo=UTC), datetime(2024, 1, 5, tzinfo=UTC))
+            is None
+        )
+
+
+class TestWebStatsRollup(ClickhouseTestMixin, APIBaseTest):
+    def setUp(self):
+        super().setUp()
+        get_client().flushall()
+
+    def _create_pageviews(self):
+        pageviews_by_person: list[tuple[str, list[tuple[str, str, str, Optional[str]]]]] = [
+            (
+                "p1",
+                [
+                    ("2024-01-02T10:05:00Z", "/", "Chrome", "google.com"),
+                    ("2024-01-02T10:15:00Z", "/docs", "Chrome", "google.com"),
+                    ("2024-01-05T09:00:00Z", "/pricing", "Firefox", None),
+                ],
+            ),
+            ("p2", [("2024-01-03T12:00:00Z", "/docs", "Safari", "twitter.com")]),
+            ("p3", [("2024-01-09T12:00:00Z", "/", "Chrome", None), ("2024-01-09T12:01:00Z", "/docs", "Chrome", None)]),
+        ]
+        for distinct_id, pageviews in pageviews_by_person:
+            with freeze_time(pageviews[0][0]):
+                _create_person(team_id=self.team.pk, distinct_ids=[distinct_id])
+            session_id = str(uuid7(pageviews[0][0]))
+            for timestamp, pathname, browser, referring_domain in pageviews:
+                if timestamp.startswith("2024-01-05"):
+                    session_id = str(uuid7(timestamp))
+                _create_event(
+                    team=self.team,
+                    event="$pageview",
+                    distinct_id=distinct_id,
+                    timestamp=timestamp,
+                    properties={
+                        "$session_id": session_id,
+                        "$pathname": pathname,
+                        "$current_url": f"https://example.com{pathname}",
+                        "$browser": browser,
+                        **({"$referring_domain": referring_domain} if referring_domain else {}),
+                    },
+                )
+
+    def _roll_up(self, now: datetime) -> None:
+        with override_settings(WEB_STATS_ROLLUP_TEAM_IDS={str(self.team.pk)}, WEB_STATS_ROLLUP_BACKFILL_DAYS=30):
+            update_web_stats_rollup(self.team, now=now)
+
+    def _run_overview(self, date_from: str = "2024-01-04", date_to: str = "2024-01-10"):
+        return WebOverviewQueryRunner(
+            team=self.team,
+            query=WebOverviewQuery(dateRange=DateRange(date_from=date_from, date_to=date_to), properties=[]),
+        ).calculate()
+
+    def _run_stats_table(
+        self, breakdown_by: WebStatsBreakdown, date_from: str = "2024-01-04", date_to: str = "2024-01-10", **kwargs
+    ):
+        return WebStatsTableQueryRunner(
+            team=self.team,
+            query=WebStatsTableQuery(
+                dateRange=DateRange(date_from=date_from, date_to=date_to),
+                properties=[],
+                breakdownBy=breakdown_by,
+                **kwargs,
+            ),
+        ).calculate()
+
+    def test_update_web_stats_rollup_records_coverage(self):
+        self._create_pageviews()
+
+        self._roll_up(datetime(2024, 1, 10, 14, 30, tzinfo=UTC))
+
+        coverage = get_web_stats_rollup_coverage(self.team.pk)
+        assert coverage == WebStatsRollupCoverage(
+            date_from=datetime(2023, 12, 10, 12, tzinfo=UTC), date_to=datetime(2024, 1, 9, 12, tzinfo=UTC)
+        )
+
+    @freeze_time("2024-01-10T12:00:00Z")
+    def test_overview_results_match_events(self):
+        self._create_pageviews()
+        expected = self._run_overview()
+
+        self._roll_up(datetime(2024, 1, 9, 14, 30, tzinfo=UTC))
+        with override_settings(WEB_STATS_ROLLUP_TEAM_IDS={str(self.team.pk)}):
+            response = self._run_overview()
+
+        assert response.results == expected.results
+        assert any("web_stats_rollup" in timing.k for timing in response.timings or [])
+        assert not any("web_stats_rollup" in timing.k for timing in expected.timings or [])
+
+    @freeze_time("2024-01-10T12:00:00Z")
+    def test_stats_table_results_match_events(self):
+        self._create_pageviews()
+        expected_pages = self._run_stats_table(WebStatsBreakdown.INITIAL_PAGE, includeBounceRate=True)
+        expected_browsers = self._run_stats_table(WebStatsBreakdown.BROWSER)
+
+        self._roll_up(datetime(2024, 1, 9, 14, 30, tzinfo=UTC))
+        with override_settings(WEB_STATS_ROLLUP_TEAM_IDS={str(self.team.pk)}):
+            pages = self._run_stats_table(WebStatsBreakdown.INITIAL_PAGE, includeBounceRate=True)
+            browsers = self._run_stats_table(WebStatsBreakdown.BROWSER)
+            paths = self._run_stats_table(WebStatsBreakdown.PAGE)
+
+        assert pages.results == expected_pages.results
+        assert browsers.results == expected_browsers.results
+        assert any("web_stats_rollup" in timing.k for timing in pages.timings or [])
+        # pages aren't rolled up, so they're always read from events
+        assert not any("web_stats_rollup" in timing.k for timing in paths.timings or [])
+
+    @freeze_time("2024-01-10T12:00:00Z")
+    def test_results_match_events_for_sessions_spanning_hours(self):
+        _create_person(team_id=self.team.pk, distinct_ids=["p1"])
+        sessions = [
+            # spans the end of a day
+            [("2024-01-04T23:50:00Z", "Chrome"), ("2024-01-05T00:10:00Z", "Firefox")],
+            # goes on for more than an hour after the end of the rolled up hours it started in
+            [
+                ("2024-01-05T11:00:00Z", "Chrome"),
+                ("2024-01-05T11:40:00Z", "Chrome"),
+                ("2024-01-05T13:30:00Z", "Safari"),
+            ],
+        ]
+        for pageviews in sessions:
+            session_id = str(uuid7(pageviews[0][0]))
+            for timestamp, browser in pageviews:
+                _create_event(
+                    team=self.team,
+                    event="$pageview",
+                    distinct_id="p1",
+                    timestamp=timestamp,
+                    properties={"$session_id": session_id, "$pathname": "/", "$browser": browser},
+                )
+
+        date_ranges = [("2024-01-04", "2024-01-04"), ("2024-01-05", "2024-01-05"), ("2024-01-04", "2024-01-05")]
+        expected = {
+            date_range: (self._run_overview(*date_range), self._run_stats_table(WebStatsBreakdown.BROWSER, *date_range))
+            for date_range in date_ranges
+        }
+
+        self._roll_up(datetime(2024, 1, 9, 14, 30, tzinfo=UTC))
+        with override_settings(WEB_STATS_ROLLUP_TEAM_IDS={str(self.team.pk)}):
+            for date_range in date_ranges:
+                overview = self._run_overview(*date_range)
+                browsers = self._run_stats_table(WebStatsBreakdown.BROWSER, *date_range)
+
+                expected_overview, expected_browsers = expected[date_range]
+                assert overview.results == expected_overview.results, date_range
+                assert browsers.results == expected_browsers.results, date_range
+                assert any("web_stats_rollup" in timing.k for timing in overview.timings or [])
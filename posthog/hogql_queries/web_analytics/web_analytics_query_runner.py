@@ -15,6 +15,12 @@ from posthog.hogql.property import property_to_expr
 from posthog.hogql.query import execute_hogql_query
 from posthog.hogql_queries.query_runner import QueryRunner
 from posthog.hogql_queries.utils.query_date_range import QueryDateRange
+from posthog.hogql_queries.web_analytics.rollup import (
+    WebStatsRollupPlan,
+    can_use_rollup_for_properties,
+    get_web_stats_rollup_plan,
+    to_start_of_hour,
+)
 from posthog.models.filters.mixins.utils import cached_property
 from posthog.schema import (
     EventPropertyFilter,
@@ -179,6 +185,34 @@ class WebAnalyticsQueryRunner(QueryRunner, ABC):
         else:
             return []
 
+    def _can_use_rollup(self) -> bool:
+        """Whether the query's breakdown and options can be calculated from the hourly web stats rollup"""
+        return False
+
+    def _includes_previous_period(self) -> bool:
+        return True
+
+    @cached_property
+    def rollup_plan(self) -> Optional[WebStatsRollupPlan]:
+        if (
+            not self._can_use_rollup()
+            or self._test_account_filters
+            or not can_use_rollup_for_properties(self.query.properties)
+        ):
+            return None
+
+        date_from = self.query_date_range.date_from()
+        if self._includes_previous_period():
+            # The rollup can only tell periods apart if they're split at the start of an hour
+            if to_start_of_hour(date_from) is None:
+                return None
+            date_from = self.query_date_range.previous_period_date_from
+        return get_web_stats_rollup_plan(self.team, date_from, self.query_date_range.date_to())
+
+    def _measure_query_path(self):
+        """Records in the timings whether the query reads the hourly rollup or only events"""
+        return self.timings.measure("web_stats_rollup" if self.rollup_plan else "web_stats_events")
+
     def _refresh_frequency(self):
         date_to = self.query_date_range.date_to()
         date_from = self.query_date_range.date_from()
@@ -202,7 +236,7 @@ class WebAnalyticsQueryRunner(QueryRunner, ABC):
         )
 
     def _get_or_calculate_sample_ratio(self) -> SamplingRate:
-        if not self.query.sampling or not self.query.sampling.enabled:
+        if not self.query.sampling or not self.query.sampling.enabled or self.rollup_plan:
             return SamplingRate(numerator=1)
         if self.query.sampling.forceSamplingRate:
             return self.query.sampling.forceSamplingRate
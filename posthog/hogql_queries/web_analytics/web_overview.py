@@ -4,10 +4,11 @@ import math
 from django.utils.timezone import datetime
 
 from posthog.hogql import ast
-from posthog.hogql.parser import parse_select
+from posthog.hogql.parser import parse_expr, parse_select
 from posthog.hogql.property import property_to_expr, get_property_type, action_to_expr
 from posthog.hogql.query import execute_hogql_query
 from posthog.hogql_queries.utils.query_date_range import QueryDateRange
+from posthog.hogql_queries.web_analytics.rollup import map_to_rollup_columns, web_stats_rollup_rows_query
 from posthog.hogql_queries.web_analytics.web_analytics_query_runner import (
     WebAnalyticsQueryRunner,
 )
@@ -29,7 +30,16 @@ class WebOverviewQueryRunner(WebAnalyticsQueryRunner):
     cached_response: CachedWebOverviewQueryResponse
 
     def to_query(self) -> ast.SelectQuery | ast.SelectSetQuery:
-        return self.outer_select
+        with self._measure_query_path():
+            if self.rollup_plan:
+                return self.rollup_select
+            return self.outer_select
+
+    def _can_use_rollup(self) -> bool:
+        return not self.query.conversionGoal and not self.query.includeLCPScore
+
+    def _includes_previous_period(self) -> bool:
+        return bool(self.query.compare)
 
     def calculate(self):
         response = execute_hogql_query(
@@ -67,6 +77,7 @@ class WebOverviewQueryRunner(WebAnalyticsQueryRunner):
         return WebOverviewQueryResponse(
             results=results,
             samplingRate=self._sample_rate,
+            timings=response.timings,
             modifiers=self.modifiers,
             dateFrom=self.query_date_range.date_from_str,
             dateTo=self.query_date_range.date_to_str,
@@ -302,6 +313,56 @@ HAVING and(
         assert isinstance(query, ast.SelectQuery)
         return query
 
+    @cached_property
+    def rollup_select(self) -> ast.SelectQuery:
+        assert self.rollup_plan is not None
+        mid = self.query_date_range.date_from_as_hogql()
+
+        def current_period_aggregate(function_name, column_name):
+            return ast.Call(
+                name=function_name + "If",
+                args=[ast.Field(chain=[column_name]), parse_expr("hour >= {mid}", placeholders={"mid": mid})],
+            )
+
+        def previous_period_aggregate(function_name, column_name):
+            if not self.query.compare:
+                return ast.Constant(value=None)
+
+            return ast.Call(
+                name=function_name + "If",
+                args=[ast.Field(chain=[column_name]), parse_expr("hour < {mid}", placeholders={"mid": mid})],
+            )
+
+        def per_session(period_aggregate, column_name):
+            return ast.Call(
+                name="divide",
+                args=[period_aggregate("sum", column_name), period_aggregate("sum", "sessions_count")],
+            )
+
+        # Same columns as outer_select, each session is counted in exactly one row so sums add up
+        select: list[ast.Expr] = [
+            ast.Alias(alias="unique_users", expr=current_period_aggregate("uniqMerge", "persons_uniq_state")),
+            ast.Alias(alias="previous_unique_users", expr=previous_period_aggregate("uniqMerge", "persons_uniq_state")),
+            ast.Alias(alias="total_filtered_pageview_count", expr=current_period_aggregate("sum", "pageviews_count")),
+            ast.Alias(
+                alias="previous_filtered_pageview_count", expr=previous_period_aggregate("sum", "pageviews_count")
+            ),
+            ast.Alias(alias="unique_sessions", expr=current_period_aggregate("sum", "sessions_count")),
+            ast.Alias(alias="previous_unique_sessions", expr=previous_period_aggregate("sum", "sessions_count")),
+            ast.Alias(alias="avg_duration_s", expr=per_session(current_period_aggregate, "total_session_duration")),
+            ast.Alias(
+                alias="prev_avg_duration_s", expr=per_session(previous_period_aggregate, "total_session_duration")
+            ),
+            ast.Alias(alias="bounce_rate", expr=per_session(current_period_aggregate, "bounces_count")),
+            ast.Alias(alias="prev_bounce_rate", expr=per_session(previous_period_aggregate, "bounces_count")),
+        ]
+
+        return ast.SelectQuery(
+            select=select,
+            select_from=ast.JoinExpr(table=web_stats_rollup_rows_query(self.rollup_plan)),
+            where=map_to_rollup_columns(self.session_properties()),
+        )
+
 
 def to_data(
     key: str,
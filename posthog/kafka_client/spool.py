@@ -0,0 +1,438 @@
+"""
+A bounded, append-only log on local disk for messages on their way to Kafka, so that capture can acknowledge events
+once they're durable locally instead of waiting for Kafka to acknowledge them.
+
+Messages are appended to segment files and synced to disk before `append` returns, with one sync for all the requests
+which appended in the meantime, so that requests don't wait for each other's syncs. A background thread produces
+the segments to Kafka oldest first, and deletes each one once Kafka acknowledged all its messages, so a message is
+delivered at least once, including after a crash of the process.
+"""
+
+import fcntl
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from django.conf import settings
+from kafka.producer.future import FutureRecordMetadata
+from prometheus_client import Counter, Gauge
+from sentry_sdk import capture_exception
+from structlog import get_logger
+
+from posthog.kafka_client.client import KafkaProducer, _KafkaProducer
+
+logger = get_logger(__name__)
+
+SPOOL_DEPTH_MESSAGES_GAUGE = Gauge(
+    "capture_spool_depth_messages",
+    "Messages in the capture spool which haven't been acknowledged by Kafka yet.",
+)
+SPOOL_DEPTH_BYTES_GAUGE = Gauge(
+    "capture_spool_depth_bytes",
+    "Bytes of messages in the capture spool which haven't been acknowledged by Kafka yet.",
+)
+SPOOL_OLDEST_MESSAGE_AGE_GAUGE = Gauge(
+    "capture_spool_oldest_message_age_seconds",
+    "Age of the oldest message in the capture spool which hasn't been acknowledged by Kafka yet.",
+)
+SPOOL_FLUSHED_MESSAGES_COUNTER = Counter(
+    "capture_spool_flushed_messages_total",
+    "Messages produced from the capture spool and acknowledged by Kafka.",
+)
+SPOOL_FLUSH_ERRORS_COUNTER = Counter(
+    "capture_spool_flush_errors_total",
+    "Failed attempts to produce a segment of the capture spool to Kafka, which are retried.",
+)
+SPOOL_FULL_COUNTER = Counter(
+    "capture_spool_full_total",
+    "Requests whose messages didn't fit in the capture spool.",
+)
+
+# Length and CRC32 of each message's payload
+_MESSAGE_HEADER = struct.Struct(">II")
+_SEGMENT_SUFFIX = ".log"
+# How long the flusher waits for more messages before sealing the segment they're appended to
+_LINGER_SECONDS = 0.05
+# How often the flusher updates the age of the oldest message when there's nothing to flush
+_IDLE_SECONDS = 1.0
+_MAX_BACKOFF_SECONDS = 30.0
+
+
+class SpoolFullError(Exception):
+    pass
+
+
+def _encode_value(value: str) -> bytes:
+    return value.encode("utf-8")
+
+
+@dataclass
+class SpooledMessage:
+    topic: str
+    # The message serialized as JSON, as the Kafka producer would serialize it
+    value: str
+    key: Optional[str] = None
+    headers: Optional[list[tuple[str, str]]] = None
+
+    def encode(self) -> bytes:
+        payload = json.dumps([self.topic, self.value, self.key, self.headers]).encode("utf-8")
+        return _MESSAGE_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+    def produce(self, producer: _KafkaProducer) -> FutureRecordMetadata:
+        return producer.produce(
+            topic=self.topic, data=self.value, key=self.key, headers=self.headers, value_serializer=_encode_value
+        )
+
+
+def read_segment(path: str) -> list[SpooledMessage]:
+    """Reads the messages of a segment, up to a message which was only partially written when the process crashed"""
+    messages: list[SpooledMessage] = []
+    with open(path, "rb") as f:
+        while header := f.read(_MESSAGE_HEADER.size):
+            if len(header) < _MESSAGE_HEADER.size:
+                break
+            length, checksum = _MESSAGE_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                logger.warning("capture_spool_truncated_segment", path=path, messages=len(messages))
+                break
+            topic, value, key, headers = json.loads(payload)
+            messages.append(SpooledMessage(topic=topic, value=value, key=key, headers=headers))
+    return messages
+
+
+@dataclass
+class _Segment:
+    path: str
+    size: int = 0
+    message_count: int = 0
+    created_at: float = field(default_factory=time.time)
+    # Messages already acknowledged by Kafka, which aren't produced again if producing the rest fails
+    flushed_count: int = 0
+    fd: Optional[int] = None
+    # Whether messages were written which aren't synced yet, or are being synced, in which case the file is closed once
+    # they are
+    sync_pending: bool = False
+
+
+class SpoolBatch:
+    """
+    Collects the messages produced while handling one request, with the interface of `KafkaProducer`, so that they
+    can be appended to the spool together with `commit`, or produced to Kafka directly with `produce_to`.
+    """
+
+    def __init__(self, spool: "CaptureSpool"):
+        self.spool = spool
+        self.messages: list[SpooledMessage] = []
+
+    def produce(
+        self,
+        topic: str,
+        data: Any,
+        key: Optional[str] = None,
+        value_serializer: Optional[Callable[[Any], Any]] = None,
+        headers: Optional[list[tuple[str, str]]] = None,
+    ) -> None:
+        if value_serializer is not None:
+            raise ValueError("Spooled messages are always serialized as JSON")
+        self.messages.append(SpooledMessage(topic=topic, value=json.dumps(data), key=key, headers=headers))
+
+    def commit(self) -> None:
+        self.spool.append(self.messages)
+
+    def produce_to(self, producer: _KafkaProducer) -> list[FutureRecordMetadata]:
+        return [message.produce(producer) for message in self.messages]
+
+
+class CaptureSpool:
+    """
+    Appends messages to segment files in `directory`, and produces them to Kafka from a background thread.
+
+    At most `max_bytes` of messages are kept, beyond which `append` raises `SpoolFullError`, so that capture falls
+    back to producing to Kafka directly and clients back off if Kafka can't keep up. Segments are sealed once they
+    reach `segment_bytes`, or as soon as the flusher is idle, so that messages are produced with little delay while
+    Kafka is healthy and in large batches while it's not. Segments left by a previous process are produced first.
+
+    The directory must only be used by one process at a time, see `get_capture_spool`.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int,
+        segment_bytes: int,
+        producer_factory: Callable[[], _KafkaProducer] = KafkaProducer,
+        batch_size: int = 1000,
+        ack_timeout_seconds: float = 10,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.producer_factory = producer_factory
+        self.batch_size = batch_size
+        self.ack_timeout_seconds = ack_timeout_seconds
+        self.pid = os.getpid()
+
+        self._condition = threading.Condition()
+        self._sealed: deque[_Segment] = deque()
+        self._active: Optional[_Segment] = None
+        self._size = 0
+        self._message_count = 0
+        self._next_sequence = 0
+        # Appends are numbered, so that each request can tell whether a sync covered its messages
+        self._write_sequence = 0
+        self._synced_sequence = 0
+        self._unsynced: list[_Segment] = []
+        # Held by the request which is syncing, see `_sync`
+        self._sync_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+        if self._sealed:
+            self._start_flusher()
+
+    def _recover(self) -> None:
+        names = sorted(name for name in os.listdir(self.directory) if name.endswith(_SEGMENT_SUFFIX))
+        for name in names:
+            path = os.path.join(self.directory, name)
+            stat = os.stat(path)
+            segment = _Segment(
+                path=path, size=stat.st_size, message_count=len(read_segment(path)), created_at=stat.st_mtime
+            )
+            self._sealed.append(segment)
+            self._size += segment.size
+            self._message_count += segment.message_count
+        if names:
+            self._next_sequence = int(names[-1][: -len(_SEGMENT_SUFFIX)]) + 1
+            logger.info("capture_spool_recovered", directory=self.directory, messages=self._message_count)
+        self._update_depth()
+
+    def _update_depth(self) -> None:
+        SPOOL_DEPTH_MESSAGES_GAUGE.set(self._message_count)
+        SPOOL_DEPTH_BYTES_GAUGE.set(self._size)
+        oldest = self._sealed[0] if self._sealed else self._active
+        SPOOL_OLDEST_MESSAGE_AGE_GAUGE.set(
+            time.time() - oldest.created_at if oldest is not None and oldest.message_count > 0 else 0
+        )
+
+    def _open_segment(self) -> _Segment:
+        path = os.path.join(self.directory, f"{self._next_sequence:020d}{_SEGMENT_SUFFIX}")
+        self._next_sequence += 1
+        segment = _Segment(path=path, fd=os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600))
+        # Sync the directory too, so that the new file is still there after a crash
+        directory_fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(directory_fd)
+        finally:
+            os.close(directory_fd)
+        return segment
+
+    def _seal_active(self) -> None:
+        if self._active is None:
+            return
+        if self._active.fd is not None and not self._active.sync_pending:
+            os.close(self._active.fd)
+            self._active.fd = None
+        self._sealed.append(self._active)
+        self._active = None
+
+    def append(self, messages: Sequence[SpooledMessage]) -> None:
+        """Appends `messages` to the spool, and returns once they're synced to disk"""
+        if not messages:
+            return
+        data = b"".join(message.encode() for message in messages)
+        with self._condition:
+            if self._size + len(data) > self.max_bytes:
+                SPOOL_FULL_COUNTER.inc()
+                raise SpoolFullError(f"Capture spool is full with {self._size} bytes")
+            if self._active is not None and self._active.size >= self.segment_bytes:
+                self._seal_active()
+            if self._active is None:
+                self._active = self._open_segment()
+            assert self._active.fd is not None
+            os.write(self._active.fd, data)
+            if self._active not in self._unsynced:
+                self._active.sync_pending = True
+                self._unsynced.append(self._active)
+            self._write_sequence += 1
+            sequence = self._write_sequence
+            self._active.size += len(data)
+            self._active.message_count += len(messages)
+            self._size += len(data)
+            self._message_count += len(messages)
+            self._update_depth()
+            self._condition.notify_all()
+        self._sync(sequence)
+        self._start_flusher()
+
+    def _sync(self, sequence: int) -> None:
+        """
+        Returns once the append numbered `sequence` is synced to disk. The first request to get here syncs everything
+        written so far outside of `_condition`, so that other requests and the flusher can go on, and the requests
+        which appended while it did are covered by the next sync.
+        """
+        with self._sync_lock:
+            with self._condition:
+                if self._synced_sequence >= sequence:
+                    return
+                target = self._write_sequence
+                segments, self._unsynced = self._unsynced, []
+            try:
+                for segment in segments:
+                    assert segment.fd is not None
+                    os.fsync(segment.fd)
+            except Exception:
+                with self._condition:
+                    # The next request to sync tries again
+                    self._unsynced = segments + [segment for segment in self._unsynced if segment not in segments]
+                raise
+            with self._condition:
+                self._synced_sequence = target
+                for segment in segments:
+                    segment.sync_pending = segment in self._unsynced
+                    if segment is not self._active and not segment.sync_pending and segment.fd is not None:
+                        # Sealed while it was being synced
+                        os.close(segment.fd)
+                        segment.fd = None
+
+    def batch(self) -> SpoolBatch:
+        return SpoolBatch(self)
+
+    def _start_flusher(self) -> None:
+        with self._condition:
+            if self._stopped.is_set():
+                return
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._flush_loop, name="capture-spool-flusher", daemon=True)
+                self._flusher.start()
+
+    def _next_segment(self) -> Optional[_Segment]:
+        with self._condition:
+            while not self._sealed and (self._active is None or self._active.message_count == 0):
+                if self._stopped.is_set():
+                    return None
+                self._condition.wait(timeout=_IDLE_SECONDS)
+                self._update_depth()
+
+        # Give the requests which are being handled a moment to add their messages to the same segment
+        if self._stopped.wait(_LINGER_SECONDS):
+            return None
+
+        with self._condition:
+            if not self._sealed:
+                self._seal_active()
+            return self._sealed[0]
+
+    def _flush_loop(self) -> None:
+        backoff = 1.0
+        while True:
+            segment = self._next_segment()
+            if segment is None:
+                return
+            try:
+                self._flush_segment(segment)
+                backoff = 1.0
+            except Exception as e:
+                SPOOL_FLUSH_ERRORS_COUNTER.inc()
+                logger.exception("capture_spool_flush_failed", path=segment.path)
+                capture_exception(e)
+                if self._stopped.wait(backoff):
+                    return
+                backoff = min(backoff * 2, _MAX_BACKOFF_SECONDS)
+
+    def _flush_segment(self, segment: _Segment) -> None:
+        messages = read_segment(segment.path)
+        producer = self.producer_factory()
+        while segment.flushed_count < len(messages):
+            batch = messages[segment.flushed_count : segment.flushed_count + self.batch_size]
+            futures = [message.produce(producer) for message in batch]
+            deadline = time.monotonic() + self.ack_timeout_seconds
+            for future in futures:
+                future.get(timeout=max(0.0, deadline - time.monotonic()))
+            segment.flushed_count += len(batch)
+            SPOOL_FLUSHED_MESSAGES_COUNTER.inc(len(batch))
+
+        os.remove(segment.path)
+        with self._condition:
+            self._sealed.remove(segment)
+            self._size -= segment.size
+            self._message_count -= segment.message_count
+            self._update_depth()
+            self._condition.notify_all()
+
+    @property
+    def message_count(self) -> int:
+        with self._condition:
+            return self._message_count
+
+    def wait_until_flushed(self, timeout: Optional[float] = None) -> bool:
+        """Waits until all messages appended so far were acknowledged by Kafka, and returns whether they were"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._condition:
+            while self._message_count > 0:
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(timeout=remaining)
+            return True
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stops producing messages to Kafka. Messages can still be appended, and the ones which weren't produced yet are
+        produced by the next process to use the spool.
+        """
+        self._stopped.set()
+        with self._condition:
+            self._condition.notify_all()
+            flusher = self._flusher
+        if flusher is not None:
+            flusher.join(timeout)
+        with self._condition:
+            self._seal_active()
+
+
+_spool: Optional[CaptureSpool] = None
+_spool_lock = threading.Lock()
+# Kept open for the lifetime of the process, as closing it releases the lock on its spool directory
+_spool_lock_fd: Optional[int] = None
+
+
+def _claim_directory(base_directory: str) -> str:
+    """Claims the first directory under `base_directory` which isn't used by another process, with a file lock"""
+    global _spool_lock_fd
+    slot = 0
+    while True:
+        directory = os.path.join(base_directory, f"slot-{slot}")
+        os.makedirs(directory, exist_ok=True)
+        fd = os.open(os.path.join(directory, "lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            slot += 1
+            continue
+        _spool_lock_fd = fd
+        return directory
+
+
+def get_capture_spool() -> CaptureSpool:
+    """The spool of this process, which is created on first use, so that forked workers each get their own"""
+    global _spool
+    with _spool_lock:
+        if _spool is None or _spool.pid != os.getpid():
+            _spool = CaptureSpool(
+                _claim_directory(settings.CAPTURE_SPOOL_DIRECTORY),
+                max_bytes=settings.CAPTURE_SPOOL_MAX_BYTES,
+                segment_bytes=settings.CAPTURE_SPOOL_SEGMENT_BYTES,
+                ack_timeout_seconds=settings.KAFKA_PRODUCE_ACK_TIMEOUT_SECONDS,
+            )
+        return _spool
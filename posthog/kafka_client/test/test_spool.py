@@ -0,0 +1,164 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+from kafka.errors import KafkaTimeoutError
+
+from posthog.kafka_client.client import KafkaProducerForTests, _KafkaProducer
+from posthog.kafka_client.spool import CaptureSpool, SpooledMessage, SpoolFullError, read_segment
+
+
+class RecordingKafkaProducerForTests(KafkaProducerForTests):
+    def __init__(self, failures: int = 0):
+        super().__init__()
+        self.sent: list[dict] = []
+        self.failures = failures
+
+    def send(self, topic, value, key=None, headers=None):
+        if self.failures > 0:
+            self.failures -= 1
+            raise KafkaTimeoutError("Kafka is slow")
+        self.sent.append({"topic": topic, "value": value, "key": key, "headers": headers})
+        return super().send(topic, value, key=key, headers=headers)
+
+
+class TestCaptureSpool(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.kafka = RecordingKafkaProducerForTests()
+
+    def _producer(self) -> _KafkaProducer:
+        producer = _KafkaProducer(test=True)
+        producer.producer = self.kafka
+        return producer
+
+    def _spool(self, **kwargs) -> CaptureSpool:
+        spool = CaptureSpool(
+            self.directory,
+            max_bytes=kwargs.pop("max_bytes", 1024 * 1024),
+            segment_bytes=kwargs.pop("segment_bytes", 1024),
+            producer_factory=self._producer,
+            **kwargs,
+        )
+        self.addCleanup(spool.stop, 5)
+        return spool
+
+    def _messages(self, count: int, start: int = 0) -> list[SpooledMessage]:
+        return [
+            SpooledMessage(
+                topic="events", value=json.dumps({"index": index}), key=f"token:{index}", headers=[("token", "abc")]
+            )
+            for index in range(start, start + count)
+        ]
+
+    def _sent_indices(self) -> list[int]:
+        return [json.loads(message["value"])["index"] for message in self.kafka.sent]
+
+    def test_flushes_messages_to_kafka_in_order(self):
+        spool = self._spool()
+        for start in range(0, 50, 10):
+            spool.append(self._messages(10, start=start))
+
+        assert spool.wait_until_flushed(timeout=10)
+        assert self._sent_indices() == list(range(50))
+        assert self.kafka.sent[0] == {
+            "topic": "events",
+            "value": b'{"index": 0}',
+            "key": b"token:0",
+            "headers": [("token", b"abc")],
+        }
+        assert [name for name in os.listdir(spool.directory) if name.endswith(".log")] == []
+
+    def test_batch_produces_like_kafka_producer(self):
+        spool = self._spool()
+        batch = spool.batch()
+        batch.produce(topic="events", data={"event": "$pageview"}, key="token:1", headers=[("token", "abc")])
+        batch.commit()
+
+        assert spool.wait_until_flushed(timeout=10)
+        direct = RecordingKafkaProducerForTests()
+        producer = _KafkaProducer(test=True)
+        producer.producer = direct
+        producer.produce(topic="events", data={"event": "$pageview"}, key="token:1", headers=[("token", "abc")])
+        assert self.kafka.sent == direct.sent
+
+    def test_retries_until_kafka_acknowledges(self):
+        self.kafka.failures = 2
+        spool = self._spool()
+        spool.append(self._messages(5))
+
+        assert spool.wait_until_flushed(timeout=15)
+        assert self._sent_indices() == list(range(5))
+
+    def test_rejects_messages_when_full(self):
+        spool = self._spool(max_bytes=200)
+        spool.stop()
+
+        spool.append(self._messages(2))
+        with self.assertRaises(SpoolFullError):
+            spool.append(self._messages(2))
+
+    def test_recovers_messages_of_previous_process(self):
+        spool = self._spool()
+        spool.stop()
+        spool.append(self._messages(10))
+        spool.stop()
+        assert self.kafka.sent == []
+
+        # A partially written message at the end of a segment is ignored
+        segment_path = sorted(os.path.join(spool.directory, name) for name in os.listdir(spool.directory))[0]
+        with open(segment_path, "ab") as f:
+            f.write(self._messages(1, start=10)[0].encode()[:-3])
+        assert len(read_segment(segment_path)) == 10
+
+        recovered = self._spool()
+        assert recovered.message_count == 10
+        assert recovered.wait_until_flushed(timeout=10)
+        assert self._sent_indices() == list(range(10))
+
+    def test_appends_while_syncing_share_the_next_sync(self):
+        spool = self._spool()
+        spool.stop()
+        spool.append(self._messages(1))
+
+        syncing = threading.Event()
+        release = threading.Event()
+        synced_fds: list[int] = []
+        fsync = os.fsync
+
+        def slow_fsync(fd: int) -> None:
+            synced_fds.append(fd)
+            syncing.set()
+            release.wait(5)
+            fsync(fd)
+
+        with mock.patch("posthog.kafka_client.spool.os.fsync", side_effect=slow_fsync):
+            threads = [threading.Thread(target=spool.append, args=(self._messages(1, start=1),))]
+            threads[0].start()
+            assert syncing.wait(5)
+
+            threads += [threading.Thread(target=spool.append, args=(self._messages(1, start=i),)) for i in range(2, 6)]
+            for thread in threads[1:]:
+                thread.start()
+            # Messages are appended while the first sync is still going on
+            deadline = time.monotonic() + 5
+            while spool.message_count < 6 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert spool.message_count == 6
+
+            release.set()
+            for thread in threads:
+                thread.join(5)
+
+        assert len(synced_fds) == 2
+        segment_paths = sorted(
+            os.path.join(spool.directory, name) for name in os.listdir(spool.directory) if name.endswith(".log")
+        )
+        indices = [json.loads(message.value)["index"] for path in segment_paths for message in read_segment(path)]
+        assert sorted(indices) == list(range(6))
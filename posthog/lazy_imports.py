@@ -0,0 +1,25 @@
+import importlib
+import sys
+from collections.abc import Callable, Iterable
+from typing import Any
+
+
+def lazy_attributes(package: str, module: str, names: Iterable[str]) -> Callable[[str], Any]:
+    """
+    Returns a module-level `__getattr__` for `package`, which imports `module` the first time one of `names` is
+    accessed on the package and returns that attribute of it. This lets a package re-export things that are expensive to
+    import, without everything that imports a part of the package having to import them too.
+
+        __getattr__ = lazy_attributes(__name__, "posthog.temporal.batch_exports.workflows", ["WORKFLOWS", "ACTIVITIES"])
+    """
+    lazy_names = frozenset(names)
+
+    def __getattr__(name: str) -> Any:
+        if name not in lazy_names:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module), name)
+        # Later accesses don't go through `__getattr__` anymore
+        setattr(sys.modules[package], name, value)
+        return value
+
+    return __getattr__
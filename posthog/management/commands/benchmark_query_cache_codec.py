@@ -0,0 +1,153 @@
+import random
+import statistics
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from posthog.cache_utils import OrjsonJsonSerializer
+from posthog.caching import query_cache_codec
+from posthog.caching.tolerant_zlib_compressor import TolerantZlibCompressor
+
+
+def _trends_response(rng: random.Random, *, series: int, days: int, interval: str = "day") -> dict:
+    step = timedelta(hours=1) if interval == "hour" else timedelta(days=1)
+    dates = [datetime(2024, 1, 1, tzinfo=UTC) + step * i for i in range(days)]
+    results = []
+    for index in range(series):
+        base = rng.randint(10, 5000)
+        # Weekly seasonality with some noise, like most pageview counts
+        data = [max(0, int(base * (1.3 if date.weekday() < 5 else 1) + rng.gauss(0, base * 0.05))) for date in dates]
+        results.append(
+            {
+                "data": data,
+                "labels": [date.strftime("%-d-%b-%Y") for date in dates],
+                "days": [date.strftime("%Y-%m-%d") for date in dates],
+                "count": float(sum(data)),
+                "label": f"Chrome {index}",
+                "filter": {"insight": "TRENDS", "date_from": "-90d", "interval": interval, "breakdown": "$browser"},
+                "action": {
+                    "days": dates,
+                    "id": "$pageview",
+                    "type": "events",
+                    "order": 0,
+                    "name": "$pageview",
+                    "custom_name": None,
+                    "math": "total",
+                    "math_property": None,
+                    "math_hogql": None,
+                    "math_group_type_index": None,
+                    "properties": {},
+                },
+                "breakdown_value": f"Chrome {index}",
+            }
+        )
+    return _cached_response(results)
+
+
+def _retention_response(rng: random.Random, *, cohorts: int) -> dict:
+    results = []
+    for index in range(cohorts):
+        size = rng.randint(100, 10000)
+        results.append(
+            {
+                "date": datetime(2024, 1, 1, tzinfo=UTC) + timedelta(days=index),
+                "label": f"Day {index}",
+                "values": [
+                    {"count": int(size * 0.9**period), "label": f"Day {period}"} for period in range(cohorts - index)
+                ],
+            }
+        )
+    return _cached_response(results)
+
+
+def _hogql_response(rng: random.Random, *, rows: int) -> dict:
+    results = [
+        [
+            f"0190{rng.getrandbits(96):024x}",
+            rng.choice(["$pageview", "$autocapture", "$pageleave", "signed up"]),
+            f"https://example.com/{rng.choice(['', 'docs', 'pricing', 'blog'])}",
+            (datetime(2024, 1, 1, tzinfo=UTC) + timedelta(seconds=rng.randint(0, 86400 * 30))).isoformat(),
+            rng.random() * 100,
+        ]
+        for _ in range(rows)
+    ]
+    return {**_cached_response(results), "columns": ["uuid", "event", "url", "timestamp", "value"]}
+
+
+def _cached_response(results: list) -> dict:
+    last_refresh = datetime(2024, 4, 1, tzinfo=UTC)
+    return {
+        "is_cached": False,
+        "query_status": None,
+        "last_refresh": last_refresh,
+        "calculation_trigger": None,
+        "results": results,
+        "hogql": "SELECT count() FROM events WHERE timestamp >= now() - INTERVAL 90 DAY",
+        "cache_key": "cache_" + "0" * 32,
+        "timezone": "UTC",
+        "next_allowed_client_refresh": last_refresh + timedelta(minutes=15),
+        "cache_target_age": last_refresh + timedelta(hours=6),
+    }
+
+
+def _median_ms(fn: Callable[[Any], Any], value: Any, iterations: int) -> float:
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(value)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1000
+
+
+class Command(BaseCommand):
+    help = "Compare the size and speed of caching query results as JSON and with the compact query cache codec"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=50, help="Runs to take the median latency of")
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        responses = {
+            "trends, 90 days": _trends_response(rng, series=1, days=90),
+            "trends, 90 days, 25 breakdowns": _trends_response(rng, series=25, days=90),
+            "trends, 90 days, 300 breakdowns": _trends_response(rng, series=300, days=90),
+            "trends, 14 days hourly, 25 breakdowns": _trends_response(rng, series=25, days=14 * 24, interval="hour"),
+            "retention, 30 cohorts": _retention_response(rng, cohorts=30),
+            "hogql, 1000 rows": _hogql_response(rng, rows=1000),
+        }
+
+        serializer = OrjsonJsonSerializer({})
+        compressor = TolerantZlibCompressor({})
+        iterations = options["iterations"]
+
+        self.stdout.write(
+            f"{'response':<40}{'json':>10}{'json+zstd':>12}{'codec':>10}{'codec+zstd':>12}{'saved':>8}"
+            f"{'encode json/codec ms':>24}{'decode json/codec ms':>24}{'serve codec ms':>16}"
+        )
+        for name, response in responses.items():
+            json_bytes = serializer.dumps(response)
+            codec_bytes = query_cache_codec.encode(response)
+            assert query_cache_codec.decode(codec_bytes) == serializer.loads(json_bytes)
+
+            # Sizes are compared as stored, i.e. after Redis compression
+            with override_settings(USE_REDIS_COMPRESSION=True):
+                json_stored = len(compressor.compress(json_bytes))
+                codec_stored = len(compressor.compress(codec_bytes))
+
+            encode_json = _median_ms(serializer.dumps, response, iterations)
+            encode_codec = _median_ms(query_cache_codec.encode, response, iterations)
+            decode_json = _median_ms(serializer.loads, json_bytes, iterations)
+            decode_codec = _median_ms(query_cache_codec.decode, codec_bytes, iterations)
+            # Cached JSON is served as is, while encoded responses are converted back to JSON
+            serve_codec = _median_ms(query_cache_codec.to_json, codec_bytes, iterations)
+
+            self.stdout.write(
+                f"{name:<40}{len(json_bytes):>10}{json_stored:>12}{len(codec_bytes):>10}{codec_stored:>12}"
+                f"{1 - codec_stored / json_stored:>8.0%}"
+                f"{f'{encode_json:.2f} / {encode_codec:.2f}':>24}{f'{decode_json:.2f} / {decode_codec:.2f}':>24}"
+                f"{serve_codec:>16.2f}"
+            )
@@ -0,0 +1,89 @@
+import subprocess
+import sys
+from dataclasses import dataclass
+
+from django.core.management.base import BaseCommand, CommandError
+
+# What each kind of process imports before it can handle its first request or task
+BOOT_TARGETS = {
+    "django": "import django; django.setup()",
+    "web": "import django; django.setup(); import posthog.urls",
+    "celery": "import django; django.setup(); from posthog.celery import app; app.loader.import_default_modules()",
+    "temporal": "import django; django.setup(); import posthog.management.commands.start_temporal_worker",
+}
+
+
+@dataclass
+class ImportTime:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_import_times(output: str) -> list[ImportTime]:
+    """
+    Parses the report Python writes to stderr with `-X importtime`, which has a line like
+    `import time:       431 |    5521691 |   posthog.api` for each module.
+    """
+    import_times = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        if not self_us.strip().isdigit():
+            # The header
+            continue
+        import_times.append(ImportTime(module.strip(), int(self_us), int(cumulative_us)))
+    return import_times
+
+
+def measure_import_times(code: str) -> list[ImportTime]:
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=False
+    )
+    if process.returncode != 0:
+        raise CommandError(f"Importing failed:\n{process.stderr[-2000:]}")
+    return parse_import_times(process.stderr)
+
+
+class Command(BaseCommand):
+    help = "Report which modules a process spends its startup time importing, and check it against a budget"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            choices=sorted(BOOT_TARGETS),
+            default=[],
+            action="append",
+            help="Kind of process to measure the startup of, defaults to all of them",
+        )
+        parser.add_argument("--top", type=int, default=25, help="Number of the slowest imports to list")
+        parser.add_argument(
+            "--budget-seconds",
+            type=float,
+            default=None,
+            help="Fail if importing takes longer than this for any target, e.g. to track startup time in CI",
+        )
+
+    def handle(self, *args, **options):
+        over_budget = []
+        for target in options["target"] or sorted(BOOT_TARGETS):
+            import_times = measure_import_times(BOOT_TARGETS[target])
+            total_seconds = sum(import_time.self_us for import_time in import_times) / 1e6
+
+            self.stdout.write(f"{target}: {len(import_times)} modules imported in {total_seconds:.2f}s")
+            self.stdout.write(f"{'self ms':>10}{'cumulative ms':>15}  module")
+            slowest = sorted(import_times, key=lambda import_time: import_time.self_us, reverse=True)
+            for import_time in slowest[: options["top"]]:
+                self.stdout.write(
+                    f"{import_time.self_us / 1000:>10.1f}{import_time.cumulative_us / 1000:>15.1f}  {import_time.module}"
+                )
+            self.stdout.write("")
+
+            if options["budget_seconds"] is not None and total_seconds > options["budget_seconds"]:
+                over_budget.append(f"{target} ({total_seconds:.2f}s)")
+
+        if over_budget:
+            raise CommandError(
+                f"Importing took longer than the budget of {options['budget_seconds']}s for: {', '.join(over_budget)}"
+            )
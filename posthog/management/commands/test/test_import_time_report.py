@@ -0,0 +1,43 @@
+import subprocess
+import sys
+
+from django.test import SimpleTestCase
+
+from posthog.management.commands.import_time_report import ImportTime, parse_import_times
+
+
+class TestImportTimeReport(SimpleTestCase):
+    def test_parse_import_times(self):
+        output = "\n".join(
+            [
+                "import time: self [us] | cumulative | imported package",
+                "import time:       431 |    5521691 | posthog.admin.admins",
+                "import time:      1448 |    5509684 |   posthog.admin.admins.user_admin",
+                "Traceback (most recent call last):",
+            ]
+        )
+
+        assert parse_import_times(output) == [
+            ImportTime("posthog.admin.admins", 431, 5521691),
+            ImportTime("posthog.admin.admins.user_admin", 1448, 5509684),
+        ]
+
+    def test_workflows_are_imported_lazily(self):
+        # A fresh interpreter, as the workflows stay imported and cached on the package once anything accessed them
+        code = "\n".join(
+            [
+                "import sys",
+                "import django",
+                "django.setup()",
+                "import posthog.temporal.batch_exports",
+                "assert 'posthog.temporal.batch_exports.workflows' not in sys.modules",
+                "from posthog.temporal.batch_exports import WORKFLOWS",
+                "assert 'posthog.temporal.batch_exports.workflows' in sys.modules",
+                "assert posthog.temporal.batch_exports.WORKFLOWS is WORKFLOWS",
+                "assert not hasattr(posthog.temporal.batch_exports, 'NOT_A_WORKFLOW')",
+            ]
+        )
+
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=False)
+
+        assert result.returncode == 0, result.stderr
@@ -199,8 +199,15 @@ class Cohort(models.Model):
             "deleted": self.deleted,
         }
 
-    def calculate_people_ch(self, pending_version: int, *, initiating_user_id: Optional[int] = None):
-        from posthog.models.cohort.util import recalculate_cohortpeople
+    def calculate_people_ch(
+        self, pending_version: Optional[int], *, initiating_user_id: Optional[int] = None, incremental: bool = False
+    ):
+        """
+        Recalculates the cohort as `pending_version`. With `incremental`, eligible cohorts instead get membership
+        changes since their last calculation applied, and `pending_version` can be None, as a pending version is only
+        taken if persons were removed or the cohort has to be fully recalculated after all.
+        """
+        from posthog.models.cohort.util import recalculate_cohortpeople, recalculate_cohortpeople_incrementally
         from posthog.tasks.calculate_cohort import clear_stale_cohort
 
         logger.warn(
@@ -208,11 +215,23 @@ class Cohort(models.Model):
             id=self.pk,
             current_version=self.version,
             new_version=pending_version,
+            incremental=incremental,
         )
         start_time = time.monotonic()
 
         try:
-            count = recalculate_cohortpeople(self, pending_version, initiating_user_id=initiating_user_id)
+            incremental_result = (
+                recalculate_cohortpeople_incrementally(self, initiating_user_id=initiating_user_id)
+                if incremental
+                else None
+            )
+            is_incremental = incremental_result is not None
+            if incremental_result is not None:
+                count, pending_version = incremental_result
+            else:
+                if pending_version is None:
+                    pending_version = get_and_update_pending_version(self)
+                count = recalculate_cohortpeople(self, pending_version, initiating_user_id=initiating_user_id)
             self.count = count
 
             self.last_calculation = timezone.now()
@@ -235,6 +254,18 @@ class Cohort(models.Model):
             self.is_calculating = False
             self.save()
 
+        if is_incremental and pending_version == self.version:
+            # The current version was updated in place, so there's no new version to switch to
+            logger.warn(
+                "cohort_calculation_completed",
+                id=self.pk,
+                version=self.version,
+                incremental=True,
+                duration=(time.monotonic() - start_time),
+            )
+            return
+        assert pending_version is not None
+
         # Update filter to match pending version if still valid
         Cohort.objects.filter(pk=self.pk).filter(Q(version__lt=pending_version) | Q(version__isnull=True)).update(
             version=pending_version, count=count
@@ -245,6 +276,7 @@ class Cohort(models.Model):
             "cohort_calculation_completed",
             id=self.pk,
             version=pending_version,
+            incremental=is_incremental,
             duration=(time.monotonic() - start_time),
         )
 
@@ -373,6 +405,70 @@ def get_and_update_pending_version(cohort: Cohort):
     return cohort.pending_version
 
 
+def calculate_people_ch_for_cohorts(
+    cohorts: list[Cohort], pending_versions: dict[int, int], *, initiating_user_id: Optional[int] = None
+) -> None:
+    """
+    Calculates cohorts with identical filters in one ClickHouse pass, see `get_cohort_filters_hash`.
+    """
+    from posthog.models.cohort.util import recalculate_cohortpeople_for_cohorts
+    from posthog.tasks.calculate_cohort import clear_stale_cohort
+
+    if len(cohorts) == 1:
+        cohorts[0].calculate_people_ch(pending_versions[cohorts[0].pk], initiating_user_id=initiating_user_id)
+        return
+
+    logger.warn(
+        "cohort_group_calculation_started",
+        ids=[cohort.pk for cohort in cohorts],
+        new_versions=pending_versions,
+    )
+    start_time = time.monotonic()
+
+    try:
+        counts = recalculate_cohortpeople_for_cohorts(cohorts, pending_versions, initiating_user_id=initiating_user_id)
+    except Exception:
+        for cohort in cohorts:
+            cohort.errors_calculating = F("errors_calculating") + 1
+            cohort.last_error_at = timezone.now()
+            cohort.is_calculating = False
+            cohort.save()
+
+        logger.warning(
+            "cohort_group_calculation_failed",
+            ids=[cohort.pk for cohort in cohorts],
+            new_versions=pending_versions,
+            exc_info=True,
+        )
+
+        raise
+
+    for cohort in cohorts:
+        pending_version = pending_versions[cohort.pk]
+        count = counts[cohort.pk]
+
+        cohort.count = count
+        cohort.last_calculation = timezone.now()
+        cohort.errors_calculating = 0
+        cohort.last_error_at = None
+        cohort.is_calculating = False
+        cohort.save()
+
+        # Update filter to match pending version if still valid
+        Cohort.objects.filter(pk=cohort.pk).filter(Q(version__lt=pending_version) | Q(version__isnull=True)).update(
+            version=pending_version, count=count
+        )
+
+        clear_stale_cohort.delay(cohort.pk, before_version=pending_version)
+
+    logger.warn(
+        "cohort_group_calculation_completed",
+        ids=[cohort.pk for cohort in cohorts],
+        new_versions=pending_versions,
+        duration=(time.monotonic() - start_time),
+    )
+
+
 class CohortPeople(models.Model):
     id = models.BigAutoField(primary_key=True)
     cohort = models.ForeignKey("Cohort", on_delete=models.CASCADE)
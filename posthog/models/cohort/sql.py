@@ -49,6 +49,69 @@ WHERE team_id = %(team_id)s AND cohort_id = %(cohort_id)s AND version < %(new_ve
 SETTINGS optimize_aggregation_in_order = 1, join_algorithm = 'auto'
 """
 
+# Same as RECALCULATE_COHORT_BY_ID, but writes the result of a single cohort filter query to several cohorts which
+# share identical filters. cohort_ids and new_versions are parallel arrays.
+RECALCULATE_COHORTS_BY_IDS = """
+INSERT INTO cohortpeople
+SELECT id, cohort_version.1 as cohort_id, %(team_id)s as team_id, 1 AS sign, cohort_version.2 AS version
+FROM (
+    {cohort_filter}
+) as person
+ARRAY JOIN arrayZip(%(cohort_ids)s, %(new_versions)s) AS cohort_version
+UNION ALL
+SELECT person_id, cohort_id, team_id, -1, version
+FROM cohortpeople
+WHERE team_id = %(team_id)s AND has(%(cohort_ids)s, cohort_id) AND version < transform(cohort_id, %(cohort_ids)s, %(new_versions)s, 0) AND sign = 1
+SETTINGS optimize_aggregation_in_order = 1, join_algorithm = 'auto'
+"""
+
+# Membership changes of a cohort's current version, restricted to the candidate persons which could have changed.
+# Returns persons to add with added = 1 and persons to remove with added = 0.
+GET_COHORTPEOPLE_DELTA_SQL = """
+SELECT id, 1 AS added
+FROM ({matching_query}) AS matching
+WHERE id NOT IN (
+    SELECT person_id FROM cohortpeople
+    WHERE team_id = %(team_id)s AND cohort_id = %(cohort_id)s AND version = %(version)s
+)
+UNION ALL
+SELECT person_id, 0 AS added
+FROM cohortpeople
+WHERE team_id = %(team_id)s AND cohort_id = %(cohort_id)s AND version = %(version)s
+AND person_id IN ({candidates_query})
+AND person_id NOT IN (SELECT id FROM ({matching_query}))
+"""
+
+INSERT_COHORTPEOPLE_SQL = """
+INSERT INTO cohortpeople (person_id, cohort_id, team_id, sign, version) VALUES
+"""
+
+# Copies the members of a cohort's current version to a new version, except for the persons removed from it, and
+# cancels out the rows of previous versions like RECALCULATE_COHORT_BY_ID does
+COPY_COHORTPEOPLE_TO_VERSION_SQL = """
+INSERT INTO cohortpeople
+SELECT DISTINCT person_id, cohort_id, team_id, 1 AS sign, %(new_version)s AS version
+FROM cohortpeople
+WHERE team_id = %(team_id)s AND cohort_id = %(cohort_id)s AND version = %(version)s AND sign = 1
+AND person_id NOT IN %(removed_person_ids)s
+UNION ALL
+SELECT person_id, cohort_id, team_id, -1, version
+FROM cohortpeople
+WHERE team_id = %(team_id)s AND cohort_id = %(cohort_id)s AND version < %(new_version)s AND sign = 1
+"""
+
+# Persons whose properties changed since the watermark, including deleted ones
+GET_PERSON_IDS_UPDATED_AFTER_SQL = """
+SELECT DISTINCT id FROM person WHERE team_id = %(team_id)s AND _timestamp > %(watermark)s
+"""
+
+GET_PERSON_IDS_BY_EVENT_SQL = """
+SELECT DISTINCT pdi.person_id AS id
+FROM events e
+INNER JOIN ({person_distinct_ids_query}) AS pdi ON e.distinct_id = pdi.distinct_id
+WHERE e.team_id = %(team_id)s AND e.event = %(event)s AND ({timestamp_filter}) {person_filter}
+"""
+
 # NOTE: Group by version id to ensure that signs are summed between corresponding rows.
 # Version filtering is not necessary as only positive rows of the latest version will be selected by sum(sign) > 0
 
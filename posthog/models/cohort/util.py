@@ -1,6 +1,8 @@
+import hashlib
+import json
 import uuid
 from datetime import datetime, timedelta
-from typing import Any, Optional, Union, cast
+from typing import Any, Literal, Optional, Union, cast
 
 import structlog
 from dateutil import parser
@@ -22,15 +24,21 @@ from posthog.hogql.printer import print_ast
 from posthog.models import Action, Filter, Team
 from posthog.models.action.util import format_action_filter
 from posthog.models.async_deletion import AsyncDeletion, DeletionType
-from posthog.models.cohort.cohort import Cohort, CohortOrEmpty
+from posthog.models.cohort.cohort import Cohort, CohortOrEmpty, get_and_update_pending_version
 from posthog.models.cohort.sql import (
     CALCULATE_COHORT_PEOPLE_SQL,
+    COPY_COHORTPEOPLE_TO_VERSION_SQL,
     GET_COHORT_SIZE_SQL,
+    GET_COHORTPEOPLE_DELTA_SQL,
     GET_COHORTS_BY_PERSON_UUID,
+    GET_PERSON_IDS_BY_EVENT_SQL,
+    GET_PERSON_IDS_UPDATED_AFTER_SQL,
     GET_PERSON_ID_BY_PRECALCULATED_COHORT_ID,
     GET_STATIC_COHORT_SIZE_SQL,
     GET_STATIC_COHORTPEOPLE_BY_PERSON_UUID,
+    INSERT_COHORTPEOPLE_SQL,
     RECALCULATE_COHORT_BY_ID,
+    RECALCULATE_COHORTS_BY_IDS,
     STALE_COHORTPEOPLE,
 )
 from posthog.models.person.sql import (
@@ -39,15 +47,26 @@ from posthog.models.person.sql import (
     INSERT_PERSON_STATIC_COHORT,
     PERSON_STATIC_COHORT_TABLE,
 )
-from posthog.models.property import Property, PropertyGroup
+from posthog.models.property import BehavioralPropertyType, Property, PropertyGroup
 from posthog.queries.insight import insight_sync_execute
 from posthog.queries.person_distinct_id_query import get_team_distinct_ids_query
+from posthog.redis import get_client
+from posthog.schema import PersonsOnEventsMode
 
 # temporary marker to denote when cohortpeople table started being populated
 TEMP_PRECALCULATED_MARKER = parser.parse("2021-06-07T15:00:00+00:00")
 
 logger = structlog.get_logger(__name__)
 
+COHORT_CALCULATION_STATE_KEY = "cohort_calculation_state:{cohort_id}"
+COHORT_CALCULATION_STATE_TTL = timedelta(days=7)
+# Deltas are idempotent, so each incremental update overlaps the previous one to tolerate ingestion lag
+INCREMENTAL_WATERMARK_OVERLAP = timedelta(minutes=10)
+# Incrementally updated cohorts are still fully recalculated this often, to correct any drift
+FULL_RECALCULATION_INTERVAL = timedelta(hours=24)
+
+IncrementalCohortKind = Literal["person_properties", "performed_event"]
+
 
 def format_person_query(cohort: Cohort, index: int, hogql_context: HogQLContext) -> tuple[str, dict[str, Any]]:
     if cohort.is_static:
@@ -342,6 +361,7 @@ def get_static_cohort_size(cohort: Cohort) -> Optional[int]:
 def recalculate_cohortpeople(
     cohort: Cohort, pending_version: int, *, initiating_user_id: Optional[int]
 ) -> Optional[int]:
+    calculation_started_at = timezone.now()
     hogql_context = HogQLContext(within_non_hogql_query=True, team_id=cohort.team_id)
     cohort_query, cohort_params = format_person_query(cohort, 0, hogql_context)
 
@@ -380,6 +400,7 @@ def recalculate_cohortpeople(
     )
 
     count = get_cohort_size(cohort, override_version=pending_version)
+    set_cohort_calculation_state(cohort, pending_version, calculated_at=calculation_started_at, full=True)
 
     if count is not None and before_count is not None:
         logger.warn(
@@ -393,6 +414,300 @@ def recalculate_cohortpeople(
     return count
 
 
+def get_cohort_filters_hash(cohort: Cohort) -> Optional[str]:
+    """
+    Returns a hash of the cohort's normalized filters, so that cohorts with identical definitions can be calculated
+    together. Returns None for cohorts which can't share a calculation.
+    """
+    if cohort.is_static or cohort.query or not cohort.properties.values:
+        return None
+
+    normalized_filters = json.dumps(cohort.properties.to_dict(), sort_keys=True, default=str)
+    return hashlib.sha1(f"{cohort.team_id}_{normalized_filters}".encode()).hexdigest()
+
+
+def recalculate_cohortpeople_for_cohorts(
+    cohorts: list[Cohort], pending_versions: dict[int, int], *, initiating_user_id: Optional[int]
+) -> dict[int, Optional[int]]:
+    """
+    Recalculates several cohorts with identical filters in a single pass over ClickHouse.
+
+    All cohorts must belong to the same team and share the same `get_cohort_filters_hash`. Returns the new size of
+    each cohort keyed by cohort id.
+    """
+    if len({cohort.team_id for cohort in cohorts}) != 1:
+        raise ValueError("Cohorts calculated together must belong to the same team")
+
+    calculation_started_at = timezone.now()
+    representative = cohorts[0]
+    hogql_context = HogQLContext(within_non_hogql_query=True, team_id=representative.team_id)
+    cohort_query, cohort_params = format_person_query(representative, 0, hogql_context)
+
+    cohort_ids = [cohort.pk for cohort in cohorts]
+    logger.warn(
+        "Recalculating cohortpeople for cohorts with identical filters starting",
+        team_id=representative.team_id,
+        cohort_ids=cohort_ids,
+    )
+
+    tag_queries(kind="cohort_calculation", team_id=representative.team_id, query_type="CohortsQuery")
+    if initiating_user_id:
+        tag_queries(user_id=initiating_user_id)
+
+    sync_execute(
+        RECALCULATE_COHORTS_BY_IDS.format(cohort_filter=cohort_query),
+        {
+            **cohort_params,
+            **hogql_context.values,
+            "cohort_ids": cohort_ids,
+            "new_versions": [pending_versions[cohort_id] for cohort_id in cohort_ids],
+            "team_id": representative.team_id,
+        },
+        settings={
+            "max_execution_time": 600,
+            "send_timeout": 600,
+            "receive_timeout": 600,
+            "optimize_on_insert": 0,
+        },
+        workload=Workload.OFFLINE,
+    )
+
+    # All cohorts share the same filters, so they all have the same size
+    count = get_cohort_size(representative, override_version=pending_versions[representative.pk])
+    for cohort in cohorts:
+        set_cohort_calculation_state(
+            cohort, pending_versions[cohort.pk], calculated_at=calculation_started_at, full=True
+        )
+
+    logger.warn(
+        "Recalculating cohortpeople for cohorts with identical filters done",
+        team_id=representative.team_id,
+        cohort_ids=cohort_ids,
+        size=count,
+    )
+
+    return {cohort_id: count for cohort_id in cohort_ids}
+
+
+def get_incremental_cohort_kind(cohort: Cohort) -> Optional[IncrementalCohortKind]:
+    """
+    Returns which kind of incremental update the cohort supports, if any. Supported are cohorts of only person
+    properties, and cohorts of a single "performed event in the last N days" filter.
+    """
+    if cohort.is_static or cohort.query:
+        return None
+
+    properties = cohort.properties.flat
+    if not properties:
+        return None
+
+    if all(prop.type == "person" for prop in properties):
+        return "person_properties"
+
+    if len(properties) == 1:
+        prop = properties[0]
+        if (
+            prop.type == "behavioral"
+            and prop.value == BehavioralPropertyType.PERFORMED_EVENT
+            and prop.event_type == "events"
+            and not prop.negation
+            and not prop.event_filters
+            and not prop.explicit_datetime
+            and prop.time_value is not None
+            and prop.time_interval is not None
+            and cohort.team.person_on_events_mode
+            in (PersonsOnEventsMode.DISABLED, PersonsOnEventsMode.PERSON_ID_OVERRIDE_PROPERTIES_JOINED)
+        ):
+            return "performed_event"
+
+    return None
+
+
+def set_cohort_calculation_state(cohort: Cohort, version: int, *, calculated_at: datetime, full: bool) -> None:
+    """
+    Records the start of the last successful calculation of the given cohort version, which is the watermark that
+    incremental updates compute changes from.
+    """
+    key = COHORT_CALCULATION_STATE_KEY.format(cohort_id=cohort.pk)
+    fully_calculated_at = calculated_at
+    if not full:
+        previous_state = get_cohort_calculation_state(cohort)
+        if previous_state is None:
+            return
+        fully_calculated_at = datetime.fromisoformat(previous_state["fully_calculated_at"])
+
+    state = {
+        "version": version,
+        "filters_hash": get_cohort_filters_hash(cohort),
+        "calculated_at": calculated_at.isoformat(),
+        "fully_calculated_at": fully_calculated_at.isoformat(),
+    }
+    get_client().set(key, json.dumps(state), ex=COHORT_CALCULATION_STATE_TTL)
+
+
+def get_cohort_calculation_state(cohort: Cohort) -> Optional[dict[str, Any]]:
+    raw_state = get_client().get(COHORT_CALCULATION_STATE_KEY.format(cohort_id=cohort.pk))
+    if not raw_state:
+        return None
+    return json.loads(raw_state)
+
+
+def get_incremental_watermark(cohort: Cohort) -> Optional[datetime]:
+    """
+    Returns the time from which changes need to be applied to the cohort's current version, or None if the cohort
+    has to be fully recalculated.
+    """
+    state = get_cohort_calculation_state(cohort)
+    if state is None or cohort.version is None:
+        return None
+
+    if state["version"] != cohort.version or state["filters_hash"] != get_cohort_filters_hash(cohort):
+        # The cohort changed since its current version was calculated
+        return None
+
+    if datetime.fromisoformat(state["fully_calculated_at"]) < timezone.now() - FULL_RECALCULATION_INTERVAL:
+        return None
+
+    return datetime.fromisoformat(state["calculated_at"]) - INCREMENTAL_WATERMARK_OVERLAP
+
+
+def _get_incremental_queries(
+    cohort: Cohort, kind: IncrementalCohortKind, watermark: datetime, now: datetime
+) -> Optional[tuple[str, str, dict[str, Any]]]:
+    """
+    Returns a query for candidate persons whose membership may have changed since the watermark, and a query for
+    which of those currently match the cohort.
+    """
+    from posthog.queries.cohort_query import CohortQuery
+    from posthog.queries.foss_cohort_query import relative_date_to_seconds
+
+    if kind == "person_properties":
+        hogql_context = HogQLContext(within_non_hogql_query=True, team_id=cohort.team_id)
+        # The person query only returns persons updated after the watermark
+        matching_query, matching_params = CohortQuery(
+            Filter(
+                data={"properties": cohort.properties, "updated_after": watermark.isoformat()},
+                team=cohort.team,
+                hogql_context=hogql_context,
+            ),
+            cohort.team,
+            cohort_pk=cohort.pk,
+            persons_on_events_mode=cohort.team.person_on_events_mode,
+        ).get_query()
+        return (
+            GET_PERSON_IDS_UPDATED_AFTER_SQL,
+            f"SELECT id FROM ({matching_query})",
+            {**matching_params, **hogql_context.values, "watermark": watermark},
+        )
+
+    prop = cohort.properties.flat[0]
+    window = timedelta(seconds=relative_date_to_seconds((prop.time_value, prop.time_interval)))
+    if now - watermark >= window:
+        return None
+
+    # Persons who performed the event since the watermark may have joined, and persons whose events
+    # dropped out of the window since the watermark may have left
+    candidates_filter = (
+        "timestamp >= %(watermark)s OR (timestamp >= %(expiring_from)s AND timestamp <= %(window_start)s)"
+    )
+    matching_filter = "timestamp > %(window_start)s AND timestamp < %(now)s"
+
+    def person_ids_by_event_query(timestamp_filter: str, person_filter: str = "") -> str:
+        return GET_PERSON_IDS_BY_EVENT_SQL.format(
+            person_distinct_ids_query=get_team_distinct_ids_query(
+                cohort.team_id, relevant_events_conditions=f"AND event = %(event)s AND ({timestamp_filter})"
+            ),
+            timestamp_filter=timestamp_filter,
+            person_filter=person_filter,
+        )
+
+    candidates_query = person_ids_by_event_query(candidates_filter)
+    return (
+        candidates_query,
+        person_ids_by_event_query(matching_filter, f"AND pdi.person_id IN ({candidates_query})"),
+        {
+            "event": prop.key,
+            "watermark": watermark,
+            "expiring_from": watermark - window,
+            "window_start": now - window,
+            "now": now,
+        },
+    )
+
+
+def recalculate_cohortpeople_incrementally(
+    cohort: Cohort, *, initiating_user_id: Optional[int]
+) -> Optional[tuple[int, int]]:
+    """
+    Applies membership changes since the last calculation to the cohort, instead of recomputing its whole membership.
+    Persons who now match are added to the current version in place. If persons no longer match, the remaining
+    members are copied to a new version in ClickHouse instead, so that readers of a version never see removed persons.
+
+    Returns the new size and version of the cohort, or None if the cohort can't be updated incrementally and needs to
+    be fully recalculated with `recalculate_cohortpeople`.
+    """
+    kind = get_incremental_cohort_kind(cohort)
+    if kind is None:
+        return None
+
+    watermark = get_incremental_watermark(cohort)
+    if watermark is None:
+        return None
+
+    calculation_started_at = timezone.now()
+    queries = _get_incremental_queries(cohort, kind, watermark, calculation_started_at)
+    if queries is None:
+        return None
+    candidates_query, matching_query, query_params = queries
+
+    tag_queries(kind="cohort_calculation", team_id=cohort.team_id, query_type="CohortsQueryIncremental")
+    if initiating_user_id:
+        tag_queries(user_id=initiating_user_id)
+
+    version = cast(int, cohort.version)
+    params = {**query_params, "cohort_id": cohort.pk, "team_id": cohort.team_id, "version": version}
+    delta = sync_execute(
+        GET_COHORTPEOPLE_DELTA_SQL.format(candidates_query=candidates_query, matching_query=matching_query),
+        params,
+        settings={"max_execution_time": 600, "send_timeout": 600, "receive_timeout": 600},
+        workload=Workload.OFFLINE,
+    )
+    added = [row[0] for row in delta if row[1]]
+    removed = [row[0] for row in delta if not row[1]]
+
+    new_version = version
+    if removed:
+        new_version = get_and_update_pending_version(cohort)
+        sync_execute(
+            COPY_COHORTPEOPLE_TO_VERSION_SQL,
+            {**params, "new_version": new_version, "removed_person_ids": removed},
+            settings={"max_execution_time": 600, "send_timeout": 600, "receive_timeout": 600},
+            workload=Workload.OFFLINE,
+        )
+    if added:
+        sync_execute(
+            INSERT_COHORTPEOPLE_SQL,
+            [(person_id, cohort.pk, cohort.team_id, 1, new_version) for person_id in added],
+            workload=Workload.OFFLINE,
+        )
+
+    set_cohort_calculation_state(cohort, new_version, calculated_at=calculation_started_at, full=False)
+    count = get_cohort_size(cohort, override_version=new_version) or 0
+
+    logger.warn(
+        "Incrementally updated cohortpeople",
+        team_id=cohort.team_id,
+        cohort_id=cohort.pk,
+        version=version,
+        new_version=new_version,
+        added=len(added),
+        removed=len(removed),
+        size=count,
+    )
+
+    return count, new_version
+
+
 def clear_stale_cohortpeople(cohort: Cohort, before_version: int) -> None:
     if cohort.version and cohort.version > 0:
         stale_count_result = sync_execute(
@@ -1,4 +1,7 @@
 import re
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Any, Optional, Union
 
 from django.contrib.postgres.fields import ArrayField
 from django.db import models
@@ -19,7 +22,77 @@ class Element(models.Model):
     group = models.ForeignKey("ElementGroup", on_delete=models.CASCADE, null=True, blank=True)
 
 
+class ParsedElement:
+    """
+    A lightweight element parsed from an `elements_chain`, with the same fields as `Element`.
+
+    Parsed elements are shared through the parse cache, so they must not be mutated. Use `to_element` to get a Django
+    model instance, or `to_dict` for the same output as `ElementSerializer`.
+    """
+
+    __slots__ = (
+        "text",
+        "tag_name",
+        "href",
+        "attr_id",
+        "attr_class",
+        "nth_child",
+        "nth_of_type",
+        "attributes",
+        "order",
+    )
+
+    text: Optional[str]
+    tag_name: Optional[str]
+    href: Optional[str]
+    attr_id: Optional[str]
+    attr_class: Optional[tuple[str, ...]]
+    nth_child: Optional[int]
+    nth_of_type: Optional[int]
+    attributes: dict[str, str]
+    order: int
+
+    def __init__(self, order: int) -> None:
+        self.text = None
+        self.tag_name = None
+        self.href = None
+        self.attr_id = None
+        self.attr_class = None
+        self.nth_child = None
+        self.nth_of_type = None
+        self.attributes = {}
+        self.order = order
+
+    def to_element(self) -> Element:
+        return Element(
+            text=self.text,
+            tag_name=self.tag_name,
+            href=self.href,
+            attr_id=self.attr_id,
+            attr_class=list(self.attr_class) if self.attr_class is not None else None,
+            nth_child=self.nth_child,
+            nth_of_type=self.nth_of_type,
+            attributes=dict(self.attributes),
+            order=self.order,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "text": self.text,
+            "tag_name": self.tag_name,
+            "attr_class": list(self.attr_class) if self.attr_class is not None else None,
+            "href": self.href,
+            "attr_id": self.attr_id,
+            "nth_child": self.nth_child,
+            "nth_of_type": self.nth_of_type,
+            "attributes": dict(self.attributes),
+            "order": self.order,
+        }
+
+
 parse_attributes_regex = re.compile(r"(?P<attribute>(?P<key>.*?)\=\"(?P<value>.*?[^\\])\")", re.MULTILINE)
+# Same as above, but only capturing the key and value
+_parse_key_value_regex = re.compile(r"(.*?)\=\"(.*?[^\\])\"", re.MULTILINE)
 
 # Below splits all elements by ;, while ignoring escaped quotes and semicolons within quotes
 split_chain_regex = re.compile(r'(?:[^\s;"]|"(?:\\.|[^"])*")+')
@@ -28,63 +101,96 @@ split_chain_regex = re.compile(r'(?:[^\s;"]|"(?:\\.|[^"])*")+')
 # Needs a regex because classes can have : too
 split_class_attributes = re.compile(r"(.*?)($|:([a-zA-Z\-\_0-9]*=.*))")
 
+# The same chains repeat constantly, so parsed chains are memoized. Very long chains are rare and not worth caching.
+ELEMENTS_CHAIN_CACHE_SIZE = 4096
+MAX_CACHED_ELEMENTS_CHAIN_LENGTH = 10_000
+
 
 def _escape(input: str) -> str:
     return input.replace('"', r"\"")
 
 
-def elements_to_string(elements: list[Element]) -> str:
+def elements_to_string(elements: Sequence[Union[Element, ParsedElement]]) -> str:
     ret = []
     for element in elements:
-        el_string = ""
-        if element.tag_name:
-            el_string += element.tag_name
+        el_string = element.tag_name or ""
         if element.attr_class:
-            for single_class in sorted(element.attr_class):
-                el_string += ".{}".format(single_class.replace('"', ""))
-        attributes = {
-            **({"text": element.text} if element.text else {}),
-            "nth-child": element.nth_child or 0,
-            "nth-of-type": element.nth_of_type or 0,
-            **({"href": element.href} if element.href else {}),
-            **({"attr_id": element.attr_id} if element.attr_id else {}),
-            **element.attributes,
-        }
-        attributes = {_escape(key): _escape(str(value)) for key, value in sorted(attributes.items())}
+            el_string += "".join(
+                ".{}".format(single_class.replace('"', "")) for single_class in sorted(element.attr_class)
+            )
+
+        attributes: dict[str, Any] = {"nth-child": element.nth_child or 0, "nth-of-type": element.nth_of_type or 0}
+        if element.text:
+            attributes["text"] = element.text
+        if element.href:
+            attributes["href"] = element.href
+        if element.attr_id:
+            attributes["attr_id"] = element.attr_id
+        attributes.update(element.attributes)
+
+        escaped_attributes = {_escape(key): _escape(str(value)) for key, value in sorted(attributes.items())}
         el_string += ":"
-        el_string += "".join(['{}="{}"'.format(key, value) for key, value in attributes.items()])
+        el_string += "".join('{}="{}"'.format(key, value) for key, value in escaped_attributes.items())
         ret.append(el_string)
     return ";".join(ret)
 
 
+def _parse_element(el_string: str, order: int) -> ParsedElement:
+    element = ParsedElement(order)
+
+    # The pattern always matches, at the latest at the end of the string
+    split = split_class_attributes.search(el_string)
+    assert split is not None
+    tag_and_classes, attributes = split.group(1), split.group(3)
+
+    if tag_and_classes:
+        tag_name, _, classes = tag_and_classes.partition(".")
+        element.tag_name = tag_name
+        if classes:
+            element.attr_class = tuple(cl for cl in classes.split(".") if cl != "")
+        elif "." in tag_and_classes:
+            element.attr_class = ()
+
+    if attributes:
+        for key, value in _parse_key_value_regex.findall(attributes):
+            if key == "href":
+                element.href = value
+            elif key == "nth-child":
+                element.nth_child = int(value)
+            elif key == "nth-of-type":
+                element.nth_of_type = int(value)
+            elif key == "text":
+                element.text = value
+            elif key == "attr_id":
+                element.attr_id = value
+            elif key:
+                element.attributes[key] = value
+
+    return element
+
+
+def _parse_elements_chain(chain: str) -> tuple[ParsedElement, ...]:
+    return tuple(_parse_element(el_string, idx) for idx, el_string in enumerate(split_chain_regex.findall(chain)))
+
+
+_parse_elements_chain_cached = lru_cache(maxsize=ELEMENTS_CHAIN_CACHE_SIZE)(_parse_elements_chain)
+
+
+def parse_elements_chain(chain: str) -> tuple[ParsedElement, ...]:
+    """
+    Parses an `elements_chain` string into lightweight elements, memoizing the result per chain.
+    """
+    if len(chain) > MAX_CACHED_ELEMENTS_CHAIN_LENGTH:
+        return _parse_elements_chain(chain)
+    return _parse_elements_chain_cached(chain)
+
+
 def chain_to_elements(chain: str) -> list[Element]:
-    elements = []
-    for idx, el_string in enumerate(re.findall(split_chain_regex, chain)):
-        el_string_split = re.findall(split_class_attributes, el_string)[0]
-        attributes = re.finditer(parse_attributes_regex, el_string_split[2]) if len(el_string_split) > 2 else []
-
-        element = Element(order=idx)
-
-        if el_string_split[0]:
-            tag_and_class = el_string_split[0].split(".", 1)
-            element.tag_name = tag_and_class[0]
-            if len(tag_and_class) > 1:
-                element.attr_class = [cl for cl in tag_and_class[1].split(".") if cl != ""]
-
-        for ii in attributes:
-            item = ii.groupdict()
-            if item["key"] == "href":
-                element.href = item["value"]
-            elif item["key"] == "nth-child":
-                element.nth_child = int(item["value"])
-            elif item["key"] == "nth-of-type":
-                element.nth_of_type = int(item["value"])
-            elif item["key"] == "text":
-                element.text = item["value"]
-            elif item["key"] == "attr_id":
-                element.attr_id = item["value"]
-            elif item["key"]:
-                element.attributes[item["key"]] = item["value"]
-
-        elements.append(element)
-    return elements
+    return [element.to_element() for element in parse_elements_chain(chain)]
+
+
+def chain_to_element_dicts(chain: str) -> list[dict[str, Any]]:
+    """
+    Same as `ElementSerializer(chain_to_elements(chain), many=True).data`, without creating any Django models.
+    """
+    return [element.to_dict() for element in parse_elements_chain(chain)]
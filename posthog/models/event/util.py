@@ -14,7 +14,7 @@ from posthog.kafka_client.topics import KAFKA_EVENTS_JSON
 from posthog.models import Group
 from posthog.models.element.element import (
     Element,
-    chain_to_elements,
+    chain_to_element_dicts,
     elements_to_string,
 )
 from posthog.models.event.sql import BULK_INSERT_EVENT_SQL, INSERT_EVENT_SQL
@@ -294,6 +294,14 @@ class ElementSerializer(serializers.ModelSerializer):
         ]
 
 
+def serialize_elements_chain(elements_chain: str) -> list[dict[str, Any]]:
+    """
+    Same as `ElementSerializer(chain_to_elements(elements_chain), many=True).data`, without creating any models.
+    Elements parsed from a chain never have an event.
+    """
+    return [{"event": None, **element} for element in chain_to_element_dicts(elements_chain)]
+
+
 def parse_properties(properties: str, allow_list: Optional[set[str]] = None) -> dict:
     # parse_constants gets called for any NaN, Infinity etc values
     # we just want those to be returned as None
@@ -350,7 +358,7 @@ class ClickhouseEventSerializer(serializers.Serializer):
     def get_elements(self, event):
         if not event["elements_chain"]:
             return []
-        return ElementSerializer(chain_to_elements(event["elements_chain"]), many=True).data
+        return serialize_elements_chain(event["elements_chain"])
 
     def get_elements_chain(self, event):
         return event["elements_chain"]
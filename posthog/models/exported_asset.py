@@ -1,6 +1,6 @@
 import secrets
 from datetime import timedelta
-from typing import Optional
+from typing import IO, Optional, Union
 
 import structlog
 from django.conf import settings
@@ -153,7 +153,11 @@ def get_content_response(asset: ExportedAsset, download: bool = False):
     return res
 
 
-def save_content(exported_asset: ExportedAsset, content: bytes) -> None:
+def save_content(exported_asset: ExportedAsset, content: Union[bytes, IO[bytes]]) -> None:
+    """
+    Saves the content of an export, which can be a file so that large exports are streamed to object storage
+    instead of being read into memory.
+    """
     try:
         if settings.OBJECT_STORAGE_ENABLED:
             save_content_to_object_storage(exported_asset, content)
@@ -170,12 +174,15 @@ def save_content(exported_asset: ExportedAsset, content: bytes) -> None:
         save_content_to_exported_asset(exported_asset, content)
 
 
-def save_content_to_exported_asset(exported_asset: ExportedAsset, content: bytes) -> None:
+def save_content_to_exported_asset(exported_asset: ExportedAsset, content: Union[bytes, IO[bytes]]) -> None:
+    if not isinstance(content, bytes):
+        content.seek(0)
+        content = content.read()
     exported_asset.content = content
     exported_asset.save(update_fields=["content"])
 
 
-def save_content_to_object_storage(exported_asset: ExportedAsset, content: bytes) -> None:
+def save_content_to_object_storage(exported_asset: ExportedAsset, content: Union[bytes, IO[bytes]]) -> None:
     path_parts: list[str] = [
         settings.OBJECT_STORAGE_EXPORTS_FOLDER,
         exported_asset.export_format.split("/")[1],
@@ -184,6 +191,8 @@ def save_content_to_object_storage(exported_asset: ExportedAsset, content: bytes
         str(UUIDT()),
     ]
     object_path = "/".join(path_parts)
+    if not isinstance(content, bytes):
+        content.seek(0)
     object_storage.write(object_path, content)
     exported_asset.content_location = object_path
     exported_asset.save(update_fields=["content_location"])
@@ -0,0 +1,249 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Optional
+from uuid import uuid4
+
+import orjson
+from django.db import transaction
+from django.db.models import F, Q
+from sentry_sdk import capture_exception
+
+from posthog.redis import get_client
+
+PROPERTY_TYPE_CATALOG_VERSION_KEY = "posthog:property_type_catalog_version:{team_id}"
+PROPERTY_TYPE_CATALOG_KEY = "posthog:property_type_catalog:{team_id}:{version}"
+PROPERTY_TYPE_CATALOG_VERSION_TTL = timedelta(days=7)
+# Property types are also set by the plugin server when it first sees a property, without invalidating the catalog,
+# so catalogs are reloaded from Postgres at least this often
+PROPERTY_TYPE_CATALOG_TTL = timedelta(minutes=10)
+# How long a process trusts its own copy of a catalog before checking in redis whether it was invalidated
+PROPERTY_TYPE_CATALOG_LOCAL_TTL = timedelta(minutes=1)
+PROPERTY_TYPE_CATALOG_LOCAL_MAX_TEAMS = 256
+# Catalogs of teams with more typed properties only hold the most queried ones, and look up the others in Postgres,
+# so that every process and redis doesn't hold all of them
+PROPERTY_TYPE_CATALOG_MAX_PROPERTIES = 10_000
+
+
+@dataclass(frozen=True)
+class PropertyTypeCatalog:
+    """
+    Types of a team's event, person and group properties which have a type.
+
+    Unless the catalog `is_complete`, it only holds up to `PROPERTY_TYPE_CATALOG_MAX_PROPERTIES` of them, and the
+    `get_*_property_types` methods look up the types of other properties in Postgres.
+    """
+
+    team_id: int
+    version: str
+    event_properties: dict[str, str] = field(default_factory=dict)
+    person_properties: dict[str, str] = field(default_factory=dict)
+    group_properties: dict[int, dict[str, str]] = field(default_factory=dict)
+    is_complete: bool = True
+
+    def get_group_properties(self, group_type_index: int) -> dict[str, str]:
+        return self.group_properties.get(group_type_index, {})
+
+    def get_event_property_types(self, names: Iterable[str]) -> dict[str, str]:
+        from posthog.models import PropertyDefinition
+
+        return self._get_property_types(self.event_properties, names, PropertyDefinition.Type.EVENT)
+
+    def get_person_property_types(self, names: Iterable[str]) -> dict[str, str]:
+        from posthog.models import PropertyDefinition
+
+        return self._get_property_types(self.person_properties, names, PropertyDefinition.Type.PERSON)
+
+    def get_group_property_types(self, group_type_index: int, names: Iterable[str]) -> dict[str, str]:
+        from posthog.models import PropertyDefinition
+
+        return self._get_property_types(
+            self.get_group_properties(group_type_index), names, PropertyDefinition.Type.GROUP, group_type_index
+        )
+
+    def _get_property_types(
+        self, properties: dict[str, str], names: Iterable[str], type: int, group_type_index: Optional[int] = None
+    ) -> dict[str, str]:
+        types: dict[str, str] = {}
+        missing_names: list[str] = []
+        for name in names:
+            if name in properties:
+                types[name] = properties[name]
+            else:
+                missing_names.append(name)
+        if missing_names and not self.is_complete:
+            types.update(_load_property_types(self.team_id, type, group_type_index, missing_names))
+        return types
+
+    def to_json(self) -> bytes:
+        return orjson.dumps(
+            {
+                "event": self.event_properties,
+                "person": self.person_properties,
+                "group": {str(index): properties for index, properties in self.group_properties.items()},
+                "complete": self.is_complete,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, team_id: int, version: str, data: bytes) -> "PropertyTypeCatalog":
+        parsed = orjson.loads(data)
+        return cls(
+            team_id=team_id,
+            version=version,
+            event_properties=parsed["event"],
+            person_properties=parsed["person"],
+            group_properties={int(index): properties for index, properties in parsed["group"].items()},
+            is_complete=parsed.get("complete", True),
+        )
+
+
+class _LocalCatalogs:
+    def __init__(self, max_teams: int):
+        self.max_teams = max_teams
+        self._entries: OrderedDict[int, tuple[PropertyTypeCatalog, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, team_id: int) -> tuple[Optional[PropertyTypeCatalog], bool]:
+        """Returns the team's catalog if this process has one, and whether it can still be used without checking"""
+        with self._lock:
+            entry = self._entries.get(team_id)
+            if entry is None:
+                return None, False
+            catalog, expires_at = entry
+            self._entries.move_to_end(team_id)
+            return catalog, expires_at >= time.monotonic()
+
+    def set(self, team_id: int, catalog: PropertyTypeCatalog) -> None:
+        with self._lock:
+            self._entries[team_id] = (catalog, time.monotonic() + PROPERTY_TYPE_CATALOG_LOCAL_TTL.total_seconds())
+            self._entries.move_to_end(team_id)
+            while len(self._entries) > self.max_teams:
+                self._entries.popitem(last=False)
+
+    def discard(self, team_id: int) -> None:
+        with self._lock:
+            self._entries.pop(team_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+local_catalogs = _LocalCatalogs(PROPERTY_TYPE_CATALOG_LOCAL_MAX_TEAMS)
+
+
+def _get_catalog_version(team_id: int) -> str:
+    client = get_client()
+    key = PROPERTY_TYPE_CATALOG_VERSION_KEY.format(team_id=team_id)
+    stored_version = client.get(key)
+    if stored_version is not None:
+        return stored_version.decode()
+
+    # Teams without a version get a new one, so that catalogs cached before it was lost aren't used anymore
+    version = uuid4().hex
+    if client.set(key, version, nx=True, ex=PROPERTY_TYPE_CATALOG_VERSION_TTL):
+        return version
+    stored_version = client.get(key)
+    return stored_version.decode() if stored_version is not None else version
+
+
+def _load_property_types(team_id: int, type: int, group_type_index: Optional[int], names: list[str]) -> dict[str, str]:
+    from posthog.models import PropertyDefinition
+
+    # Event properties defined before types were added have no type, like in `_load_catalog`
+    type_filter = Q(type=type) | Q(type__isnull=True) if type == PropertyDefinition.Type.EVENT else Q(type=type)
+    definitions = PropertyDefinition.objects.filter(
+        type_filter, team_id=team_id, name__in=names, property_type__isnull=False
+    )
+    if group_type_index is not None:
+        definitions = definitions.filter(group_type_index=group_type_index)
+    return {
+        name: property_type for name, property_type in definitions.values_list("name", "property_type") if property_type
+    }
+
+
+def _load_catalog(team_id: int, version: str) -> PropertyTypeCatalog:
+    from posthog.models import PropertyDefinition
+
+    definitions = list(
+        PropertyDefinition.objects.filter(team_id=team_id, property_type__isnull=False)
+        .order_by(F("query_usage_30_day").desc(nulls_last=True))
+        .values_list("type", "group_type_index", "name", "property_type")[: PROPERTY_TYPE_CATALOG_MAX_PROPERTIES + 1]
+    )
+    is_complete = len(definitions) <= PROPERTY_TYPE_CATALOG_MAX_PROPERTIES
+    catalog = PropertyTypeCatalog(team_id=team_id, version=version, is_complete=is_complete)
+    for type, group_type_index, name, property_type in definitions[:PROPERTY_TYPE_CATALOG_MAX_PROPERTIES]:
+        if not property_type:
+            continue
+        if type is None or type == PropertyDefinition.Type.EVENT:
+            catalog.event_properties[name] = property_type
+        elif type == PropertyDefinition.Type.PERSON:
+            catalog.person_properties[name] = property_type
+        elif type == PropertyDefinition.Type.GROUP and group_type_index is not None:
+            catalog.group_properties.setdefault(group_type_index, {})[name] = property_type
+    return catalog
+
+
+def get_property_type_catalog(team_id: int) -> PropertyTypeCatalog:
+    """
+    Returns the team's property types from this process' cache or redis, only loading them from Postgres when the
+    catalog has been invalidated or expired. Other processes see an invalidation within
+    `PROPERTY_TYPE_CATALOG_LOCAL_TTL`, as that's how often the version of a local copy is checked.
+    """
+    local_catalog, is_fresh = local_catalogs.get(team_id)
+    if local_catalog is not None and is_fresh:
+        return local_catalog
+
+    try:
+        version = _get_catalog_version(team_id)
+    except Exception as e:
+        capture_exception(e)
+        return _load_catalog(team_id, version="")
+
+    if local_catalog is not None and local_catalog.version == version:
+        local_catalogs.set(team_id, local_catalog)
+        return local_catalog
+
+    key = PROPERTY_TYPE_CATALOG_KEY.format(team_id=team_id, version=version)
+    try:
+        cached_catalog = get_client().get(key)
+    except Exception as e:
+        capture_exception(e)
+        cached_catalog = None
+
+    if cached_catalog is not None:
+        catalog = PropertyTypeCatalog.from_json(team_id, version, cached_catalog)
+    else:
+        catalog = _load_catalog(team_id, version)
+        try:
+            get_client().set(key, catalog.to_json(), ex=PROPERTY_TYPE_CATALOG_TTL)
+        except Exception as e:
+            capture_exception(e)
+
+    local_catalogs.set(team_id, catalog)
+    return catalog
+
+
+def _bump_catalog_version(team_id: int) -> None:
+    local_catalogs.discard(team_id)
+    try:
+        get_client().set(
+            PROPERTY_TYPE_CATALOG_VERSION_KEY.format(team_id=team_id),
+            uuid4().hex,
+            ex=PROPERTY_TYPE_CATALOG_VERSION_TTL,
+        )
+    except Exception as e:
+        capture_exception(e)
+
+
+def invalidate_property_type_catalog(team_id: int) -> None:
+    """
+    Makes all processes reload the team's property types. Invalidates again once the current transaction commits, as
+    a catalog loaded before that would still contain the previous property types.
+    """
+    _bump_catalog_version(team_id)
+    transaction.on_commit(lambda: _bump_catalog_version(team_id))
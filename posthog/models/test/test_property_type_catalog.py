@@ -0,0 +1,149 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from freezegun import freeze_time
+
+from posthog.models import PropertyDefinition
+from posthog.models.property_type_catalog import (
+    PROPERTY_TYPE_CATALOG_LOCAL_TTL,
+    PROPERTY_TYPE_CATALOG_VERSION_KEY,
+    PropertyTypeCatalog,
+    get_property_type_catalog,
+    local_catalogs,
+)
+from posthog.redis import get_client
+from posthog.test.base import BaseTest
+
+
+class TestPropertyTypeCatalog(BaseTest):
+    def setUp(self):
+        super().setUp()
+        local_catalogs.clear()
+
+    def test_catalog_contains_typed_properties(self):
+        PropertyDefinition.objects.create(team=self.team, name="price", property_type="Numeric")
+        PropertyDefinition.objects.create(team=self.team, name="untyped")
+        PropertyDefinition.objects.create(
+            team=self.team, name="is_admin", property_type="Boolean", type=PropertyDefinition.Type.PERSON
+        )
+        PropertyDefinition.objects.create(
+            team=self.team,
+            name="industry",
+            property_type="String",
+            type=PropertyDefinition.Type.GROUP,
+            group_type_index=1,
+        )
+
+        catalog = get_property_type_catalog(self.team.pk)
+
+        self.assertEqual(catalog.event_properties, {"price": "Numeric"})
+        self.assertEqual(catalog.person_properties, {"is_admin": "Boolean"})
+        self.assertEqual(catalog.group_properties, {1: {"industry": "String"}})
+        self.assertEqual(catalog.get_group_properties(0), {})
+
+    @patch("posthog.models.property_type_catalog.PROPERTY_TYPE_CATALOG_MAX_PROPERTIES", 2)
+    def test_catalog_of_teams_with_many_properties_holds_the_most_queried_ones(self):
+        PropertyDefinition.objects.create(team=self.team, name="price", property_type="Numeric", query_usage_30_day=5)
+        PropertyDefinition.objects.create(team=self.team, name="rarely_queried", property_type="String")
+        PropertyDefinition.objects.create(
+            team=self.team,
+            name="is_admin",
+            property_type="Boolean",
+            type=PropertyDefinition.Type.PERSON,
+            query_usage_30_day=1,
+        )
+
+        catalog = get_property_type_catalog(self.team.pk)
+
+        self.assertFalse(catalog.is_complete)
+        self.assertEqual(catalog.event_properties, {"price": "Numeric"})
+        self.assertEqual(catalog.person_properties, {"is_admin": "Boolean"})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(catalog.get_event_property_types(["price"]), {"price": "Numeric"})
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                catalog.get_event_property_types(["price", "rarely_queried", "unknown"]),
+                {"price": "Numeric", "rarely_queried": "String"},
+            )
+
+        local_catalogs.clear()
+        self.assertFalse(get_property_type_catalog(self.team.pk).is_complete)
+
+    @patch("posthog.models.property_type_catalog.PROPERTY_TYPE_CATALOG_MAX_PROPERTIES", 1)
+    def test_incomplete_catalog_looks_up_untyped_definitions_as_event_properties(self):
+        PropertyDefinition.objects.create(team=self.team, name="price", property_type="Numeric", query_usage_30_day=5)
+        PropertyDefinition.objects.create(
+            team=self.team, name="is_admin", property_type="Boolean", type=PropertyDefinition.Type.PERSON
+        )
+
+        catalog = get_property_type_catalog(self.team.pk)
+        self.assertFalse(catalog.is_complete)
+
+        # Definitions without a type are event properties, like in the catalog
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(catalog.get_event_property_types(["price", "is_admin"]), {"price": "Numeric"})
+        self.assertIn('"posthog_propertydefinition"."type" IS NULL', queries[0]["sql"])
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(catalog.get_person_property_types(["is_admin"]), {"is_admin": "Boolean"})
+        self.assertNotIn("IS NULL", queries[0]["sql"])
+
+    def test_complete_catalog_does_not_look_up_missing_properties(self):
+        PropertyDefinition.objects.create(team=self.team, name="price", property_type="Numeric")
+
+        catalog = get_property_type_catalog(self.team.pk)
+
+        self.assertTrue(catalog.is_complete)
+        with self.assertNumQueries(0):
+            self.assertEqual(catalog.get_event_property_types(["price", "unknown"]), {"price": "Numeric"})
+            self.assertEqual(catalog.get_group_property_types(0, ["industry"]), {})
+
+    def test_catalog_round_trips_through_json(self):
+        catalog = PropertyTypeCatalog(
+            team_id=self.team.pk,
+            version="version",
+            event_properties={"price": "Numeric"},
+            group_properties={1: {"industry": "String"}},
+            is_complete=False,
+        )
+
+        self.assertEqual(PropertyTypeCatalog.from_json(self.team.pk, "version", catalog.to_json()), catalog)
+
+    def test_catalog_is_cached_locally_and_in_redis(self):
+        PropertyDefinition.objects.create(team=self.team, name="price", property_type="Numeric")
+
+        with self.assertNumQueries(1):
+            get_property_type_catalog(self.team.pk)
+        with self.assertNumQueries(0):
+            get_property_type_catalog(self.team.pk)
+
+        local_catalogs.clear()
+        with self.assertNumQueries(0):
+            catalog = get_property_type_catalog(self.team.pk)
+        self.assertEqual(catalog.event_properties, {"price": "Numeric"})
+
+    def test_catalog_is_invalidated_when_property_definitions_change(self):
+        property_definition = PropertyDefinition.objects.create(team=self.team, name="price", property_type="Numeric")
+        self.assertEqual(get_property_type_catalog(self.team.pk).event_properties, {"price": "Numeric"})
+
+        property_definition.property_type = "String"
+        property_definition.save()
+        self.assertEqual(get_property_type_catalog(self.team.pk).event_properties, {"price": "String"})
+
+        property_definition.delete()
+        self.assertEqual(get_property_type_catalog(self.team.pk).event_properties, {})
+
+    def test_version_is_checked_once_per_local_ttl(self):
+        with freeze_time("2024-01-01T00:00:00") as frozen_time:
+            catalog = get_property_type_catalog(self.team.pk)
+
+            # Another process invalidates the catalog
+            get_client().set(PROPERTY_TYPE_CATALOG_VERSION_KEY.format(team_id=self.team.pk), "other_version")
+            with patch("posthog.models.property_type_catalog.get_client") as get_client_mock:
+                self.assertIs(get_property_type_catalog(self.team.pk), catalog)
+            get_client_mock.assert_not_called()
+
+            frozen_time.tick(PROPERTY_TYPE_CATALOG_LOCAL_TTL + timedelta(seconds=1))
+            self.assertEqual(get_property_type_catalog(self.team.pk).version, "other_version")
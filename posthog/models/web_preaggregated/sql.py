@@ -0,0 +1,89 @@
+from django.conf import settings
+
+from posthog.clickhouse.table_engines import (
+    AggregatingMergeTree,
+    Distributed,
+    ReplicationScheme,
+)
+
+"""
+Hourly rollups of web analytics stats, so that WebOverviewQueryRunner and WebStatsTableQueryRunner don't need to scan
+every $pageview event of large teams.
+
+Sessions belong to the hour they started in, and their pageviews are counted by the hour they were viewed in, under
+the entry pathname, referrer and UTM parameters of the session and the browser, OS, device type and country of the
+pageview. This way a range of hours counts the same pageviews as reading events does. Each session is counted once, in
+the row of its first pageview, so sums of sessions, pageviews, bounces and durations add up exactly across rows, and
+visitors are kept as uniq states which can be merged.
+
+Empty strings are stored instead of NULLs, as nullable columns can't be part of the ORDER BY.
+
+Rows are inserted by the update_web_stats_rollups task, see posthog/hogql_queries/web_analytics/rollup.py.
+"""
+
+TABLE_BASE_NAME = "web_stats_hourly"
+WEB_STATS_HOURLY_DATA_TABLE = lambda: f"sharded_{TABLE_BASE_NAME}"
+
+TRUNCATE_WEB_STATS_HOURLY_TABLE_SQL = (
+    lambda: f"TRUNCATE TABLE IF EXISTS {WEB_STATS_HOURLY_DATA_TABLE()} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+DROP_WEB_STATS_HOURLY_TABLE_SQL = (
+    lambda: f"DROP TABLE IF EXISTS {WEB_STATS_HOURLY_DATA_TABLE()} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+
+WEB_STATS_HOURLY_TABLE_BASE_SQL = """
+CREATE TABLE IF NOT EXISTS {table_name} ON CLUSTER '{cluster}'
+(
+    team_id Int64,
+    -- start of the hour the session started in
+    hour DateTime('UTC'),
+    -- start of the hour the pageviews were viewed in
+    pageview_hour DateTime('UTC'),
+
+    entry_pathname String,
+    referring_domain String,
+    utm_source String,
+    utm_medium String,
+    utm_campaign String,
+    browser String,
+    os String,
+    device_type String,
+    country_code String,
+
+    persons_uniq_state AggregateFunction(uniq, UUID),
+    pageviews_count SimpleAggregateFunction(sum, UInt64),
+    sessions_count SimpleAggregateFunction(sum, UInt64),
+    bounces_count SimpleAggregateFunction(sum, UInt64),
+    total_session_duration SimpleAggregateFunction(sum, Float64)
+) ENGINE = {engine}
+"""
+
+WEB_STATS_HOURLY_DATA_TABLE_ENGINE = lambda: AggregatingMergeTree(
+    TABLE_BASE_NAME, replication_scheme=ReplicationScheme.SHARDED
+)
+
+WEB_STATS_HOURLY_TABLE_SQL = lambda: (
+    WEB_STATS_HOURLY_TABLE_BASE_SQL
+    + """
+    PARTITION BY toYYYYMM(hour)
+    -- queries always filter by team and a range of hours, then by any of the breakdown columns
+    ORDER BY (team_id, hour, pageview_hour, entry_pathname, referring_domain, utm_source, utm_medium, utm_campaign, browser, os, device_type, country_code)
+"""
+).format(
+    table_name=WEB_STATS_HOURLY_DATA_TABLE(),
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    engine=WEB_STATS_HOURLY_DATA_TABLE_ENGINE(),
+)
+
+# shard via team_id, so that all of a team's rows for an hour merge into one row per breakdown on the same shard
+WRITABLE_WEB_STATS_HOURLY_TABLE_SQL = lambda: WEB_STATS_HOURLY_TABLE_BASE_SQL.format(
+    table_name=f"writable_{TABLE_BASE_NAME}",
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    engine=Distributed(data_table=WEB_STATS_HOURLY_DATA_TABLE(), sharding_key="sipHash64(team_id)"),
+)
+
+DISTRIBUTED_WEB_STATS_HOURLY_TABLE_SQL = lambda: WEB_STATS_HOURLY_TABLE_BASE_SQL.format(
+    table_name=TABLE_BASE_NAME,
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    engine=Distributed(data_table=WEB_STATS_HOURLY_DATA_TABLE(), sharding_key="sipHash64(team_id)"),
+)
@@ -296,9 +296,10 @@ def get_people(
 def get_serialized_people(
     team: Team, people_ids: list[Any], value_per_actor_id: Optional[dict[str, float]] = None, distinct_id_limit=1000
 ) -> list[SerializedPerson]:
-    persons_dict = PersonStrategy(team, ActorsQuery(), HogQLHasMorePaginator()).get_actors(
-        people_ids, order_by="created_at DESC, uuid"
-    )
+    persons_dict = PersonStrategy(team, ActorsQuery(), HogQLHasMorePaginator()).get_actors(people_ids)
+    # Newest first, and by UUID for persons created at the same time
+    persons_dict = dict(sorted(persons_dict.items(), key=lambda item: item[0]))
+    persons_dict = dict(sorted(persons_dict.items(), key=lambda item: item[1]["created_at"], reverse=True))
     from posthog.api.person import get_person_name_helper
 
     return [
@@ -2,6 +2,7 @@
 from typing import Any, Dict, Optional
 
 import redis
+import redis.asyncio
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 
@@ -31,6 +32,25 @@ def get_client(redis_url: Optional[str] = None) -> redis.Redis:
     return _client_map[redis_url]
 
 
+def get_async_client(redis_url: Optional[str] = None) -> redis.asyncio.Redis:
+    """
+    Returns a new asyncio client. Its connections belong to the event loop it's used in, so unlike `get_client` it
+    isn't shared, and has to be closed by the caller.
+    """
+    redis_url = redis_url or settings.REDIS_URL
+
+    if settings.TEST:
+        from fakeredis import aioredis
+
+        # Fake clients with the same host and port share their data, including with the synchronous one
+        return aioredis.FakeRedis()
+
+    if not redis_url:
+        raise ImproperlyConfigured("Redis not configured!")
+
+    return redis.asyncio.from_url(redis_url, db=0)
+
+
 def TEST_clear_clients():
     global _client_map
     for key in list(_client_map.keys()):
@@ -5,7 +5,9 @@ from __future__ import annotations
 from enum import Enum, StrEnum
 from typing import Any, Literal, Optional, Union
 
-from pydantic import AwareDatetime, BaseModel, ConfigDict, Field, RootModel
+from pydantic import AwareDatetime, ConfigDict, Field
+
+from posthog.schema_base import BaseModel, RootModel
 
 
 class SchemaRoot(RootModel[Any]):
@@ -382,6 +384,21 @@ class AssistantTrendsMath(StrEnum):
     FIRST_TIME_FOR_USER_WITH_FILTERS = "first_time_for_user_with_filters"
 
 
+class AutoSamplingInfo(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+    )
+    estimatedEventCount: int = Field(
+        ..., description="Estimated number of events the query would have read without sampling"
+    )
+    relativeStandardError: float = Field(
+        ..., description="Expected relative standard error of the counts in the results, e.g. 0.01 for ±1%"
+    )
+    samplingFactor: float = Field(
+        ..., description="Share of the events the results were calculated from, e.g. 0.1 for 10%"
+    )
+
+
 class AutocompleteCompletionItemKind(StrEnum):
     METHOD = "Method"
     FUNCTION = "Function"
@@ -2449,6 +2466,9 @@ class PathsQueryResponse(BaseModel):
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
     )
     results: list[dict[str, Any]]
+    samplingInfo: Optional[AutoSamplingInfo] = Field(
+        default=None, description="Set when the results were calculated from automatically sampled events"
+    )
     timings: Optional[list[QueryTiming]] = Field(
         default=None, description="Measured timings for different parts of the query generation process"
     )
@@ -3335,6 +3355,9 @@ class TrendsQueryResponse(BaseModel):
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
     )
     results: list[dict[str, Any]]
+    samplingInfo: Optional[AutoSamplingInfo] = Field(
+        default=None, description="Set when the results were calculated from automatically sampled events"
+    )
     timings: Optional[list[QueryTiming]] = Field(
         default=None, description="Measured timings for different parts of the query generation process"
     )
@@ -3494,6 +3517,10 @@ class ActorsQueryResponse(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Pass as `cursor` to get the next page. Only returned if the ordering of the query allows it",
+    )
     offset: int
     query_status: Optional[QueryStatus] = Field(
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
@@ -3780,6 +3807,10 @@ class CachedActorsQueryResponse(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Pass as `cursor` to get the next page. Only returned if the ordering of the query allows it",
+    )
     next_allowed_client_refresh: AwareDatetime
     offset: int
     query_status: Optional[QueryStatus] = Field(
@@ -3879,6 +3910,10 @@ class CachedEventsQueryResponse(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Pass as `cursor` to get the next page. Only returned if the ordering of the query allows it",
+    )
     next_allowed_client_refresh: AwareDatetime
     offset: Optional[int] = None
     query_status: Optional[QueryStatus] = Field(
@@ -3952,6 +3987,9 @@ class CachedFunnelsQueryResponse(BaseModel):
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
     )
     results: Union[FunnelTimeToConvertResults, list[dict[str, Any]], list[list[dict[str, Any]]]]
+    samplingInfo: Optional[AutoSamplingInfo] = Field(
+        default=None, description="Set when the results were calculated from automatically sampled events"
+    )
     timezone: str
     timings: Optional[list[QueryTiming]] = Field(
         default=None, description="Measured timings for different parts of the query generation process"
@@ -4076,6 +4114,9 @@ class CachedPathsQueryResponse(BaseModel):
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
     )
     results: list[dict[str, Any]]
+    samplingInfo: Optional[AutoSamplingInfo] = Field(
+        default=None, description="Set when the results were calculated from automatically sampled events"
+    )
     timezone: str
     timings: Optional[list[QueryTiming]] = Field(
         default=None, description="Measured timings for different parts of the query generation process"
@@ -4106,6 +4147,9 @@ class CachedRetentionQueryResponse(BaseModel):
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
     )
     results: list[RetentionResult]
+    samplingInfo: Optional[AutoSamplingInfo] = Field(
+        default=None, description="Set when the results were calculated from automatically sampled events"
+    )
     timezone: str
     timings: Optional[list[QueryTiming]] = Field(
         default=None, description="Measured timings for different parts of the query generation process"
@@ -4263,6 +4307,9 @@ class CachedTrendsQueryResponse(BaseModel):
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
     )
     results: list[dict[str, Any]]
+    samplingInfo: Optional[AutoSamplingInfo] = Field(
+        default=None, description="Set when the results were calculated from automatically sampled events"
+    )
     timezone: str
     timings: Optional[list[QueryTiming]] = Field(
         default=None, description="Measured timings for different parts of the query generation process"
@@ -4910,6 +4957,10 @@ class EventsQueryResponse(BaseModel):
     modifiers: Optional[HogQLQueryModifiers] = Field(
         default=None, description="Modifiers used when performing the query"
     )
+    nextCursor: Optional[str] = Field(
+        default=None,
+        description="Pass as `cursor` to get the next page. Only returned if the ordering of the query allows it",
+    )
     offset: Optional[int] = None
     query_status: Optional[QueryStatus] = Field(
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
@@ -5102,6 +5153,9 @@ class FunnelsQueryResponse(BaseModel):
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
     )
     results: Union[FunnelTimeToConvertResults, list[dict[str, Any]], list[list[dict[str, Any]]]]
+    samplingInfo: Optional[AutoSamplingInfo] = Field(
+        default=None, description="Set when the results were calculated from automatically sampled events"
+    )
     timings: Optional[list[QueryTiming]] = Field(
         default=None, description="Measured timings for different parts of the query generation process"
     )
@@ -5313,6 +5367,10 @@ class RecordingsQueryResponse(BaseModel):
         extra="forbid",
     )
     has_next: bool
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Pass as `cursor` to get the next page. Only returned if the ordering of the query allows it",
+    )
     results: list[SessionRecordingType]
 
 
@@ -5332,6 +5390,9 @@ class RetentionQueryResponse(BaseModel):
         default=None, description="Query status indicates whether next to the provided data, a query is still running."
     )
     results: list[RetentionResult]
+    samplingInfo: Optional[AutoSamplingInfo] = Field(
+        default=None, description="Set when the results were calculated from automatically sampled events"
+    )
     timings: Optional[list[QueryTiming]] = Field(
         default=None, description="Measured timings for different parts of the query generation process"
     )
@@ -5662,6 +5723,13 @@ class RecordingsQuery(BaseModel):
     )
     actions: Optional[list[dict[str, Any]]] = None
     console_log_filters: Optional[list[LogEntryPropertyFilter]] = None
+    cursor: Optional[str] = Field(
+        default=None,
+        description=(
+            "Continue after the last row of the previous page, using the `nextCursor` it returned. Faster than `offset`"
+            " for pages deep into the results"
+        ),
+    )
     date_from: Optional[str] = "-3d"
     date_to: Optional[str] = None
     events: Optional[list[dict[str, Any]]] = None
@@ -5723,6 +5791,13 @@ class RetentionQuery(BaseModel):
         extra="forbid",
     )
     aggregation_group_type_index: Optional[int] = Field(default=None, description="Groups aggregation")
+    autoSampling: Optional[bool] = Field(
+        default=False,
+        description=(
+            "Sample the events automatically if the query would otherwise read too many of them to be fast.\nIgnored if"
+            " `samplingFactor` is set."
+        ),
+    )
     dateRange: Optional[InsightDateRange] = Field(default=None, description="Date range for the query")
     filterTestAccounts: Optional[bool] = Field(
         default=False, description="Exclude internal and test users by applying the respective filters"
@@ -5820,6 +5895,13 @@ class TrendsQuery(BaseModel):
         extra="forbid",
     )
     aggregation_group_type_index: Optional[int] = Field(default=None, description="Groups aggregation")
+    autoSampling: Optional[bool] = Field(
+        default=False,
+        description=(
+            "Sample the events automatically if the query would otherwise read too many of them to be fast.\nIgnored if"
+            " `samplingFactor` is set."
+        ),
+    )
     breakdownFilter: Optional[BreakdownFilter] = Field(default=None, description="Breakdown of the events and actions")
     compareFilter: Optional[CompareFilter] = Field(default=None, description="Compare to date range")
     dateRange: Optional[InsightDateRange] = Field(default=None, description="Date range for the query")
@@ -5936,6 +6018,13 @@ class EventsQuery(BaseModel):
     actionId: Optional[int] = Field(default=None, description="Show events matching a given action")
     after: Optional[str] = Field(default=None, description="Only fetch events that happened after this timestamp")
     before: Optional[str] = Field(default=None, description="Only fetch events that happened before this timestamp")
+    cursor: Optional[str] = Field(
+        default=None,
+        description=(
+            "Continue after the last row of the previous page, using the `nextCursor` it returned. Faster than `offset`"
+            " for pages deep into the results"
+        ),
+    )
     event: Optional[str] = Field(default=None, description="Limit to events matching this string")
     filterTestAccounts: Optional[bool] = Field(default=None, description="Filter test accounts")
     fixedProperties: Optional[
@@ -6017,6 +6106,13 @@ class FunnelsQuery(BaseModel):
         extra="forbid",
     )
     aggregation_group_type_index: Optional[int] = Field(default=None, description="Groups aggregation")
+    autoSampling: Optional[bool] = Field(
+        default=False,
+        description=(
+            "Sample the events automatically if the query would otherwise read too many of them to be fast.\nIgnored if"
+            " `samplingFactor` is set."
+        ),
+    )
     breakdownFilter: Optional[BreakdownFilter] = Field(default=None, description="Breakdown of the events and actions")
     dateRange: Optional[InsightDateRange] = Field(default=None, description="Date range for the query")
     filterTestAccounts: Optional[bool] = Field(
@@ -6605,6 +6701,13 @@ class PathsQuery(BaseModel):
         extra="forbid",
     )
     aggregation_group_type_index: Optional[int] = Field(default=None, description="Groups aggregation")
+    autoSampling: Optional[bool] = Field(
+        default=False,
+        description=(
+            "Sample the events automatically if the query would otherwise read too many of them to be fast.\nIgnored if"
+            " `samplingFactor` is set."
+        ),
+    )
     dateRange: Optional[InsightDateRange] = Field(default=None, description="Date range for the query")
     filterTestAccounts: Optional[bool] = Field(
         default=False, description="Exclude internal and test users by applying the respective filters"
@@ -6677,6 +6780,13 @@ class FunnelCorrelationQuery(BaseModel):
     funnelCorrelationExcludeEventNames: Optional[list[str]] = None
     funnelCorrelationExcludeNames: Optional[list[str]] = None
     funnelCorrelationNames: Optional[list[str]] = None
+    funnelCorrelationRankInQuery: Optional[bool] = Field(
+        default=None,
+        description=(
+            "Compute the odds ratios, drop insignificant results and keep the top results in the query, instead of"
+            " returning the counts of every event or property value"
+        ),
+    )
     funnelCorrelationType: FunnelCorrelationResultsType
     kind: Literal["FunnelCorrelationQuery"] = "FunnelCorrelationQuery"
     response: Optional[FunnelCorrelationResponse] = None
@@ -6777,6 +6887,13 @@ class ActorsQuery(BaseModel):
     model_config = ConfigDict(
         extra="forbid",
     )
+    cursor: Optional[str] = Field(
+        default=None,
+        description=(
+            "Continue after the last row of the previous page, using the `nextCursor` it returned. Faster than `offset`"
+            " for pages deep into the results"
+        ),
+    )
     fixedProperties: Optional[
         list[Union[PersonPropertyFilter, CohortPropertyFilter, HogQLPropertyFilter, EmptyPropertyFilter]]
     ] = Field(
@@ -7132,7 +7249,3 @@ class QuerySchemaRoot(
         EventTaxonomyQuery,
         ActorsPropertyTaxonomyQuery,
     ] = Field(..., discriminator="kind")
-
-
-PropertyGroupFilterValue.model_rebuild()
-QueryRequest.model_rebuild()
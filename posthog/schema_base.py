@@ -0,0 +1,22 @@
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel as PydanticBaseModel, ConfigDict, RootModel as PydanticRootModel
+
+RootModelRootType = TypeVar("RootModelRootType")
+
+
+class BaseModel(PydanticBaseModel):
+    """
+    Base class of the models generated into `posthog.schema`. Building the validators and serializers of all of them
+    takes seconds, which every process would spend on startup, so each model is only built when it's first used.
+    """
+
+    model_config = ConfigDict(defer_build=True)
+
+
+class RootModel(PydanticRootModel[RootModelRootType], Generic[RootModelRootType]):
+    """
+    Root models are built lazily too, as building one builds all the models it refers to.
+    """
+
+    model_config = ConfigDict(defer_build=True)
@@ -1,4 +1,5 @@
 import re
+from collections.abc import Sequence
 from typing import Any, NamedTuple, cast, Optional, Union
 from datetime import datetime, timedelta
 
@@ -89,7 +90,7 @@ class SessionRecordingListFromFilters:
         """
 
     @staticmethod
-    def _data_to_return(results: list[Any] | None) -> list[dict[str, Any]]:
+    def _data_to_return(results: Sequence[Any] | None) -> list[dict[str, Any]]:
         default_columns = [
             "session_id",
             "team_id",
@@ -1,4 +1,5 @@
 import re
+from collections.abc import Sequence
 from typing import Any, NamedTuple, cast, Optional, Union
 from datetime import datetime, timedelta, UTC
 
@@ -11,7 +12,7 @@ from posthog.hogql.constants import HogQLGlobalSettings
 from posthog.hogql.parser import parse_select
 from posthog.hogql.property import property_to_expr, action_to_expr
 from posthog.hogql.query import execute_hogql_query
-from posthog.hogql_queries.insights.paginators import HogQLHasMorePaginator
+from posthog.hogql_queries.insights.paginators import HogQLCursorPaginator
 from posthog.hogql_queries.legacy_compatibility.filter_to_query import MathAvailability, legacy_entity_to_node
 from posthog.hogql_queries.utils.query_date_range import QueryDateRange
 from posthog.models import Team, Entity, Action
@@ -131,7 +132,7 @@ class SessionRecordingListFromQuery:
         """
 
     @staticmethod
-    def _data_to_return(results: list[Any] | None) -> list[dict[str, Any]]:
+    def _data_to_return(results: Sequence[Any] | None) -> list[dict[str, Any]]:
         default_columns = [
             "session_id",
             "team_id",
@@ -173,8 +174,15 @@ class SessionRecordingListFromQuery:
             self._query.properties = self._query.properties or []
             self._query.properties += self._test_account_filters
 
-        self._paginator = HogQLHasMorePaginator(
-            limit=query.limit or self.SESSION_RECORDINGS_DEFAULT_LIMIT, offset=query.offset or 0
+        self._paginator = HogQLCursorPaginator(
+            # session_id breaks ties, so that the sort key is unique
+            order_by=[
+                ast.OrderExpr(expr=self._order_by_clause(), order="DESC"),
+                ast.OrderExpr(expr=ast.Field(chain=["session_id"]), order="DESC"),
+            ],
+            cursor=query.cursor,
+            limit=query.limit or self.SESSION_RECORDINGS_DEFAULT_LIMIT,
+            offset=query.offset or 0,
         )
         self._hogql_query_modifiers = hogql_query_modifiers
 
@@ -216,6 +224,13 @@ class SessionRecordingListFromQuery:
             timings=paginated_response.timings,
         )
 
+    @property
+    def next_cursor(self) -> Optional[str]:
+        """
+        Cursor for the page after the one returned by `run`, if there is one.
+        """
+        return self._paginator.next_cursor
+
     def get_query(self):
         return parse_select(
             self.BASE_QUERY,
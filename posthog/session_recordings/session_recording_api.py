@@ -840,6 +840,7 @@ def list_recordings_from_query(
     more_recordings_available = False
     team = context["get_team"]()
     hogql_timings: list[QueryTiming] | None = None
+    next_cursor: str | None = None
 
     timer = ServerTimingsGathered()
 
@@ -864,9 +865,11 @@ def list_recordings_from_query(
         modifiers = safely_read_modifiers_overrides(distinct_id, team)
 
         with timer("load_recordings_from_hogql"):
-            (ch_session_recordings, more_recordings_available, hogql_timings) = SessionRecordingListFromQuery(
+            session_recording_list = SessionRecordingListFromQuery(
                 query=query, team=team, hogql_query_modifiers=modifiers
-            ).run()
+            )
+            (ch_session_recordings, more_recordings_available, hogql_timings) = session_recording_list.run()
+            next_cursor = session_recording_list.next_cursor
 
         with timer("build_recordings"):
             recordings_from_clickhouse = SessionRecording.get_or_build_from_clickhouse(team, ch_session_recordings)
@@ -916,7 +919,7 @@ def list_recordings_from_query(
 
     all_timings = _generate_timings(hogql_timings, timer)
     return (
-        {"results": results, "has_next": more_recordings_available, "version": 4},
+        {"results": results, "has_next": more_recordings_available, "next_cursor": next_cursor, "version": 4},
         all_timings,
     )
 
@@ -303,6 +303,11 @@ if not REDIS_URL:
 # can cope with compressed and uncompressed reading at the same time
 USE_REDIS_COMPRESSION = get_from_env("USE_REDIS_COMPRESSION", True, type_cast=str_to_bool)
 
+# Controls whether query results are cached in the compact encoding of `posthog.caching.query_cache_codec`.
+# Both the compact encoding and plain JSON are always readable, so this can be turned on once every
+# reader is deployed, and turned off again without invalidating the cache
+USE_QUERY_CACHE_CODEC = get_from_env("USE_QUERY_CACHE_CODEC", False, type_cast=str_to_bool)
+
 # AWS ElastiCache supports "reader" endpoints.
 # See "Finding a Redis (Cluster Mode Disabled) Cluster's Endpoints (Console)"
 # on https://docs.aws.amazon.com/AmazonElastiCache/latest/red-ug/Endpoints.html#Endpoints.Find.Redis
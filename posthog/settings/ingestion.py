@@ -42,6 +42,23 @@ PARTITION_KEY_BUCKET_REPLENTISH_RATE = get_from_env(
     "PARTITION_KEY_BUCKET_REPLENTISH_RATE", type_cast=float, default=1.0
 )
 
+# In-process detection of partition keys with bursts of events, which routes their events to random partitions or,
+# with the "overflow" routing, to the overflow topic for CAPTURE_HEAVY_HITTERS_TTL_SECONDS after a burst is detected.
+# Detections are shared with the other capture pods through Redis.
+CAPTURE_HEAVY_HITTERS_ENABLED = get_from_env("CAPTURE_HEAVY_HITTERS_ENABLED", type_cast=str_to_bool, default=False)
+CAPTURE_HEAVY_HITTERS_THRESHOLD = get_from_env("CAPTURE_HEAVY_HITTERS_THRESHOLD", type_cast=int, default=1000)
+CAPTURE_HEAVY_HITTERS_WINDOW_SECONDS = get_from_env("CAPTURE_HEAVY_HITTERS_WINDOW_SECONDS", type_cast=int, default=60)
+CAPTURE_HEAVY_HITTERS_TTL_SECONDS = get_from_env("CAPTURE_HEAVY_HITTERS_TTL_SECONDS", type_cast=int, default=600)
+CAPTURE_HEAVY_HITTERS_ROUTING = os.getenv("CAPTURE_HEAVY_HITTERS_ROUTING", "random")
+
+# Whether capture acknowledges analytics events once they're written to a spool on local disk, from which they're
+# produced to Kafka in the background, instead of once Kafka acknowledges them. Requires a persistent volume at
+# CAPTURE_SPOOL_DIRECTORY to not lose the events which weren't produced yet when a pod is replaced.
+CAPTURE_SPOOL_ENABLED = get_from_env("CAPTURE_SPOOL_ENABLED", type_cast=str_to_bool, default=False)
+CAPTURE_SPOOL_DIRECTORY = os.getenv("CAPTURE_SPOOL_DIRECTORY", "/var/lib/posthog/capture-spool")
+CAPTURE_SPOOL_MAX_BYTES = get_from_env("CAPTURE_SPOOL_MAX_BYTES", type_cast=int, default=1024 * 1024 * 1024)
+CAPTURE_SPOOL_SEGMENT_BYTES = get_from_env("CAPTURE_SPOOL_SEGMENT_BYTES", type_cast=int, default=16 * 1024 * 1024)
+
 # Overflow configuration for session replay
 REPLAY_OVERFLOW_FORCED_TOKENS = get_set(os.getenv("REPLAY_OVERFLOW_FORCED_TOKENS", ""))
 REPLAY_OVERFLOW_SESSIONS_ENABLED = get_from_env("REPLAY_OVERFLOW_SESSIONS_ENABLED", type_cast=bool, default=False)
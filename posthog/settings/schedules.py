@@ -37,6 +37,12 @@ COUNT_TILES_WITH_NO_FILTERS_HASH_INTERVAL_SECONDS = get_from_env(
 
 CACHED_RESULTS_TTL = 7 * 24 * 60 * 60  # how long to keep cached results for
 
+# How many of a team's insights are warmed at once, and how many warming queries run at once across all teams
+CACHE_WARMING_TEAM_CONCURRENCY = get_from_env("CACHE_WARMING_TEAM_CONCURRENCY", 2, type_cast=int)
+CACHE_WARMING_MAX_CONCURRENCY = get_from_env("CACHE_WARMING_MAX_CONCURRENCY", 30, type_cast=int)
+# How many seconds of ClickHouse queries are scheduled to warm each team's insights per warming run
+CACHE_WARMING_TEAM_BUDGET_SECONDS = get_from_env("CACHE_WARMING_TEAM_BUDGET_SECONDS", 20 * 60, type_cast=int)
+
 # Schedule to run asynchronous data deletion on. Follows crontab syntax.
 # Use empty string to prevent this
 CLEAR_CLICKHOUSE_REMOVED_DATA_SCHEDULE_CRON = get_from_env(
@@ -6,7 +6,7 @@ import structlog
 from corsheaders.defaults import default_headers
 
 from posthog.settings.base_variables import BASE_DIR, DEBUG, TEST
-from posthog.settings.utils import get_from_env, get_list, str_to_bool
+from posthog.settings.utils import get_from_env, get_list, get_set, str_to_bool
 from posthog.utils_cors import CORS_ALLOWED_TRACING_HEADERS
 
 logger = structlog.get_logger(__name__)
@@ -51,6 +51,33 @@ DEFAULT_IDENTIFIED_ONLY_TEAM_ID_MIN: int = get_from_env("DEFAULT_IDENTIFIED_ONLY
 # The string "all" -- represents all team IDs
 DECIDE_TRACK_TEAM_IDS = get_list(os.getenv("DECIDE_TRACK_TEAM_IDS", ""))
 
+# Teams whose web analytics stats are rolled up hourly, so that web analytics queries can read them from the rollup
+WEB_STATS_ROLLUP_TEAM_IDS = get_set(os.getenv("WEB_STATS_ROLLUP_TEAM_IDS", ""))
+# How many days to roll up when a team is added to WEB_STATS_ROLLUP_TEAM_IDS
+WEB_STATS_ROLLUP_BACKFILL_DAYS = get_from_env("WEB_STATS_ROLLUP_BACKFILL_DAYS", 90, type_cast=int)
+
+# How many tiles of a dashboard are calculated at once when it's loaded. Tests calculate tiles one by one in the request
+# thread, as other threads can't see data created within a test's transaction.
+DASHBOARD_TILE_MAX_WORKERS = get_from_env("DASHBOARD_TILE_MAX_WORKERS", 1 if TEST else 4, type_cast=int)
+# How many tiles of a team a process calculates at once, across all dashboards being loaded
+DASHBOARD_TILE_MAX_CONCURRENCY_PER_TEAM = get_from_env("DASHBOARD_TILE_MAX_CONCURRENCY_PER_TEAM", 8, type_cast=int)
+# Tiles which can't start calculating within this many seconds of a dashboard load are calculated asynchronously
+DASHBOARD_TILE_CALCULATION_BUDGET_SECONDS = get_from_env(
+    "DASHBOARD_TILE_CALCULATION_BUDGET_SECONDS", 10.0, type_cast=float
+)
+
+# How long a request to wait for a query is held open at most, until the query completes. Under ASGI the request waits
+# in the event loop, so it can be held open until the query completes. Under WSGI it takes up one of the few worker
+# threads of a process, so it's only held briefly and the frontend polls in between.
+QUERY_STATUS_LONG_POLL_SECONDS = get_from_env("QUERY_STATUS_LONG_POLL_SECONDS", 30.0, type_cast=float)
+QUERY_STATUS_MAX_WAIT_SECONDS = get_from_env("QUERY_STATUS_MAX_WAIT_SECONDS", 0.5, type_cast=float)
+
+# How many seconds persons and groups shown in actor and event lists are kept in memory, so that paging through a list
+# or reloading it doesn't look them up again. Tests change persons between queries, so they don't keep them.
+ACTOR_HYDRATION_CACHE_TTL_SECONDS = get_from_env("ACTOR_HYDRATION_CACHE_TTL_SECONDS", 0 if TEST else 30, type_cast=int)
+# How many persons and groups are kept in memory at most
+ACTOR_HYDRATION_CACHE_MAX_SIZE = get_from_env("ACTOR_HYDRATION_CACHE_MAX_SIZE", 20_000, type_cast=int)
+
 # Decide skip hash key overrides
 DECIDE_SKIP_HASH_KEY_OVERRIDE_WRITES = get_from_env(
     "DECIDE_SKIP_HASH_KEY_OVERRIDE_WRITES", False, type_cast=str_to_bool
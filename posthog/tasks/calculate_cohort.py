@@ -1,20 +1,27 @@
 import time
+from collections import defaultdict
 from typing import Any, Optional
 
 import structlog
 from celery import shared_task
+from celery.canvas import chain
 from dateutil.relativedelta import relativedelta
-from django.db.models import F, ExpressionWrapper, DurationField, Q
+from django.db.models import F, ExpressionWrapper, DurationField, Max, Q
 from django.utils import timezone
 from prometheus_client import Gauge
 from sentry_sdk import set_tag
 
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 from posthog.api.monitoring import Feature
-from posthog.models import Cohort
-from posthog.models.cohort import get_and_update_pending_version
-from posthog.models.cohort.util import clear_stale_cohortpeople
+from posthog.models import Cohort, FeatureFlag, Insight, InsightViewed
+from posthog.models.cohort import CohortOrEmpty, calculate_people_ch_for_cohorts, get_and_update_pending_version
+from posthog.models.cohort.util import (
+    clear_stale_cohortpeople,
+    get_cohort_filters_hash,
+    get_dependent_cohorts,
+    sort_cohorts_topologically,
+)
 from posthog.models.user import User
 
 COHORT_RECALCULATIONS_BACKLOG_GAUGE = Gauge(
@@ -31,11 +38,24 @@ logger = structlog.get_logger(__name__)
 
 MAX_AGE_MINUTES = 15
 
+# How many more candidates than `parallel_count` are considered when ranking cohorts by usage
+CANDIDATE_POOL_MULTIPLIER = 4
+
+# Cohorts referenced by insights viewed within this window count as recently used
+USAGE_LOOKBACK_DAYS = 7
+MAX_USAGE_INSIGHTS = 1000
+
+# Cohorts not calculated for this long are prioritized regardless of usage
+MAX_STALENESS_HOURS = 24
+
 
 def calculate_cohorts(parallel_count: int) -> None:
     """
     Calculates maximum N cohorts in parallel.
 
+    Candidates are ranked by how recently they were used in feature flags or insights. Cohorts of a team are
+    calculated in dependency order, and cohorts with identical filters are calculated together in a single pass.
+
     Args:
         parallel_count: Maximum number of cohorts to calculate in parallel.
     """
@@ -49,7 +69,7 @@ def calculate_cohorts(parallel_count: int) -> None:
         output_field=DurationField(),
     )
 
-    for cohort in (
+    candidates = list(
         Cohort.objects.filter(
             deleted=False,
             is_calculating=False,
@@ -62,10 +82,13 @@ def calculate_cohorts(parallel_count: int) -> None:
             | Q(last_error_at__isnull=True)  # backwards compatability cohorts before last_error_at was introduced
         )
         .exclude(is_static=True)
-        .order_by(F("last_calculation").asc(nulls_first=True))[0:parallel_count]
-    ):
-        cohort = Cohort.objects.filter(pk=cohort.pk).get()
-        update_cohort(cohort, initiating_user=None)
+        .order_by(F("last_calculation").asc(nulls_first=True))[0 : parallel_count * CANDIDATE_POOL_MULTIPLIER]
+    )
+
+    cohorts = prioritize_cohorts_by_usage(candidates)[0:parallel_count]
+
+    for steps in plan_cohort_recalculations(cohorts):
+        schedule_cohort_recalculation_steps(steps)
 
     # update gauge
     backlog = (
@@ -81,9 +104,164 @@ def calculate_cohorts(parallel_count: int) -> None:
     COHORT_RECALCULATIONS_BACKLOG_GAUGE.set(backlog)
 
 
-def update_cohort(cohort: Cohort, *, initiating_user: Optional[User]) -> None:
-    pending_version = get_and_update_pending_version(cohort)
-    calculate_cohort_ch.delay(cohort.id, pending_version, initiating_user.id if initiating_user else None)
+def _extract_cohort_ids(data: Any) -> set[int]:
+    cohort_ids: set[int] = set()
+    if isinstance(data, dict):
+        if data.get("type") == "cohort" and not isinstance(data.get("value"), list):
+            try:
+                cohort_ids.add(int(data["value"]))
+            except (KeyError, ValueError, TypeError):
+                pass
+        for value in data.values():
+            cohort_ids.update(_extract_cohort_ids(value))
+    elif isinstance(data, list):
+        for value in data:
+            cohort_ids.update(_extract_cohort_ids(value))
+    return cohort_ids
+
+
+def get_cohorts_last_used_at(cohorts: list[Cohort]) -> dict[int, datetime]:
+    """
+    Returns when each cohort was last used, either by an active feature flag (which is evaluated continuously,
+    so counts as used right now) or by an insight viewed within the last USAGE_LOOKBACK_DAYS.
+    """
+    team_ids = {cohort.team_id for cohort in cohorts}
+    cohort_ids = {cohort.pk for cohort in cohorts}
+    last_used_at: dict[int, datetime] = {}
+    now = timezone.now()
+
+    def mark_used(cohort_id: int, used_at: datetime) -> None:
+        if cohort_id in cohort_ids and (cohort_id not in last_used_at or last_used_at[cohort_id] < used_at):
+            last_used_at[cohort_id] = used_at
+
+    seen_cohorts_cache: dict[int, CohortOrEmpty] = {cohort.pk: cohort for cohort in cohorts}
+    for flag in FeatureFlag.objects.filter(team_id__in=team_ids, active=True, deleted=False):
+        for cohort_id in flag.get_cohort_ids(seen_cohorts_cache=seen_cohorts_cache):
+            mark_used(cohort_id, now)
+
+    recently_viewed = dict(
+        InsightViewed.objects.filter(
+            team_id__in=team_ids,
+            last_viewed_at__gte=now - timedelta(days=USAGE_LOOKBACK_DAYS),
+        )
+        .values("insight_id")
+        .annotate(viewed_at=Max("last_viewed_at"))
+        .order_by("-viewed_at")
+        .values_list("insight_id", "viewed_at")[0:MAX_USAGE_INSIGHTS]
+    )
+    for insight_id, filters, query in Insight.objects.filter(id__in=recently_viewed.keys()).values_list(
+        "id", "filters", "query"
+    ):
+        for cohort_id in _extract_cohort_ids(filters) | _extract_cohort_ids(query):
+            mark_used(cohort_id, recently_viewed[insight_id])
+
+    return last_used_at
+
+
+def prioritize_cohorts_by_usage(cohorts: list[Cohort]) -> list[Cohort]:
+    """
+    Orders cohorts so that the most recently used ones are calculated first. Cohorts that haven't been calculated
+    for MAX_STALENESS_HOURS go first regardless of usage, so that unused cohorts aren't starved.
+    """
+    if not cohorts:
+        return []
+
+    last_used_at = get_cohorts_last_used_at(cohorts)
+    overdue_before = timezone.now() - timedelta(hours=MAX_STALENESS_HOURS)
+
+    def sort_key(cohort: Cohort) -> tuple[bool, bool, float]:
+        is_overdue = cohort.last_calculation is None or cohort.last_calculation <= overdue_before
+        used_at = last_used_at.get(cohort.pk)
+        return (not is_overdue, used_at is None, -used_at.timestamp() if used_at else 0.0)
+
+    # sorted() is stable, so cohorts with the same priority stay ordered by last calculation
+    return sorted(cohorts, key=sort_key)
+
+
+def plan_cohort_recalculations(cohorts: list[Cohort]) -> list[list[list[Cohort]]]:
+    """
+    Splits cohorts into independent chains of steps. Steps of a chain must run in order, as later steps depend on
+    cohorts calculated in earlier ones. Each step is a list of cohorts with identical filters, calculated in one pass.
+    """
+    cohorts_by_team: dict[int, list[Cohort]] = defaultdict(list)
+    for cohort in cohorts:
+        cohorts_by_team[cohort.team_id].append(cohort)
+
+    chains: list[list[list[Cohort]]] = []
+    for team_cohorts in cohorts_by_team.values():
+        selected = {cohort.pk: cohort for cohort in team_cohorts}
+        seen_cohorts_cache: dict[int, CohortOrEmpty] = dict(selected)
+
+        dependencies: dict[int, set[int]] = {}
+        for cohort in team_cohorts:
+            dependencies[cohort.pk] = {
+                dependency.pk
+                for dependency in get_dependent_cohorts(cohort, seen_cohorts_cache=seen_cohorts_cache)
+                if dependency.pk in selected
+            }
+        has_dependants = set().union(*dependencies.values())
+
+        try:
+            ordered_ids = [
+                cohort_id
+                for cohort_id in sort_cohorts_topologically(set(selected.keys()), seen_cohorts_cache)
+                if cohort_id in selected
+            ]
+        except (KeyError, ValueError, TypeError):
+            # Invalid cohort references, fall back to the original order
+            ordered_ids = list(selected.keys())
+
+        # Cohorts with identical filters have identical dependencies, so they can share the step of the first one
+        steps: list[list[Cohort]] = []
+        steps_by_hash: dict[str, list[Cohort]] = {}
+        for cohort_id in ordered_ids:
+            cohort = selected[cohort_id]
+            filters_hash = get_cohort_filters_hash(cohort)
+            if filters_hash is not None and filters_hash in steps_by_hash:
+                steps_by_hash[filters_hash].append(cohort)
+                continue
+
+            step = [cohort]
+            steps.append(step)
+            if filters_hash is not None:
+                steps_by_hash[filters_hash] = step
+
+        # Steps without dependencies between them can run in parallel
+        dependent_steps: list[list[Cohort]] = []
+        for step in steps:
+            if any(dependencies[cohort.pk] or cohort.pk in has_dependants for cohort in step):
+                dependent_steps.append(step)
+            else:
+                chains.append([step])
+
+        if dependent_steps:
+            chains.append(dependent_steps)
+
+    return chains
+
+
+def schedule_cohort_recalculation_steps(steps: list[list[Cohort]]) -> None:
+    if len(steps) == 1 and len(steps[0]) == 1:
+        # Scheduled recalculations of a single cohort can be applied as deltas, see recalculate_cohortpeople_incrementally
+        update_cohort(steps[0][0], initiating_user=None, incremental=True)
+        return
+
+    chain(
+        *[
+            calculate_cohorts_ch.si(
+                [cohort.pk for cohort in step], [get_and_update_pending_version(cohort) for cohort in step]
+            )
+            for step in steps
+        ]
+    ).apply_async()
+
+
+def update_cohort(cohort: Cohort, *, initiating_user: Optional[User], incremental: bool = False) -> None:
+    # Incremental updates only take a pending version if they remove persons or fall back to a full recalculation
+    pending_version = None if incremental else get_and_update_pending_version(cohort)
+    calculate_cohort_ch.delay(
+        cohort.id, pending_version, initiating_user.id if initiating_user else None, incremental=incremental
+    )
 
 
 @shared_task(ignore_result=True)
@@ -93,7 +271,9 @@ def clear_stale_cohort(cohort_id: int, before_version: int) -> None:
 
 
 @shared_task(ignore_result=True, max_retries=2)
-def calculate_cohort_ch(cohort_id: int, pending_version: int, initiating_user_id: Optional[int] = None) -> None:
+def calculate_cohort_ch(
+    cohort_id: int, pending_version: Optional[int], initiating_user_id: Optional[int] = None, incremental: bool = False
+) -> None:
     cohort: Cohort = Cohort.objects.get(pk=cohort_id)
 
     set_tag("feature", Feature.COHORT.value)
@@ -105,7 +285,33 @@ def calculate_cohort_ch(cohort_id: int, pending_version: int, initiating_user_id
         staleness_hours = (timezone.now() - cohort.last_calculation).total_seconds() / 3600
     COHORT_STALENESS_HOURS_GAUGE.set(staleness_hours)
 
-    cohort.calculate_people_ch(pending_version, initiating_user_id=initiating_user_id)
+    cohort.calculate_people_ch(pending_version, initiating_user_id=initiating_user_id, incremental=incremental)
+
+
+@shared_task(ignore_result=True, max_retries=2)
+def calculate_cohorts_ch(
+    cohort_ids: list[int], pending_versions: list[int], initiating_user_id: Optional[int] = None
+) -> None:
+    cohorts_by_id = Cohort.objects.in_bulk(cohort_ids)
+    cohorts = [cohorts_by_id[cohort_id] for cohort_id in cohort_ids if cohort_id in cohorts_by_id]
+    if not cohorts:
+        return
+
+    set_tag("feature", Feature.COHORT.value)
+    set_tag("cohort_id", ",".join(str(cohort.pk) for cohort in cohorts))
+    set_tag("team_id", cohorts[0].team_id)
+
+    for cohort in cohorts:
+        staleness_hours = 0.0
+        if cohort.last_calculation is not None:
+            staleness_hours = (timezone.now() - cohort.last_calculation).total_seconds() / 3600
+        COHORT_STALENESS_HOURS_GAUGE.set(staleness_hours)
+
+    calculate_people_ch_for_cohorts(
+        cohorts,
+        dict(zip(cohort_ids, pending_versions)),
+        initiating_user_id=initiating_user_id,
+    )
 
 
 @shared_task(ignore_result=True, max_retries=1)
@@ -1,7 +1,8 @@
 import datetime
-import io
+import pickle
+import tempfile
 from typing import Any, Optional
-from collections.abc import Generator
+from collections.abc import Generator, Iterator
 from urllib.parse import parse_qsl, quote, urlencode, urlparse, urlunparse
 
 from pydantic import BaseModel
@@ -25,7 +26,12 @@ from ..exporter import (
     EXPORT_TIMER,
 )
 from ...exceptions import QuerySizeExceeded
-from ...hogql.constants import CSV_EXPORT_LIMIT, CSV_EXPORT_BREAKDOWN_LIMIT_INITIAL, CSV_EXPORT_BREAKDOWN_LIMIT_LOW
+from ...hogql.constants import (
+    CSV_EXPORT_LIMIT,
+    CSV_EXPORT_BREAKDOWN_LIMIT_INITIAL,
+    CSV_EXPORT_BREAKDOWN_LIMIT_LOW,
+    get_max_limit_for_context,
+)
 from ...hogql.query import LimitContext
 
 logger = structlog.get_logger(__name__)
@@ -33,6 +39,12 @@ logger = structlog.get_logger(__name__)
 RESULT_LIMIT_KEYS = ("distinct_ids",)
 RESULT_LIMIT_LENGTH = 10
 
+# Query kinds which are exported page by page, following the cursor (or offset) of each page
+PAGINATED_QUERY_KINDS = ("EventsQuery", "ActorsQuery")
+EXPORT_PAGE_SIZE = 5000
+# Rows and rendered files are kept in memory up to this size and spill over to disk beyond it
+EXPORT_SPOOL_MAX_SIZE = 10 * 1024 * 1024
+
 
 # SUPPORTED CSV TYPES
 
@@ -53,10 +65,10 @@ RESULT_LIMIT_LENGTH = 10
 
 # HOW DOES THIS WORK
 # 1. We receive an export task with a given resource uri (identical to the API)
-# 2. We call the actual API to load the data with the given params so that we receive a paginateable response
-# 3. We save the response to a chunk in object storage and then load the `next` page of results
+# 2. We call the actual API or run the query to load the data with the given params, a page at a time
+# 3. We flatten the rows of the page into a temporary file and then load the `next` page of results
 # 4. Repeat until exhausted or limit reached
-# 5. We save the final blob output and update the ExportedAsset
+# 5. We render the rows into another temporary file, stream it to object storage and update the ExportedAsset
 
 
 def add_query_params(url: str, params: dict[str, str]) -> str:
@@ -273,6 +285,10 @@ def get_from_hogql_query(exported_asset: ExportedAsset, limit: int, resource: di
     query = resource.get("source")
     assert query is not None
 
+    if query.get("kind") in PAGINATED_QUERY_KINDS:
+        yield from _paginate_hogql_query(exported_asset, query)
+        return
+
     while True:
         try:
             query_response = process_query_dict(
@@ -296,7 +312,76 @@ def get_from_hogql_query(exported_asset: ExportedAsset, limit: int, resource: di
         return
 
 
-def _export_to_dict(exported_asset: ExportedAsset, limit: int) -> Any:
+def _paginate_hogql_query(exported_asset: ExportedAsset, query: dict) -> Generator[Any, None, None]:
+    """
+    Runs an events or actors query in pages of `EXPORT_PAGE_SIZE` rows, continuing after the cursor of the previous
+    page where the ordering allows it and after its offset otherwise, up to the query's limit or the export limit.
+    """
+    max_rows = get_max_limit_for_context(LimitContext.EXPORT)
+    remaining = min(query.get("limit") or max_rows, max_rows)
+    page_query = {**query, "offset": query.get("offset") or 0}
+
+    while remaining > 0:
+        page_query["limit"] = min(EXPORT_PAGE_SIZE, remaining)
+        query_response = process_query_dict(
+            team=exported_asset.team,
+            query_json=page_query,
+            limit_context=LimitContext.EXPORT,
+            execution_mode=ExecutionMode.CALCULATE_BLOCKING_ALWAYS,
+        )
+        if isinstance(query_response, BaseModel):
+            query_response = query_response.model_dump(by_alias=True)
+
+        page_size = len(query_response.get("results") or [])
+        yield from _convert_response_to_csv_data(query_response)
+
+        remaining -= page_size
+        if not page_size or not query_response.get("hasMore"):
+            return
+        if query_response.get("nextCursor"):
+            page_query["cursor"] = query_response["nextCursor"]
+        else:
+            page_query["offset"] += page_size
+
+
+class SpooledRows:
+    """
+    Flattened export rows, spooled to a temporary file instead of being held in memory. The fields of all rows are
+    collected in the order they were first seen, as the header of the table is needed before any row is written.
+    """
+
+    def __init__(self, renderer: OrderedCsvRenderer) -> None:
+        self.renderer = renderer
+        self.fields: dict[str, None] = {}
+        self.first_row: Optional[Any] = None
+        self._file = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE)
+
+    def __enter__(self) -> "SpooledRows":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self._file.close()
+
+    def append(self, row: Any) -> None:
+        if self.first_row is None:
+            self.first_row = row
+        flat_row = self.renderer.flatten_item(row)
+        self.fields.update(dict.fromkeys(flat_row))
+        pickle.dump(flat_row, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def __iter__(self) -> Iterator[dict]:
+        self._file.seek(0)
+        while True:
+            try:
+                yield pickle.load(self._file)
+            except EOFError:
+                return
+
+    def tablize(self, header: Any = None) -> Generator:
+        return self.renderer.tablize_flat(self, list(self.fields), header=header)
+
+
+def _spool_rows(exported_asset: ExportedAsset, limit: int, rows: SpooledRows) -> dict:
     resource = exported_asset.export_context
 
     columns: list[str] = resource.get("columns", [])
@@ -307,50 +392,56 @@ def _export_to_dict(exported_asset: ExportedAsset, limit: int) -> Any:
     else:
         returned_rows = get_from_insights_api(exported_asset, limit, resource)
 
-    all_csv_rows = list(returned_rows)
-    renderer = OrderedCsvRenderer()
+    for row in returned_rows:
+        rows.append(row)
+
     render_context = {}
     if columns:
         render_context["header"] = columns
 
-    if len(all_csv_rows):
+    if rows.first_row is not None:
         # NOTE: This is not ideal as some rows _could_ have different keys
         # Ideally we would extend the csvrenderer to supported keeping the order in place
-        is_any_col_list_or_dict = [x for x in all_csv_rows[0].values() if isinstance(x, dict) or isinstance(x, list)]
+        is_any_col_list_or_dict = [x for x in rows.first_row.values() if isinstance(x, dict) or isinstance(x, list)]
         if not is_any_col_list_or_dict:
             # If values are serialised then keep the order of the keys, else allow it to be unordered
-            renderer.header = all_csv_rows[0].keys()
+            rows.renderer.header = list(rows.first_row.keys())
     else:
         # If we have no rows, that means we couldn't convert anything, so put something to avoid confusion
-        all_csv_rows = [{"error": "No data available or unable to format for export."}]
+        rows.append({"error": "No data available or unable to format for export."})
 
-    return renderer, all_csv_rows, render_context
+    return render_context
 
 
 def _export_to_csv(exported_asset: ExportedAsset, limit: int) -> None:
-    renderer, all_csv_rows, render_context = _export_to_dict(exported_asset, limit)
+    renderer = OrderedCsvRenderer()
 
-    rendered_csv_content = renderer.render(all_csv_rows, renderer_context=render_context)
-    save_content(exported_asset, rendered_csv_content)
+    with SpooledRows(renderer) as rows, tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE) as output:
+        render_context = _spool_rows(exported_asset, limit, rows)
+        renderer.write_table(rows.tablize(header=render_context.get("header", renderer.header)), output)
+        save_content(exported_asset, output)
 
 
 def _export_to_excel(exported_asset: ExportedAsset, limit: int) -> None:
-    output = io.BytesIO()
-
-    workbook = Workbook()
-    worksheet = workbook.active
-
-    renderer, all_csv_rows, render_context = _export_to_dict(exported_asset, limit)
-
-    for row_num, row_data in enumerate(renderer.tablize(all_csv_rows, header=render_context.get("header"))):
-        for col_num, value in enumerate(row_data):
-            if value is not None and not isinstance(value, str | int | float | bool):
-                value = str(value)
-            worksheet.cell(row=row_num + 1, column=col_num + 1, value=value)
+    # Write-only workbooks write each row out as it's appended instead of keeping all cells in memory
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet()
+
+    with (
+        SpooledRows(OrderedCsvRenderer()) as rows,
+        tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE) as output,
+    ):
+        render_context = _spool_rows(exported_asset, limit, rows)
+        for row_data in rows.tablize(header=render_context.get("header")):
+            worksheet.append(
+                [
+                    str(value) if value is not None and not isinstance(value, str | int | float | bool) else value
+                    for value in row_data
+                ]
+            )
 
-    workbook.save(output)
-    output.seek(0)
-    save_content(exported_asset, output.getvalue())
+        workbook.save(output)
+        save_content(exported_asset, output)
 
 
 def get_limit_param_key(path: str) -> str:
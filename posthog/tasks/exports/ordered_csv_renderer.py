@@ -1,8 +1,10 @@
 import itertools
 from collections import OrderedDict
-from typing import Any
-from collections.abc import Generator
+from typing import IO, Any
+from collections.abc import Generator, Iterable
 
+import unicodecsv as csv
+from django.conf import settings
 from more_itertools import unique_everseen
 from rest_framework_csv.renderers import CSVRenderer
 
@@ -29,20 +31,28 @@ class OrderedCsvRenderer(
         # Get the set of all unique headers, and sort them.
         unique_fields = list(unique_everseen(itertools.chain(*(item.keys() for item in data))))
 
+        yield from self.tablize_flat(data, unique_fields, header=header, labels=labels)
+
+    def tablize_flat(
+        self, data: Iterable[dict], unique_fields: list[str], header: Any = None, labels: Any = None
+    ) -> Generator:
+        """
+        Convert already flattened data into a table, given all of its fields in the order they were first seen.
+        The data is only iterated once, so it can be read from a file instead of being held in memory.
+        """
         ordered_fields: dict[str, Any] = OrderedDict()
-        for item in unique_fields:
-            field = item.split(".")
-            field = field[0]
+        for unique_field in unique_fields:
+            field = unique_field.split(".")[0]
             if field in ordered_fields:
-                ordered_fields[field].append(item)
+                ordered_fields[field].append(unique_field)
             else:
-                ordered_fields[field] = [item]
+                ordered_fields[field] = [unique_field]
 
         flat_ordered_fields = list(itertools.chain(*ordered_fields.values()))
         if not header:
             field_headers = flat_ordered_fields
         else:
-            field_headers = header
+            field_headers = list(header)
             for single_header in field_headers:
                 if single_header in flat_ordered_fields or single_header not in ordered_fields:
                     continue
@@ -61,3 +71,11 @@ class OrderedCsvRenderer(
         # item has no data with None values.
         for item in data:
             yield [item.get(key, None) for key in field_headers]
+
+    def write_table(self, table: Iterable[list], output: IO[bytes]) -> None:
+        """
+        Write the rows of a table to `output` as CSV, one row at a time.
+        """
+        csv_writer = csv.writer(output, encoding=settings.DEFAULT_CHARSET, **(self.writer_opts or {}))
+        for row in table:
+            csv_writer.writerow(row)
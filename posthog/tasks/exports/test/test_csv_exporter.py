@@ -460,6 +460,49 @@ class TestCSVExporter(APIBaseTest):
             self.assertEqual(first_row[2], "$pageview")
             self.assertEqual(first_row[5], str(self.team.pk))
 
+    @patch("posthog.tasks.exports.csv_exporter.EXPORT_PAGE_SIZE", 4)
+    @patch("posthog.models.exported_asset.UUIDT")
+    def test_csv_exporter_events_query_in_pages(self, mocked_uuidt: Any) -> None:
+        random_uuid = f"RANDOM_TEST_ID::{UUIDT()}"
+        for i in range(10):
+            _create_event(
+                event="$pageview",
+                distinct_id=random_uuid,
+                team=self.team,
+                timestamp=now() - relativedelta(minutes=i),
+                properties={"prop": i},
+            )
+        flush_persons_and_events()
+
+        for select in (["properties.prop"], ["properties.prop", "timestamp"]):
+            exported_asset = ExportedAsset(
+                team=self.team,
+                export_format=ExportedAsset.ExportFormat.CSV,
+                export_context={
+                    "source": {
+                        "kind": "EventsQuery",
+                        "select": select,
+                        "where": [f"distinct_id = '{random_uuid}'"],
+                        "orderBy": ["properties.prop"] if len(select) == 1 else None,
+                    }
+                },
+            )
+            exported_asset.save()
+            mocked_uuidt.return_value = "a-guid"
+
+            with self.settings(OBJECT_STORAGE_ENABLED=True, OBJECT_STORAGE_EXPORTS_FOLDER="Test-Exports"):
+                # Ordered by a property the pages are read by offset, ordered by timestamp by cursor
+                with patch(
+                    "posthog.tasks.exports.csv_exporter.process_query_dict", wraps=csv_exporter.process_query_dict
+                ) as mocked_process_query_dict:
+                    csv_exporter.export_tabular(exported_asset)
+                content = object_storage.read(exported_asset.content_location)
+                lines = (content or "").split("\r\n")
+
+            self.assertEqual(mocked_process_query_dict.call_count, 3)
+            self.assertEqual(len(lines), 12)
+            self.assertEqual(sorted(int(line.split(",")[0]) for line in lines[1:11]), list(range(10)))
+
     @patch("posthog.hogql.constants.MAX_SELECT_RETURNED_ROWS", 10)
     @patch("posthog.models.exported_asset.UUIDT")
     def test_csv_exporter_events_query_with_columns(
@@ -692,6 +735,7 @@ class TestCSVExporter(APIBaseTest):
 
         with self.settings(OBJECT_STORAGE_ENABLED=True, OBJECT_STORAGE_EXPORTS_FOLDER="Test-Exports"):
             csv_exporter.export_tabular(exported_asset)
+            assert exported_asset.content_location is not None
             content = object_storage.read(exported_asset.content_location)
             lines = (content or "").strip().split("\r\n")
             self.assertEqual(
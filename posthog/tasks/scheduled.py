@@ -54,6 +54,7 @@ from posthog.tasks.tasks import (
     update_survey_iteration,
     verify_persons_data_in_sync,
     update_survey_adaptive_sampling,
+    update_web_stats_rollups,
 )
 from posthog.utils import get_crontab
 
@@ -262,6 +263,13 @@ def setup_periodic_tasks(sender: Celery, **kwargs: Any) -> None:
         name="update survey's sampling feature flag rollout  based on date",
     )
 
+    if settings.WEB_STATS_ROLLUP_TEAM_IDS:
+        sender.add_periodic_task(
+            crontab(hour="*", minute="10"),
+            update_web_stats_rollups.s(),
+            name="update web analytics hourly rollups",
+        )
+
     sender.add_periodic_task(
         crontab(hour="*", minute="*/2"),
         check_alerts_task.s(),
@@ -563,6 +563,13 @@ def update_event_partitions() -> None:
         )
 
 
+@shared_task(ignore_result=True, queue=CeleryQueue.LONG_RUNNING.value)
+def update_web_stats_rollups() -> None:
+    from posthog.hogql_queries.web_analytics.rollup import update_web_stats_rollups
+
+    update_web_stats_rollups()
+
+
 @shared_task(ignore_result=True)
 def clean_stale_partials() -> None:
     """Clean stale (meaning older than 7 days) partial social auth sessions."""
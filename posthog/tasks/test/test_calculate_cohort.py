@@ -6,6 +6,7 @@ from unittest.mock import MagicMock, patch
 from freezegun import freeze_time
 
 from posthog.models.cohort import Cohort
+from posthog.models.feature_flag import FeatureFlag
 from posthog.models.person import Person
 from posthog.tasks.calculate_cohort import calculate_cohort_from_list, calculate_cohorts, MAX_AGE_MINUTES
 from posthog.test.base import APIBaseTest
@@ -91,4 +92,100 @@ def calculate_cohort_test_factory(event_factory: Callable, person_factory: Calla
             calculate_cohorts(5)
             self.assertEqual(patch_update_cohort.call_count, 2)
 
+        @patch("posthog.tasks.calculate_cohort.chain")
+        @patch("posthog.tasks.calculate_cohort.update_cohort")
+        def test_calculate_cohorts_groups_identical_filters(
+            self, patch_update_cohort: MagicMock, patch_chain: MagicMock
+        ) -> None:
+            filters = {
+                "properties": {
+                    "type": "OR",
+                    "values": [{"type": "AND", "values": [{"key": "email", "value": "a@b.com", "type": "person"}]}],
+                }
+            }
+            cohort1 = Cohort.objects.create(
+                team_id=self.team.pk,
+                filters=filters,
+                last_calculation=timezone.now() - relativedelta(minutes=MAX_AGE_MINUTES + 1),
+            )
+            cohort2 = Cohort.objects.create(
+                team_id=self.team.pk,
+                filters=filters,
+                last_calculation=timezone.now() - relativedelta(minutes=MAX_AGE_MINUTES + 1),
+            )
+            cohort3 = Cohort.objects.create(
+                team_id=self.team.pk,
+                filters={
+                    "properties": {
+                        "type": "OR",
+                        "values": [{"type": "AND", "values": [{"key": "email", "value": "c@d.com", "type": "person"}]}],
+                    }
+                },
+                last_calculation=timezone.now() - relativedelta(minutes=MAX_AGE_MINUTES + 1),
+            )
+
+            calculate_cohorts(5)
+
+            patch_update_cohort.assert_called_once_with(cohort3, initiating_user=None, incremental=True)
+            patch_chain.assert_called_once()
+            signatures = patch_chain.call_args[0]
+            self.assertEqual(len(signatures), 1)
+            self.assertCountEqual(signatures[0].args[0], [cohort1.pk, cohort2.pk])
+
+        @patch("posthog.tasks.calculate_cohort.chain")
+        @patch("posthog.tasks.calculate_cohort.update_cohort")
+        def test_calculate_cohorts_in_dependency_order(
+            self, patch_update_cohort: MagicMock, patch_chain: MagicMock
+        ) -> None:
+            base_cohort = Cohort.objects.create(
+                team_id=self.team.pk,
+                filters={
+                    "properties": {
+                        "type": "OR",
+                        "values": [{"type": "AND", "values": [{"key": "email", "value": "a@b.com", "type": "person"}]}],
+                    }
+                },
+                last_calculation=timezone.now() - relativedelta(minutes=MAX_AGE_MINUTES + 1),
+            )
+            # Calculated longer ago, so it would be picked up first without dependency ordering
+            dependent_cohort = Cohort.objects.create(
+                team_id=self.team.pk,
+                filters={
+                    "properties": {
+                        "type": "OR",
+                        "values": [
+                            {"type": "AND", "values": [{"key": "id", "value": base_cohort.pk, "type": "cohort"}]}
+                        ],
+                    }
+                },
+                last_calculation=timezone.now() - relativedelta(minutes=MAX_AGE_MINUTES + 2),
+            )
+
+            calculate_cohorts(5)
+
+            patch_update_cohort.assert_not_called()
+            signatures = patch_chain.call_args[0]
+            self.assertEqual([signature.args[0] for signature in signatures], [[base_cohort.pk], [dependent_cohort.pk]])
+
+        @patch("posthog.tasks.calculate_cohort.update_cohort")
+        def test_calculate_cohorts_prioritizes_cohorts_used_in_flags(self, patch_update_cohort: MagicMock) -> None:
+            Cohort.objects.create(
+                team_id=self.team.pk,
+                last_calculation=timezone.now() - relativedelta(minutes=MAX_AGE_MINUTES + 10),
+            )
+            used_cohort = Cohort.objects.create(
+                team_id=self.team.pk,
+                last_calculation=timezone.now() - relativedelta(minutes=MAX_AGE_MINUTES + 1),
+            )
+            FeatureFlag.objects.create(
+                team=self.team,
+                key="flag-with-cohort",
+                created_by=self.user,
+                filters={"groups": [{"properties": [{"key": "id", "type": "cohort", "value": used_cohort.pk}]}]},
+            )
+
+            calculate_cohorts(1)
+
+            patch_update_cohort.assert_called_once_with(used_cohort, initiating_user=None, incremental=True)
+
     return TestCalculateCohort
@@ -1,20 +1,34 @@
-from posthog.temporal.data_imports.external_data_job import (
-    ExternalDataJobWorkflow,
-    create_external_data_job_model_activity,
-    create_source_templates,
-    import_data_activity_sync,
-    update_external_data_job_model,
-    check_billing_limits_activity,
-    sync_new_schemas_activity,
-)
+from typing import TYPE_CHECKING
+
+from posthog.lazy_imports import lazy_attributes
 
-WORKFLOWS = [ExternalDataJobWorkflow]
+if TYPE_CHECKING:
+    from posthog.temporal.data_imports.workflows import (
+        ACTIVITIES,
+        WORKFLOWS,
+        ExternalDataJobWorkflow,
+        check_billing_limits_activity,
+        create_external_data_job_model_activity,
+        create_source_templates,
+        import_data_activity_sync,
+        sync_new_schemas_activity,
+        update_external_data_job_model,
+    )
 
-ACTIVITIES = [
-    create_external_data_job_model_activity,
-    update_external_data_job_model,
-    import_data_activity_sync,
-    create_source_templates,
-    check_billing_limits_activity,
-    sync_new_schemas_activity,
-]
+# The workflow imports every source's pipeline and client library, which the web server and others that only need
+# e.g. the pipeline settings shouldn't have to import
+__getattr__ = lazy_attributes(
+    __name__,
+    "posthog.temporal.data_imports.workflows",
+    [
+        "ACTIVITIES",
+        "WORKFLOWS",
+        "ExternalDataJobWorkflow",
+        "check_billing_limits_activity",
+        "create_external_data_job_model_activity",
+        "create_source_templates",
+        "import_data_activity_sync",
+        "sync_new_schemas_activity",
+        "update_external_data_job_model",
+    ],
+)
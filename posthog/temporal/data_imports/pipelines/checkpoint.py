@@ -0,0 +1,136 @@
+"""Checkpoints of reads which are split into ranges, so that a retried sync only reads the ranges it didn't load"""
+
+import math
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Optional, Union
+
+PartitionValue = Union[int, datetime, date]
+
+
+@dataclass(frozen=True)
+class Partition:
+    """
+    A range of rows of the partition column, from `lower` (inclusive) to `upper` (exclusive). The first and last
+    partitions are unbounded, so that rows added since the partitions were planned are read as well.
+    """
+
+    index: int
+    lower: Optional[PartitionValue]
+    upper: Optional[PartitionValue]
+
+
+def split_range(min_value: PartitionValue, max_value: PartitionValue, partition_count: int) -> list[Partition]:
+    """
+    Splits the values from `min_value` to `max_value` into at most `partition_count` equally wide partitions.
+    """
+    boundaries: list[PartitionValue] = []
+    if isinstance(min_value, int) and isinstance(max_value, int):
+        step = math.ceil((max_value - min_value + 1) / partition_count)
+        boundaries = [min_value + step * index for index in range(1, partition_count)]
+    elif isinstance(min_value, datetime) and isinstance(max_value, datetime):
+        datetime_step = (max_value - min_value) / partition_count
+        boundaries = [min_value + datetime_step * index for index in range(1, partition_count)]
+    elif isinstance(min_value, date) and isinstance(max_value, date):
+        date_step = (max_value - min_value) / partition_count
+        boundaries = [min_value + date_step * index for index in range(1, partition_count)]
+
+    # Ranges narrower than the number of partitions result in the same boundary more than once
+    boundaries = sorted({boundary for boundary in boundaries if min_value < boundary <= max_value})  # type: ignore[operator]
+    lower_bounds: list[Optional[PartitionValue]] = [None, *boundaries]
+    upper_bounds: list[Optional[PartitionValue]] = [*boundaries, None]
+    return [
+        Partition(index=index, lower=lower, upper=upper)
+        for index, (lower, upper) in enumerate(zip(lower_bounds, upper_bounds))
+    ]
+
+
+def _encode_value(value: Optional[PartitionValue]) -> Any:
+    if isinstance(value, datetime):
+        return {"datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"date": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Optional[PartitionValue]:
+    if isinstance(value, dict):
+        if "datetime" in value:
+            return datetime.fromisoformat(value["datetime"])
+        return date.fromisoformat(value["date"])
+    return value
+
+
+class PartitionCheckpoint:
+    """
+    Which partitions of a partitioned read have been loaded, so that a retried sync only reads the other ones.
+
+    Partitions count as read once all their rows have been extracted, but only become completed when the pipeline
+    commits the checkpoint after loading them. The checkpoint is passed to `save` as a JSON serializable dict, or
+    `None` once all partitions have been loaded.
+    """
+
+    def __init__(self, state: Optional[dict] = None, save: Optional[Callable[[Optional[dict]], None]] = None):
+        self._save = save
+        self.column: Optional[str] = None
+        self.partitions: list[Partition] = []
+        self.completed: set[int] = set()
+        self._read: set[int] = set()
+        if state:
+            self.column = state["column"]
+            self.partitions = [
+                Partition(index=index, lower=_decode_value(lower), upper=_decode_value(upper))
+                for index, (lower, upper) in enumerate(state["partitions"])
+            ]
+            self.completed = set(state["completed"])
+
+    @property
+    def is_planned(self) -> bool:
+        return len(self.partitions) > 0
+
+    @property
+    def has_progress(self) -> bool:
+        return len(self.completed) > 0
+
+    @property
+    def is_finished(self) -> bool:
+        return self.is_planned and len(self.completed) == len(self.partitions)
+
+    def plan(self, column: str, partitions: list[Partition]) -> None:
+        self.column = column
+        self.partitions = partitions
+        self.completed = set()
+        self._read = set()
+
+    def pending(self, limit: Optional[int] = None) -> list[Partition]:
+        pending = [
+            partition
+            for partition in self.partitions
+            if partition.index not in self.completed and partition.index not in self._read
+        ]
+        return pending[:limit] if limit is not None else pending
+
+    def mark_read(self, partition: Partition) -> None:
+        self._read.add(partition.index)
+
+    def commit(self) -> None:
+        self.completed |= self._read
+        self._read = set()
+        if self._save is not None and self.is_planned:
+            self._save(self.to_dict())
+
+    def clear(self) -> None:
+        self.plan(column="", partitions=[])
+        self.column = None
+        if self._save is not None:
+            self._save(None)
+
+    def to_dict(self) -> dict:
+        return {
+            "column": self.column,
+            "partitions": [
+                [_encode_value(partition.lower), _encode_value(partition.upper)] for partition in self.partitions
+            ],
+            "completed": sorted(self.completed),
+        }
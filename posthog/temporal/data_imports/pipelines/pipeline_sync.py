@@ -36,6 +36,7 @@ from collections import Counter
 from clickhouse_driver.errors import ServerException
 
 from posthog.temporal.common.logger import bind_temporal_worker_logger_sync
+from posthog.temporal.data_imports.pipelines.checkpoint import PartitionCheckpoint
 from posthog.warehouse.data_load.validate_schema import dlt_to_hogql_type
 from posthog.warehouse.models.credential import get_or_create_datawarehouse_credential
 from posthog.warehouse.models.external_data_job import ExternalDataJob
@@ -65,9 +66,11 @@ class DataImportPipelineSync:
         logger: FilteringBoundLogger,
         reset_pipeline: bool,
         incremental: bool = False,
+        partition_checkpoint: Optional[PartitionCheckpoint] = None,
     ):
         self.inputs = inputs
         self.logger = logger
+        self.partition_checkpoint = partition_checkpoint
 
         self._incremental = incremental
         self.refresh_dlt = reset_pipeline
@@ -199,23 +202,39 @@ class DataImportPipelineSync:
 
         return None
 
+    def _append_to_replaced_tables(self, resource_names: list[str]) -> None:
+        """Loads the given full refresh resources by appending, as their tables are emptied once before the first run"""
+        for name in resource_names:
+            resource = self.source._resources[name]
+            if resource.write_disposition != "append":
+                self.logger.debug("Updating table write_disposition to append")
+                resource.apply_hints(write_disposition="append")
+
     def _run(self) -> dict[str, int]:
         if self.refresh_dlt:
             self.logger.info("Pipeline getting a full refresh due to reset_pipeline being set")
 
         pipeline = self._create_pipeline()
 
-        # Workaround for full refresh schemas while we wait for Rust to fix memory issue
-        for name, resource in self.source._resources.items():
-            if resource.write_disposition == "replace":
-                delta_table = self._get_delta_table(name)
+        # A partitioned read which failed part way resumes after the partitions it loaded, so keep the loaded rows
+        resuming = self.partition_checkpoint is not None and self.partition_checkpoint.has_progress
+        if resuming:
+            self.logger.info("Resuming partitioned read after the partitions which were loaded already")
 
-                if delta_table is not None:
-                    self.logger.debug("Deleting existing delta table")
-                    delta_table.delete()
+        # Workaround for full refresh schemas while we wait for Rust to fix memory issue. Partitioned reads also load
+        # full refresh tables over several runs, so the table is only emptied before the first run and every run
+        # appends to it, rather than each run replacing the rows of the runs before it
+        replaced_resources = [
+            name for name, resource in self.source._resources.items() if resource.write_disposition == "replace"
+        ]
+        for name in replaced_resources:
+            delta_table = self._get_delta_table(name)
 
-                self.logger.debug("Updating table write_disposition to append")
-                resource.apply_hints(write_disposition="append")
+            if delta_table is not None and not resuming:
+                self.logger.debug("Deleting existing delta table")
+                delta_table.delete()
+
+        self._append_to_replaced_tables(replaced_resources)
 
         total_counts: Counter[str] = Counter({})
 
@@ -223,16 +242,18 @@ class DataImportPipelineSync:
         if self.should_chunk_pipeline:
             # will get overwritten
             counts: Counter[str] = Counter({"start": 1})
+            partitions_pending = False
             pipeline_runs = 0
 
-            while counts:
+            while counts or partitions_pending:
                 self.logger.info(f"Running incremental (non-sql) pipeline, run ${pipeline_runs}")
+                self._append_to_replaced_tables(replaced_resources)
 
                 try:
                     pipeline.run(
                         self.source,
                         loader_file_format=self.loader_file_format,
-                        refresh="drop_sources" if self.refresh_dlt and pipeline_runs == 0 else None,
+                        refresh="drop_sources" if self.refresh_dlt and pipeline_runs == 0 and not resuming else None,
                     )
                 except PipelineStepFailed as e:
                     # Remove once DLT support writing empty Delta files
@@ -254,6 +275,14 @@ class DataImportPipelineSync:
                 counts = Counter(filtered_rows)
                 total_counts = counts + total_counts
 
+                # Partitioned reads load a few partitions per run, so keep running until all of them are loaded,
+                # including after runs whose partitions were empty
+                if self.partition_checkpoint is not None:
+                    self.partition_checkpoint.commit()
+                    partitions_pending = (
+                        self.partition_checkpoint.is_planned and not self.partition_checkpoint.is_finished
+                    )
+
                 if total_counts.total() > 0:
                     # Fix to upgrade all tables to DeltaS3Wrapper
                     resouce_names = list(self.source._resources.keys())
@@ -297,33 +326,52 @@ class DataImportPipelineSync:
                     self.logger.info("No table_counts, skipping validate_schema_and_update_table")
 
                 pipeline_runs = pipeline_runs + 1
+
+            if self.partition_checkpoint is not None:
+                self.partition_checkpoint.clear()
         else:
             self.logger.info("Running standard pipeline")
-            try:
-                pipeline.run(
-                    self.source,
-                    loader_file_format=self.loader_file_format,
-                    refresh="drop_sources" if self.refresh_dlt else None,
-                )
-            except PipelineStepFailed as e:
-                # Remove once DLT support writing empty Delta files
-                if isinstance(e.exception, LoadClientJobRetry):
-                    if "Generic S3 error" not in e.exception.retry_message:
-                        raise
-                elif isinstance(e.exception, DeltaError):
-                    if e.exception.args[0] != "Generic error: No data source supplied to write command.":
+            pipeline_runs = 0
+
+            while True:
+                self._append_to_replaced_tables(replaced_resources)
+                try:
+                    pipeline.run(
+                        self.source,
+                        loader_file_format=self.loader_file_format,
+                        refresh="drop_sources" if self.refresh_dlt and pipeline_runs == 0 and not resuming else None,
+                    )
+                except PipelineStepFailed as e:
+                    # Remove once DLT support writing empty Delta files
+                    if isinstance(e.exception, LoadClientJobRetry):
+                        if "Generic S3 error" not in e.exception.retry_message:
+                            raise
+                    elif isinstance(e.exception, DeltaError):
+                        if e.exception.args[0] != "Generic error: No data source supplied to write command.":
+                            raise
+                    else:
                         raise
+
+                if pipeline.last_trace.last_normalize_info is not None:
+                    row_counts = pipeline.last_trace.last_normalize_info.row_counts
                 else:
-                    raise
+                    row_counts = {}
 
-            if pipeline.last_trace.last_normalize_info is not None:
-                row_counts = pipeline.last_trace.last_normalize_info.row_counts
-            else:
-                row_counts = {}
+                filtered_rows = dict(filter(lambda pair: not pair[0].startswith("_dlt"), row_counts.items()))
+                counts = Counter(filtered_rows)
+                total_counts = total_counts + counts
+                pipeline_runs = pipeline_runs + 1
+
+                # Partitioned reads load a few partitions per run, and record them as loaded once the run is done
+                if self.partition_checkpoint is None:
+                    break
+                self.partition_checkpoint.commit()
+                if not self.partition_checkpoint.is_planned or self.partition_checkpoint.is_finished:
+                    break
+                self.logger.info(f"Running partitioned pipeline, run {pipeline_runs}")
 
-            filtered_rows = dict(filter(lambda pair: not pair[0].startswith("_dlt"), row_counts.items()))
-            counts = Counter(filtered_rows)
-            total_counts = total_counts + counts
+            if self.partition_checkpoint is not None:
+                self.partition_checkpoint.clear()
 
             if total_counts.total() > 0:
                 # Fix to upgrade all tables to DeltaS3Wrapper
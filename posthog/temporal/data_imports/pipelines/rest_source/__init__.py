@@ -7,7 +7,10 @@ from typing import (
 )
 from collections.abc import AsyncGenerator, Iterator
 from collections.abc import Callable
+import copy
+import functools
 import graphlib  # type: ignore[import,unused-ignore]
+import time
 
 import dlt
 from dlt.common.validation import validate_dict
@@ -23,12 +26,16 @@ from dlt.sources.helpers.rest_client.client import RESTClient
 from dlt.sources.helpers.rest_client.paginators import BasePaginator
 from dlt.sources.helpers.rest_client.typing import HTTPMethodBasic
 
+from posthog.settings.utils import get_from_env
+from posthog.temporal.data_imports.pipelines.checkpoint import Partition, PartitionCheckpoint
+
 from .typing import (
     ClientConfig,
     ResolvedParam,
     Endpoint,
     EndpointResource,
     RESTAPIConfig,
+    WindowConfig,
 )
 from .config_setup import (
     IncrementalParam,
@@ -39,8 +46,14 @@ from .config_setup import (
     setup_incremental_object,
     create_response_hooks,
 )
+from .fetching import RateLimiter, RateLimitedRESTClient, iterate_concurrently, iterate_windows, prefetch
 from .utils import exclude_keys  # noqa: F401
 
+# How many requests a source sends at once, unless its client config sets `concurrency`
+REST_SOURCE_CONCURRENCY = get_from_env("DATA_WAREHOUSE_REST_CONCURRENCY", 4, type_cast=int)
+# How many windows each worker fetches per sync, unless the windows config sets `window_count`
+WINDOWS_PER_WORKER = 4
+
 
 def rest_api_source(
     config: RESTAPIConfig,
@@ -111,11 +124,18 @@ def rest_api_source(
     return decorated(config, team_id, job_id)
 
 
-def rest_api_resources(config: RESTAPIConfig, team_id: int, job_id: str) -> list[DltResource]:
+def rest_api_resources(
+    config: RESTAPIConfig,
+    team_id: int,
+    job_id: str,
+    partition_checkpoint: Optional[PartitionCheckpoint] = None,
+) -> list[DltResource]:
     """Creates a list of resources from a REST API configuration.
 
     Args:
         config (RESTAPIConfig): Configuration for the REST API source.
+        partition_checkpoint (PartitionCheckpoint, optional): Tracks which windows of a windowed endpoint have
+            been loaded, so that a retry only fetches the others. Without it all windows are fetched in one run.
 
     Returns:
         list[DltResource]: List of dlt resources.
@@ -193,6 +213,7 @@ def rest_api_resources(config: RESTAPIConfig, team_id: int, job_id: str) -> list
         resolved_param_map,
         team_id=team_id,
         job_id=job_id,
+        partition_checkpoint=partition_checkpoint,
     )
 
     return list(resources.values())
@@ -205,9 +226,14 @@ def create_resources(
     resolved_param_map: dict[str, Optional[ResolvedParam]],
     team_id: int,
     job_id: str,
+    partition_checkpoint: Optional[PartitionCheckpoint] = None,
 ) -> dict[str, DltResource]:
     resources = {}
 
+    concurrency = client_config.get("concurrency") or REST_SOURCE_CONCURRENCY
+    # Shared by all resources, as they all count towards the rate limits of the same API
+    rate_limiter = RateLimiter(max_concurrency=concurrency)
+
     for resource_name in dependency_graph.static_order():
         resource_name = cast(str, resource_name)
         endpoint_resource = endpoint_resource_map[resource_name]
@@ -230,14 +256,16 @@ def create_resources(
             incremental_cursor_transform,
         ) = setup_incremental_object(request_params, endpoint_config.get("incremental"))
 
-        client = RESTClient(
+        client = RateLimitedRESTClient(
             base_url=client_config.get("base_url"),
             headers=client_config.get("headers"),
             auth=create_auth(client_config.get("auth")),
             paginator=create_paginator(client_config.get("paginator")),
+            rate_limiter=rate_limiter,
         )
 
         hooks = create_response_hooks(endpoint_config.get("response_actions"))
+        window_config = endpoint_config.get("windows")
 
         resource_kwargs = exclude_keys(endpoint_resource, {"endpoint", "include_from_parent"})
 
@@ -255,6 +283,8 @@ def create_resources(
                 incremental_object: Optional[Incremental[Any]] = incremental_object,
                 incremental_param: Optional[IncrementalParam] = incremental_param,
                 incremental_cursor_transform: Optional[Callable[..., Any]] = incremental_cursor_transform,
+                resource_name: str = resource_name,
+                windows: Optional[WindowConfig] = window_config,
             ) -> AsyncGenerator[Iterator[Any], Any]:
                 yield dlt.mark.materialize_table_schema()  # type: ignore
 
@@ -266,14 +296,35 @@ def create_resources(
                         incremental_cursor_transform,
                     )
 
-                yield client.paginate(
-                    method=method,
-                    path=path,
-                    params=params,
-                    json=json,
-                    paginator=paginator,
-                    data_selector=data_selector,
-                    hooks=hooks,
+                if windows:
+                    yield _paginate_windows(
+                        client,
+                        method=method,
+                        path=path,
+                        params=params,
+                        json=json,
+                        paginator=paginator,
+                        data_selector=data_selector,
+                        hooks=hooks,
+                        windows=windows,
+                        checkpoint_key=f"{resource_name}:{windows['start_param']}",
+                        checkpoint=partition_checkpoint,
+                        incremental_object=incremental_object,
+                        concurrency=concurrency,
+                    )
+                    return
+
+                # Fetches the next page while dlt processes the previous one
+                yield prefetch(
+                    lambda: client.paginate(
+                        method=method,
+                        path=path,
+                        params=params,
+                        json=json,
+                        paginator=paginator,
+                        data_selector=data_selector,
+                        hooks=hooks,
+                    )
                 )
 
             resources[resource_name] = dlt.resource(
@@ -319,7 +370,7 @@ def create_resources(
                         incremental_cursor_transform,
                     )
 
-                for item in items:
+                def paginate_children(item: dict[str, Any]) -> Iterator[Any]:
                     formatted_path, parent_record = process_parent_data_item(
                         path, item, resolved_param, include_from_parent
                     )
@@ -328,7 +379,8 @@ def create_resources(
                         method=method,
                         path=formatted_path,
                         params=params,
-                        paginator=paginator,
+                        # Paginators keep the state of the pages they fetched, so each parent needs its own
+                        paginator=copy.deepcopy(paginator),
                         data_selector=data_selector,
                         hooks=hooks,
                     ):
@@ -337,6 +389,12 @@ def create_resources(
                                 child_record.update(parent_record)
                         yield child_page
 
+                # The children of the items of a page are fetched concurrently
+                for child_page in iterate_concurrently(
+                    [functools.partial(paginate_children, item) for item in items], max_workers=concurrency
+                ):
+                    yield child_page
+
             resources[resource_name] = dlt.resource(  # type: ignore[call-overload]
                 paginate_dependent_resource,
                 data_from=predecessor,
@@ -372,3 +430,57 @@ def _set_incremental_params(
     if incremental_param.end:
         params[incremental_param.end] = transform(incremental_object.end_value)
     return params
+
+
+def _paginate_windows(
+    client: RESTClient,
+    method: HTTPMethodBasic,
+    path: str,
+    params: dict[str, Any],
+    json: Optional[dict[str, Any]],
+    paginator: Optional[BasePaginator],
+    data_selector: Optional[jsonpath.TJsonPath],
+    hooks: Optional[dict[str, Any]],
+    windows: WindowConfig,
+    checkpoint_key: str,
+    checkpoint: Optional[PartitionCheckpoint],
+    incremental_object: Optional[Incremental[Any]],
+    concurrency: int,
+) -> Iterator[Any]:
+    """
+    Pages through the endpoint in time windows, which are fetched concurrently. Without a checkpoint which is saved
+    between runs, all windows are fetched in one run.
+    """
+    start = windows.get("initial_value", 0)
+    if incremental_object and isinstance(incremental_object.last_value, int):
+        start = max(start, incremental_object.last_value)
+    convert = windows.get("convert") or (lambda value: value)
+
+    def fetch_window(window: Partition) -> Iterator[Any]:
+        # Paginators and request params are updated as pages are fetched, so each window needs its own
+        window_params = dict(params)
+        if window.lower is not None:
+            window_params[windows["start_param"]] = convert(window.lower)
+        if window.upper is not None:
+            window_params[windows["end_param"]] = convert(window.upper)
+
+        return client.paginate(
+            method=method,
+            path=path,
+            params=window_params,
+            json=json,
+            paginator=copy.deepcopy(paginator),
+            data_selector=data_selector,
+            hooks=hooks,
+        )
+
+    return iterate_windows(
+        checkpoint if checkpoint is not None else PartitionCheckpoint(),
+        key=checkpoint_key,
+        start=start,
+        end=int(time.time()),
+        window_count=windows.get("window_count") or concurrency * WINDOWS_PER_WORKER,
+        fetch_window=fetch_window,
+        max_workers=concurrency,
+        windows_per_run=concurrency if checkpoint is not None else None,
+    )
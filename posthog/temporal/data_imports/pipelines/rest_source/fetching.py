@@ -0,0 +1,258 @@
+"""Concurrent page fetching for REST API sources, which adapts how many requests are in flight to the API's rate limits"""
+
+import functools
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from email.utils import mktime_tz, parsedate_tz
+from typing import Any, Optional, Union
+
+from dlt.common import logger
+from dlt.sources.helpers.requests import Request, Response
+from dlt.sources.helpers.rest_client.client import RESTClient
+from requests import HTTPError
+
+from posthog.temporal.data_imports.pipelines.checkpoint import Partition, PartitionCheckpoint, split_range
+
+# How long a fetcher waits for the consumer to take a page before checking whether fetching was stopped
+_QUEUE_TIMEOUT_SECONDS = 1.0
+# How long requests pause after a rate limited response which doesn't say when to retry
+_DEFAULT_BACKOFF_SECONDS = 1.0
+# Longest pause a response can ask for, so that a misreported reset doesn't stall the sync
+_MAX_PAUSE_SECONDS = 60.0
+# How often a rate limited request is sent before its error is raised
+_MAX_RATE_LIMITED_ATTEMPTS = 5
+# Reset headers with values above this are unix timestamps rather than a number of seconds
+_UNIX_TIMESTAMP_THRESHOLD = 1_000_000_000
+
+_REMAINING_HEADERS = ("X-RateLimit-Remaining", "RateLimit-Remaining", "X-Rate-Limit-Remaining")
+_RESET_HEADERS = ("X-RateLimit-Reset", "RateLimit-Reset", "X-Rate-Limit-Reset")
+
+
+def _header_number(response: Response, names: Sequence[str]) -> Optional[float]:
+    for name in names:
+        value = response.headers.get(name)
+        if value is None:
+            continue
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _retry_after_seconds(response: Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parsed = parsedate_tz(value)
+    if parsed is None:
+        return None
+    return max(0.0, mktime_tz(parsed) - time.time())
+
+
+def _reset_seconds(response: Response) -> Optional[float]:
+    reset = _header_number(response, _RESET_HEADERS)
+    if reset is None:
+        return None
+    if reset > _UNIX_TIMESTAMP_THRESHOLD:
+        return max(0.0, reset - time.time())
+    return max(0.0, reset)
+
+
+class RateLimiter:
+    """
+    Limits how many requests to an API are in flight at once, and adapts the limit to its rate limit responses.
+
+    The limit starts at `max_concurrency`. A 429 response halves it and pauses all requests for as long as the
+    response asks, and each run of `limit` successful responses raises it by one again. Responses which report that
+    no requests remain pause all requests until the reported reset, and ones which report that fewer requests remain
+    than the limit lower it to those.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = self.max_concurrency
+        self._in_flight = 0
+        self._successes = 0
+        self._resume_at = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._condition:
+            while True:
+                wait = self._resume_at - time.monotonic()
+                if wait <= 0 and self._in_flight < self.limit:
+                    break
+                self._condition.wait(timeout=wait if wait > 0 else None)
+            self._in_flight += 1
+
+    def release(self) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _pause(self, seconds: float) -> None:
+        self._resume_at = max(self._resume_at, time.monotonic() + min(seconds, _MAX_PAUSE_SECONDS))
+
+    def update(self, response: Response) -> None:
+        with self._condition:
+            remaining = _header_number(response, _REMAINING_HEADERS)
+            if response.status_code == 429:
+                self.limit = max(1, self.limit // 2)
+                self._successes = 0
+                pause = _retry_after_seconds(response)
+                if pause is None:
+                    pause = _reset_seconds(response)
+                self._pause(pause if pause is not None else _DEFAULT_BACKOFF_SECONDS)
+                logger.debug(f"Rate limited, lowering the number of concurrent requests to {self.limit}")
+            elif remaining is not None and remaining < 1:
+                reset = _reset_seconds(response)
+                self._pause(reset if reset is not None else _DEFAULT_BACKOFF_SECONDS)
+            elif remaining is not None and remaining < self.limit:
+                self.limit = max(1, int(remaining))
+                self._successes = 0
+            elif response.ok and self.limit < self.max_concurrency:
+                self._successes += 1
+                if self._successes >= self.limit:
+                    self.limit += 1
+                    self._successes = 0
+            self._condition.notify_all()
+
+
+class RateLimitedRESTClient(RESTClient):
+    """
+    A `RESTClient` which sends its requests through `rate_limiter`, and retries requests which were rate limited
+    once the limiter allows it.
+    """
+
+    def __init__(self, *args: Any, rate_limiter: RateLimiter, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.rate_limiter = rate_limiter
+
+    def _send_request(self, request: Request, **kwargs: Any) -> Response:
+        attempt = 1
+        while True:
+            self.rate_limiter.acquire()
+            try:
+                response = super()._send_request(request, **kwargs)
+            except HTTPError as e:
+                # The default response hook raises for error statuses, including the 429 we want to retry
+                if e.response is None or e.response.status_code != 429 or attempt >= _MAX_RATE_LIMITED_ATTEMPTS:
+                    if e.response is not None:
+                        self.rate_limiter.update(e.response)
+                    raise
+                response = e.response
+            finally:
+                self.rate_limiter.release()
+
+            self.rate_limiter.update(response)
+            if response.status_code != 429 or attempt >= _MAX_RATE_LIMITED_ATTEMPTS:
+                return response
+            attempt += 1
+
+
+@dataclass
+class _ProducerDone:
+    index: int
+
+
+def iterate_concurrently(
+    producers: Sequence[Callable[[], Iterator[Any]]],
+    max_workers: int,
+    on_done: Optional[Callable[[int], None]] = None,
+    buffer_size: Optional[int] = None,
+) -> Iterator[Any]:
+    """
+    Runs `producers` on up to `max_workers` threads and yields the items of all of them as they arrive. Producers run
+    at most `buffer_size` items ahead of the consumer, which defaults to two per worker, so a single producer fetches
+    its next page while the previous one is processed.
+
+    `on_done` is called with the index of a producer once all its items have been yielded.
+    """
+    if not producers:
+        return
+
+    items: queue.Queue[Union[Any, _ProducerDone, BaseException]] = queue.Queue(maxsize=buffer_size or 2 * max_workers)
+    stopped = threading.Event()
+
+    def put(item: Union[Any, _ProducerDone, BaseException]) -> bool:
+        while not stopped.is_set():
+            try:
+                items.put(item, timeout=_QUEUE_TIMEOUT_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce(index: int) -> None:
+        try:
+            for item in producers[index]():
+                if not put(item):
+                    return
+            put(_ProducerDone(index))
+        except BaseException as e:
+            put(e)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rest-fetch") as executor:
+        for index in range(len(producers)):
+            executor.submit(produce, index)
+
+        try:
+            done_count = 0
+            while done_count < len(producers):
+                item = items.get()
+                if isinstance(item, BaseException):
+                    raise item
+                if isinstance(item, _ProducerDone):
+                    if on_done is not None:
+                        on_done(item.index)
+                    done_count += 1
+                    continue
+                yield item
+        finally:
+            # Stop the producers if the consumer stopped, e.g. because a fetch or the pipeline failed
+            stopped.set()
+
+
+def prefetch(producer: Callable[[], Iterator[Any]], lookahead: int = 2) -> Iterator[Any]:
+    """
+    Yields the items of `producer`, which runs on a thread up to `lookahead` items ahead of the consumer.
+    """
+    return iterate_concurrently([producer], max_workers=1, buffer_size=lookahead)
+
+
+def iterate_windows(
+    checkpoint: PartitionCheckpoint,
+    key: str,
+    start: int,
+    end: int,
+    window_count: int,
+    fetch_window: Callable[[Partition], Iterator[Any]],
+    max_workers: int,
+    windows_per_run: Optional[int] = None,
+) -> Iterator[Any]:
+    """
+    Splits the time range from `start` to `end` into `window_count` windows, and yields the pages `fetch_window`
+    fetches for each of them, `max_workers` windows at once.
+
+    The windows are planned in `checkpoint` under `key`, which records a window as read once all its pages have been
+    yielded. At most `windows_per_run` windows are fetched per run, oldest first, so that the cursor of an
+    incremental sync only moves past windows which have been loaded.
+    """
+    if not checkpoint.is_planned or checkpoint.column != key:
+        checkpoint.plan(key, split_range(start, end, window_count))
+
+    windows = checkpoint.pending(windows_per_run)
+    return iterate_concurrently(
+        [functools.partial(fetch_window, window) for window in windows],
+        max_workers=max_workers,
+        on_done=lambda index: checkpoint.mark_read(windows[index]),
+    )
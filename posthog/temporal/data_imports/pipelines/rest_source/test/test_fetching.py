@@ -0,0 +1,232 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from requests import Response
+
+from posthog.temporal.data_imports.pipelines.checkpoint import PartitionCheckpoint
+from posthog.temporal.data_imports.pipelines.rest_source import rest_api_resources
+from posthog.temporal.data_imports.pipelines.rest_source.fetching import RateLimiter, iterate_concurrently
+
+ITEMS = [{"id": index, "created": 1000 + index * 10} for index in range(1, 61)]
+PAGE_SIZE = 5
+
+
+class MockAPI:
+    """A list API filtered by creation time and paged with a cursor, like Stripe's"""
+
+    def __init__(self):
+        self.base_url = ""
+        self.requests: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.rate_limited_requests = 0
+        self._lock = threading.Lock()
+
+    def handle(self, path: str, query: dict[str, str]) -> tuple[int, dict[str, str], dict]:
+        with self._lock:
+            self.requests.append(path)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            rate_limited = self.rate_limited_requests > 0
+            if rate_limited:
+                self.rate_limited_requests -= 1
+        try:
+            # Slow enough for concurrent requests to overlap
+            time.sleep(0.02)
+            if rate_limited:
+                return 429, {"Retry-After": "0"}, {"error": "rate limited"}
+
+            if match := re.fullmatch(r"/items/(\d+)/notes", path):
+                return 200, {}, {"data": [{"note": f"note {match.group(1)}"}], "next_cursor": None}
+
+            items = [
+                item
+                for item in ITEMS
+                if item["created"] >= int(query.get("created[gte]", 0))
+                and ("created[lt]" not in query or item["created"] < int(query["created[lt]"]))
+            ]
+            offset = int(query.get("cursor", 0))
+            page = items[offset : offset + PAGE_SIZE]
+            next_cursor = offset + PAGE_SIZE if offset + PAGE_SIZE < len(items) else None
+            return 200, {"X-RateLimit-Remaining": "100"}, {"data": page, "next_cursor": next_cursor}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def api():
+    mock_api = MockAPI()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            status, headers, body = mock_api.handle(url.path, query)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(json.dumps(body).encode())
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    mock_api.base_url = f"http://127.0.0.1:{server.server_address[1]}/"
+    yield mock_api
+    server.shutdown()
+    server.server_close()
+
+
+def _config(api, resources, concurrency=4):
+    return {
+        "client": {
+            "base_url": api.base_url,
+            "paginator": {"type": "cursor", "cursor_path": "next_cursor", "cursor_param": "cursor"},
+            "concurrency": concurrency,
+        },
+        "resource_defaults": {"primary_key": "id"},
+        "resources": resources,
+    }
+
+
+def _items_resource(window_count=8):
+    return {
+        "name": "items",
+        "endpoint": {
+            "path": "items",
+            "data_selector": "data",
+            "windows": {
+                "start_param": "created[gte]",
+                "end_param": "created[lt]",
+                "initial_value": 1000,
+                "window_count": window_count,
+            },
+        },
+    }
+
+
+def _read(resource) -> list[dict]:
+    return [item for item in resource if isinstance(item, dict)]
+
+
+def test_windowed_fetch_returns_all_items_concurrently(api):
+    (resource,) = rest_api_resources(_config(api, [_items_resource()]), team_id=1, job_id="job")
+
+    items = _read(resource)
+
+    assert sorted(item["id"] for item in items) == [item["id"] for item in ITEMS]
+    assert api.max_in_flight > 1
+
+
+def test_windowed_fetch_resumes_from_checkpoint(api):
+    saved_states: list[Optional[dict]] = []
+    checkpoint = PartitionCheckpoint(save=saved_states.append)
+
+    # With a checkpoint, each run only fetches as many windows as requests can be in flight
+    (resource,) = rest_api_resources(
+        _config(api, [_items_resource()], concurrency=2), team_id=1, job_id="job", partition_checkpoint=checkpoint
+    )
+    first_ids = {item["id"] for item in _read(resource)}
+    checkpoint.commit()
+    assert not checkpoint.is_finished
+
+    resumed_checkpoint = PartitionCheckpoint(saved_states[-1], save=saved_states.append)
+    resumed_ids: set[int] = set()
+    while not resumed_checkpoint.is_finished:
+        (resource,) = rest_api_resources(
+            _config(api, [_items_resource()], concurrency=2),
+            team_id=1,
+            job_id="job",
+            partition_checkpoint=resumed_checkpoint,
+        )
+        resumed_ids |= {item["id"] for item in _read(resource)}
+        resumed_checkpoint.commit()
+
+    assert first_ids.isdisjoint(resumed_ids)
+    assert sorted(first_ids | resumed_ids) == [item["id"] for item in ITEMS]
+
+
+def test_dependent_resource_fetches_children_concurrently(api):
+    resources = [
+        {"name": "items", "endpoint": {"path": "items", "data_selector": "data"}},
+        {
+            "name": "notes",
+            "include_from_parent": ["id"],
+            "endpoint": {
+                "path": "items/{item_id}/notes",
+                "data_selector": "data",
+                "params": {"item_id": {"type": "resolve", "resource": "items", "field": "id"}},
+            },
+        },
+    ]
+    items_resource, notes_resource = rest_api_resources(_config(api, resources), team_id=1, job_id="job")
+
+    notes = _read(items_resource | notes_resource)
+
+    assert sorted(note["_items_id"] for note in notes) == [item["id"] for item in ITEMS]
+    assert all(note["note"] == f"note {note['_items_id']}" for note in notes)
+    assert api.max_in_flight > 1
+
+
+def test_rate_limited_requests_are_retried(api):
+    api.rate_limited_requests = 2
+    resources = [{"name": "items", "endpoint": {"path": "items", "data_selector": "data"}}]
+    (resource,) = rest_api_resources(_config(api, resources), team_id=1, job_id="job")
+
+    assert len(_read(resource)) == len(ITEMS)
+
+
+def _response(status_code: int, headers: dict[str, str]) -> Response:
+    response = Response()
+    response.status_code = status_code
+    response.headers.update(headers)
+    return response
+
+
+def test_rate_limiter_adapts_concurrency():
+    limiter = RateLimiter(max_concurrency=4)
+
+    limiter.update(_response(429, {"Retry-After": "0"}))
+    assert limiter.limit == 2
+    limiter.update(_response(429, {"Retry-After": "0"}))
+    limiter.update(_response(429, {"Retry-After": "0"}))
+    assert limiter.limit == 1
+
+    # Each run of as many successful responses as the limit raises it by one
+    for _ in range(1 + 2 + 3):
+        limiter.update(_response(200, {}))
+    assert limiter.limit == 4
+
+    limiter.update(_response(200, {"X-RateLimit-Remaining": "2"}))
+    assert limiter.limit == 2
+
+
+def test_rate_limiter_pauses_until_reset():
+    limiter = RateLimiter(max_concurrency=2)
+    limiter.update(_response(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "0.5"}))
+
+    started_at = time.monotonic()
+    limiter.acquire()
+    limiter.release()
+
+    assert time.monotonic() - started_at >= 0.4
+
+
+def test_iterate_concurrently_raises_producer_errors():
+    def failing():
+        yield 1
+        raise ValueError("fetch failed")
+
+    with pytest.raises(ValueError, match="fetch failed"):
+        list(iterate_concurrently([lambda: iter([0]), failing], max_workers=2))
@@ -158,6 +158,7 @@ class ClientConfig(TypedDict, total=False):
     headers: Optional[dict[str, str]]
     auth: Optional[AuthConfig]
     paginator: Optional[PaginatorConfig]
+    concurrency: Optional[int]
 
 
 class IncrementalArgs(TypedDict, total=False):
@@ -175,6 +176,18 @@ class IncrementalConfig(IncrementalArgs, total=False):
     end_param: Optional[str]
 
 
+class WindowConfig(TypedDict, total=False):
+    """Splits the time range from `initial_value` (or the incremental cursor) up to now into windows, which are
+    fetched concurrently. Window bounds are unix timestamps, passed through `convert` if the API expects another
+    format."""
+
+    start_param: str
+    end_param: str
+    initial_value: int
+    window_count: Optional[int]
+    convert: Optional[Callable[..., Any]]
+
+
 ParamBindType = Literal["resolve", "incremental"]
 
 
@@ -218,6 +231,7 @@ class Endpoint(TypedDict, total=False):
     data_selector: Optional[jsonpath.TJsonPath]
     response_actions: Optional[list[ResponseAction]]
     incremental: Optional[IncrementalConfig]
+    windows: Optional[WindowConfig]
 
 
 class ResourceBase(TypedDict, total=False):
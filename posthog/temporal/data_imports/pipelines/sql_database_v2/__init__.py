@@ -9,6 +9,7 @@ from sqlalchemy.engine import Engine
 from zoneinfo import ZoneInfo
 
 import dlt
+from dlt.common.schema.typing import TWriteDispositionConfig
 from dlt.sources import DltResource, DltSource
 from urllib.parse import quote
 from dlt.common.libs.pyarrow import pyarrow as pa
@@ -28,6 +29,7 @@ from .helpers import (
     SqlTableResourceConfiguration,
     _detect_precision_hints_deprecated,
 )
+from ..checkpoint import PartitionCheckpoint
 from .schema_types import (
     default_table_adapter,
     table_to_columns,
@@ -39,6 +41,9 @@ from .schema_types import (
 from sqlalchemy_bigquery import BigQueryDialect, __all__
 from sqlalchemy_bigquery._types import _type_map
 
+# How many connections Postgres and MySQL tables are read over at once
+SQL_PARTITION_COUNT = get_from_env("DATA_WAREHOUSE_SQL_PARTITION_COUNT", 4, type_cast=int)
+
 # Workaround to get JSON support in the BigQuery Dialect
 BigQueryDialect.JSON = BigQueryJSON
 _type_map["JSON"] = BigQueryJSON
@@ -68,6 +73,7 @@ def sql_source_for_type(
     team_id: Optional[int] = None,
     incremental_field: Optional[str] = None,
     incremental_field_type: Optional[IncrementalFieldType] = None,
+    partition_checkpoint: Optional[PartitionCheckpoint] = None,
 ) -> DltSource:
     host = quote(host)
     user = quote(user)
@@ -83,11 +89,13 @@ def sql_source_for_type(
         incremental = None
 
     connect_args = []
+    partition_count = 1
 
     if source_type == ExternalDataSource.Type.POSTGRES:
         credentials = ConnectionStringCredentials(
             f"postgresql://{user}:{password}@{host}:{port}/{database}?sslmode={sslmode}"
         )
+        partition_count = SQL_PARTITION_COUNT
     elif source_type == ExternalDataSource.Type.MYSQL:
         query_params = ""
 
@@ -104,6 +112,8 @@ def sql_source_for_type(
         # PlanetScale needs this to be set
         if host.endswith("psdb.cloud"):
             connect_args = ["SET workload = 'OLAP';"]
+
+        partition_count = SQL_PARTITION_COUNT
     elif source_type == ExternalDataSource.Type.MSSQL:
         credentials = ConnectionStringCredentials(
             f"mssql+pyodbc://{user}:{password}@{host}:{port}/{database}?driver=ODBC+Driver+18+for+SQL+Server&TrustServerCertificate=yes"
@@ -118,6 +128,8 @@ def sql_source_for_type(
         incremental=incremental,
         team_id=team_id,
         connect_args=connect_args,
+        partition_count=partition_count,
+        partition_checkpoint=partition_checkpoint,
     )
 
     return db_source
@@ -211,6 +223,8 @@ def sql_database(
     incremental: Optional[dlt.sources.incremental] = None,
     team_id: Optional[int] = None,
     connect_args: Optional[list[str]] = None,
+    partition_count: int = 1,
+    partition_checkpoint: Optional[PartitionCheckpoint] = None,
 ) -> Iterable[DltResource]:
     """
     A dlt source which loads data from an SQL database using SQLAlchemy.
@@ -241,6 +255,10 @@ def sql_database(
             Argument is a single sqlalchemy data type (`TypeEngine` instance) and it should return another sqlalchemy data type, or `None` (type will be inferred from data)
         query_adapter_callback(Optional[Callable[Select, Table], Select]): Callable to override the SELECT query used to fetch data from the table.
             The callback receives the sqlalchemy `Select` and corresponding `Table` objects and should return the modified `Select`.
+        partition_count (int): Number of connections to read each table over at once, each reading a range of its primary key or incremental field.
+            Only used with the "pyarrow" backend, and for tables with a single integer, date or datetime primary key if not loaded incrementally.
+        partition_checkpoint (Optional[PartitionCheckpoint]): Tracks which ranges have been loaded, so that a retry only reads the others.
+            The pipeline needs to commit it after each run, and repeat runs until it's finished.
 
     Returns:
         Iterable[DltResource]: A list of DLT resources for each table to be loaded.
@@ -283,6 +301,8 @@ def sql_database(
             incremental=incremental,
             team_id=team_id,
             connect_args=connect_args,
+            partition_count=partition_count,
+            partition_checkpoint=partition_checkpoint,
         )
 
 
@@ -321,6 +341,8 @@ def sql_table(
     included_columns: Optional[list[str]] = None,
     team_id: Optional[int] = None,
     connect_args: Optional[list[str]] = None,
+    partition_count: int = 1,
+    partition_checkpoint: Optional[PartitionCheckpoint] = None,
 ) -> DltResource:
     """
     A dlt resource which loads data from an SQL database table using SQLAlchemy.
@@ -352,6 +374,8 @@ def sql_table(
         included_columns (Optional[List[str]): List of column names to select from the table. If not provided, all columns are loaded.
         query_adapter_callback(Optional[Callable[Select, Table], Select]): Callable to override the SELECT query used to fetch data from the table.
             The callback receives the sqlalchemy `Select` and corresponding `Table` objects and should return the modified `Select`.
+        partition_count (int): Number of connections to read the table over at once, each reading a range of its primary key or incremental field.
+        partition_checkpoint (Optional[PartitionCheckpoint]): Tracks which ranges have been loaded, so that a retry only reads the others.
 
     Returns:
         DltResource: The dlt resource for loading data from the SQL database table.
@@ -383,18 +407,24 @@ def sql_table(
 
         return query.with_only_columns(table.c[*cols_to_select])
 
-    return dlt.resource(
-        table_rows,
-        name=table_obj.name,
-        primary_key=get_primary_key(table_obj),
-        merge_key=get_primary_key(table_obj),
-        columns=columns,
-        write_disposition={
+    # An empty key gives the same table schema as no key
+    primary_key = get_primary_key(table_obj) or []
+    write_disposition: TWriteDispositionConfig = (
+        {
             "disposition": "merge",
             "strategy": "upsert",
         }
         if incremental
-        else "replace",
+        else "replace"
+    )
+
+    return dlt.resource(
+        table_rows,
+        name=table_obj.name,
+        primary_key=primary_key,
+        merge_key=primary_key,
+        columns=columns,
+        write_disposition=write_disposition,
         table_format="delta",
     )(
         engine=engine,
@@ -410,4 +440,7 @@ def sql_table(
         included_columns=included_columns,
         query_adapter_callback=query_adapter_callback,
         connect_args=connect_args,
+        partition_count=partition_count,
+        partition_checkpoint=partition_checkpoint,
+        partitions_per_run=partition_count,
     )
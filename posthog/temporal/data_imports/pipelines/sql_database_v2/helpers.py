@@ -32,6 +32,8 @@ from sqlalchemy import Table, create_engine, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.exc import CompileError
 
+from ..checkpoint import PartitionCheckpoint
+
 
 TableBackend = Literal["sqlalchemy", "pyarrow", "pandas", "connectorx"]
 TQueryAdapter = Callable[[SelectAny, Table], SelectAny]
@@ -191,6 +193,9 @@ def table_rows(
     included_columns: Optional[list[str]] = None,
     query_adapter_callback: Optional[TQueryAdapter] = None,
     connect_args: Optional[list[str]] = None,
+    partition_count: int = 1,
+    partition_checkpoint: Optional[PartitionCheckpoint] = None,
+    partitions_per_run: Optional[int] = None,
 ) -> Iterator[TDataItem]:
     columns: TTableSchemaColumns | None = None
     if defer_table_reflect:
@@ -220,16 +225,35 @@ def table_rows(
 
     yield dlt.mark.materialize_table_schema()  # type: ignore
 
-    loader = TableLoader(
-        engine,
-        backend,
-        table,
-        columns,
-        incremental=incremental,
-        chunk_size=chunk_size,
-        query_adapter_callback=query_adapter_callback,
-        connect_args=connect_args,
-    )
+    from .partitions import PartitionedTableLoader, get_partition_column
+
+    partition_column = get_partition_column(table, incremental) if partition_count > 1 else None
+    loader: TableLoader
+    if partition_column is not None and backend == "pyarrow":
+        loader = PartitionedTableLoader(
+            engine,
+            table,
+            columns,
+            partition_column=partition_column,
+            partition_count=partition_count,
+            checkpoint=partition_checkpoint or PartitionCheckpoint(),
+            partitions_per_run=partitions_per_run if partition_checkpoint is not None else None,
+            incremental=incremental,
+            chunk_size=chunk_size,
+            query_adapter_callback=query_adapter_callback,
+            connect_args=connect_args,
+        )
+    else:
+        loader = TableLoader(
+            engine,
+            backend,
+            table,
+            columns,
+            incremental=incremental,
+            chunk_size=chunk_size,
+            query_adapter_callback=query_adapter_callback,
+            connect_args=connect_args,
+        )
 
     yield from loader.load_rows(backend_kwargs)
 
@@ -0,0 +1,172 @@
+"""Partitioned reads, which split a table into ranges of one column and read the ranges over several connections"""
+
+import queue
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Optional, Union
+
+import dlt
+from dlt.common.schema import TTableSchemaColumns
+from dlt.common.typing import TDataItem
+from sqlalchemy import Column, Table, func, text
+from sqlalchemy.engine import Engine
+
+from posthog.temporal.data_imports.pipelines.checkpoint import Partition, PartitionCheckpoint, split_range
+
+from .arrow_helpers import row_tuples_to_arrow
+from .helpers import SelectAny, TableLoader, TQueryAdapter
+
+# How long a reader waits for the consumer to take a chunk before checking whether the read was stopped
+_QUEUE_TIMEOUT_SECONDS = 1.0
+# How many ranges the table is split into per connection, so that a sync is checkpointed several times
+PARTITIONS_PER_CONNECTION = 4
+
+
+def get_partition_column(table: Table, incremental: Optional[dlt.sources.incremental[Any]]) -> Optional[Column]:
+    """
+    The column to split the table by: the incremental field if the table is synced incrementally, as only rows after
+    its last value are read anyway, or otherwise a primary key of a single integer, date or datetime column.
+    """
+    if incremental is not None:
+        if incremental.last_value_func is not max:
+            return None
+        column = table.c[incremental.cursor_path]
+    else:
+        primary_key = list(table.primary_key.columns)
+        if len(primary_key) != 1:
+            return None
+        column = primary_key[0]
+
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return None
+    if not issubclass(python_type, int | date) or issubclass(python_type, bool):
+        return None
+    return column
+
+
+@dataclass
+class _PartitionRead:
+    partition: Partition
+
+
+class PartitionedTableLoader(TableLoader):
+    """
+    Reads the table in partitions of `partition_column`, `partition_count` at once over separate connections, and
+    yields the chunks of all of them as one stream of arrow tables. The table is split into
+    `PARTITIONS_PER_CONNECTION` partitions per connection.
+
+    At most `partitions_per_run` partitions are read per run of the resource, which the pipeline repeats until the
+    checkpoint is finished, so that a failed sync can resume after the partitions which have been loaded already.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        table: Table,
+        columns: TTableSchemaColumns,
+        partition_column: Column,
+        partition_count: int,
+        checkpoint: PartitionCheckpoint,
+        partitions_per_run: Optional[int] = None,
+        chunk_size: int = 1000,
+        incremental: Optional[dlt.sources.incremental[Any]] = None,
+        query_adapter_callback: Optional[TQueryAdapter] = None,
+        connect_args: Optional[list[str]] = None,
+    ) -> None:
+        super().__init__(
+            engine,
+            "pyarrow",
+            table,
+            columns,
+            chunk_size=chunk_size,
+            incremental=incremental,
+            query_adapter_callback=query_adapter_callback,
+            connect_args=connect_args,
+        )
+        self.partition_column = partition_column
+        self.partition_count = partition_count
+        self.checkpoint = checkpoint
+        self.partitions_per_run = partitions_per_run
+
+    def plan_partitions(self) -> list[Partition]:
+        query = (
+            self.make_query()
+            .with_only_columns(func.min(self.partition_column), func.max(self.partition_column))
+            .order_by(None)
+        )
+        with self.engine.connect() as conn:
+            min_value, max_value = conn.execute(query).one()
+
+        if min_value is None or max_value is None:
+            return [Partition(index=0, lower=None, upper=None)]
+        return split_range(min_value, max_value, self.partition_count * PARTITIONS_PER_CONNECTION)
+
+    def partition_query(self, partition: Partition) -> SelectAny:
+        query = self.make_query()
+        if partition.lower is not None:
+            query = query.where(self.partition_column >= partition.lower)
+        if partition.upper is not None:
+            query = query.where(self.partition_column < partition.upper)
+        return query
+
+    def load_rows(self, backend_kwargs: Optional[dict[str, Any]] = None) -> Iterator[TDataItem]:
+        if not self.checkpoint.is_planned or self.checkpoint.column != self.partition_column.name:
+            self.checkpoint.plan(self.partition_column.name, self.plan_partitions())
+
+        partitions = self.checkpoint.pending(self.partitions_per_run)
+        if not partitions:
+            return
+
+        tz = (backend_kwargs or {}).get("tz", "UTC")
+        # Bounded, so that readers wait for the pipeline instead of buffering the whole table in memory
+        chunks: queue.Queue[Union[TDataItem, _PartitionRead, BaseException]] = queue.Queue(
+            maxsize=2 * self.partition_count
+        )
+        stopped = threading.Event()
+
+        def put(item: Union[TDataItem, _PartitionRead, BaseException]) -> bool:
+            while not stopped.is_set():
+                try:
+                    chunks.put(item, timeout=_QUEUE_TIMEOUT_SECONDS)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def read_partition(partition: Partition) -> None:
+            try:
+                with self.engine.connect() as conn:
+                    if self.connect_args:
+                        for stmt in self.connect_args:
+                            conn.execute(text(stmt))
+                    result = conn.execution_options(yield_per=self.chunk_size).execute(self.partition_query(partition))
+                    for rows in result.partitions(size=self.chunk_size):
+                        if not put(row_tuples_to_arrow(rows, self.columns, tz=tz)):
+                            return
+                put(_PartitionRead(partition))
+            except BaseException as e:
+                put(e)
+
+        with ThreadPoolExecutor(max_workers=self.partition_count, thread_name_prefix="sql-partition") as executor:
+            for partition in partitions:
+                executor.submit(read_partition, partition)
+
+            try:
+                read_count = 0
+                while read_count < len(partitions):
+                    item = chunks.get()
+                    if isinstance(item, BaseException):
+                        raise item
+                    if isinstance(item, _PartitionRead):
+                        self.checkpoint.mark_read(item.partition)
+                        read_count += 1
+                        continue
+                    yield item
+            finally:
+                # Stop the readers if the pipeline stopped consuming, e.g. because a read or the pipeline failed
+                stopped.set()
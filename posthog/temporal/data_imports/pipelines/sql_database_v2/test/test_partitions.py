@@ -0,0 +1,155 @@
+from datetime import date, datetime
+from typing import Optional
+
+import dlt
+import pyarrow as pa
+import pytest
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, create_engine, insert
+
+from posthog.temporal.data_imports.pipelines.sql_database_v2 import sql_table
+from posthog.temporal.data_imports.pipelines.sql_database_v2.helpers import table_rows
+from posthog.temporal.data_imports.pipelines.sql_database_v2.partitions import (
+    PARTITIONS_PER_CONNECTION,
+    Partition,
+    PartitionCheckpoint,
+    get_partition_column,
+    split_range,
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # A database file rather than an in-memory database, which every connection would get its own copy of
+    return create_engine(f"sqlite:///{tmp_path / 'source.db'}")
+
+
+@pytest.fixture
+def table(engine):
+    metadata = MetaData()
+    table = Table(
+        "items",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("name", String),
+        Column("updated_at", DateTime),
+    )
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(table),
+            [
+                {"id": index, "name": f"item {index}", "updated_at": datetime(2024, 1, 1 + index % 28)}
+                for index in range(1, 101)
+            ],
+        )
+    return table
+
+
+def _read_ids(engine, table, **kwargs) -> list[int]:
+    ids = []
+    for item in table_rows(engine, table, chunk_size=7, backend="pyarrow", reflection_level="full", **kwargs):
+        if isinstance(item, pa.Table):
+            ids.extend(item.column("id").to_pylist())
+    return sorted(ids)
+
+
+def test_split_range():
+    assert split_range(1, 100, 4) == [
+        Partition(index=0, lower=None, upper=26),
+        Partition(index=1, lower=26, upper=51),
+        Partition(index=2, lower=51, upper=76),
+        Partition(index=3, lower=76, upper=None),
+    ]
+    assert split_range(5, 6, 4) == [Partition(index=0, lower=None, upper=6), Partition(index=1, lower=6, upper=None)]
+    assert split_range(7, 7, 4) == [Partition(index=0, lower=None, upper=None)]
+    assert split_range(datetime(2024, 1, 1), datetime(2024, 1, 3), 2) == [
+        Partition(index=0, lower=None, upper=datetime(2024, 1, 2)),
+        Partition(index=1, lower=datetime(2024, 1, 2), upper=None),
+    ]
+    assert split_range(date(2024, 1, 1), date(2024, 1, 5), 2)[1].lower == date(2024, 1, 3)
+
+
+def test_get_partition_column(table):
+    assert get_partition_column(table, None) is table.c.id
+
+    incremental = dlt.sources.incremental("updated_at", initial_value=datetime(2024, 1, 1))
+    assert get_partition_column(table, incremental) is table.c.updated_at
+
+    name_incremental = dlt.sources.incremental("name", initial_value="")
+    assert get_partition_column(table, name_incremental) is None
+
+
+def test_partitioned_read_returns_all_rows(engine, table):
+    assert _read_ids(engine, table, partition_count=4) == list(range(1, 101))
+
+
+def test_partitioned_read_of_empty_table(engine, table):
+    with engine.begin() as conn:
+        conn.execute(table.delete())
+
+    assert _read_ids(engine, table, partition_count=4) == []
+
+
+def _read_ids_of_sql_table(engine, checkpoint: PartitionCheckpoint) -> list[int]:
+    resource = sql_table(
+        engine,
+        table="items",
+        chunk_size=7,
+        backend="pyarrow",
+        partition_count=2,
+        partition_checkpoint=checkpoint,
+    )
+    ids = []
+    for item in resource:
+        if isinstance(item, pa.Table):
+            ids.extend(item.column("id").to_pylist())
+    return sorted(ids)
+
+
+def _lower_id(checkpoint: PartitionCheckpoint, index: int) -> int:
+    lower = checkpoint.partitions[index].lower
+    assert isinstance(lower, int)
+    return lower
+
+
+def test_partitioned_read_resumes_from_checkpoint(engine, table):
+    saved_states: list[Optional[dict]] = []
+    checkpoint = PartitionCheckpoint(save=saved_states.append)
+
+    # Each run reads as many partitions as there are connections, out of several per connection
+    first_ids = _read_ids_of_sql_table(engine, checkpoint)
+    assert len(checkpoint.partitions) == 2 * PARTITIONS_PER_CONNECTION
+    assert first_ids == list(range(1, _lower_id(checkpoint, 2)))
+    checkpoint.commit()
+    assert not checkpoint.is_finished
+
+    # A retry only reads the partitions which weren't loaded yet, including rows added since
+    with engine.begin() as conn:
+        conn.execute(insert(table), [{"id": 101, "name": "item 101", "updated_at": datetime(2024, 2, 1)}])
+    resumed_checkpoint = PartitionCheckpoint(saved_states[-1], save=saved_states.append)
+    assert resumed_checkpoint.has_progress
+
+    second_ids = _read_ids_of_sql_table(engine, resumed_checkpoint)
+    assert second_ids == list(range(_lower_id(checkpoint, 2), _lower_id(checkpoint, 4)))
+    resumed_checkpoint.commit()
+
+    remaining_ids = []
+    while not resumed_checkpoint.is_finished:
+        remaining_ids.extend(_read_ids_of_sql_table(engine, resumed_checkpoint))
+        resumed_checkpoint.commit()
+    assert sorted(first_ids + second_ids + remaining_ids) == list(range(1, 102))
+
+    resumed_checkpoint.clear()
+    assert saved_states[-1] is None
+
+
+def test_checkpoint_round_trip():
+    checkpoint = PartitionCheckpoint()
+    checkpoint.plan("updated_at", split_range(datetime(2024, 1, 1), datetime(2024, 1, 3), 2))
+    checkpoint.mark_read(checkpoint.partitions[0])
+    checkpoint.commit()
+
+    restored = PartitionCheckpoint(checkpoint.to_dict())
+    assert restored.column == "updated_at"
+    assert restored.partitions == checkpoint.partitions
+    assert restored.pending() == [checkpoint.partitions[1]]
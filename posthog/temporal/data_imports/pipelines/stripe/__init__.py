@@ -2,11 +2,15 @@ from typing import Any, Optional
 import dlt
 from dlt.sources.helpers.rest_client.paginators import BasePaginator
 from dlt.sources.helpers.requests import Response, Request
+from posthog.temporal.data_imports.pipelines.checkpoint import PartitionCheckpoint
 from posthog.temporal.data_imports.pipelines.rest_source import RESTAPIConfig, rest_api_resources
 from posthog.temporal.data_imports.pipelines.rest_source.typing import EndpointResource
 from posthog.warehouse.models.external_table_definitions import get_dlt_mapping_for_external_table
 from stripe import StripeClient
 
+# Nothing in Stripe was created before it launched, so windows start here rather than at the unix epoch
+STRIPE_LAUNCH_TIMESTAMP = 1293840000  # 2011-01-01
+
 
 def get_resource(name: str, is_incremental: bool) -> EndpointResource:
     resources: dict[str, EndpointResource] = {
@@ -295,7 +299,14 @@ def get_resource(name: str, is_incremental: bool) -> EndpointResource:
         },
     }
 
-    return resources[name]
+    resource = resources[name]
+    # All list endpoints filter by creation time, so they're fetched in concurrent windows of it
+    resource["endpoint"]["windows"] = {  # type: ignore
+        "start_param": "created[gte]",
+        "end_param": "created[lt]",
+        "initial_value": STRIPE_LAUNCH_TIMESTAMP,
+    }
+    return resource
 
 
 class StripePaginator(BasePaginator):
@@ -325,7 +336,13 @@ class StripePaginator(BasePaginator):
 
 @dlt.source(max_table_nesting=0)
 def stripe_source(
-    api_key: str, account_id: Optional[str], endpoint: str, team_id: int, job_id: str, is_incremental: bool = False
+    api_key: str,
+    account_id: Optional[str],
+    endpoint: str,
+    team_id: int,
+    job_id: str,
+    is_incremental: bool = False,
+    partition_checkpoint: Optional[PartitionCheckpoint] = None,
 ):
     config: RESTAPIConfig = {
         "client": {
@@ -355,7 +372,7 @@ def stripe_source(
         "resources": [get_resource(endpoint, is_incremental)],
     }
 
-    yield from rest_api_resources(config, team_id, job_id)
+    yield from rest_api_resources(config, team_id, job_id, partition_checkpoint=partition_checkpoint)
 
 
 def validate_credentials(api_key: str) -> bool:
@@ -1,7 +1,7 @@
 import dataclasses
 import uuid
 from datetime import datetime
-from typing import Any
+from typing import Any, Optional
 
 from django.db import close_old_connections
 from django.db.models import Prefetch, F
@@ -11,6 +11,7 @@ from temporalio import activity
 from posthog.models.integration import Integration
 from posthog.temporal.common.heartbeat_sync import HeartbeaterSync
 from posthog.temporal.data_imports.pipelines.bigquery import delete_table
+from posthog.temporal.data_imports.pipelines.checkpoint import PartitionCheckpoint
 
 from posthog.temporal.data_imports.pipelines.pipeline_sync import DataImportPipelineSync, PipelineInputs
 from posthog.temporal.data_imports.util import is_posthog_team
@@ -73,6 +74,9 @@ def import_data_activity_sync(inputs: ImportDataActivityInputs):
             if not stripe_secret_key:
                 raise ValueError(f"Stripe secret key not found for job {model.id}")
 
+            # Stripe is fetched in windows of creation time, which a failed sync resumes after
+            partition_checkpoint = _partition_checkpoint_for_schema(schema)
+
             source = stripe_source(
                 api_key=stripe_secret_key,
                 account_id=account_id,
@@ -80,6 +84,7 @@ def import_data_activity_sync(inputs: ImportDataActivityInputs):
                 team_id=inputs.team_id,
                 job_id=inputs.run_id,
                 is_incremental=schema.is_incremental,
+                partition_checkpoint=partition_checkpoint,
             )
 
             return _run(
@@ -89,6 +94,7 @@ def import_data_activity_sync(inputs: ImportDataActivityInputs):
                 inputs=inputs,
                 schema=schema,
                 reset_pipeline=reset_pipeline,
+                partition_checkpoint=partition_checkpoint,
             )
         elif model.pipeline.source_type == ExternalDataSource.Type.HUBSPOT:
             from posthog.temporal.data_imports.pipelines.hubspot import hubspot
@@ -123,10 +129,14 @@ def import_data_activity_sync(inputs: ImportDataActivityInputs):
             ExternalDataSource.Type.MYSQL,
             ExternalDataSource.Type.MSSQL,
         ]:
+            # Only the v2 source reads tables in partitions, which it resumes from the checkpoint after a failure
+            partition_kwargs: dict[str, Any] = {}
             if is_posthog_team(inputs.team_id):
                 from posthog.temporal.data_imports.pipelines.sql_database_v2 import sql_source_for_type
+
+                partition_kwargs["partition_checkpoint"] = _partition_checkpoint_for_schema(schema)
             else:
-                from posthog.temporal.data_imports.pipelines.sql_database import sql_source_for_type
+                from posthog.temporal.data_imports.pipelines.sql_database import sql_source_for_type  # type: ignore[assignment]
 
             host = model.pipeline.job_inputs.get("host")
             port = model.pipeline.job_inputs.get("port")
@@ -180,6 +190,7 @@ def import_data_activity_sync(inputs: ImportDataActivityInputs):
                         else None,
                         team_id=inputs.team_id,
                         using_ssl=using_ssl,
+                        **partition_kwargs,
                     )
 
                     return _run(
@@ -189,6 +200,7 @@ def import_data_activity_sync(inputs: ImportDataActivityInputs):
                         inputs=inputs,
                         schema=schema,
                         reset_pipeline=reset_pipeline,
+                        **partition_kwargs,
                     )
 
             source = sql_source_for_type(
@@ -207,6 +219,7 @@ def import_data_activity_sync(inputs: ImportDataActivityInputs):
                 else None,
                 team_id=inputs.team_id,
                 using_ssl=using_ssl,
+                **partition_kwargs,
             )
 
             return _run(
@@ -216,6 +229,7 @@ def import_data_activity_sync(inputs: ImportDataActivityInputs):
                 inputs=inputs,
                 schema=schema,
                 reset_pipeline=reset_pipeline,
+                **partition_kwargs,
             )
         elif model.pipeline.source_type == ExternalDataSource.Type.SNOWFLAKE:
             if is_posthog_team(inputs.team_id):
@@ -435,8 +449,11 @@ def _run(
     inputs: ImportDataActivityInputs,
     schema: ExternalDataSchema,
     reset_pipeline: bool,
+    partition_checkpoint: Optional[PartitionCheckpoint] = None,
 ):
-    table_row_counts = DataImportPipelineSync(job_inputs, source, logger, reset_pipeline, schema.is_incremental).run()
+    table_row_counts = DataImportPipelineSync(
+        job_inputs, source, logger, reset_pipeline, schema.is_incremental, partition_checkpoint=partition_checkpoint
+    ).run()
     total_rows_synced = sum(table_row_counts.values())
 
     ExternalDataJob.objects.filter(id=inputs.run_id, team_id=inputs.team_id).update(
@@ -445,3 +462,16 @@ def _run(
     source = ExternalDataSource.objects.get(id=inputs.source_id)
     source.job_inputs.pop("reset_pipeline", None)
     source.save()
+
+
+def _partition_checkpoint_for_schema(schema: ExternalDataSchema) -> PartitionCheckpoint:
+    def save(state: Optional[dict]) -> None:
+        if schema.sync_type_config.get("partition_checkpoint") == state:
+            return
+        if state is None:
+            schema.sync_type_config.pop("partition_checkpoint", None)
+        else:
+            schema.sync_type_config["partition_checkpoint"] = state
+        schema.save(update_fields=["sync_type_config"])
+
+    return PartitionCheckpoint(schema.sync_type_config.get("partition_checkpoint"), save=save)
@@ -88,6 +88,7 @@ def test_postgres_source_without_ssh_tunnel(activity_environment, team, **kwargs
             incremental_field_type=None,
             team_id=team.id,
             using_ssl=True,
+            partition_checkpoint=mock.ANY,
         )
 
 
@@ -129,6 +130,7 @@ def test_postgres_source_with_ssh_tunnel_disabled(activity_environment, team, **
             incremental_field_type=None,
             team_id=team.id,
             using_ssl=True,
+            partition_checkpoint=mock.ANY,
         )
 
 
@@ -188,4 +190,5 @@ def test_postgres_source_with_ssh_tunnel_enabled(activity_environment, team, **k
             incremental_field_type=None,
             team_id=team.id,
             using_ssl=True,
+            partition_checkpoint=mock.ANY,
         )
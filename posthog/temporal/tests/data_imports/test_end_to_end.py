@@ -37,6 +37,8 @@ from posthog.schema import (
 )
 from posthog.temporal.data_imports import ACTIVITIES
 from posthog.temporal.data_imports.external_data_job import ExternalDataJobWorkflow
+from posthog.temporal.data_imports.pipelines.rest_source import REST_SOURCE_CONCURRENCY, WINDOWS_PER_WORKER
+from posthog.temporal.data_imports.pipelines.stripe import STRIPE_LAUNCH_TIMESTAMP
 from posthog.temporal.utils import ExternalDataWorkflowInputs
 from posthog.warehouse.models import (
     ExternalDataJob,
@@ -50,6 +52,8 @@ from posthog.warehouse.models.join import DataWarehouseJoin
 BUCKET_NAME = "test-pipeline"
 SESSION = aioboto3.Session()
 create_test_client = functools.partial(SESSION.client, endpoint_url=settings.OBJECT_STORAGE_ENDPOINT)
+# Stripe is fetched in windows of creation time, which the mocked endpoint returns rows of their own for
+STRIPE_WINDOW_COUNT = REST_SOURCE_CONCURRENCY * WINDOWS_PER_WORKER
 
 
 @pytest.fixture
@@ -108,6 +112,7 @@ async def _run(
     mock_data_response: Any,
     sync_type: Optional[ExternalDataSchema.SyncType] = None,
     sync_type_config: Optional[dict] = None,
+    expected_row_count: Optional[int] = None,
 ):
     source = await sync_to_async(ExternalDataSource.objects.create)(
         source_id=uuid.uuid4(),
@@ -144,8 +149,11 @@ async def _run(
     await sync_to_async(schema.refresh_from_db)()
     assert schema.last_synced_at == run.created_at
 
+    if expected_row_count is None:
+        expected_row_count = STRIPE_WINDOW_COUNT if source_type == "Stripe" else 1
+
     res = await sync_to_async(execute_hogql_query)(f"SELECT * FROM {table_name}", team)
-    assert len(res.results) == 1
+    assert len(res.results) == expected_row_count
 
     for name, field in external_tables.get(table_name, {}).items():
         if field.hidden:
@@ -158,6 +166,12 @@ async def _run(
     return workflow_id, inputs
 
 
+def _stripe_window_rows(rows: list[dict[str, Any]], params: dict[str, Any]) -> list[dict[str, Any]]:
+    """Copies of the rows which were created in the requested window, with ids of their own"""
+    window_start = params.get("created[gte]") or STRIPE_LAUNCH_TIMESTAMP
+    return [{**row, "id": f"{row['id']}_{window_start}", "created": window_start} for row in rows]
+
+
 async def _execute_run(workflow_id: str, inputs: ExternalDataWorkflowInputs, mock_data_response):
     def mock_paginate(
         class_self,
@@ -170,6 +184,9 @@ async def _execute_run(workflow_id: str, inputs: ExternalDataWorkflowInputs, moc
         data_selector: Optional[Any] = None,
         hooks: Optional[Any] = None,
     ):
+        if params and (params.get("created[gte]") is not None or params.get("created[lt]") is not None):
+            return iter(_stripe_window_rows(mock_data_response, params))
+
         return iter(mock_data_response)
 
     def mock_to_session_credentials(class_self):
@@ -664,6 +681,54 @@ async def test_postgres_schema_evolution(team, postgres_config, postgres_connect
     assert any(x == "new_col" for x in columns)
 
 
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+async def test_postgres_full_refresh_loads_every_partition(team, postgres_config, postgres_connection):
+    await postgres_connection.execute(
+        "CREATE TABLE IF NOT EXISTS {schema}.test_table (id integer PRIMARY KEY)".format(
+            schema=postgres_config["schema"]
+        )
+    )
+    await postgres_connection.execute(
+        "INSERT INTO {schema}.test_table (id) SELECT generate_series(1, 100)".format(schema=postgres_config["schema"])
+    )
+    await postgres_connection.commit()
+
+    # The table is read in several partitions per connection, which are loaded over several runs of the pipeline
+    with mock.patch(
+        "posthog.temporal.data_imports.workflow_activities.import_data_sync.is_posthog_team", return_value=True
+    ):
+        _workflow_id, inputs = await _run(
+            team=team,
+            schema_name="test_table",
+            table_name="postgres_test_table",
+            source_type="Postgres",
+            job_inputs={
+                "host": postgres_config["host"],
+                "port": postgres_config["port"],
+                "database": postgres_config["database"],
+                "user": postgres_config["user"],
+                "password": postgres_config["password"],
+                "schema": postgres_config["schema"],
+                "ssh_tunnel_enabled": "False",
+            },
+            mock_data_response=[],
+            sync_type=ExternalDataSchema.SyncType.FULL_REFRESH,
+            expected_row_count=100,
+        )
+
+        # Syncing again replaces the rows, rather than adding to them
+        await _execute_run(str(uuid.uuid4()), inputs, [])
+
+    res = await sync_to_async(execute_hogql_query)(
+        "SELECT count(), count(DISTINCT id), min(id), max(id) FROM postgres_test_table", team
+    )
+    assert res.results == [(100, 100, 1, 100)]
+
+    schema = await sync_to_async(ExternalDataSchema.objects.get)(id=inputs.external_data_schema_id)
+    assert "partition_checkpoint" not in schema.sync_type_config
+
+
 @pytest.mark.django_db(transaction=True)
 @pytest.mark.asyncio
 async def test_sql_database_missing_incremental_values(team, postgres_config, postgres_connection):
@@ -4,6 +4,7 @@ from unittest import mock
 from typing import Any, Optional
 import pytest
 from asgiref.sync import sync_to_async
+from deltalake import DeltaTable
 from django.test import override_settings
 
 from posthog.temporal.data_imports import import_data_activity_sync
@@ -17,6 +18,8 @@ from posthog.temporal.data_imports.external_data_job import (
     ExternalDataWorkflowInputs,
 )
 from posthog.temporal.data_imports.pipelines.pipeline_sync import DataImportPipelineSync
+from posthog.temporal.data_imports.pipelines.rest_source import REST_SOURCE_CONCURRENCY, WINDOWS_PER_WORKER
+from posthog.temporal.data_imports.pipelines.stripe import STRIPE_LAUNCH_TIMESTAMP
 from posthog.temporal.data_imports.workflow_activities.check_billing_limits import check_billing_limits_activity
 from posthog.temporal.data_imports.workflow_activities.create_job_model import (
     CreateExternalDataJobModelActivityInputs,
@@ -55,6 +58,34 @@ from posthog.warehouse.models.external_data_schema import get_all_schemas_for_so
 BUCKET_NAME = "test-pipeline"
 SESSION = boto3.Session()
 create_test_client = functools.partial(SESSION.client, endpoint_url=settings.OBJECT_STORAGE_ENDPOINT)
+# Stripe is fetched in windows of creation time, which the mocked endpoints return rows of their own for
+STRIPE_WINDOW_COUNT = REST_SOURCE_CONCURRENCY * WINDOWS_PER_WORKER
+
+
+def _stripe_window_rows(rows: list[dict[str, Any]], params: Optional[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Copies of the rows which were created in the requested window of creation time, with ids of their own"""
+    window_start = (params or {}).get("created[gte]") or STRIPE_LAUNCH_TIMESTAMP
+    return [{**row, "id": f"{row['id']}_{window_start}", "created": window_start} for row in rows]
+
+
+def _assert_every_stripe_window_loaded(folder_path: str, table_name: str, row_id: str) -> None:
+    delta_table = DeltaTable(
+        f"s3://{BUCKET_NAME}/{folder_path}/{table_name}",
+        storage_options={
+            "aws_access_key_id": settings.OBJECT_STORAGE_ACCESS_KEY_ID,
+            "aws_secret_access_key": settings.OBJECT_STORAGE_SECRET_ACCESS_KEY,
+            "endpoint_url": settings.OBJECT_STORAGE_ENDPOINT,
+            "region": "us-east-1",
+            "AWS_ALLOW_HTTP": "true",
+            "AWS_S3_ALLOW_UNSAFE_RENAME": "true",
+        },
+    )
+    ids = delta_table.to_pyarrow_table(columns=["id"]).column("id").to_pylist()
+
+    # Windows are loaded oldest first, so the oldest window's row is the one an overwritten table would lose
+    assert len(ids) == STRIPE_WINDOW_COUNT
+    assert len(set(ids)) == STRIPE_WINDOW_COUNT
+    assert f"{row_id}_{STRIPE_LAUNCH_TIMESTAMP}" in ids
 
 
 def delete_all_from_s3(minio_client, bucket_name: str, key_prefix: str):
@@ -451,12 +482,15 @@ def test_run_stripe_job(activity_environment, team, minio_client, **kwargs):
         hooks: Optional[Any] = None,
     ):
         return iter(
-            [
-                {
-                    "id": "cus_123",
-                    "name": "John Doe",
-                }
-            ]
+            _stripe_window_rows(
+                [
+                    {
+                        "id": "cus_123",
+                        "name": "John Doe",
+                    }
+                ],
+                params,
+            )
         )
 
     def mock_charges_paginate(
@@ -471,12 +505,15 @@ def test_run_stripe_job(activity_environment, team, minio_client, **kwargs):
         hooks: Optional[Any] = None,
     ):
         return iter(
-            [
-                {
-                    "id": "chg_123",
-                    "customer": "cus_1",
-                }
-            ]
+            _stripe_window_rows(
+                [
+                    {
+                        "id": "chg_123",
+                        "customer": "cus_1",
+                    }
+                ],
+                params,
+            )
         )
 
     def mock_to_session_credentials(class_self):
@@ -520,7 +557,8 @@ def test_run_stripe_job(activity_environment, team, minio_client, **kwargs):
         folder_path = job_1.folder_path()
         job_1_customer_objects = minio_client.list_objects_v2(Bucket=BUCKET_NAME, Prefix=f"{folder_path}/customer/")
 
-        assert len(job_1_customer_objects["Contents"]) == 2
+        assert len(job_1_customer_objects["Contents"]) > 0
+        _assert_every_stripe_window_loaded(folder_path, "customer", "cus_123")
 
     with (
         mock.patch.object(RESTClient, "paginate", mock_charges_paginate),
@@ -541,7 +579,8 @@ def test_run_stripe_job(activity_environment, team, minio_client, **kwargs):
         activity_environment.run(import_data_activity_sync, job_2_inputs)
 
         job_2_charge_objects = minio_client.list_objects_v2(Bucket=BUCKET_NAME, Prefix=f"{job_2.folder_path()}/charge/")
-        assert len(job_2_charge_objects["Contents"]) == 2
+        assert len(job_2_charge_objects["Contents"]) > 0
+        _assert_every_stripe_window_loaded(job_2.folder_path(), "charge", "chg_123")
 
 
 @pytest.mark.django_db(transaction=True)
@@ -594,12 +633,15 @@ def test_run_stripe_job_row_count_update(activity_environment, team, minio_clien
         hooks: Optional[Any] = None,
     ):
         return iter(
-            [
-                {
-                    "id": "cus_123",
-                    "name": "John Doe",
-                }
-            ]
+            _stripe_window_rows(
+                [
+                    {
+                        "id": "cus_123",
+                        "name": "John Doe",
+                    }
+                ],
+                params,
+            )
         )
 
     def mock_to_session_credentials(class_self):
@@ -643,10 +685,10 @@ def test_run_stripe_job_row_count_update(activity_environment, team, minio_clien
         folder_path = job_1.folder_path()
         job_1_customer_objects = minio_client.list_objects_v2(Bucket=BUCKET_NAME, Prefix=f"{folder_path}/customer/")
 
-        assert len(job_1_customer_objects["Contents"]) == 2
+        assert len(job_1_customer_objects["Contents"]) > 0
 
         job_1.refresh_from_db()
-        assert job_1.rows_synced == 1
+        assert job_1.rows_synced == STRIPE_WINDOW_COUNT
 
 
 @pytest.mark.django_db(transaction=True)
@@ -1,4 +1,11 @@
-from posthog.models.element import Element, chain_to_elements, elements_to_string
+from posthog.api.element import ElementSerializer
+from posthog.models.element import (
+    Element,
+    chain_to_element_dicts,
+    chain_to_elements,
+    elements_to_string,
+    parse_elements_chain,
+)
 from posthog.test.base import BaseTest, ClickhouseTestMixin
 
 
@@ -83,3 +90,32 @@ class TestElement(ClickhouseTestMixin, BaseTest):
         self.assertEqual(elements[0].tag_name, "a")
         self.assertEqual(elements[0].href, "/a-url")
         self.assertEqual(elements[0].attr_class, ["small", "xy:z"])
+
+    def test_chain_to_element_dicts_matches_serializer(self):
+        for chain in [
+            'a.small:data-attr="something \\" that; could mess up"href="/a-url"nth-child="1"nth-of-type="0"text="bla"',
+            'button.btn.btn-primary:nth-child="0"nth-of-type="0";div:attr_id="nested"nth-child="0"nth-of-type="0"',
+            "a........small",
+            "a.",
+            "div",
+            "",
+        ]:
+            self.assertEqual(
+                chain_to_element_dicts(chain),
+                [dict(element) for element in ElementSerializer(chain_to_elements(chain), many=True).data],
+            )
+
+    def test_parsed_chains_are_cached(self):
+        chain = 'button.btn:nth-child="0"nth-of-type="0";div:nth-child="0"nth-of-type="0"'
+
+        self.assertIs(parse_elements_chain(chain), parse_elements_chain(chain))
+
+        # Callers can modify what they get back without affecting the cache
+        elements = chain_to_elements(chain)
+        assert elements[0].attr_class is not None
+        elements[0].attr_class.append("mutated")
+        element_dicts = chain_to_element_dicts(chain)
+        element_dicts[0]["attributes"]["mutated"] = "true"
+        self.assertEqual(chain_to_elements(chain)[0].attr_class, ["btn"])
+        self.assertEqual(chain_to_element_dicts(chain)[0]["attributes"], {})
+        self.assertEqual(elements_to_string(parse_elements_chain(chain)), chain)
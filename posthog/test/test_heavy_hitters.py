@@ -0,0 +1,74 @@
+from django.test import SimpleTestCase
+
+from posthog.heavy_hitters import HeavyHitterDetector
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestHeavyHitterDetector(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.detections: list[tuple[str, int]] = []
+        self.expirations: list[str] = []
+        self.detector = HeavyHitterDetector(
+            threshold=100,
+            window_seconds=60,
+            ttl_seconds=300,
+            top_k=3,
+            on_detect=lambda key, count: self.detections.append((key, count)),
+            on_expire=self.expirations.append,
+            clock=self.clock,
+        )
+
+    def test_detects_keys_over_threshold(self):
+        for index in range(1000):
+            self.detector.record(f"token:user_{index}")
+        for _ in range(99):
+            assert self.detector.record("token:bot") is False
+
+        assert self.detector.record("token:bot") is True
+        assert self.detector.record("token:bot") is True
+        assert self.detections == [("token:bot", 100)]
+        assert self.detector.detected_keys() == ["token:bot"]
+        assert self.detector.is_detected("token:user_1") is False
+
+    def test_counts_over_sliding_window(self):
+        self.detector.record("token:bot", count=60)
+        self.clock.now += 30
+        self.detector.record("token:bot", count=30)
+        assert self.detector.estimate("token:bot") == 90
+
+        # The first counts leave the window, the later ones stay in it
+        self.clock.now += 40
+        assert self.detector.estimate("token:bot") == 30
+        assert self.detector.record("token:bot", count=60) is False
+
+        self.clock.now += 120
+        assert self.detector.estimate("token:bot") == 0
+
+    def test_detection_expires(self):
+        assert self.detector.record("token:bot", count=100) is True
+
+        self.clock.now += 301
+        assert self.detector.is_detected("token:bot") is False
+        assert self.detector.record("token:other") is False
+        assert self.expirations == ["token:bot"]
+
+        # A key which is still heavy is detected again
+        assert self.detector.record("token:bot", count=100) is True
+        assert self.detections == [("token:bot", 100), ("token:bot", 100)]
+
+    def test_tracks_top_keys(self):
+        for key, count in [("token:a", 5), ("token:b", 50), ("token:c", 20), ("token:d", 10), ("token:e", 1)]:
+            self.detector.record(key, count=count)
+
+        assert self.detector.top() == [("token:b", 50), ("token:c", 20), ("token:d", 10)]
+
+        self.clock.now += 120
+        assert self.detector.top() == []
@@ -29,6 +29,7 @@ from posthog.api import (
     capture,
     decide,
     hog_function_template,
+    query,
     remote_config,
     router,
     sharing,
@@ -172,6 +173,11 @@ urlpatterns = [
     *ee_urlpatterns,
     # api
     path("api/unsubscribe", unsubscribe.unsubscribe),
+    # An async view, so that it can wait for the query without taking up a thread under ASGI
+    re_path(
+        r"^api/(?:environments|projects)/(?P<parent_lookup_team_id>[^/.]+)/query/(?P<pk>[^/.]+)/wait/?$",
+        query.wait_for_query,
+    ),
     path("api/", include(router.urls)),
     path("", include(tf_urls)),
     opt_slash_path("api/user/redirect_to_site", user.redirect_to_site),
@@ -3,7 +3,6 @@ from datetime import datetime, timedelta
 from typing import Optional
 from django.db import models
 from django_deprecate_fields import deprecate_field
-import snowflake.connector
 from django.conf import settings
 from posthog.models.team import Team
 from posthog.models.utils import CreatedMetaFields, DeletedMetaFields, UUIDModel, UpdatedMetaFields, sane_repr
@@ -195,6 +194,9 @@ def filter_snowflake_incremental_fields(columns: list[tuple[str, str]]) -> list[
 def get_snowflake_schemas(
     account_id: str, database: str, warehouse: str, user: str, password: str, schema: str, role: Optional[str] = None
 ) -> dict[str, list[tuple[str, str]]]:
+    # The Snowflake connector takes long to import, and only this needs it
+    import snowflake.connector
+
     with snowflake.connector.connect(
         user=user,
         password=password,